@@ -7,7 +7,7 @@ from pyomo.environ import (
     Param,
     units as pyunits,
 )
-from pyomo.common.config import ConfigValue, In
+from pyomo.common.config import Bool, ConfigValue, In
 
 import idaes.core.util.scaling as iscale
 from idaes.core import declare_process_block_class
@@ -17,49 +17,10 @@ import idaes.logger as idaeslog
 from idaes.models.unit_models.statejunction import StateJunctionData
 from idaes.core.util.exceptions import ConfigurationError
 
-from costing.chemical_addition import cost_chemical_addition
+from costing.chemical_addition import cost_chemical_addition, get_chemical_data
 
 __author__ = "Kurban Sitterley"
 
-solution_dens_dict = {
-    "default": 1000,
-    "ammonia": 900,
-    "ammonium_sulfate": 1230,
-    "alum": 1360,
-    "anti_scalant": 1021,
-    "calcium_hydroxide": 1300,
-    "caustic": 1540,
-    "ferric_chloride": 1460,
-    "hydrochloric_acid": 1490,
-    "sodium_hypochlorite": 1300,
-    "lime": 1250,
-    "polymer": 1100,
-    "scale_inhibitor": 1000,
-    "soda_ash": 2200,
-    "sodium_bisulfite": 1480,
-    "sulfuric_acid": 1781,
-}
-
-ratio_in_solution_dict = {
-    "default": 1,
-    "ammonia": 0.3,
-    "ammonium_sulfate": 0.4,
-    "alum": 0.5,
-    "anti_scalant": 1,
-    "caustic": 0.5,
-    "calcium_hydroxide": 0.35,
-    "ferric_chloride": 0.42,
-    "hydrochloric_acid": 0.37,
-    "sodium_hypochlorite": 1,
-    "lime": 0.5,
-    "polymer": 0.1,
-    "scale_inhibitor": 1,
-    "soda_ash": 1,
-    "sodium_bisulfite": 1,
-    "sulfuric_acid": 1,
-}
-
-
 # class ChemicalType(StrEnum):
 #     default = "default"
 #     ammonia = "ammonia"
@@ -110,6 +71,20 @@ class ChemicalAdditionData(StateJunctionData):
         ),
     )
 
+    CONFIG.declare(
+        "explicit",
+        ConfigValue(
+            default=False,
+            domain=Bool,
+            description="Build solution flows and pumping power as Expressions",
+            doc="""If True, chemical_soln_flow_vol, chemical_soln_flow_mass and
+    pumping_power are built as Expressions of the dose and feed flow instead
+    of Vars with equality constraints, so the unit adds no variables or
+    constraints to the model. They are then evaluated after the solve,
+    **default** - False.""",
+        ),
+    )
+
     def build(self):
 
         super().build()
@@ -132,33 +107,19 @@ class ChemicalAdditionData(StateJunctionData):
             doc=f"Mass fraction of {self.config.chemical} in solution",
         )
 
-        if "solution_density" in self.config.chemical_data.keys():
-            # Prefer user provided data
-            self.solution_density.set_value(
-                self.config.chemical_data["solution_density"]
-            )
-        elif self.config.chemical in solution_dens_dict.keys():
-            # Defer to default data
-            self.solution_density.set_value(solution_dens_dict[self.config.chemical])
-        else:
-            raise ConfigurationError(
-                f"Must provide solution density for {self.config.chemical} addition."
-            )
-
-        if "ratio_in_solution" in self.config.chemical_data.keys():
-            # Prefer user provided data
-            self.ratio_in_solution.set_value(
-                self.config.chemical_data["ratio_in_solution"]
-            )
-        elif self.config.chemical in solution_dens_dict.keys():
-            # Defer to default data
-            self.ratio_in_solution.set_value(
-                ratio_in_solution_dict[self.config.chemical]
-            )
-        else:
-            raise ConfigurationError(
-                f"Must provide ratio in solution for {self.config.chemical} addition."
-            )
+        # Prefer user provided data, defer to the chemical catalog
+        catalog_data = get_chemical_data(self.config.chemical) or {}
+        for param in ["solution_density", "ratio_in_solution"]:
+            if param in self.config.chemical_data.keys():
+                val = self.config.chemical_data[param]
+            else:
+                val = catalog_data.get(param)
+            if val is None:
+                raise ConfigurationError(
+                    f"Must provide {param.replace('_', ' ')} for "
+                    f"{self.config.chemical} addition."
+                )
+            self.find_component(param).set_value(val)
 
         self.pump_head = Param(
             initialize=10,
@@ -181,6 +142,10 @@ class ChemicalAdditionData(StateJunctionData):
             doc=f"Dose of {self.config.chemical} addition",
         )
 
+        if self.config.explicit:
+            self._build_explicit()
+            return
+
         self.chemical_soln_flow_vol = Var(
             initialize=1,
             units=pyunits.m**3 / pyunits.s,
@@ -245,6 +210,47 @@ class ChemicalAdditionData(StateJunctionData):
                 to_units=pyunits.kW,
             )
 
+    def _build_explicit(self):
+        @self.Expression(
+            doc=f"Mass flow rate of {self.config.chemical} added",
+        )
+        def chemical_flow_mass(b):
+            # (kg chem / s) = (g chem / L water) * (m3 water / s)
+            return pyunits.convert(
+                b.dose * b.properties[0].flow_vol_phase["Liq"],
+                to_units=pyunits.kg / pyunits.s,
+            )
+
+        @self.Expression(
+            doc=f"Volumetric flow rate of {self.config.chemical} solution",
+        )
+        def chemical_soln_flow_vol(b):
+            return pyunits.convert(
+                b.chemical_flow_mass / (b.ratio_in_solution * b.solution_density),
+                to_units=pyunits.m**3 / pyunits.s,
+            )
+
+        @self.Expression(
+            doc=f"Mass flow rate of {self.config.chemical} solution",
+        )
+        def chemical_soln_flow_mass(b):
+            return pyunits.convert(
+                b.chemical_flow_mass / b.ratio_in_solution,
+                to_units=pyunits.kg / pyunits.s,
+            )
+
+        @self.Expression(
+            doc=f"Pumping power for {self.config.chemical} addition",
+        )
+        def pumping_power(b):
+            return pyunits.convert(
+                b.chemical_flow_mass
+                * b.pump_head
+                * Constants.acceleration_gravity
+                / b.pump_efficiency,
+                to_units=pyunits.kW,
+            )
+
     def initialize_build(
         self,
         state_args=None,
@@ -261,6 +267,9 @@ class ChemicalAdditionData(StateJunctionData):
         if iscale.get_scaling_factor(self.dose) is None:
             iscale.set_scaling_factor(self.dose, 10)
 
+        if self.config.explicit:
+            return
+
         if iscale.get_scaling_factor(self.chemical_soln_flow_vol) is None:
             iscale.set_scaling_factor(self.chemical_soln_flow_vol, 1)
 
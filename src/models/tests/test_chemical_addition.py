@@ -4,11 +4,17 @@ from pyomo.environ import (
     ConcreteModel,
     TransformationFactory,
     assert_optimal_termination,
+    value,
     units as pyunits,
 )
 from pyomo.network import Arc
+from pyomo.util.calc_var_value import calculate_variable_from_constraint
 
 from idaes.core.util.exceptions import ConfigurationError
+from idaes.core.util.model_statistics import (
+    degrees_of_freedom,
+    number_activated_constraints,
+)
 from idaes.core import FlowsheetBlock, UnitModelCostingBlock
 import idaes.core.util.scaling as iscale
 from idaes.core.util.testing import initialization_tester
@@ -18,6 +24,8 @@ from watertap.core.solvers import get_solver
 from watertap.costing import WaterTAPCosting
 
 from models.chemical_addition import ChemicalAddition
+from costing.chemical_addition import get_chemical_catalog, get_chemical_data
+from srp.utils import compute_lazy_properties
 
 solver = get_solver()
 
@@ -62,7 +70,7 @@ def test_chemical_addition():
         m = build_chem_addition_model(chemical=chem)
 
         # Check unit configuration
-        assert len(m.fs.unit.config) == 6
+        assert len(m.fs.unit.config) == 7
 
         # Check that variables are constructed
         assert hasattr(m.fs.unit, "dose")
@@ -92,3 +100,108 @@ def test_chemical_addition_costing():
         results = solver.solve(m)
         # Check for optimal solution
         assert_optimal_termination(results)
+
+
+@pytest.mark.unit
+def test_chemical_catalog():
+    catalog = get_chemical_catalog()
+    assert catalog is get_chemical_catalog()
+    assert get_chemical_data("not_a_chemical") is None
+
+    data = get_chemical_data("hydrochloric_acid")
+    assert data["cost"] == 0.12
+    assert data["purity"] == 0.36
+    assert data["solution_density"] == 1490
+    assert data["ratio_in_solution"] == 0.37
+    assert not data["volumetric_cost"]
+    assert get_chemical_data("sodium_bisulfite")["volumetric_cost"]
+
+    # Solution properties come from the catalog unless provided
+    m = build_chem_addition_model(chemical="ferric_chloride")
+    assert value(m.fs.unit.solution_density) == 1460
+    assert value(m.fs.unit.ratio_in_solution) == 0.42
+    m.fs.unit2 = ChemicalAddition(
+        property_package=m.fs.properties,
+        chemical="sodium_hydroxide",
+        chemical_data={"solution_density": 1300, "ratio_in_solution": 0.25},
+    )
+    assert value(m.fs.unit2.ratio_in_solution) == 0.25
+
+    msg = "Must provide solution density for sodium_hydroxide addition."
+    with pytest.raises(ConfigurationError, match=msg):
+        m.fs.unit3 = ChemicalAddition(
+            property_package=m.fs.properties, chemical="sodium_hydroxide"
+        )
+
+
+@pytest.mark.unit
+def test_chemical_addition_costing_blocks():
+    m = build_chem_addition_model(chemical="sodium_bisulfite")
+    m.fs.unit2 = ChemicalAddition(
+        property_package=m.fs.properties, chemical="hydrochloric_acid"
+    )
+    m.fs.unit3 = ChemicalAddition(
+        property_package=m.fs.properties, chemical="sodium_bisulfite"
+    )
+    m.fs.costing = WaterTAPCosting()
+    for unit in [m.fs.unit, m.fs.unit2, m.fs.unit3]:
+        unit.costing = UnitModelCostingBlock(flowsheet_costing_block=m.fs.costing)
+
+    # Only the parameter blocks of the chemicals used are built
+    assert m.fs.costing.component("sodium_bisulfite") is not None
+    assert m.fs.costing.component("hydrochloric_acid") is not None
+    assert m.fs.costing.component("ammonia") is None
+
+    hcl = m.fs.costing.hydrochloric_acid
+    assert hcl.cost.fixed
+    assert value(hcl.cost) == 0.12
+    assert value(hcl.purity) == 0.36
+    assert str(pyunits.get_units(hcl.cost)) == "USD_2020/kg"
+    assert str(pyunits.get_units(m.fs.costing.sodium_bisulfite.cost)) == (
+        "USD_2021/gal"
+    )
+    assert {"sodium_bisulfite", "hydrochloric_acid"} <= set(m.fs.costing.flow_types)
+    # Volume priced chemicals are costed on the solution flow
+    flows = m.fs.costing._registered_flows
+    assert flows["sodium_bisulfite"] == [
+        m.fs.unit.chemical_soln_flow_vol,
+        m.fs.unit3.chemical_soln_flow_vol,
+    ]
+    assert flows["hydrochloric_acid"] == [m.fs.unit2.chemical_flow_mass]
+
+    m.fs.unit4 = ChemicalAddition(property_package=m.fs.properties, chemical="polymer")
+    with pytest.raises(ValueError, match="Unrecognized chemical type polymer"):
+        m.fs.unit4.costing = UnitModelCostingBlock(flowsheet_costing_block=m.fs.costing)
+
+
+@pytest.mark.unit
+def test_chemical_addition_explicit():
+    m = build_chem_addition_model(chemical="sodium_bisulfite")
+    m.fs.explicit = ChemicalAddition(
+        property_package=m.fs.properties, chemical="sodium_bisulfite", explicit=True
+    )
+    m.fs.explicit.dose.fix(0.1)
+    for v in ["flow_mass_phase_comp", "temperature", "pressure"]:
+        for idx, var in getattr(m.fs.explicit.inlet, v).items():
+            var.fix(value(getattr(m.fs.unit.inlet, v)[idx]))
+    iscale.calculate_scaling_factors(m)
+
+    assert degrees_of_freedom(m.fs.explicit) == 0
+    assert number_activated_constraints(m.fs.unit) == (
+        number_activated_constraints(m.fs.explicit) + 3
+    )
+
+    # Expressions match the solution of the implicit constraints
+    compute_lazy_properties(m.fs.unit.properties)
+    compute_lazy_properties(m.fs.explicit.properties)
+    for v in ["chemical_soln_flow_vol", "chemical_soln_flow_mass", "pumping_power"]:
+        calculate_variable_from_constraint(
+            getattr(m.fs.unit, v), getattr(m.fs.unit, f"eq_{v}")
+        )
+    for v in ["chemical_soln_flow_vol", "chemical_soln_flow_mass", "pumping_power"]:
+        assert value(getattr(m.fs.explicit, v)) == pytest.approx(
+            value(getattr(m.fs.unit, v)), rel=1e-8
+        )
+        assert str(pyunits.get_units(getattr(m.fs.explicit, v))) == str(
+            pyunits.get_units(getattr(m.fs.unit, v))
+        )
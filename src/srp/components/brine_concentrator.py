@@ -45,6 +45,7 @@ from watertap.costing import WaterTAPCosting
 
 from srp.components.translator_sw_to_water import TranslatorSWtoWater
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 __author__ = "Kurban Sitterley"
 
@@ -141,6 +142,7 @@ def build_system(recovery=0.5, Qin=350, Cin=11408, feed_temp=27, **kwargs):
     return m
 
 
+@profiled
 def build_bc(m, blk, external_heating=True):
 
     print(f'\n{"=======> BUILDING BC SYSTEM <=======":^60}\n')
@@ -302,7 +304,8 @@ def build_bc(m, blk, external_heating=True):
     if external_heating:
         add_external_heating(blk)
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
     blk.evaporator.connect_to_condenser(blk.condenser)
     _log.info("MVC flowsheet built")
@@ -493,6 +496,7 @@ def init_system(m, blk, **kwargs):
     propagate_state(m.fs.mvc_to_disposal)
 
 
+@profiled
 def init_bc(
     # m,
     blk,
@@ -21,6 +21,7 @@ from watertap.property_models.seawater_prop_pack import SeawaterParameterBlock
 from watertap.core.solvers import get_solver
 
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 solver = get_solver()
 
@@ -76,6 +77,7 @@ def build_system(
     return m
 
 
+@profiled
 def build_mixer(blk, name=None, prop_package=None, inlet_list=["inlet1", "inlet2"]):
 
     if name is None:
@@ -119,7 +121,8 @@ def build_mixer(blk, name=None, prop_package=None, inlet_list=["inlet1", "inlet2
         destination=blk.product.inlet,
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_system_scaling(m):
@@ -168,6 +171,7 @@ def init_system(m):
     m.fs.product.initialize()
 
 
+@profiled
 def init_mixer(blk, name=None):
     if name is None:
         name = blk.name.split(".")[-1]
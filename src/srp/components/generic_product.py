@@ -17,6 +17,7 @@ from watertap.property_models.seawater_prop_pack import SeawaterParameterBlock
 from watertap.core.solvers import get_solver
 
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 __all__ = ["build_product", "init_product"]
 
@@ -78,6 +79,7 @@ def set_system_op_conditions(m):
     iscale.calculate_scaling_factors(m)
 
 
+@profiled
 def build_product(blk, name=None, prop_package=None):
 
     if name is None:
@@ -102,11 +104,13 @@ def build_product(blk, name=None, prop_package=None):
         destination=blk.unit.inlet,
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
     return blk
 
 
+@profiled
 def init_product(blk, name=None):
 
     if name is None:
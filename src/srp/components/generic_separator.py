@@ -18,6 +18,7 @@ from watertap.property_models.seawater_prop_pack import SeawaterParameterBlock
 from watertap.core.solvers import get_solver
 
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 __all__ = [
     "build_separator",
@@ -63,6 +64,7 @@ def build_system(Qin=11343, Cin=1467, feed_temp=27, outlet_list=["outlet1", "out
     return m
 
 
+@profiled
 def build_separator(blk, name=None, prop_package=None, outlet_list=None):
 
     if name is None:
@@ -111,7 +113,8 @@ def build_separator(blk, name=None, prop_package=None, outlet_list=None):
             ),
         )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_system_scaling(m):
@@ -177,6 +180,7 @@ def init_system(m):
         pb.initialize()
 
 
+@profiled
 def init_separator(blk, name=None):
 
     if name is None:
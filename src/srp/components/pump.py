@@ -21,6 +21,7 @@ from watertap.property_models.seawater_prop_pack import SeawaterParameterBlock
 from watertap.core.solvers import get_solver
 
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 __all__ = ["build_pump", "set_pump_op_conditions", "init_pump", "set_pump_scaling"]
 
@@ -61,6 +62,7 @@ def build_system(Qin=11343, Cin=1467, feed_temp=27):
     return m
 
 
+@profiled
 def build_pump(blk, name=None, prop_package=None):
 
     if name is None:
@@ -121,7 +123,8 @@ def build_pump(blk, name=None, prop_package=None):
         destination=blk.product.inlet,
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_pump_scaling(blk):
@@ -173,6 +176,7 @@ def set_pump_op_conditions(blk, pressure=350, efficiency=0.8, use_pressure_const
     blk.unit.control_volume.properties_out[0].pressure.fix(pressure)
 
 
+@profiled
 def init_pump(blk):
 
     blk.feed.initialize()
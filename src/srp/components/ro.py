@@ -21,6 +21,7 @@ from watertap.property_models.seawater_prop_pack import SeawaterParameterBlock
 from watertap.core.solvers import get_solver
 
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 __all__ = [
     "build_ro",
@@ -69,6 +70,7 @@ def build_system(
     return m
 
 
+@profiled
 def build_ro(
     blk,
     prop_package=None,
@@ -147,7 +149,8 @@ def build_ro(
             ),
         )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_system_scaling(m):
@@ -204,6 +207,7 @@ def init_system(m):
         pb.initialize()
 
 
+@profiled
 def init_ro(blk):
 
     blk.feed.initialize()
@@ -29,6 +29,8 @@ from watertap.unit_models import Pump
 
 from srp.components import *
 from srp.utils.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.results import collect_stream_results, get_result
 
 __all__ = [
     "build_srp",
@@ -57,6 +59,7 @@ The flowsheet is not yet fully validated against plant data and should be consid
 """
 
 
+@profiled
 def build_srp(
     Qin=11343,
     Cin=1467,
@@ -64,6 +67,7 @@ def build_srp(
     BCs=["BC_A", "BC_B", "BC_C"],
     perm_flow_guess=49,
     add_basic_bcs=False,
+    lazy_properties=False,
 ):
 
     Qin = Qin * pyunits.gallons / pyunits.minute
@@ -77,6 +81,8 @@ def build_srp(
     m.perm_flow_guess = perm_flow_guess
     m.BCs = BCs
     m.add_basic_bcs = add_basic_bcs
+    # Only build flow_vol_phase and conc_mass_phase_comp where referenced
+    m.lazy_properties = lazy_properties
 
     m.fs = FlowsheetBlock(dynamic=False)
 
@@ -277,6 +283,7 @@ def build_srp(
     return m
 
 
+@profiled
 def connect_srp(m):
 
     # WELLS TO RAW WATER TANK MIXER
@@ -402,9 +409,11 @@ def connect_srp(m):
         source=m.fs.demin.product.outlet, destination=m.fs.product.inlet
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(m)
+    with profile_section("expand_arcs", m):
+        TransformationFactory("network.expand_arcs").apply_to(m)
 
 
+@profiled
 def set_srp_scaling(m):
 
     m.fs.properties_feed.set_default_scaling(
@@ -625,6 +634,7 @@ def init_bcs_basic(m):
         propagate_state(a)
 
 
+@profiled
 def initialize_srp(m):
 
     m.fs.wells.initialize()
@@ -723,8 +733,16 @@ def initialize_srp(m):
     m.fs.product.initialize()
 
 
+def _flow_and_tds(df, sb):
+    return (
+        get_result(df, sb, "flow_vol_phase", "Liq"),
+        get_result(df, sb, "conc_mass_phase_comp", "Liq,TDS"),
+    )
+
+
 def print_stream_flows(m, w=30):
 
+    fbs = []
     for fb in m.fs.component_objects(Block, descend_into=False):
 
         if any(x in fb.name for x in ["_expanded", "costing"]):
@@ -735,6 +753,12 @@ def print_stream_flows(m, w=30):
             continue
         if "bc_" in fb.name.lower():
             continue
+        fbs.append(fb)
+
+    # Collect the streams of all reported blocks at once
+    df = collect_stream_results(fbs, units={"pressure": pyunits.bar}, construct=True)
+
+    for fb in fbs:
 
         title = fb.name.replace("fs.", "").replace("_", " ").upper()
         side = int(((3 * w) - len(title)) / 2) - 1
@@ -742,29 +766,13 @@ def print_stream_flows(m, w=30):
         print(f"\n{header}\n")
         # print(f"{title.lower()} DOF = {degrees_of_freedom(fb)}\n")
 
-        if (
+        u = fb
+        if not (
             isinstance(fb, Feed)
             or isinstance(fb, Product)
             or isinstance(fb, StateJunction)
         ):
-            props = fb.find_component("properties")
-            flow_in = value(
-                pyunits.convert(
-                    props[0].flow_vol_phase["Liq"],
-                    to_units=pyunits.gallons / pyunits.minute,
-                )
-            )
-            conc_in = value(
-                pyunits.convert(
-                    props[0].conc_mass_phase_comp["Liq", "TDS"],
-                    to_units=pyunits.mg / pyunits.L,
-                )
-            )
-            print(f'{"Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
-            print(f'{"TDS":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
-            continue
-
-        u = fb.find_component("unit")
+            u = fb.find_component("unit")
 
         if u is None:
             continue
@@ -775,19 +783,7 @@ def print_stream_flows(m, w=30):
             or isinstance(u, Product)
             or isinstance(u, StateJunction)
         ):
-            props = u.find_component("properties")
-            flow_in = value(
-                pyunits.convert(
-                    props[0].flow_vol_phase["Liq"],
-                    to_units=pyunits.gallons / pyunits.minute,
-                )
-            )
-            conc_in = value(
-                pyunits.convert(
-                    props[0].conc_mass_phase_comp["Liq", "TDS"],
-                    to_units=pyunits.mg / pyunits.L,
-                )
-            )
+            flow_in, conc_in = _flow_and_tds(df, u.properties[0])
             print(f'{"Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
             print(f'{"TDS":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
             continue
@@ -797,46 +793,18 @@ def print_stream_flows(m, w=30):
                 print(f'{"Recovery":<{w}s}{f"{recov:<{w},.2f}"}{"%":<{w}s}')
             ms = u.find_component("mixed_state")
             if isinstance(u, Separator):
-                flow_in = value(
-                    pyunits.convert(
-                        ms[0].flow_vol_phase["Liq"],
-                        to_units=pyunits.gallons / pyunits.minute,
-                    )
-                )
-                conc_in = value(
-                    pyunits.convert(
-                        ms[0].conc_mass_phase_comp["Liq", "TDS"],
-                        to_units=pyunits.mg / pyunits.L,
-                    )
-                )
+                flow_in, conc_in = _flow_and_tds(df, ms[0])
                 print(f'{"Feed Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
                 print(f'{"Feed TDS":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
-                tot_flow_out = sum(
-                    value(
-                        pyunits.convert(
-                            u.find_component(f"{x}_state")[0].flow_vol_phase["Liq"],
-                            to_units=pyunits.gallons / pyunits.minute,
-                        )
-                    )
+                outlets = {
+                    x: _flow_and_tds(df, u.find_component(f"{x}_state")[0])
                     for x in u.config.outlet_list
-                )
+                }
+                tot_flow_out = sum(flow_out for flow_out, _ in outlets.values())
                 print(
                     f'{"TOTAL OUTLET FLOW":<{w}s}{f"{tot_flow_out:<{w},.1f}"}{"gpm":<{w}s}'
                 )
-                for x in u.config.outlet_list:
-                    sb = u.find_component(f"{x}_state")
-                    flow_out = value(
-                        pyunits.convert(
-                            sb[0].flow_vol_phase["Liq"],
-                            to_units=pyunits.gallons / pyunits.minute,
-                        )
-                    )
-                    conc_out = value(
-                        pyunits.convert(
-                            sb[0].conc_mass_phase_comp["Liq", "TDS"],
-                            to_units=pyunits.mg / pyunits.L,
-                        )
-                    )
+                for x, (flow_out, conc_out) in outlets.items():
                     print(
                         f'{"   Flow " + x.replace("_", " ").title():<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}'
                     )
@@ -845,88 +813,34 @@ def print_stream_flows(m, w=30):
                     )
                 continue
             elif isinstance(u, Mixer):
-                tot_flow_in = sum(
-                    value(
-                        pyunits.convert(
-                            u.find_component(f"{x}_state")[0].flow_vol_phase["Liq"],
-                            to_units=pyunits.gallons / pyunits.minute,
-                        )
-                    )
+                inlets = {
+                    x: _flow_and_tds(df, u.find_component(f"{x}_state")[0])
                     for x in u.config.inlet_list
-                )
+                }
+                tot_flow_in = sum(flow_in for flow_in, _ in inlets.values())
                 print(
                     f'{"TOTAL INLET FLOW":<{w}s}{f"{tot_flow_in:<{w},.1f}"}{"gpm":<{w}s}'
                 )
-                for x in u.config.inlet_list:
-                    sb = u.find_component(f"{x}_state")
-                    flow_in = value(
-                        pyunits.convert(
-                            sb[0].flow_vol_phase["Liq"],
-                            to_units=pyunits.gallons / pyunits.minute,
-                        )
-                    )
-                    conc_in = value(
-                        pyunits.convert(
-                            sb[0].conc_mass_phase_comp["Liq", "TDS"],
-                            to_units=pyunits.mg / pyunits.L,
-                        )
-                    )
+                for x, (flow_in, conc_in) in inlets.items():
                     print(
                         f'{"   Flow " + x.replace("_", " ").title():<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}'
                     )
                     print(
                         f'{"   TDS " + x.replace("_", " ").title():<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}'
                     )
-                flow_out = value(
-                    pyunits.convert(
-                        ms[0].flow_vol_phase["Liq"],
-                        to_units=pyunits.gallons / pyunits.minute,
-                    )
-                )
-                conc_out = value(
-                    pyunits.convert(
-                        ms[0].conc_mass_phase_comp["Liq", "TDS"],
-                        to_units=pyunits.mg / pyunits.L,
-                    )
-                )
+                flow_out, conc_out = _flow_and_tds(df, ms[0])
                 print(f'{"Outlet Flow":<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}')
                 print(f'{"Outlet TDS":<{w}s}{f"{conc_out:<{w},.1f}"}{"mg/L":<{w}s}')
 
         elif isinstance(u, Pump):
             cv = u.find_component("control_volume")
-            flow_in = value(
-                pyunits.convert(
-                    cv.properties_in[0].flow_vol_phase["Liq"],
-                    to_units=pyunits.gallons / pyunits.minute,
-                )
-            )
-            conc_in = value(
-                pyunits.convert(
-                    cv.properties_in[0].conc_mass_phase_comp["Liq", "TDS"],
-                    to_units=pyunits.mg / pyunits.L,
-                )
-            )
-            pressure = value(
-                pyunits.convert(cv.properties_in[0].pressure, to_units=pyunits.bar)
-            )
+            flow_in, conc_in = _flow_and_tds(df, cv.properties_in[0])
+            pressure = get_result(df, cv.properties_in[0], "pressure")
             print(f'{"Inlet Pressure":<{w}s}{f"{pressure:<{w},.1f}"}{"bar":<{w}s}')
             print(f'{"Inlet Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
             print(f'{"Inlet TDS":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
-            flow_out = value(
-                pyunits.convert(
-                    cv.properties_out[0].flow_vol_phase["Liq"],
-                    to_units=pyunits.gallons / pyunits.minute,
-                )
-            )
-            conc_out = value(
-                pyunits.convert(
-                    cv.properties_out[0].conc_mass_phase_comp["Liq", "TDS"],
-                    to_units=pyunits.mg / pyunits.L,
-                )
-            )
-            pressure = value(
-                pyunits.convert(cv.properties_out[0].pressure, to_units=pyunits.bar)
-            )
+            flow_out, conc_out = _flow_and_tds(df, cv.properties_out[0])
+            pressure = get_result(df, cv.properties_out[0], "pressure")
             print(f'{"Outlet Pressure":<{w}s}{f"{pressure:<{w},.1f}"}{"bar":<{w}s}')
             print(f'{"Outlet Flow":<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}')
             print(f'{"Outlet TDS":<{w}s}{f"{conc_out:<{w},.1f}"}{"mg/L":<{w}s}')
@@ -963,7 +877,8 @@ def run_srp():
     initialize_srp(m)
     add_bcs(m)
     # assert degrees_of_freedom(m) == 0
-    results = solver.solve(m)
+    with profile_section("solve", m):
+        results = solver.solve(m)
     assert_optimal_termination(results)
     print_stream_flows(m)
 
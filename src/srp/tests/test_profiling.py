@@ -0,0 +1,88 @@
+import json
+import pytest
+from pyomo.environ import ConcreteModel, Var, Constraint, Block
+from pyomo.solvers.plugins.solvers.IPOPT import IPOPT
+
+from srp.utils.profiling import (
+    Profiler,
+    profile_section,
+    profiled,
+    get_active_profiler,
+    _ipopt_iterations,
+)
+
+
+@profiled
+def build_unit(blk, n=3):
+    blk.x = Var(range(n))
+
+    @blk.Constraint(range(n))
+    def eq(b, i):
+        return b.x[i] == i
+
+    with profile_section("inner", blk):
+        blk.y = Var()
+
+
+@profiled
+def build_model():
+    m = ConcreteModel()
+    m.unit = Block()
+    build_unit(m.unit, n=4)
+    return m
+
+
+@pytest.mark.unit
+def test_profiled_inactive():
+    assert get_active_profiler() is None
+    m = build_model()
+    assert len(m.unit.x) == 4
+
+
+@pytest.mark.unit
+def test_profiler(tmp_path):
+    with Profiler() as prof:
+        assert get_active_profiler() is prof
+        assert IPOPT.process_output is not prof._process_output
+        m = build_model()
+    assert get_active_profiler() is None
+    assert IPOPT.process_output is prof._process_output
+
+    root = prof.to_dict()
+    assert root["wall_time"] > 0
+    (build,) = root["children"]
+    assert build["name"] == "build_model"
+    assert build["vars_added"] == 5
+    assert build["cons_added"] == 4
+    (unit,) = build["children"]
+    assert unit["name"] == "build_unit[unit]"
+    assert unit["vars_added"] == 5
+    assert unit["children"][0]["name"] == "inner"
+    assert unit["children"][0]["vars_added"] == 1
+
+    prof._record_solve(12)
+    assert root["solves"] == 1
+    assert root["iterations"] == 12
+
+    folded = prof.to_folded().splitlines()
+    assert folded[0].startswith("total ")
+    assert folded[-1].startswith("total;build_model;build_unit[unit];inner ")
+
+    path = tmp_path / "profile.json"
+    prof.write_json(str(path))
+    with open(path) as f:
+        assert json.load(f)["children"][0]["name"] == "build_model"
+
+
+@pytest.mark.unit
+def test_nested_profilers():
+    with Profiler():
+        with pytest.raises(RuntimeError, match="already active"):
+            with Profiler():
+                pass
+
+
+@pytest.mark.unit
+def test_ipopt_iterations():
+    log = "Number of Iterations....: 27\n\n(scaled) (unscaled)"
+    assert int(_ipopt_iterations.search(log).group(1)) == 27
@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+
+from pyomo.environ import ConcreteModel, value, units as pyunits
+
+from idaes.core import FlowsheetBlock
+from idaes.models.unit_models import Feed
+
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+from watertap.unit_models import Pump
+
+from srp.utils.results import (
+    collect_stream_results,
+    collect_results,
+    get_result,
+    get_stream_table,
+    write_results,
+)
+
+
+def build_model():
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.feed = Feed(property_package=m.fs.properties)
+    m.fs.pump = Pump(property_package=m.fs.properties)
+
+    for sb in [m.fs.feed.properties[0], m.fs.pump.control_volume.properties_in[0]]:
+        sb.flow_mass_phase_comp["Liq", "H2O"].set_value(10)
+        sb.flow_mass_phase_comp["Liq", "NaCl"].set_value(0.05)
+        sb.temperature.set_value(298.15)
+        sb.pressure.set_value(2e5)
+    m.fs.pump.work_mechanical[0].set_value(1500)
+    m.fs.pump.deltaP[0].set_value(5e5)
+    return m
+
+
+@pytest.mark.unit
+def test_collect_stream_results():
+    m = build_model()
+    sb = m.fs.feed.properties[0]
+    sb.flow_vol_phase
+    sb.conc_mass_phase_comp
+
+    df = collect_stream_results(m.fs.feed)
+    assert list(df.columns) == ["block", "kind", "variable", "index", "value", "units"]
+    assert set(df["block"]) == {sb.name}
+    assert set(df["kind"]) == {"stream"}
+
+    assert get_result(df, sb, "flow_vol_phase", "Liq") == pytest.approx(
+        value(
+            pyunits.convert(
+                sb.flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute
+            )
+        )
+    )
+    assert get_result(df, sb, "conc_mass_phase_comp", "Liq,NaCl") == pytest.approx(
+        value(
+            pyunits.convert(
+                sb.conc_mass_phase_comp["Liq", "NaCl"],
+                to_units=pyunits.mg / pyunits.L,
+            )
+        )
+    )
+    assert get_result(df, sb, "pressure") == pytest.approx(
+        value(pyunits.convert(sb.pressure, to_units=pyunits.psi))
+    )
+
+    df = collect_stream_results(m.fs.feed, units={"pressure": pyunits.bar})
+    assert get_result(df, sb, "pressure") == pytest.approx(2)
+    assert df.loc[df["variable"] == "pressure", "units"].iloc[0] == "bar"
+
+    with pytest.raises(KeyError, match="No result"):
+        get_result(df, sb, "enth_flow")
+
+
+@pytest.mark.unit
+def test_collect_results_does_not_construct():
+    m = build_model()
+    sb = m.fs.pump.control_volume.properties_in[0]
+    assert not sb.is_property_constructed("flow_vol_phase")
+
+    df = collect_results(m)
+    assert not sb.is_property_constructed("flow_vol_phase")
+    assert not sb.is_property_constructed("conc_mass_phase_comp")
+    assert get_result(df, sb, "pressure") == pytest.approx(
+        value(pyunits.convert(sb.pressure, to_units=pyunits.psi))
+    )
+    assert get_result(df, m.fs.pump, "work_mechanical", "0.0") == pytest.approx(1.5)
+    assert get_result(df, m.fs.pump, "deltaP", "0.0") == pytest.approx(
+        value(pyunits.convert(5e5 * pyunits.Pa, to_units=pyunits.psi))
+    )
+    assert set(df["kind"]) == {"stream", "unit"}
+
+    df = collect_stream_results(m.fs.pump, construct=True)
+    assert sb.is_property_constructed("flow_vol_phase")
+    assert "flow_vol_phase" in set(df["variable"])
+
+
+@pytest.mark.unit
+def test_stream_table_and_write(tmp_path):
+    m = build_model()
+    df = collect_results(m)
+    table = get_stream_table(df)
+    assert m.fs.feed.properties[0].name in table.index
+    assert "pressure" in table.columns
+    assert "flow_mass_phase_comp" not in table.columns
+
+    path = tmp_path / "results.csv"
+    write_results(df, str(path))
+    df_read = pd.read_csv(path, keep_default_na=False)
+    assert len(df_read) == len(df)
+    assert df_read["value"].tolist() == pytest.approx(df["value"].tolist())
+
+    with pytest.raises(ValueError, match="Unknown results file extension"):
+        write_results(df, str(tmp_path / "results.txt"))
@@ -0,0 +1,59 @@
+import pytest
+
+from pyomo.environ import ConcreteModel, Var, Param, Expression, value, units as pyunits
+from pyomo.core.base.units_container import UnitsError
+
+import srp.utils.units as units
+from srp.utils.units import conversion_factor, converted_value, clear_conversion_cache
+
+
+def build_model():
+    m = ConcreteModel()
+    m.flow = Var(initialize=0.5, units=pyunits.m**3 / pyunits.s)
+    m.conc = Var(["NaCl"], initialize=2.5, units=pyunits.kg / pyunits.m**3)
+    m.pressure = Param(initialize=3e5, units=pyunits.Pa, mutable=True)
+    m.frac = Var(initialize=0.4)
+    m.mass_flow = Expression(expr=m.flow * m.conc["NaCl"])
+    return m
+
+
+@pytest.mark.unit
+def test_converted_value():
+    clear_conversion_cache()
+    m = build_model()
+    cases = [
+        (m.flow, pyunits.gallons / pyunits.minute),
+        (m.conc["NaCl"], pyunits.mg / pyunits.L),
+        (m.pressure, pyunits.psi),
+        (m.mass_flow, pyunits.ton / pyunits.month),
+        (m.flow * 2, pyunits.m**3 / pyunits.hr),
+        (m.frac, pyunits.dimensionless),
+    ]
+    for expr, to_units in cases:
+        assert converted_value(expr, to_units) == pytest.approx(
+            value(pyunits.convert(expr, to_units=to_units)), rel=1e-12
+        )
+    # Second pass uses the cached factors
+    n = len(units._conversion_factors)
+    m.flow.set_value(0.7)
+    for expr, to_units in cases:
+        assert converted_value(expr, to_units) == pytest.approx(
+            value(pyunits.convert(expr, to_units=to_units)), rel=1e-12
+        )
+    assert len(units._conversion_factors) == n
+
+
+@pytest.mark.unit
+def test_conversion_factor():
+    clear_conversion_cache()
+    assert conversion_factor(pyunits.bar, pyunits.Pa) == pytest.approx(1e5)
+    assert conversion_factor(
+        pyunits.m**3 / pyunits.s, pyunits.gallons / pyunits.minute
+    ) == pytest.approx(15850.323, rel=1e-6)
+    assert len(units._conversion_factors) == 2
+    clear_conversion_cache()
+    assert len(units._conversion_factors) == 0
+
+    m = build_model()
+    with pytest.raises(UnitsError):
+        converted_value(m.flow, pyunits.psi)
@@ -0,0 +1,92 @@
+import pytest
+
+from pyomo.environ import ConcreteModel, value, units as pyunits
+
+from idaes.core import FlowsheetBlock
+from idaes.models.unit_models import Feed, Mixer
+
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+
+from srp.utils.utils import touch_flow_and_conc, compute_lazy_properties
+from srp.utils.results import collect_stream_results, get_result
+
+
+def build_model(lazy_properties=False):
+    m = ConcreteModel()
+    m.lazy_properties = lazy_properties
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.feed = Feed(property_package=m.fs.properties)
+    m.fs.mixer = Mixer(property_package=m.fs.properties, inlet_list=["a", "b"])
+    touch_flow_and_conc(m.fs.feed)
+    touch_flow_and_conc(m.fs.mixer)
+
+    sb = m.fs.feed.properties[0]
+    sb.flow_mass_phase_comp["Liq", "H2O"].set_value(10)
+    sb.flow_mass_phase_comp["Liq", "NaCl"].set_value(0.1)
+    sb.temperature.set_value(298.15)
+    sb.pressure.set_value(101325)
+    return m
+
+
+@pytest.mark.unit
+def test_touch_flow_and_conc():
+    m = build_model()
+    for sb in [
+        m.fs.feed.properties[0],
+        m.fs.mixer.mixed_state[0],
+        m.fs.mixer.a_state[0],
+        m.fs.mixer.b_state[0],
+    ]:
+        assert sb.is_property_constructed("flow_vol_phase")
+        assert sb.is_property_constructed("conc_mass_phase_comp")
+
+
+@pytest.mark.unit
+def test_touch_flow_and_conc_lazy():
+    m = build_model(lazy_properties=True)
+    eager = build_model()
+    assert m.nvariables() < eager.nvariables()
+    for sb in [m.fs.feed.properties[0], m.fs.mixer.mixed_state[0]]:
+        assert not sb.is_property_constructed("flow_vol_phase")
+        assert not sb.is_property_constructed("conc_mass_phase_comp")
+
+
+@pytest.mark.unit
+def test_compute_lazy_properties():
+    m = build_model(lazy_properties=True)
+    sb = m.fs.feed.properties[0]
+    sb.conc_mass_phase_comp
+    compute_lazy_properties(m.fs.feed)
+
+    # Dependencies built with conc_mass_phase_comp are computed first
+    mass_frac = 0.1 / 10.1
+    assert value(sb.mass_frac_phase_comp["Liq", "NaCl"]) == pytest.approx(mass_frac)
+    assert value(sb.conc_mass_phase_comp["Liq", "NaCl"]) == pytest.approx(
+        value(sb.dens_mass_phase["Liq"]) * mass_frac
+    )
+
+    # Only the listed properties are computed
+    sb.flow_vol_phase["Liq"].set_value(1)
+    compute_lazy_properties(sb, properties=["conc_mass_phase_comp"])
+    assert value(sb.flow_vol_phase["Liq"]) == 1
+    compute_lazy_properties(sb)
+    assert value(sb.flow_vol_phase["Liq"]) == pytest.approx(
+        10.1 / value(sb.dens_mass_phase["Liq"])
+    )
+
+
+@pytest.mark.unit
+def test_collect_lazy_properties():
+    m = build_model(lazy_properties=True)
+    sb = m.fs.feed.properties[0]
+    df = collect_stream_results(m.fs.feed, construct=True)
+    assert sb.is_property_constructed("flow_vol_phase")
+    assert get_result(df, sb, "flow_vol_phase", "Liq") == pytest.approx(
+        value(
+            pyunits.convert(
+                10.1 * pyunits.kg / pyunits.s / sb.dens_mass_phase["Liq"],
+                to_units=pyunits.gallons / pyunits.minute,
+            )
+        )
+    )
@@ -1 +1,4 @@
 from .utils import *
+from .profiling import *
+from .units import *
+from .results import *
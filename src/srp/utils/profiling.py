@@ -0,0 +1,227 @@
+"""
+Opt-in construction and solve profiling for the WRD and SRP flowsheets.
+
+Functions decorated with @profiled and code wrapped in profile_section() are
+only timed while a Profiler is active, e.g.:
+
+    with Profiler() as prof:
+        m = build_wrd_system(num_pro_trains=4, file="wrd_inputs_8_19_21.yaml")
+        ...
+        initialize_wrd_system(m)
+    prof.report()
+    prof.write_json("wrd_profile.json")
+    prof.write_folded("wrd_profile.folded")  # for flamegraph.pl or speedscope
+"""
+
+import re
+import json
+import time
+import functools
+from contextlib import contextmanager
+
+from pyomo.environ import Var, Constraint
+from pyomo.core.base.block import BlockData
+from pyomo.solvers.plugins.solvers.IPOPT import IPOPT
+
+__all__ = [
+    "Profiler",
+    "profile_section",
+    "profiled",
+    "get_active_profiler",
+]
+
+_active_profiler = None
+
+_ipopt_iterations = re.compile(r"Number of Iterations\.*:\s*(\d+)")
+
+
+def get_active_profiler():
+    return _active_profiler
+
+
+def _count_components(blk):
+    # Count on the block a function was called on (not the whole model) so
+    # frequently called helpers like touch_flow_and_conc stay cheap to profile
+    if blk is None:
+        return 0, 0
+    num_vars = sum(1 for _ in blk.component_data_objects(Var, descend_into=True))
+    num_cons = sum(1 for _ in blk.component_data_objects(Constraint, descend_into=True))
+    return num_vars, num_cons
+
+
+def _new_section(name):
+    return {
+        "name": name,
+        "wall_time": 0,
+        "vars_added": 0,
+        "cons_added": 0,
+        "solves": 0,
+        "iterations": 0,
+        "children": [],
+    }
+
+
+class Profiler:
+    """
+    Records a tree of timed sections. Each section holds its wall time, the
+    number of variables and constraints added to its block while it ran and
+    the number of IPOPT solves and iterations (all inclusive of children).
+    """
+
+    def __init__(self, name="total", count_components=True):
+        self.count_components = count_components
+        self.root = _new_section(name)
+        self._stack = [self.root]
+        self._process_output = None
+
+    def __enter__(self):
+        global _active_profiler
+        if _active_profiler is not None:
+            raise RuntimeError("A Profiler is already active.")
+        _active_profiler = self
+
+        # IPOPT output is always captured by pyomo, so iterations are parsed
+        # from the log of every solve while the profiler is active
+        self._process_output = IPOPT.process_output
+
+        def process_output(solver, rc):
+            results = self._process_output(solver, rc)
+            match = _ipopt_iterations.search(getattr(solver, "_log", None) or "")
+            self._record_solve(int(match.group(1)) if match else 0)
+            return results
+
+        IPOPT.process_output = process_output
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        global _active_profiler
+        self.root["wall_time"] = time.perf_counter() - self._t0
+        IPOPT.process_output = self._process_output
+        _active_profiler = None
+
+    def _record_solve(self, iterations):
+        for section in self._stack:
+            section["solves"] += 1
+            section["iterations"] += iterations
+
+    @contextmanager
+    def section(self, name, blk=None):
+        """
+        Time a section nested under the currently open one. The yielded dict
+        can be given a "blk" entry (e.g. a model created inside the section)
+        if blk is not known when the section opens.
+        """
+        section = _new_section(name)
+        self._stack[-1]["children"].append(section)
+        self._stack.append(section)
+        handle = {"blk": blk}
+        if self.count_components:
+            vars0, cons0 = _count_components(blk)
+        t0 = time.perf_counter()
+        try:
+            yield handle
+        finally:
+            section["wall_time"] = time.perf_counter() - t0
+            if self.count_components:
+                vars1, cons1 = _count_components(handle["blk"])
+                section["vars_added"] = vars1 - vars0
+                section["cons_added"] = cons1 - cons0
+            self._stack.pop()
+
+    def to_dict(self):
+        return self.root
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.root, f, indent=2)
+
+    def to_folded(self):
+        """
+        Return the profile in folded stack format ("a;b;c value" per line,
+        self time in microseconds) for flame graph tools.
+        """
+        lines = []
+
+        def _fold(section, prefix):
+            stack = f"{prefix};{section['name']}" if prefix else section["name"]
+            child_time = sum(c["wall_time"] for c in section["children"])
+            self_time = max(section["wall_time"] - child_time, 0)
+            lines.append(f"{stack} {int(self_time * 1e6)}")
+            for child in section["children"]:
+                _fold(child, stack)
+
+        _fold(self.root, "")
+        return "\n".join(lines)
+
+    def write_folded(self, path):
+        with open(path, "w") as f:
+            f.write(self.to_folded() + "\n")
+
+    def report(self, w=30, max_depth=None):
+        title = "Profile"
+        side = int(((3 * w) - len(title)) / 2) - 1
+        header = "=" * side + f" {title} " + "=" * side
+        print(f"\n{header}\n")
+        print(
+            f'{"Section":<{2 * w}s}{"Time (s)":>10s}{"Vars":>10s}{"Cons":>10s}{"Solves":>8s}{"Iters":>8s}'
+        )
+
+        def _print(section, depth):
+            if max_depth is not None and depth > max_depth:
+                return
+            name = "  " * depth + section["name"]
+            print(
+                f'{name:<{2 * w}s}{section["wall_time"]:>10.3f}{section["vars_added"]:>10d}'
+                f'{section["cons_added"]:>10d}{section["solves"]:>8d}{section["iterations"]:>8d}'
+            )
+            for child in section["children"]:
+                _print(child, depth + 1)
+
+        _print(self.root, 0)
+
+
+@contextmanager
+def profile_section(name, blk=None):
+    """
+    Time the enclosed code as a section of the active profiler.
+    Does nothing if no profiler is active.
+    """
+    if _active_profiler is None:
+        yield {"blk": blk}
+        return
+    with _active_profiler.section(name, blk=blk) as handle:
+        yield handle
+
+
+def _get_block_arg(args, kwargs):
+    blks = [a for a in args if isinstance(a, BlockData)]
+    blks += [kwargs[k] for k in ["blk", "m"] if isinstance(kwargs.get(k), BlockData)]
+    # Prefer the first unit block over the whole model, e.g. build_bc(m, blk)
+    units = [b for b in blks if b is not b.model()]
+    if units:
+        return units[0], True
+    if blks:
+        return blks[0], False
+    return None, False
+
+
+def profiled(func):
+    """
+    Decorator that records each call of func as a profile section named
+    after the function and the unit block it is called on.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _active_profiler is None:
+            return func(*args, **kwargs)
+        blk, is_unit = _get_block_arg(args, kwargs)
+        name = f"{func.__name__}[{blk.name}]" if is_unit else func.__name__
+        with _active_profiler.section(name, blk=blk) as handle:
+            result = func(*args, **kwargs)
+            if handle["blk"] is None and isinstance(result, BlockData):
+                handle["blk"] = result
+        return result
+
+    return wrapper
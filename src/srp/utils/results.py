@@ -0,0 +1,261 @@
+"""
+Structured results for WRD and SRP flowsheets.
+
+collect_results walks a flowsheet once and returns a tidy DataFrame with one
+row per value: block, kind (stream, unit or costing), variable, index, value
+and units. Unit conversions are cached per pair of units (see units.py). By
+default only properties that are already constructed are read, so collecting
+results does not add variables to the model. The stream reports render their text from this table and
+write_results exports it to csv, parquet or hdf5.
+"""
+
+import os
+
+import pandas as pd
+
+from pyomo.environ import Block, Var, Expression, value, units as pyunits
+from pyomo.core.base.units_container import UnitsError
+
+from idaes.core import UnitModelBlockData
+from idaes.core.base.property_base import StateBlockData
+from idaes.core.base.costing_base import (
+    FlowsheetCostingBlockData,
+    UnitModelCostingBlockData,
+)
+
+from srp.utils.units import conversion_factor
+from srp.utils.utils import compute_lazy_properties
+
+__all__ = [
+    "stream_units",
+    "unit_kpi_units",
+    "collect_stream_results",
+    "collect_unit_results",
+    "collect_costing_results",
+    "collect_results",
+    "get_result",
+    "get_stream_table",
+    "write_results",
+]
+
+result_columns = ["block", "kind", "variable", "index", "value", "units"]
+
+# Report units of the stream properties
+stream_units = {
+    "flow_vol_phase": pyunits.gallons / pyunits.minute,
+    "conc_mass_phase_comp": pyunits.mg / pyunits.L,
+    "pressure": pyunits.psi,
+    "temperature": pyunits.K,
+}
+
+# Unit model KPIs collected when present, with their report units
+unit_kpi_units = {
+    "work_mechanical": pyunits.kW,
+    "deltaP": pyunits.psi,
+    "efficiency_pump": pyunits.dimensionless,
+    "recovery_vol_phase": pyunits.dimensionless,
+    "recovery_mass_phase_comp": pyunits.dimensionless,
+    "area": pyunits.m**2,
+    "heat_duty": pyunits.kW,
+}
+
+
+def _index_str(index):
+    if index is None:
+        return ""
+    if isinstance(index, tuple):
+        return ",".join(str(i) for i in index)
+    return str(index)
+
+
+def _add_rows(rows, block, kind, component, to_units=None):
+    """
+    Add one row per element of a Var or Expression, converted to to_units
+    when given and compatible with the model units.
+    """
+    factor = None
+    for index, c in component.items():
+        v = value(c, exception=False)
+        if v is None:
+            continue
+        if factor is None:
+            units = pyunits.get_units(c)
+            if units is None:
+                units = pyunits.dimensionless
+            factor = 1
+            if to_units is not None:
+                try:
+                    factor = conversion_factor(units, to_units)
+                    units = to_units
+                except UnitsError:
+                    pass
+            units_str = str(units)
+        rows.append(
+            (
+                block,
+                kind,
+                component.local_name,
+                _index_str(index),
+                v * factor,
+                units_str,
+            )
+        )
+
+
+def _var_names(blk):
+    return {v.local_name for v in blk.component_objects(Var, descend_into=False)}
+
+
+def _find_blocks(blk, block_type):
+    # blk may be a block, an indexed block or a list of those
+    if isinstance(blk, (list, tuple)):
+        for b in blk:
+            yield from _find_blocks(b, block_type)
+        return
+    datas = blk.values() if blk.is_indexed() else [blk]
+    for d in datas:
+        if isinstance(d, block_type):
+            yield d
+        for b in d.component_data_objects(Block, descend_into=True):
+            if isinstance(b, block_type):
+                yield b
+
+
+def collect_stream_results(
+    blk, units=None, include_internal=False, construct=False, rows=None
+):
+    """
+    Flow, concentration, pressure and temperature of every state block on blk.
+
+    Args:
+        blk: block (or list of blocks) to search for state blocks
+        units: {property name: report units} overriding stream_units
+        include_internal: also collect the states along spatial domains
+            (e.g. along RO modules), which are skipped by default
+        construct: build flow_vol_phase and conc_mass_phase_comp on state
+            blocks where they are not constructed yet
+
+    Returns:
+        tidy DataFrame, see collect_results
+    """
+    report_units = {**stream_units, **(units or {})}
+    out = [] if rows is None else rows
+    for sb in _find_blocks(blk, StateBlockData):
+        index = sb.index()
+        if not include_internal and isinstance(index, tuple) and len(index) > 1:
+            continue
+        if construct and not all(
+            sb.is_property_constructed(name) for name in report_units
+        ):
+            existing = _var_names(sb)
+            for name in report_units:
+                getattr(sb, name, None)
+            # Properties built after a solve (e.g. in lazy mode) and the
+            # properties they depend on have no values yet
+            compute_lazy_properties(sb, properties=_var_names(sb) - existing)
+        for name, to_units in report_units.items():
+            if not sb.is_property_constructed(name):
+                continue
+            component = getattr(sb, name, None)
+            if component is None:
+                continue
+            _add_rows(out, sb.name, "stream", component, to_units)
+    if rows is None:
+        return pd.DataFrame(out, columns=result_columns)
+
+
+def collect_unit_results(blk, units=None, rows=None):
+    """
+    KPIs (unit_kpi_units, e.g. pump work, pressure change and recovery) of
+    every unit model on blk.
+    """
+    report_units = {**unit_kpi_units, **(units or {})}
+    out = [] if rows is None else rows
+    for unit in _find_blocks(blk, UnitModelBlockData):
+        for name, to_units in report_units.items():
+            component = unit.component(name)
+            if isinstance(component, (Var, Expression)):
+                _add_rows(out, unit.name, "unit", component, to_units)
+    if rows is None:
+        return pd.DataFrame(out, columns=result_columns)
+
+
+def collect_costing_results(blk, rows=None):
+    """
+    Scalar costing results (e.g. LCOW, SEC, total costs) of the flowsheet
+    costing blocks and the capital and operating costs of every unit on blk,
+    in their model units.
+    """
+    out = [] if rows is None else rows
+    for costing in _find_blocks(blk, FlowsheetCostingBlockData):
+        for c in costing.component_objects([Var, Expression], descend_into=False):
+            if not c.is_indexed():
+                _add_rows(out, costing.name, "costing", c)
+    for costing in _find_blocks(blk, UnitModelCostingBlockData):
+        for name in ["capital_cost", "fixed_operating_cost"]:
+            c = costing.component(name)
+            if c is not None:
+                _add_rows(out, costing.name, "costing", c)
+    if rows is None:
+        return pd.DataFrame(out, columns=result_columns)
+
+
+def collect_results(m, streams=True, units=True, costing=True, include_internal=False):
+    """
+    Collect the results of a flowsheet into one tidy DataFrame with the
+    columns block, kind (stream, unit or costing), variable, index (comma
+    separated), value and units.
+    """
+    rows = []
+    if streams:
+        collect_stream_results(m, include_internal=include_internal, rows=rows)
+    if units:
+        collect_unit_results(m, rows=rows)
+    if costing:
+        collect_costing_results(m, rows=rows)
+    return pd.DataFrame(rows, columns=result_columns)
+
+
+def get_result(df, block, variable, index=""):
+    """
+    Value of one result, with block the full name of the block (or a block).
+    """
+    if not isinstance(block, str):
+        block = block.name
+    match = df[
+        (df["block"] == block) & (df["variable"] == variable) & (df["index"] == index)
+    ]
+    if match.empty:
+        raise KeyError(f"No result for {block}.{variable}[{index}]")
+    return match["value"].iloc[0]
+
+
+def get_stream_table(df):
+    """
+    Wide table of the stream results with one row per state block.
+    """
+    streams = df[df["kind"] == "stream"]
+    columns = streams["variable"] + streams["index"].map(
+        lambda i: f"[{i}]" if i else ""
+    )
+    return streams.assign(column=columns).pivot(
+        index="block", columns="column", values="value"
+    )
+
+
+def write_results(df, path, key="results"):
+    """
+    Write results to csv, parquet (needs pyarrow) or hdf5 (needs pytables),
+    chosen from the file extension.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        df.to_csv(path, index=False)
+    elif ext == ".parquet":
+        df.to_parquet(path, index=False)
+    elif ext in [".h5", ".hdf5"]:
+        df.to_hdf(path, key=key, mode="w", format="table")
+    else:
+        raise ValueError(
+            f"Unknown results file extension {ext}, use .csv, .parquet or .h5"
+        )
@@ -0,0 +1,60 @@
+"""
+Cached unit conversions for reporting.
+
+value(pyunits.convert(expr, to_units=...)) builds a new Pyomo expression and
+checks its units on every call. The reports call it for every printed line, so
+the conversion factors are cached here by (from_units, to_units) and applied to
+the numeric value directly.
+"""
+
+from pyomo.environ import value, units as pyunits
+from pyomo.core.base.units_container import _PyomoUnit
+
+__all__ = [
+    "conversion_factor",
+    "converted_value",
+    "clear_conversion_cache",
+]
+
+_conversion_factors = {}
+
+
+def _pint_units(units):
+    # Hashable key for Pyomo units or for the units of an expression, cheaper
+    # to get than str(units)
+    if isinstance(units, _PyomoUnit):
+        return units._get_pint_unit()
+    if hasattr(units, "get_units"):
+        # Var and Param data know their units without walking an expression
+        units = units.get_units()
+        return None if units is None else units._get_pint_unit()
+    return pyunits._get_pint_units(units)
+
+
+def conversion_factor(from_units, to_units):
+    """
+    Factor converting values from from_units to to_units.
+    """
+    key = (_pint_units(from_units), _pint_units(to_units))
+    if key not in _conversion_factors:
+        _conversion_factors[key] = pyunits.convert_value(
+            1, from_units=from_units, to_units=to_units
+        )
+    return _conversion_factors[key]
+
+
+def converted_value(expr, to_units):
+    """
+    Numeric value of a Pyomo component or expression in to_units, same as
+    value(pyunits.convert(expr, to_units=to_units)).
+    """
+    key = (_pint_units(expr), _pint_units(to_units))
+    factor = _conversion_factors.get(key)
+    if factor is None:
+        factor = conversion_factor(pyunits.get_units(expr), to_units)
+        _conversion_factors[key] = factor
+    return factor * value(expr)
+
+
+def clear_conversion_cache():
+    _conversion_factors.clear()
@@ -1,15 +1,29 @@
+from pyomo.environ import Block, Constraint, Var
+from pyomo.core.expr.visitor import identify_variables
+from pyomo.util.calc_var_value import calculate_variable_from_constraint
+from idaes.core.base.property_base import StateBlockData
 from idaes.models.unit_models import Mixer, Separator
+from .profiling import profiled
 
 
 __all__ = [
     "touch_flow_and_conc",
+    "compute_lazy_properties",
 ]
 
 
+@profiled
 def touch_flow_and_conc(b):
     """
     Touch flow and conc variables for construction
+
+    Skipped for models built with lazy_properties=True (m.lazy_properties),
+    where these properties are only built on the state blocks where a
+    constraint, expression, scaling factor or report references them.
     """
+    if getattr(b.model(), "lazy_properties", False):
+        return
+
     props = b.find_component("properties")
     if props is not None:
         props[0].flow_vol_phase
@@ -37,3 +51,65 @@ def touch_flow_and_conc(b):
             sb = b.find_component(f"{x}_state")
             sb[0].flow_vol_phase
             sb[0].conc_mass_phase_comp
+
+
+def _defining_constraints(sb, properties=None):
+    """
+    (variable, constraint) pairs of the on-demand properties of a state block,
+    ordered so that every property comes after the properties it depends on.
+    """
+    pairs = {}
+    for c in sb.component_objects(Constraint, descend_into=False):
+        name = c.local_name[3:]
+        if not c.local_name.startswith("eq_") or (
+            properties is not None and name not in properties
+        ):
+            continue
+        var = sb.find_component(name)
+        if not isinstance(var, Var):
+            continue
+        for idx, con in c.items():
+            if idx in var and con.active and not var[idx].fixed:
+                pairs[id(var[idx])] = (var[idx], con)
+
+    # Depth first topological sort on the variables in each constraint
+    order = []
+    visited = set()
+
+    def visit(key):
+        visited.add(key)
+        var, con = pairs[key]
+        for v in identify_variables(con.body, include_fixed=False):
+            if id(v) in pairs and id(v) not in visited:
+                visit(id(v))
+        order.append((var, con))
+
+    for key in pairs:
+        if key not in visited:
+            visit(key)
+    return order
+
+
+def compute_lazy_properties(blk, properties=None):
+    """
+    Set the on-demand properties of the state blocks on blk from their
+    defining constraints (eq_<property>), computing the properties they
+    depend on first. Use for properties built after a solve, e.g. when
+    reporting a model built with lazy_properties=True.
+
+    Args:
+        blk: state block or block (or indexed block) containing state blocks
+        properties: names of the properties to compute, default all
+    """
+    blocks = blk.values() if blk.is_indexed() else [blk]
+    for b in blocks:
+        state_blocks = [
+            sb
+            for sb in b.component_data_objects(Block, descend_into=True)
+            if isinstance(sb, StateBlockData)
+        ]
+        if isinstance(b, StateBlockData):
+            state_blocks.insert(0, b)
+        for sb in state_blocks:
+            for var, con in _defining_constraints(sb, properties):
+                calculate_variable_from_constraint(var, con)
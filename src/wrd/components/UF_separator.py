@@ -17,7 +17,9 @@ from idaes.models.unit_models.separator import SplittingType
 from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
 from watertap.core.solvers import get_solver
 
-from wrd.utilities import touch_flow_and_conc
+from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 # Would be smart to add __all__ to other component files too
 __all__ = [
@@ -64,6 +66,7 @@ def build_system(Qin=11343, Cin=1467, feed_temp=27, outlet_list=["outlet1", "out
     return m
 
 
+@profiled
 def build_separator(blk, name=None, prop_package=None, outlet_list=None):
 
     if prop_package is None:
@@ -105,7 +108,8 @@ def build_separator(blk, name=None, prop_package=None, outlet_list=None):
             ),
         )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_system_scaling(m):
@@ -171,6 +175,7 @@ def init_system(m):
         pb.initialize()
 
 
+@profiled
 def init_separator(blk, name=None):
 
     if name is None:
@@ -201,45 +206,29 @@ def report_separator(blk, w=25):
     header = "=" * side + f" {title} " + "=" * side
     print(f"\n{header}\n")
     ms = blk.unit.find_component("mixed_state")
-    flow_in = value(
-        pyunits.convert(
-            ms[0].flow_vol_phase["Liq"],
-            to_units=pyunits.gallons / pyunits.minute,
-        )
+    flow_in = converted_value(
+        ms[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute
     )
-    conc_in = value(
-        pyunits.convert(
-            ms[0].conc_mass_phase_comp["Liq", "NaCl"],
-            to_units=pyunits.mg / pyunits.L,
-        )
+    conc_in = converted_value(
+        ms[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L
     )
     print(f'{"INLET Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
     print(f'{"INLET NaCl":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
     tot_flow_out = sum(
-        value(
-            value(
-                pyunits.convert(
-                    blk.unit.find_component(f"{x}_state")[0].flow_vol_phase["Liq"],
-                    to_units=pyunits.gallons / pyunits.minute,
-                )
-            )
+        converted_value(
+            blk.unit.find_component(f"{x}_state")[0].flow_vol_phase["Liq"],
+            pyunits.gallons / pyunits.minute,
         )
         for x in blk.unit.config.outlet_list
     )
     print(f'{"TOTAL OUTLET FLOW":<{w}s}{f"{tot_flow_out:<{w},.1f}"}{"gpm":<{w}s}')
     for x in blk.unit.config.outlet_list:
         sb = blk.unit.find_component(f"{x}_state")
-        flow_out = value(
-            pyunits.convert(
-                sb[0].flow_vol_phase["Liq"],
-                to_units=pyunits.gallons / pyunits.minute,
-            )
+        flow_out = converted_value(
+            sb[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute
         )
-        conc_out = value(
-            pyunits.convert(
-                sb[0].conc_mass_phase_comp["Liq", "NaCl"],
-                to_units=pyunits.mg / pyunits.L,
-            )
+        conc_out = converted_value(
+            sb[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L
         )
         print(
             f'{"   Flow " + x.replace("_", " ").title():<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}'
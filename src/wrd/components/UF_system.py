@@ -31,7 +31,11 @@ from watertap.core.solvers import get_solver
 
 from wrd.components.UF_train import *
 from wrd.components.pump import report_pump
+from wrd.components.parallel_init import initialize_trains_parallel
+from wrd.utilities import add_train_replicas, initialize_train_replicas
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 solver = get_solver()
 
@@ -46,13 +50,21 @@ __all__ = [
 ]
 
 
+@profiled
 def build_uf_system(
     m=None,
     num_trains=3,
     split_fraction=None,
     prop_package=None,
     file="wrd_inputs_8_19_21.yaml",
+    symmetric_trains=False,
 ):
+    """
+    Build the UF system of num_trains UF trains.
+    With symmetric_trains=True only one representative train is modeled and its
+    product and disposal are scaled by num_trains into the mixers. This falls
+    back to the full model if the trains are not identical (uneven split_fraction).
+    """
 
     if m is None:
         m = ConcreteModel()
@@ -72,11 +84,31 @@ def build_uf_system(
     if prop_package is None:
         prop_package = m.fs.properties
 
+    if (
+        symmetric_trains
+        and split_fraction is not None
+        and max(split_fraction) - min(split_fraction) > 1e-12
+    ):
+        print("Trains are not identical, building the full UF system model")
+        symmetric_trains = False
+
     m.uf_num_trains = num_trains
-    m.fs.uf_trains = Set(initialize=range(1, m.uf_num_trains + 1))
+    m.file = file
+    m.uf_symmetric = symmetric_trains and num_trains > 1
+    # Number of physical trains each modeled train represents
+    m.uf_train_multiplicity = num_trains if m.uf_symmetric else 1
+    m.fs.uf_trains = Set(
+        initialize=range(1, (1 if m.uf_symmetric else m.uf_num_trains) + 1)
+    )
     m.fs.uf_train = FlowsheetBlock(m.fs.uf_trains, dynamic=False)
 
     outlet_list = [f"uf{i}" for i in m.fs.uf_trains]
+    perm_inlet_list = [f"uf_prod_inlet{i}" for i in m.fs.uf_trains]
+    brine_inlet_list = [f"uf_disp_inlet{i}" for i in m.fs.uf_trains]
+    if m.uf_symmetric:
+        outlet_list += ["replicas"]
+        perm_inlet_list += ["uf_prod_replicas"]
+        brine_inlet_list += ["uf_disp_replicas"]
 
     m.fs.uf_feed_separator = Separator(
         property_package=m.fs.properties,
@@ -84,7 +116,12 @@ def build_uf_system(
         split_basis=SplittingType.componentFlow,
     )
 
-    if split_fraction is None:
+    if m.uf_symmetric:
+        m.fs.uf_feed_separator.split_frac_input = [
+            1.0 / num_trains,
+            (num_trains - 1.0) / num_trains,
+        ]
+    elif split_fraction is None:
         # Even Split
         m.fs.uf_feed_separator.split_frac_input = (
             1.0 / len(outlet_list) * ones(len(outlet_list))
@@ -92,16 +129,12 @@ def build_uf_system(
     else:
         m.fs.uf_feed_separator.split_frac_input = split_fraction
 
-    perm_inlet_list = [f"uf_prod_inlet{i}" for i in m.fs.uf_trains]
-
     m.fs.uf_product_mixer = Mixer(
         property_package=m.fs.properties,
         momentum_mixing_type=MomentumMixingType.minimize,
         inlet_list=perm_inlet_list,
     )
 
-    brine_inlet_list = [f"uf_disp_inlet{i}" for i in m.fs.uf_trains]
-
     m.fs.uf_disposal_mixer = Mixer(
         property_package=m.fs.properties,
         momentum_mixing_type=MomentumMixingType.minimize,
@@ -116,11 +149,25 @@ def build_uf_system(
         )
 
     m.fs.total_uf_pump_power = Expression(
-        expr=sum(m.fs.uf_train[i].pump.unit.work_mechanical[0] for i in m.fs.uf_trains)
+        expr=m.uf_train_multiplicity
+        * sum(m.fs.uf_train[i].pump.unit.work_mechanical[0] for i in m.fs.uf_trains)
     )
 
-    for i, outlet in enumerate(outlet_list, start=1):
+    if m.uf_symmetric:
+        for name, mixer, train_port in [
+            ("uf_prod_replicas", m.fs.uf_product_mixer, "product"),
+            ("uf_disp_replicas", m.fs.uf_disposal_mixer, "disposal"),
+        ]:
+            add_train_replicas(
+                m.fs,
+                name,
+                mixer.find_component(f"{name}_state")[0],
+                m.fs.uf_train[1].find_component(train_port).properties[0],
+                num_trains - 1,
+            )
 
+    for i in m.fs.uf_trains:
+        outlet = f"uf{i}"
         sep_out = m.fs.uf_feed_separator.find_component(f"{outlet}")
         perm_mix_in = m.fs.uf_product_mixer.find_component(f"uf_prod_inlet{i}")
         brine_mix_in = m.fs.uf_disposal_mixer.find_component(f"uf_disp_inlet{i}")
@@ -160,7 +207,8 @@ def build_uf_system(
             destination=m.fs.disposal.inlet,
         )
 
-        TransformationFactory("network.expand_arcs").apply_to(m)
+        with profile_section("expand_arcs", m):
+            TransformationFactory("network.expand_arcs").apply_to(m)
 
         m.fs.properties.set_default_scaling(
             "flow_mass_phase_comp", 1e-1, index=("Liq", "H2O")
@@ -198,6 +246,12 @@ def set_uf_system_scaling(m):
 
 def set_uf_system_op_conditions(m):
 
+    if m.uf_symmetric:
+        for j in ["H2O", "NaCl"]:
+            m.fs.uf_feed_separator.split_fraction[0, "replicas", j].fix(
+                m.fs.uf_feed_separator.split_frac_input[1]
+            )
+
     for i in m.fs.uf_trains:
         set_uf_train_op_conditions(m.fs.uf_train[i])
         if i != m.fs.uf_trains.first():
@@ -219,7 +273,8 @@ def set_uf_system_op_conditions(m):
     # m.fs.uf_disposal_mixer.outlet.pressure[0].fix(101325)
 
 
-def initialize_uf_system(m):
+@profiled
+def initialize_uf_system(m, parallel=False):
 
     if m.standalone:
         m.fs.feed.initialize()
@@ -227,16 +282,37 @@ def initialize_uf_system(m):
 
     m.fs.uf_feed_separator.initialize()
 
+    if parallel:
+        for i in m.fs.uf_trains:
+            a = m.fs.find_component(f"sep_to_uf{i}")
+            propagate_state(a)
+        initialize_trains_parallel(
+            [m.fs.uf_train[i] for i in m.fs.uf_trains], "uf_train", file=m.file
+        )
+
     for i in m.fs.uf_trains:
-        a = m.fs.find_component(f"sep_to_uf{i}")
-        propagate_state(a)
-        initialize_uf_train(m.fs.uf_train[i])
+        if not parallel:
+            a = m.fs.find_component(f"sep_to_uf{i}")
+            propagate_state(a)
+            initialize_uf_train(m.fs.uf_train[i])
 
         a = m.fs.find_component(f"uf{i}_to_prod_mix")
         propagate_state(a)
         a = m.fs.find_component(f"uf{i}_to_disp_mix")
         propagate_state(a)
 
+    if m.uf_symmetric:
+        initialize_train_replicas(
+            m.fs.uf_product_mixer.uf_prod_replicas_state[0],
+            m.fs.uf_train[1].product.properties[0],
+            m.uf_num_trains - 1,
+        )
+        initialize_train_replicas(
+            m.fs.uf_disposal_mixer.uf_disp_replicas_state[0],
+            m.fs.uf_train[1].disposal.properties[0],
+            m.uf_num_trains - 1,
+        )
+
     m.fs.uf_product_mixer.initialize()
     m.fs.uf_disposal_mixer.initialize()
 
@@ -257,6 +333,13 @@ def add_uf_system_costing(m, costing_package=None):
     for i in m.fs.uf_trains:
         add_uf_train_costing(m.fs.uf_train[i], costing_package=costing_package)
 
+    if m.uf_symmetric:
+        # Electricity for the trains that are not explicitly modeled
+        costing_package.cost_flow(
+            (m.uf_num_trains - 1) * m.fs.uf_train[1].pump.unit.work_mechanical[0],
+            "electricity",
+        )
+
 
 def report_uf_system(m, w=30):
 
@@ -275,33 +358,33 @@ def report_uf_system(m, w=30):
     print(f"{'-' * (3 * w)}")
     if m.standalone:
         print(
-            f'{f"Total Perm Flow":<{w}s}{value(pyunits.convert(m.fs.product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"Total Perm Flow":<{w}s}{converted_value(m.fs.product.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"Final Perm Conc":<{w}s}{value(pyunits.convert(m.fs.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"Final Perm Conc":<{w}s}{converted_value(m.fs.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
         print(
-            f'{f"Total Brine Flow":<{w}s}{value(pyunits.convert(m.fs.disposal.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"Total Brine Flow":<{w}s}{converted_value(m.fs.disposal.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"Final Brine Conc":<{w}s}{value(pyunits.convert(m.fs.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"Final Brine Conc":<{w}s}{converted_value(m.fs.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
     else:
         print(
-            f'{f"Total Perm Flow":<{w}s}{value(pyunits.convert(m.fs.uf_product_mixer.mixed_state[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"Total Perm Flow":<{w}s}{converted_value(m.fs.uf_product_mixer.mixed_state[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"Final Perm Conc":<{w}s}{value(pyunits.convert(m.fs.uf_product_mixer.mixed_state[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"Final Perm Conc":<{w}s}{converted_value(m.fs.uf_product_mixer.mixed_state[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
         print(
-            f'{f"Total Brine Flow":<{w}s}{value(pyunits.convert(m.fs.uf_disposal_mixer.mixed_state[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"Total Brine Flow":<{w}s}{converted_value(m.fs.uf_disposal_mixer.mixed_state[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"Final Brine Conc":<{w}s}{value(pyunits.convert(m.fs.uf_disposal_mixer.mixed_state[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"Final Brine Conc":<{w}s}{converted_value(m.fs.uf_disposal_mixer.mixed_state[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
     print(f'{f"Overall Recovery":<{w}s}{value(m.fs.recovery_vol_uf)*100:<{w}.3f}{"%"}')
     print(
-        f'{f"Total UF Pump Power":<{w}s}{value(pyunits.convert(m.fs.total_uf_pump_power, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"Total UF Pump Power":<{w}s}{converted_value(m.fs.total_uf_pump_power, pyunits.kW):<{w}.3f}{"kW"}'
     )
 
 
@@ -27,6 +27,8 @@ from wrd.utilities import load_config, get_config_file
 from wrd.components.pump import *
 from wrd.components.UF_separator import *
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 __all__ = [
     "build_uf_train",
@@ -79,6 +81,7 @@ def build_system(file="wrd_inputs_8_19_21.yaml"):
     return m
 
 
+@profiled
 def build_uf_train(blk, file="wrd_inputs_8_19_21.yaml", prop_package=None):
 
     if prop_package is None:
@@ -124,7 +127,8 @@ def build_uf_train(blk, file="wrd_inputs_8_19_21.yaml", prop_package=None):
     )
     blk.UF_to_product = Arc(source=blk.UF.product.outlet, destination=blk.product.inlet)
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_uf_train_scaling(blk):
@@ -165,6 +169,7 @@ def initialize_system(m):
     m.fs.disposal.initialize()
 
 
+@profiled
 def initialize_uf_train(blk):
     blk.feed.initialize()
 
@@ -200,25 +205,25 @@ def report_uf_train(blk, train_num=0, w=30):
     print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
     print(f"{'-' * (3 * w)}")
     print(
-        f'{f"Total Pump Power":<{w}s}{value(pyunits.convert(blk.pump.unit.work_mechanical[0], to_units=pyunits.kilowatt)):<{w}.3f}{"kW"}'
+        f'{f"Total Pump Power":<{w}s}{converted_value(blk.pump.unit.work_mechanical[0], pyunits.kilowatt):<{w}.3f}{"kW"}'
     )
     print(
-        f'{f"Total Feed Flow":<{w}s}{value(pyunits.convert(blk.feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Feed Flow":<{w}s}{converted_value(blk.feed.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Inlet Feed Conc":<{w}s}{value(pyunits.convert(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Inlet Feed Conc":<{w}s}{converted_value(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     print(
-        f'{f"Total Perm Flow":<{w}s}{value(pyunits.convert(blk.product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Perm Flow":<{w}s}{converted_value(blk.product.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Final Perm Conc":<{w}s}{value(pyunits.convert(blk.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Final Perm Conc":<{w}s}{converted_value(blk.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     print(
-        f'{f"Total Brine Flow":<{w}s}{value(pyunits.convert(blk.disposal.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Brine Flow":<{w}s}{converted_value(blk.disposal.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Final Brine Conc":<{w}s}{value(pyunits.convert(blk.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Final Brine Conc":<{w}s}{converted_value(blk.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     report_pump(blk.pump, w=w)
 
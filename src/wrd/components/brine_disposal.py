@@ -23,6 +23,8 @@ from watertap_contrib.reflo.unit_models.deep_well_injection import (
 
 from wrd.utilities import load_config, get_config_file
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 solver = get_solver()
 
@@ -66,6 +68,7 @@ def build_system(file="wrd_inputs_8_19_21.yaml"):
     return m
 
 
+@profiled
 def build_brine_disposal(blk, file="wrd_inputs_8_19_21.yaml", prop_package=None):
 
     if prop_package is None:
@@ -86,7 +89,8 @@ def build_brine_disposal(blk, file="wrd_inputs_8_19_21.yaml", prop_package=None)
         destination=blk.unit.inlet,
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
     return blk
 
@@ -99,6 +103,7 @@ def initialize_system(m):
     initialize_brine_disposal(m.fs.brine_disposal)
 
 
+@profiled
 def initialize_brine_disposal(blk):
 
     blk.feed.initialize()
@@ -151,23 +156,23 @@ def report_brine_disposal(blk, w=25):
     temperature_in = blk.feed.properties[0].temperature
 
     print(
-        f'{f"Flow Rate":<{w}s}{value(pyunits.convert(flow_in, to_units=pyunits.gal / pyunits.min)):<{w}.3f}{"gpm"}'
+        f'{f"Flow Rate":<{w}s}{converted_value(flow_in, pyunits.gal / pyunits.min):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Concentration":<{w}s}{value(pyunits.convert(conc_in, to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Concentration":<{w}s}{converted_value(conc_in, pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     print(
-        f'{f"Pressure":<{w}s}{value(pyunits.convert(pressure_in, to_units=pyunits.psi)):<{w}.3f}{"psi"}'
+        f'{f"Pressure":<{w}s}{converted_value(pressure_in, pyunits.psi):<{w}.3f}{"psi"}'
     )
     print(
-        f'{f"Temperature":<{w}s}{value(pyunits.convert(temperature_in, to_units=pyunits.degK)):<{w}.3f}{"°K"}'
+        f'{f"Temperature":<{w}s}{converted_value(temperature_in, pyunits.degK):<{w}.3f}{"°K"}'
     )
 
     if blk.unit.find_component("costing") is not None:
         cb = blk.model().fs.costing
         dwi_cost = cb.deep_well_injection.dwi_lcow
         print(
-            f'{f"Brine Disposal Unit Cost":<{w}s}{value(pyunits.convert(dwi_cost, to_units=cb.base_currency / pyunits.m**3)):<{w}.3f}{f"{pyunits.get_units(dwi_cost)}":<{w}s}'
+            f'{f"Brine Disposal Unit Cost":<{w}s}{converted_value(dwi_cost, cb.base_currency / pyunits.m**3):<{w}.3f}{f"{pyunits.get_units(dwi_cost)}":<{w}s}'
         )
         print(
             f'{f"Brine Disposal Opex":<{w}s}{value(blk.unit.costing.variable_operating_cost):<{w}.2f}{f"{pyunits.get_units(blk.unit.costing.variable_operating_cost)}":<{w}s}'
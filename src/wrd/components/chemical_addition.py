@@ -23,6 +23,8 @@ from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
 from models import ChemicalAddition
 from srp.utils import touch_flow_and_conc
 from wrd.utilities import get_config_value, load_config, get_config_file
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 __all__ = [
     "build_chem_addition",
@@ -113,7 +115,8 @@ def build_system(
     return m
 
 
-def build_chem_addition(blk, chemical_name=None, prop_package=None):
+@profiled
+def build_chem_addition(blk, chemical_name=None, prop_package=None, explicit=False):
 
     m = blk.model()
     if prop_package is None:
@@ -134,6 +137,7 @@ def build_chem_addition(blk, chemical_name=None, prop_package=None):
         property_package=prop_package,
         chemical=chemical_name,
         chemical_data=blk.chem_config,
+        explicit=explicit,
     )
 
     blk.product = StateJunction(property_package=prop_package)
@@ -148,7 +152,8 @@ def build_chem_addition(blk, chemical_name=None, prop_package=None):
         destination=blk.product.inlet,
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_inlet_conditions(m, Qin=2637, Cin=0.5):
@@ -187,6 +192,7 @@ def initialize_system(blk):
     blk.fs.product.initialize()
 
 
+@profiled
 def initialize_chem_addition(blk):
     blk.feed.initialize()
     propagate_state(blk.feed_to_unit)
@@ -222,9 +228,8 @@ def add_chem_addition_costing(
 
 def report_chem_addition(blk, w=35):
     chem_name = blk.unit.config.chemical.replace("_", " ").title()
-    feed_flow = pyunits.convert(
-        blk.unit.properties[0].flow_vol_phase["Liq"],
-        to_units=pyunits.gallon / pyunits.min,
+    feed_flow = converted_value(
+        blk.unit.properties[0].flow_vol_phase["Liq"], pyunits.gallon / pyunits.min
     )
     title = f"{chem_name} Addition Report"
     side = int(((3 * w) - len(title)) / 2) - 1
@@ -232,9 +237,9 @@ def report_chem_addition(blk, w=35):
     print(f"\n{header}\n")
     print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
     print(f"{'-' * (3 * w)}")
-    print(f'{f"Inlet Flow":<{w}s}{f"{value(feed_flow):<{w}.2f}gpm"}')
+    print(f'{f"Inlet Flow":<{w}s}{f"{feed_flow:<{w}.2f}gpm"}')
     print(
-        f'{f"{chem_name} Dose":<{w}s}{f"{value(pyunits.convert(blk.unit.dose, to_units=pyunits.mg/pyunits.liter)):<{w}.2f}mg/L"}'
+        f'{f"{chem_name} Dose":<{w}s}{f"{converted_value(blk.unit.dose, pyunits.mg / pyunits.liter):<{w}.2f}mg/L"}'
     )
     print(
         f'{f"{chem_name} Mass Flow":<{w}s}{value(blk.unit.chemical_flow_mass):<{w}.3e}{f"{pyunits.get_units(blk.unit.chemical_flow_mass)}"}'
@@ -246,10 +251,10 @@ def report_chem_addition(blk, w=35):
         f'{f"{chem_name} Pump":<{w}s}{value(blk.unit.pumping_power):<{w}.3e}{f"{pyunits.get_units(blk.unit.pumping_power)}"}'
     )
     print(
-        f'{f"{chem_name} Vol. Flow (gpm)":<{w}s}{value(pyunits.convert(blk.unit.chemical_soln_flow_vol,to_units=pyunits.gallon/pyunits.min)):<{w}.3e}{"gpm"}'
+        f'{f"{chem_name} Vol. Flow (gpm)":<{w}s}{converted_value(blk.unit.chemical_soln_flow_vol, pyunits.gallon / pyunits.min):<{w}.3e}{"gpm"}'
     )
     print(
-        f'{f"{chem_name} Vol. Flow (gal/month)":<{w}s}{value(pyunits.convert(blk.unit.chemical_soln_flow_vol,to_units=pyunits.gallon/pyunits.month)):<{w}.3e}{"gal/month"}'
+        f'{f"{chem_name} Vol. Flow (gal/month)":<{w}s}{converted_value(blk.unit.chemical_soln_flow_vol, pyunits.gallon / pyunits.month):<{w}.3e}{"gal/month"}'
     )
     m = blk.model()
     if m.fs.find_component("costing") is not None:
@@ -0,0 +1,221 @@
+"""
+Chemical dose and spend evaluation for the WRD chemical addition units.
+
+The ChemicalAddition equations (models/chemical_addition.py) are evaluated
+with NumPy for arrays of feed flow and dose, and the chemicals are priced
+with the unit costs used by costing/chemical_addition.py. This screens
+chemical spend over long flow records, e.g. years of minute-level historian
+data, in one pass per chemical without building a Pyomo model:
+
+    results = evaluate_chemical_doses(flow, flow_units=pyunits.gallon / pyunits.min)
+    spend = total_chemical_cost(results, time_step=1, time_units=pyunits.minute)
+"""
+
+import numpy as np
+
+from pyomo.environ import value, units as pyunits
+from idaes.core.base.costing_base import register_idaes_currency_units
+from idaes.core.util.constants import Constants
+
+from costing.chemical_addition import get_chemical_data
+from wrd.utilities import load_config, get_config_file, get_config_value
+from srp.utils.units import conversion_factor, converted_value
+
+__all__ = [
+    "wrd_chemicals",
+    "get_chemical_dosing_data",
+    "chemical_dose_flows",
+    "evaluate_chemical_doses",
+    "total_chemical_cost",
+]
+
+# Pre- and post-treatment chemicals in build_wrd_system
+wrd_chemicals = [
+    "ammonium_sulfate",
+    "sodium_hypochlorite",
+    "sulfuric_acid",
+    "scale_inhibitor",
+    "calcium_hydroxide",
+    "sodium_hydroxide",
+    "sodium_bisulfite",
+]
+
+# Defaults of the ChemicalAddition pump_head (m) and pump_efficiency
+default_pump_head = 10
+default_pump_efficiency = 0.75
+
+# m/s2
+_acceleration_gravity = value(Constants.acceleration_gravity)
+
+
+def get_chemical_dosing_data(
+    chemical, file="wrd_inputs_8_19_21.yaml", base_currency=None
+):
+    """
+    Dose, solution properties and unit cost of a chemical in SI units, from
+    the chemical_addition section of a WRD input file where given and the
+    chemical catalog otherwise, as in build_chem_addition and
+    add_chem_addition_costing.
+
+    Returns:
+        dict with the dose (kg/m3, None if not in the file), solution
+        density (kg/m3), ratio in solution, purity, whether the chemical is
+        priced per volume of solution and the unit cost in base_currency per
+        m3 of solution or per kg of chemical
+    """
+    # Currency units are only registered once a costing package is built
+    register_idaes_currency_units()
+    if base_currency is None:
+        base_currency = pyunits.USD_2021
+    data = get_chemical_data(chemical)
+    if data is None or data["cost"] is None:
+        raise KeyError(f"No costing data for {chemical} in the chemical catalog")
+
+    cost_basis = pyunits.m**3 if data["volumetric_cost"] else pyunits.kg
+    dosing = {
+        "dose": None,
+        "solution_density": data["solution_density"],
+        "ratio_in_solution": data["ratio_in_solution"],
+        "purity": data["purity"],
+        "volumetric_cost": data["volumetric_cost"],
+        "unit_cost": data["cost"]
+        * conversion_factor(
+            getattr(pyunits, data["cost_units"]), base_currency / cost_basis
+        ),
+    }
+
+    if file is not None:
+        chem_data = load_config(get_config_file(file))["chemical_addition"]
+        if chemical in chem_data:
+            to_units = {
+                "chemical_dosage": pyunits.kg / pyunits.m**3,
+                "solution_density": pyunits.kg / pyunits.m**3,
+                "ratio_in_solution": pyunits.dimensionless,
+                "unit_cost": base_currency / cost_basis,
+            }
+            for key, units in to_units.items():
+                if key not in chem_data[chemical]:
+                    continue
+                val = converted_value(get_config_value(chem_data, key, chemical), units)
+                dosing["dose" if key == "chemical_dosage" else key] = val
+            if "unit_cost" in chem_data[chemical]:
+                # add_chem_addition_costing fixes the purity to 1
+                dosing["purity"] = 1
+
+    if dosing["solution_density"] is None or dosing["ratio_in_solution"] is None:
+        raise KeyError(f"No solution properties for {chemical}")
+    return dosing
+
+
+def chemical_dose_flows(
+    flow,
+    dose,
+    solution_density,
+    ratio_in_solution,
+    pump_head=default_pump_head,
+    pump_efficiency=default_pump_efficiency,
+):
+    """
+    Chemical and solution flows and pumping power of a chemical addition unit
+    for arrays of feed flow (m3/s) and dose (kg/m3), as in ChemicalAddition.
+
+    Returns:
+        dict with the chemical mass flow (kg/s), solution volumetric (m3/s)
+        and mass flow (kg/s) and the pumping power (kW)
+    """
+    chemical_flow_mass = np.asarray(dose, dtype=float) * np.asarray(flow, dtype=float)
+    return {
+        "chemical_flow_mass": chemical_flow_mass,
+        "chemical_soln_flow_vol": chemical_flow_mass
+        / (ratio_in_solution * solution_density),
+        "chemical_soln_flow_mass": chemical_flow_mass / ratio_in_solution,
+        "pumping_power": chemical_flow_mass
+        * pump_head
+        * _acceleration_gravity
+        / pump_efficiency
+        / 1000,
+    }
+
+
+def evaluate_chemical_doses(
+    flow,
+    doses=None,
+    chemicals=wrd_chemicals,
+    file="wrd_inputs_8_19_21.yaml",
+    flow_units=pyunits.m**3 / pyunits.s,
+    dose_units=pyunits.mg / pyunits.L,
+    base_currency=None,
+):
+    """
+    Solution flows, pumping power and cost of every chemical for an array of
+    feed flows.
+
+    Args:
+        flow: feed flow, array or scalar in flow_units
+        doses: {chemical: dose} with the dose an array (same shape as flow)
+            or scalar in dose_units, default the dose in file
+        chemicals: chemicals to evaluate
+        file: WRD input file for the default doses, solution properties and
+            unit costs, None to use the chemical catalog only
+        flow_units: units of flow
+        dose_units: units of the doses
+        base_currency: currency of the costs, default USD_2021
+
+    Returns:
+        {chemical: dict as chemical_dose_flows plus the cost rate
+        (base_currency/s)}
+    """
+    if doses is None:
+        doses = {}
+    flow = np.asarray(flow, dtype=float) * conversion_factor(
+        flow_units, pyunits.m**3 / pyunits.s
+    )
+    dose_factor = conversion_factor(dose_units, pyunits.kg / pyunits.m**3)
+
+    results = {}
+    for chemical in chemicals:
+        data = get_chemical_dosing_data(
+            chemical, file=file, base_currency=base_currency
+        )
+        if chemical in doses:
+            dose = np.asarray(doses[chemical], dtype=float) * dose_factor
+        elif data["dose"] is not None:
+            dose = data["dose"]
+        else:
+            raise ValueError(f"Dose must be provided for {chemical}")
+
+        res = chemical_dose_flows(
+            flow, dose, data["solution_density"], data["ratio_in_solution"]
+        )
+        # Priced on the solution volume or chemical mass, as in
+        # cost_chemical_addition
+        costed_flow = (
+            res["chemical_soln_flow_vol"]
+            if data["volumetric_cost"]
+            else res["chemical_flow_mass"]
+        )
+        res["cost_rate"] = data["unit_cost"] / data["purity"] * costed_flow
+        results[chemical] = res
+    return results
+
+
+def total_chemical_cost(results, time_step, time_units=pyunits.minute):
+    """
+    Total cost of every chemical over the flow record from the cost rates of
+    evaluate_chemical_doses.
+
+    Args:
+        results: output of evaluate_chemical_doses
+        time_step: duration of each flow point, scalar or array in time_units
+        time_units: units of time_step
+
+    Returns:
+        {chemical: cost} plus the sum over all chemicals as "total"
+    """
+    dt = np.asarray(time_step, dtype=float) * conversion_factor(time_units, pyunits.s)
+    costs = {
+        chemical: float(np.sum(res["cost_rate"] * dt))
+        for chemical, res in results.items()
+    }
+    costs["total"] = sum(costs.values())
+    return costs
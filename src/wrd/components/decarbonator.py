@@ -22,6 +22,8 @@ from watertap.core.solvers import get_solver
 from watertap.costing import WaterTAPCosting
 from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 solver = get_solver()
 
@@ -36,6 +38,7 @@ def build_system(**kwargs):
     return m
 
 
+@profiled
 def build_decarbonator(blk, prop_package):
 
     blk.feed = StateJunction(property_package=prop_package)
@@ -53,7 +56,8 @@ def build_decarbonator(blk, prop_package):
     # Add Arcs
     blk.feed_to_decarb = Arc(source=blk.feed.outlet, destination=blk.unit.inlet)
     blk.decarb_to_product = Arc(source=blk.unit.outlet, destination=blk.product.inlet)
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_inlet_conditions(blk, Qin=0.581, Cin=0, P_in=10.3):
@@ -96,6 +100,7 @@ def add_decarbonator_scaling(blk):
     set_scaling_factor(blk.unit.power_consumption, 1e-3)
 
 
+@profiled
 def initialize_decarbonator(blk):
     blk.feed.initialize()
     propagate_state(blk.feed_to_decarb)
@@ -129,19 +134,19 @@ def report_decarbonator(blk, w=30):
     total_flow = blk.feed.properties[0].flow_vol_phase["Liq"]
     power = blk.unit.power_consumption
     print(
-        f'{f"Total Flow Rate (MGD)":<{w}s}{value(pyunits.convert(total_flow, to_units=pyunits.Mgallons /pyunits.day)):<{w}.3f}{"MGD"}'
+        f'{f"Total Flow Rate (MGD)":<{w}s}{converted_value(total_flow, pyunits.Mgallons / pyunits.day):<{w}.3f}{"MGD"}'
     )
     print(f'{f"Total Flow Rate (m3/s)":<{w}s}{value(total_flow):<{w}.3e}{"m3/s"}')
     print(
-        f'{f"Total Flow Rate (gpm)":<{w}s}{value(pyunits.convert(total_flow, to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Flow Rate (gpm)":<{w}s}{converted_value(total_flow, pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Power Consumption (kW)":<{w}s}{value(pyunits.convert(power, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"Power Consumption (kW)":<{w}s}{converted_value(power, pyunits.kW):<{w}.3f}{"kW"}'
     )
     m = blk.model()
     SEC = m.fs.costing.SEC
     print(
-        f'{f"Specific Energy (SEC)":<{w}s}{value(pyunits.convert(SEC, to_units=pyunits.kWh / pyunits.m**3)):<{w}.3f}{"kWh/m3"}'
+        f'{f"Specific Energy (SEC)":<{w}s}{converted_value(SEC, pyunits.kWh / pyunits.m**3):<{w}.3f}{"kWh/m3"}'
     )
 
 
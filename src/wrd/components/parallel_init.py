@@ -0,0 +1,136 @@
+"""
+Parallel initialization of identical, independent train blocks.
+Once the feed separator state has been propagated to each train, every train
+is rebuilt as a standalone block in a worker process, given the parent's
+variable values and fixed flags, initialized, and the initialized values are
+copied back into the parent model.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from pyomo.environ import ConcreteModel, Var
+from idaes.core import FlowsheetBlock
+from idaes.core.util.scaling import calculate_scaling_factors
+
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+
+from wrd.components.ro import build_ro, set_ro_scaling, initialize_ro
+from wrd.components.ro_stage import (
+    build_ro_stage,
+    set_ro_stage_scaling,
+    initialize_ro_stage,
+)
+from wrd.components.ro_train import (
+    build_ro_train,
+    set_ro_train_scaling,
+    initialize_ro_train,
+)
+from wrd.components.UF_train import (
+    build_uf_train,
+    set_uf_train_scaling,
+    initialize_uf_train,
+)
+
+__all__ = [
+    "initialize_trains_parallel",
+]
+
+# Model-level build flags read by the train builders, copied to the worker models
+model_flags = ["lazy_properties", "explicit_chemical_addition"]
+
+# build, scaling and initialization functions for each type of train block
+train_types = {
+    "ro": (build_ro, set_ro_scaling, initialize_ro),
+    "ro_stage": (build_ro_stage, set_ro_stage_scaling, initialize_ro_stage),
+    "ro_train": (build_ro_train, set_ro_train_scaling, initialize_ro_train),
+    "uf_train": (build_uf_train, set_uf_train_scaling, initialize_uf_train),
+}
+
+
+def _get_train_data(blk):
+    return {
+        v.getname(fully_qualified=True, relative_to=blk): (v.value, v.fixed)
+        for v in blk.component_data_objects(Var, descend_into=True)
+    }
+
+
+def _initialize_train(train_type, build_kwargs, flags, default_scaling, train_data):
+    build, set_scaling, initialize = train_types[train_type]
+
+    m = ConcreteModel()
+    for flag, val in flags.items():
+        setattr(m, flag, val)
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    for (name, index), sf in default_scaling.items():
+        m.fs.properties.set_default_scaling(name, sf, index=index)
+
+    m.fs.train = FlowsheetBlock(dynamic=False)
+    build(m.fs.train, prop_package=m.fs.properties, **build_kwargs)
+    set_scaling(m.fs.train)
+    calculate_scaling_factors(m)
+
+    for name, (val, fixed) in train_data.items():
+        v = m.fs.train.find_component(name)
+        if v is None:
+            continue
+        v.set_value(val, skip_validation=True)
+        if fixed:
+            v.fix()
+        else:
+            v.unfix()
+
+    initialize(m.fs.train)
+
+    return {name: val for name, (val, _) in _get_train_data(m.fs.train).items()}
+
+
+def initialize_trains_parallel(
+    blks, train_type, max_workers=None, block_kwargs=None, **build_kwargs
+):
+    """
+    Initialize a list of independent train blocks of the same train_type
+    ("ro", "ro_stage", "ro_train" or "uf_train") in separate worker processes.
+    build_kwargs are passed to the build function of the train type (e.g.
+    file, num_stages or stage_num) and the model_flags of the parent model
+    are set on the worker model, so the worker builds the same block.
+    block_kwargs is an optional list with the build arguments that differ
+    between blocks (e.g. the file of each block), one dict per block.
+    The inlet state of each train must already be propagated.
+    """
+    if train_type not in train_types:
+        raise ValueError(
+            f"Unknown train type '{train_type}', must be one of {list(train_types)}."
+        )
+    if max_workers is None:
+        max_workers = min(len(blks), os.cpu_count())
+    if block_kwargs is None:
+        block_kwargs = [{}] * len(blks)
+
+    parent = blks[0].model()
+    flags = {f: getattr(parent, f) for f in model_flags if hasattr(parent, f)}
+    properties = parent.fs.properties
+    default_scaling = dict(properties.default_scaling_factor)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _initialize_train,
+                train_type,
+                {**build_kwargs, **kwargs},
+                flags,
+                default_scaling,
+                _get_train_data(blk),
+            )
+            for blk, kwargs in zip(blks, block_kwargs)
+        ]
+        results = [f.result() for f in futures]
+
+    for blk, values in zip(blks, results):
+        for name, val in values.items():
+            # Skip variables only built in the worker, e.g. properties of a
+            # model built with lazy_properties=True
+            v = blk.find_component(name)
+            if v is not None:
+                v.set_value(val, skip_validation=True)
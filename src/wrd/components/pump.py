@@ -22,10 +22,18 @@ from watertap.unit_models.pressure_changer import Pump
 from watertap.core.solvers import get_solver
 
 from wrd.utilities import load_config, get_config_value, get_config_file
+from wrd.components.pump_curves import (
+    get_pump_name,
+    get_pump_curve,
+    preinitialize_pump,
+)
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 __all__ = [
     "build_pump",
+    "get_rated_pressure_increase",
     "initialize_pump",
     "set_pump_op_conditions",
     "report_pump",
@@ -72,9 +80,25 @@ def build_system(stage_num=1, file="wrd_inputs_8_19_21.yaml"):
     return m
 
 
+@profiled
 def build_pump(
-    blk, stage_num=1, file="wrd_inputs_8_19_21.yaml", prop_package=None, uf=False
+    blk,
+    stage_num=1,
+    file="wrd_inputs_8_19_21.yaml",
+    prop_package=None,
+    uf=False,
+    speed=1.0,
+    variable_speed=False,
+    min_speed=0.5,
 ):
+    """
+    Build a pump with an efficiency curve on blk. speed selects the
+    efficiency curve in pump_curves.yaml. With variable_speed, the speed is a
+    variable (initialized at speed) and the full speed curve is scaled with
+    the affinity laws: the pressure increase is the rated pressure increase
+    times speed**2 and the efficiency at a flow Q is the full speed efficiency
+    at Q / speed, so the power scales with speed**3 at homologous flows.
+    """
 
     if prop_package is None:
         m = blk.model()
@@ -82,6 +106,7 @@ def build_pump(
 
     blk.config_data = load_config(get_config_file(file))
     blk.stage_num = stage_num
+    blk.variable_speed = variable_speed
 
     blk.feed = StateJunction(property_package=prop_package)
     touch_flow_and_conc(blk.feed)
@@ -98,33 +123,11 @@ def build_pump(
         doc="Efficiency from pump curves",
     )
 
-    # Load Values for surrogate model
-    if uf:
-        a_0 = 0.0677
-        a_1 = 5.357
-        a_2 = -4.475
-        a_3 = -19.578
-        # Below are estimated for 75% speed
-        # a_0 = 0.0677
-        # a_1 = 7.142
-        # a_2 = -7.956
-        # a_3 = -46.408
-    elif stage_num == 1:
-        a_0 = 0.389
-        a_1 = -0.535
-        a_2 = 41.373
-        a_3 = -138.82
-    elif stage_num == 2:
-        a_0 = 0.067
-        a_1 = 21.112
-        a_2 = -133.157
-        a_3 = -234.386
-    else:
-        # Still missing TSRO pump curves
-        a_0 = 0.067
-        a_1 = 21.112
-        a_2 = -133.157
-        a_3 = -234.386
+    # Load Values for surrogate model from the pump curves
+    pump_curves = load_config(get_config_file("pump_curves.yaml"))
+    a_0, a_1, a_2, a_3 = get_pump_curve(
+        get_pump_name(stage_num, uf=uf), speed=1.0 if variable_speed else speed
+    )
 
     # Create Variables for simple "surrogate"
     blk.unit.efficiency_constant = Param(
@@ -157,6 +160,28 @@ def build_pump(
 
     flow = blk.feed.properties[0].flow_vol_phase["Liq"]
 
+    if variable_speed:
+        blk.unit.speed = Var(
+            initialize=speed,
+            bounds=(min_speed, 1),
+            units=pyunits.dimensionless,
+            doc="Pump speed as a fraction of the rated speed",
+        )
+        blk.unit.deltaP_rated = Param(
+            initialize=value(
+                get_rated_pressure_increase(blk.config_data, stage_num, uf)
+            ),
+            mutable=True,
+            units=pyunits.Pa,
+            doc="Pressure increase at the rated speed",
+        )
+        blk.unit.eq_affinity_head = Constraint(
+            expr=blk.unit.deltaP[0] == blk.unit.deltaP_rated * blk.unit.speed**2,
+            doc="Affinity law for the pressure increase",
+        )
+        # Affinity law for the flow: efficiency at the equivalent full speed flow
+        flow = flow / blk.unit.speed
+
     blk.unit.eq_efficiency_surr = Constraint(
         expr=blk.unit.efficiency_fluid
         == blk.unit.efficiency_cubed_coeff * flow**3
@@ -168,14 +193,14 @@ def build_pump(
     blk.unit.efficiency_pump.bounds = (0, 1)
 
     blk.unit.efficiency_motor = Param(
-        initialize=0.938,
+        initialize=pump_curves["efficiency_motor"],
         mutable=True,
         units=pyunits.dimensionless,
         doc="Efficiency of motor and VFD",
     )
 
     blk.unit.efficiency_vfd = Param(
-        initialize=0.95,
+        initialize=pump_curves["efficiency_vfd"],
         mutable=True,
         units=pyunits.dimensionless,
         doc="Efficiency of VFD",
@@ -202,10 +227,35 @@ def build_pump(
     blk.feed_to_unit = Arc(source=blk.feed.outlet, destination=blk.unit.inlet)
     blk.unit_to_product = Arc(source=blk.unit.outlet, destination=blk.product.inlet)
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
+
+
+def get_rated_pressure_increase(config_data, stage_num=1, uf=False):
+    """
+    Pressure increase of a pump at the rated speed, from the suction and
+    outlet pressures in the config file (the feed pressure for UF pumps).
+    """
+    if uf:
+        p_in = get_config_value(config_data, "feed_pressure", "feed_stream")
+        p_out = get_config_value(
+            config_data, "pump_outlet_pressure", "uf_pumps", f"pump_{stage_num}"
+        )
+    else:
+        p_in = get_config_value(
+            config_data, "pump_suction_pressure", "pumps", f"pump_{stage_num}"
+        )
+        p_out = get_config_value(
+            config_data, "pump_outlet_pressure", "pumps", f"pump_{stage_num}"
+        )
+    return pyunits.convert(p_out - p_in, to_units=pyunits.Pa)
 
 
 def set_pump_op_conditions(blk, uf=False):
+    if blk.variable_speed:
+        # The speed sets the outlet pressure, unfix it to optimize the speed
+        blk.unit.speed.fix()
+        return
     if uf:
         Pout = get_config_value(
             blk.config_data, "pump_outlet_pressure", "uf_pumps", f"pump_{blk.stage_num}"
@@ -248,11 +298,13 @@ def initialize_system(m):
     m.fs.product.initialize()
 
 
+@profiled
 def initialize_pump(blk):
 
     blk.feed.initialize()
     propagate_state(blk.feed_to_unit)
 
+    preinitialize_pump(blk)
     blk.unit.initialize()
 
     propagate_state(blk.unit_to_product)
@@ -285,20 +337,18 @@ def report_pump(blk, w=30, add_costing=False):
     pout = blk.unit.control_volume.properties_out[0].pressure
 
     print(
-        f'{f"Inlet Flow":<{w}s}{value(pyunits.convert(flow_in, to_units=pyunits.gallons /pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Inlet Flow":<{w}s}{converted_value(flow_in, pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     # print(f'{f"∆P (Pa)":<{w}s}{value(deltaP):<{w}.3e}{"Pa"}')
     print(
-        f'{f"Inlet Pressure":<{w}s}{value(pyunits.convert(pin, to_units=pyunits.psi)):<{w}.3f}{"psi"}'
-    )
-    print(
-        f'{f"∆P":<{w}s}{value(pyunits.convert(deltaP, to_units=pyunits.psi)):<{w}.3f}{"psi"}'
+        f'{f"Inlet Pressure":<{w}s}{converted_value(pin, pyunits.psi):<{w}.3f}{"psi"}'
     )
+    print(f'{f"∆P":<{w}s}{converted_value(deltaP, pyunits.psi):<{w}.3f}{"psi"}')
     print(
-        f'{f"Outlet Pressure":<{w}s}{value(pyunits.convert(pout, to_units=pyunits.psi)):<{w}.3f}{"psi"}'
+        f'{f"Outlet Pressure":<{w}s}{converted_value(pout, pyunits.psi):<{w}.3f}{"psi"}'
     )
     print(
-        f'{f"Work Mech. (kW)":<{w}s}{value(pyunits.convert(work, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"Work Mech. (kW)":<{w}s}{converted_value(work, pyunits.kW):<{w}.3f}{"kW"}'
     )
     print(f'{f"Efficiency (-)":<{w}s}{value(blk.unit.efficiency_pump[0]):<{w}.3f}{"-"}')
     if add_costing:
@@ -306,7 +356,7 @@ def report_pump(blk, w=30, add_costing=False):
         # Is SEC not appearing on m.fs.costing.display a known issue?
         SEC = m.fs.costing.SEC
         print(
-            f'{f"Specific Energy (SEC)":<{w}s}{value(pyunits.convert(SEC, to_units=pyunits.kWh / pyunits.m**3)):<{w}.3f}{"kWh/m3"}'
+            f'{f"Specific Energy (SEC)":<{w}s}{converted_value(SEC, pyunits.kWh / pyunits.m**3):<{w}.3f}{"kWh/m3"}'
         )
 
 
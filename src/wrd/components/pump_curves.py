@@ -0,0 +1,181 @@
+"""
+Pump efficiency curves for the WRD pumps.
+
+The cubic efficiency curves of every pump and speed are read from
+meta_data/pump_curves.yaml and evaluated with NumPy for arrays of flow points,
+for fast screening outside Pyomo and to pre-initialize the pump models in
+pump.py before they are solved.
+"""
+
+import numpy as np
+
+from pyomo.environ import value
+
+from wrd.utilities import load_config, get_config_file
+
+__all__ = [
+    "get_pump_name",
+    "get_pump_curve",
+    "get_pump_speeds",
+    "pump_efficiency",
+    "pump_power",
+    "variable_speed_pump_power",
+    "preinitialize_pump",
+]
+
+
+def get_pump_name(stage_num=1, uf=False):
+    """
+    Name of the pump in the pump curve file, "uf" or "pump_<stage_num>".
+    """
+    return "uf" if uf else f"pump_{stage_num}"
+
+
+def _get_pump(pump, file):
+    pumps = load_config(get_config_file(file))["pumps"]
+    if pump not in pumps:
+        raise KeyError(f"Pump {pump} not found in {file}: {list(pumps)}")
+    return pumps[pump]
+
+
+def get_pump_speeds(pump, file="pump_curves.yaml"):
+    """
+    Speeds (fraction of the rated speed) with an efficiency curve.
+    """
+    return sorted(float(s) for s in _get_pump(pump, file)["speeds"])
+
+
+def get_pump_curve(pump, speed=1.0, file="pump_curves.yaml"):
+    """
+    Coefficients [a_0, a_1, a_2, a_3] of the efficiency curve of a pump at a
+    speed, with the flow in m3/s.
+    """
+    speeds = _get_pump(pump, file)["speeds"]
+    for s, coeffs in speeds.items():
+        if np.isclose(float(s), speed):
+            return np.array(coeffs, dtype=float)
+    raise KeyError(
+        f"No efficiency curve for pump {pump} at speed {speed}: "
+        f"{get_pump_speeds(pump, file)}"
+    )
+
+
+def pump_efficiency(flow, pump, speed=1.0, file="pump_curves.yaml"):
+    """
+    Fluid efficiency of a pump for an array of flows through the pump (m3/s).
+    """
+    a = get_pump_curve(pump, speed=speed, file=file)
+    return np.polynomial.polynomial.polyval(np.asarray(flow, dtype=float), a)
+
+
+def pump_power(
+    flow,
+    deltaP,
+    pump,
+    speed=1.0,
+    efficiency_motor=None,
+    efficiency_vfd=None,
+    efficiency_loss=0,
+    file="pump_curves.yaml",
+):
+    """
+    Pump efficiency and power for arrays of flows (m3/s) and pressure
+    increases (Pa), as in build_pump.
+
+    Returns:
+        dict with the fluid efficiency, overall pump efficiency and the
+        mechanical work (W) for every flow point
+    """
+    config = load_config(get_config_file(file))
+    if efficiency_motor is None:
+        efficiency_motor = config["efficiency_motor"]
+    if efficiency_vfd is None:
+        efficiency_vfd = config["efficiency_vfd"]
+
+    flow = np.asarray(flow, dtype=float)
+    efficiency_fluid = pump_efficiency(flow, pump, speed=speed, file=file)
+    efficiency_pump = (
+        efficiency_motor * efficiency_vfd * efficiency_fluid - efficiency_loss
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        work = flow * np.asarray(deltaP, dtype=float) / efficiency_pump
+    return {
+        "efficiency_fluid": efficiency_fluid,
+        "efficiency_pump": efficiency_pump,
+        "work_mechanical": work,
+    }
+
+
+def variable_speed_pump_power(
+    flow,
+    speed,
+    deltaP_rated,
+    pump,
+    efficiency_motor=None,
+    efficiency_vfd=None,
+    efficiency_loss=0,
+    file="pump_curves.yaml",
+):
+    """
+    Pump efficiency, pressure increase and power for arrays of flows (m3/s)
+    and speeds (fraction of the rated speed) with the affinity laws: the
+    pressure increase is deltaP_rated (Pa) * speed**2 and the efficiency is
+    the full speed efficiency at flow / speed.
+
+    Returns:
+        dict as pump_power plus the pressure increase (Pa)
+    """
+    flow = np.asarray(flow, dtype=float)
+    speed = np.asarray(speed, dtype=float)
+    deltaP = np.asarray(deltaP_rated, dtype=float) * speed**2
+    results = pump_power(
+        flow / speed,
+        deltaP,
+        pump,
+        speed=1.0,
+        efficiency_motor=efficiency_motor,
+        efficiency_vfd=efficiency_vfd,
+        efficiency_loss=efficiency_loss,
+        file=file,
+    )
+    results["work_mechanical"] = results["work_mechanical"] * speed
+    results["deltaP"] = deltaP
+    return results
+
+
+def preinitialize_pump(blk):
+    """
+    Set the efficiencies, pressure increase and work of a pump built with
+    build_pump from its inlet flow, outlet pressure and efficiency curve, so
+    the pump initialization and the flowsheet solve start from a consistent
+    point. Call after the inlet state is known, e.g. in initialize_pump.
+    """
+    unit = blk.unit
+    flow = value(blk.feed.properties[0].flow_vol_phase["Liq"])
+    p_in = value(unit.control_volume.properties_in[0].pressure)
+    p_out = value(unit.control_volume.properties_out[0].pressure)
+    curve_flow = flow
+    if getattr(blk, "variable_speed", False):
+        # Affinity laws, see build_pump
+        curve_flow = flow / value(unit.speed)
+        p_out = p_in + value(unit.deltaP_rated * unit.speed**2)
+        unit.control_volume.properties_out[0].pressure.set_value(p_out)
+    a = [
+        value(unit.efficiency_constant),
+        value(unit.efficiency_linear_coeff),
+        value(unit.efficiency_squared_coeff),
+        value(unit.efficiency_cubed_coeff),
+    ]
+    efficiency_fluid = np.polynomial.polynomial.polyval(curve_flow, a)
+    efficiency_pump = value(unit.efficiency_motor) * value(
+        unit.efficiency_vfd
+    ) * efficiency_fluid - value(unit.efficiency_loss)
+    if not 0 < efficiency_pump <= 1:
+        # Flow is off the pump curve, keep the current values
+        return
+
+    unit.efficiency_fluid.set_value(efficiency_fluid)
+    unit.efficiency_pump[0].set_value(efficiency_pump)
+    unit.deltaP[0].set_value(p_out - p_in)
+    unit.work_fluid[0].set_value(flow * (p_out - p_in))
+    unit.work_mechanical[0].set_value(flow * (p_out - p_in) / efficiency_pump)
@@ -1,6 +1,9 @@
 from copy import deepcopy
 from pyomo.environ import (
     ConcreteModel,
+    Param,
+    Constraint,
+    Expression,
     assert_optimal_termination,
     TransformationFactory,
     value,
@@ -20,6 +23,14 @@ from idaes.core.util.scaling import (
 )
 
 from watertap.costing import WaterTAPCosting
+from watertap.costing.unit_models.reverse_osmosis import (
+    build_reverse_osmosis_cost_param_block,
+)
+from watertap.costing.util import (
+    register_costing_parameter_block,
+    make_capital_cost_var,
+    make_fixed_operating_cost_var,
+)
 from watertap.unit_models.reverse_osmosis_1D import (
     ReverseOsmosis1D,
     PressureChangeType,
@@ -32,6 +43,8 @@ from watertap.core.solvers import get_solver
 
 from wrd.utilities import load_config, get_config_value, get_config_file
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 default_ro_config = dict(
     has_pressure_change=True,
@@ -48,10 +61,14 @@ default_ro_config = dict(
 
 __all__ = [
     "build_ro",
+    "get_ro_finite_elements",
+    "get_ro_discretization_outputs",
+    "estimate_ro_discretization_error",
     "initialize_ro",
     "set_ro_op_conditions",
     "set_ro_scaling",
     "report_ro",
+    "cost_ro_replicas",
     "add_ro_costing",
 ]
 
@@ -100,13 +117,45 @@ def build_system():
     return m
 
 
+def get_ro_finite_elements(config_data, stage_num, finite_elements=None):
+    """
+    Number of finite elements for an RO stage. finite_elements can be an int
+    applied to every stage or a dict of {stage_num: elements}. Stages not
+    given use the optional finite_elements key of the stage in the yaml file,
+    then the default RO config.
+    """
+    if isinstance(finite_elements, dict):
+        finite_elements = finite_elements.get(stage_num)
+    if finite_elements is not None:
+        return int(finite_elements)
+    try:
+        return int(
+            get_config_value(
+                config_data,
+                "finite_elements",
+                "reverse_osmosis_1d",
+                f"stage_{stage_num}",
+            )
+        )
+    except KeyError:
+        return default_ro_config["finite_elements"]
+
+
+@profiled
 def build_ro(
-    blk, prop_package=None, config=None, stage_num=1, file="wrd_inputs_8_19_21.yaml"
+    blk,
+    prop_package=None,
+    config=None,
+    stage_num=1,
+    file="wrd_inputs_8_19_21.yaml",
+    finite_elements=None,
 ):
 
     if config is None:
         config = deepcopy(default_ro_config)
     else:
+        if finite_elements is None and "finite_elements" in config:
+            finite_elements = config["finite_elements"]
         for k, v in default_ro_config.items():
             if k not in config.keys():
                 config[k] = v
@@ -118,6 +167,10 @@ def build_ro(
     blk.stage_num = stage_num
     blk.config_data = load_config(get_config_file(file))
     config["property_package"] = prop_package
+    config["finite_elements"] = get_ro_finite_elements(
+        blk.config_data, stage_num, finite_elements
+    )
+    blk.finite_elements = config["finite_elements"]
 
     blk.feed = StateJunction(property_package=prop_package)
     touch_flow_and_conc(blk.feed)
@@ -142,7 +195,8 @@ def build_ro(
         destination=blk.disposal.inlet,
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_inlet_conditions(m, Qin=2637, Cin=0.5, file="wrd_inputs_8_19_21.yaml"):
@@ -291,6 +345,7 @@ def initialize_system(m):
     m.fs.brine.initialize()
 
 
+@profiled
 def initialize_ro(blk):
 
     blk.feed.initialize()
@@ -345,16 +400,16 @@ def report_ro(blk, w=30):
     print(f"{'-' * (3 * w)}")
 
     print(
-        f'{f"Inlet Flow":<{w}s}{value(pyunits.convert(blk.feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallon / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Inlet Flow":<{w}s}{converted_value(blk.feed.properties[0].flow_vol_phase["Liq"], pyunits.gallon / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Inlet Conc.":<{w}s}{value(pyunits.convert(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.liter)):<{w}.3f}{"mg/L"}'
+        f'{f"Inlet Conc.":<{w}s}{converted_value(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.liter):<{w}.3f}{"mg/L"}'
     )
     print(
-        f'{f"Brine Flow":<{w}s}{value(pyunits.convert(blk.disposal.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallon / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Brine Flow":<{w}s}{converted_value(blk.disposal.properties[0].flow_vol_phase["Liq"], pyunits.gallon / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Product Flow":<{w}s}{value(pyunits.convert(blk.product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallon / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Product Flow":<{w}s}{converted_value(blk.product.properties[0].flow_vol_phase["Liq"], pyunits.gallon / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
         f'{f"Recovery":<{w}s}{value(blk.unit.recovery_vol_phase[0, "Liq"])*100:<{w}.3f}{"%"}'
@@ -363,13 +418,13 @@ def report_ro(blk, w=30):
         f'{f"Rejection":<{w}s}{value(blk.unit.rejection_phase_comp[0, "Liq", "NaCl"])*100:<{w}.3f}{"%"}'
     )
     print(
-        f'{f"Perm Conc":<{w}s}{value(pyunits.convert(blk.unit.mixed_permeate[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.liter)):<{w}.3f}{f"mg/L"}'
+        f'{f"Perm Conc":<{w}s}{converted_value(blk.unit.mixed_permeate[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.liter):<{w}.3f}{f"mg/L"}'
     )
     print(
-        f'{f"Brine Conc":<{w}s}{value(pyunits.convert(blk.unit.feed_side.properties[0, 1].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.liter)):<{w}.3f}{f"mg/L"}'
+        f'{f"Brine Conc":<{w}s}{converted_value(blk.unit.feed_side.properties[0, 1].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.liter):<{w}.3f}{f"mg/L"}'
     )
     print(
-        f'{f"∆P":<{w}s}{value(pyunits.convert(blk.unit.deltaP[0], to_units=pyunits.psi)):<{w}.3f}{f"psi"}'
+        f'{f"∆P":<{w}s}{converted_value(blk.unit.deltaP[0], pyunits.psi):<{w}.3f}{f"psi"}'
     )
     print(
         f'{f"Membrane Area":<{w}s}{value(blk.unit.area):<{w}.3f}{f"{pyunits.get_units(blk.unit.area)}"}'
@@ -381,17 +436,105 @@ def report_ro(blk, w=30):
         f'{f"Membrane Length":<{w}s}{value(blk.unit.length):<{w}.3f}{f"{pyunits.get_units(blk.unit.length)}"}'
     )
     print(
-        f'{f"Perm Backpressure":<{w}s}{value(pyunits.convert(blk.unit.mixed_permeate[0].pressure, to_units=pyunits.psi)):<{w}.3f}{f"psi"}'
+        f'{f"Perm Backpressure":<{w}s}{converted_value(blk.unit.mixed_permeate[0].pressure, pyunits.psi):<{w}.3f}{f"psi"}'
     )
 
 
-def add_ro_costing(blk, costing_package=None):
+def get_ro_discretization_outputs(blk):
+    """
+    Outputs of a solved RO block used to estimate its discretization error:
+    the water recovery and the mixed permeate concentration (kg/m3).
+    """
+    unit = blk.unit
+    t = unit.flowsheet().time.first()
+    return {
+        "recovery": value(unit.recovery_mass_phase_comp[t, "Liq", "H2O"]),
+        "permeate_conc": value(
+            unit.mixed_permeate[t].conc_mass_phase_comp["Liq", "NaCl"]
+        ),
+    }
+
+
+def estimate_ro_discretization_error(coarse, fine, refine_factor=2, order=1):
+    """
+    Richardson estimate of the relative discretization error of the outputs
+    of an RO block solved on a fine mesh, from the same block solved on a
+    mesh refine_factor times coarser. order is the order of accuracy of the
+    scheme, 1 for the backward finite difference. Returns the largest
+    estimate over the outputs of get_ro_discretization_outputs.
+    """
+    return max(
+        abs(fine[k] - coarse[k]) / (refine_factor**order - 1) / max(abs(fine[k]), 1e-12)
+        for k in fine
+    )
+
+
+@register_costing_parameter_block(
+    build_rule=build_reverse_osmosis_cost_param_block,
+    parameter_block_name="reverse_osmosis",
+)
+def cost_ro_replicas(blk, multiplicity=1):
+    """
+    WaterTAP RO membrane costing for multiplicity identical RO units, of which
+    only this one is modeled: the capital and membrane replacement costs are
+    those of the membrane area of all the units.
+    """
+    params = blk.costing_package.reverse_osmosis
+    make_capital_cost_var(blk)
+    make_fixed_operating_cost_var(blk)
+    blk.multiplicity = Param(
+        initialize=multiplicity,
+        units=pyunits.dimensionless,
+        doc="Number of identical RO units costed",
+    )
+    blk.membrane_cost = Expression(expr=params.membrane_cost)
+    blk.factor_membrane_replacement = Expression(
+        expr=params.factor_membrane_replacement
+    )
+    blk.membrane_area = Expression(
+        expr=blk.multiplicity * blk.unit_model.area,
+        doc="Membrane area of all the units",
+    )
+
+    blk.costing_package.add_cost_factor(blk, "TIC")
+    blk.capital_cost_constraint = Constraint(
+        expr=blk.capital_cost
+        == blk.cost_factor
+        * pyunits.convert(
+            blk.membrane_cost * blk.membrane_area,
+            to_units=blk.costing_package.base_currency,
+        )
+    )
+    blk.fixed_operating_cost_constraint = Constraint(
+        expr=blk.fixed_operating_cost
+        == pyunits.convert(
+            blk.factor_membrane_replacement * blk.membrane_cost * blk.membrane_area,
+            to_units=blk.costing_package.base_currency
+            / blk.costing_package.base_period,
+        )
+    )
+
+
+def add_ro_costing(blk, costing_package=None, multiplicity=1):
+    """
+    Cost the RO unit. With multiplicity > 1 the unit stands for that many
+    identical units (see cost_ro_replicas).
+    """
 
     if costing_package is None:
         m = blk.model()
         costing_package = m.fs.costing
 
-    blk.unit.costing = UnitModelCostingBlock(flowsheet_costing_block=costing_package)
+    if multiplicity == 1:
+        blk.unit.costing = UnitModelCostingBlock(
+            flowsheet_costing_block=costing_package
+        )
+    else:
+        blk.unit.costing = UnitModelCostingBlock(
+            flowsheet_costing_block=costing_package,
+            costing_method=cost_ro_replicas,
+            costing_method_arguments={"multiplicity": multiplicity},
+        )
 
 
 def main(file="wrd_inputs_8_19_21.yaml"):
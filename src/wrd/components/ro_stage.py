@@ -22,6 +22,7 @@ from wrd.utilities import load_config, get_config_file
 from wrd.components.pump import *
 from wrd.components.ro import *
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
 
 __all__ = [
     "build_ro_stage",
@@ -107,11 +108,13 @@ def set_ro_stage_scaling(blk):
     set_ro_scaling(blk.ro)
 
 
+@profiled
 def build_ro_stage(
     blk,
     stage_num=1,
     file="wrd_inputs_8_19_21.yaml",
     prop_package=None,
+    finite_elements=None,
 ):
     if prop_package is None:
         m = blk.model()
@@ -126,7 +129,13 @@ def build_ro_stage(
     build_pump(blk.pump, stage_num=stage_num, file=file, prop_package=prop_package)
 
     blk.ro = FlowsheetBlock(dynamic=False)
-    build_ro(blk.ro, stage_num=stage_num, file=file, prop_package=prop_package)
+    build_ro(
+        blk.ro,
+        stage_num=stage_num,
+        file=file,
+        prop_package=prop_package,
+        finite_elements=finite_elements,
+    )
 
     blk.product = StateJunction(property_package=prop_package)
     touch_flow_and_conc(blk.feed)
@@ -141,7 +150,8 @@ def build_ro_stage(
         source=blk.ro.disposal.outlet, destination=blk.disposal.inlet
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def initialize_system(m):
@@ -156,6 +166,7 @@ def initialize_system(m):
     m.fs.brine.initialize()
 
 
+@profiled
 def initialize_ro_stage(blk):
 
     blk.feed.initialize()
@@ -177,7 +188,7 @@ def report_ro_stage(blk, w=30, add_costing=True):
     report_ro(blk.ro, w=w)
 
 
-def add_ro_stage_costing(blk, costing_package=None, cost_RO=False):
+def add_ro_stage_costing(blk, costing_package=None, cost_RO=False, multiplicity=1):
 
     if costing_package is None:
         m = blk.model()
@@ -186,7 +197,9 @@ def add_ro_stage_costing(blk, costing_package=None, cost_RO=False):
     add_pump_costing(blk.pump, costing_package=costing_package)
     if cost_RO:
         # RO costing adds no opex, only capex
-        add_ro_costing(blk.ro, costing_package=costing_package)
+        add_ro_costing(
+            blk.ro, costing_package=costing_package, multiplicity=multiplicity
+        )
 
 
 def main(
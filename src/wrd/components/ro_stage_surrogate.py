@@ -0,0 +1,532 @@
+import json
+import numpy as np
+import pandas as pd
+
+from pyomo.environ import (
+    Var,
+    Param,
+    Constraint,
+    check_optimal_termination,
+    value,
+    units as pyunits,
+)
+
+from idaes.core.util.scaling import calculate_scaling_factors
+from idaes.models.unit_models import StateJunction
+
+from watertap.core.solvers import get_solver
+
+from wrd.utilities import load_config, get_config_value, get_config_file
+from wrd.components.ro_stage import (
+    build_system,
+    set_inlet_conditions,
+    set_ro_stage_op_conditions,
+    set_ro_stage_scaling,
+    initialize_system,
+)
+from srp.utils import touch_flow_and_conc
+from srp.utils.units import converted_value
+
+__all__ = [
+    "ROStageSurrogate",
+    "get_default_sample_bounds",
+    "sample_ro_stage",
+    "build_ro_stage_surrogate",
+    "set_ro_stage_surrogate_op_conditions",
+    "initialize_ro_stage_surrogate",
+    "report_ro_stage_surrogate",
+    "add_ro_stage_surrogate_costing",
+]
+
+solver = get_solver()
+
+"""
+Algebraic surrogate of a single RO stage (pump + ReverseOsmosis1D) for
+multiperiod studies. The full ro_stage model is sampled over feed flow,
+concentration, temperature and pump outlet pressure, and a quadratic
+response surface is fit for recovery, permeate concentration and pump power.
+
+feed > surrogate > product
+                 > disposal
+"""
+
+# Surrogate inputs and outputs, in the units used for sampling and fitting
+input_units = {
+    "Qin": pyunits.gallons / pyunits.minute,
+    "Cin": pyunits.g / pyunits.L,
+    "Tin": pyunits.K,
+    "pump_pressure": pyunits.psi,
+}
+
+output_units = {
+    "recovery": pyunits.dimensionless,
+    "permeate_conc": pyunits.mg / pyunits.L,
+    "pump_power": pyunits.kW,
+}
+
+
+def _quadratic_features(z, one=1):
+    # Constant, linear and all second order terms. Works on numpy columns (with
+    # one a column of ones) and pyomo expressions alike.
+    features = [one] + list(z)
+    for i in range(len(z)):
+        for j in range(i, len(z)):
+            features.append(z[i] * z[j])
+    return features
+
+
+class ROStageSurrogate:
+    """
+    Quadratic response surface of an RO stage fit by least squares on inputs
+    normalized to [0, 1] over the sampled bounds.
+    """
+
+    def __init__(self, lower=None, upper=None, coefficients=None, metadata=None):
+        self.input_names = list(input_units)
+        self.output_names = list(output_units)
+        self.lower = lower
+        self.upper = upper
+        self.coefficients = coefficients
+        self.metadata = metadata if metadata is not None else {}
+
+    def _normalize(self, X):
+        return (np.asarray(X, dtype=float) - self.lower) / (self.upper - self.lower)
+
+    def _design_matrix(self, X):
+        Z = self._normalize(X).T
+        return np.column_stack(_quadratic_features(Z, one=np.ones(Z.shape[1])))
+
+    def fit(self, samples):
+        """
+        Fit the surrogate to a DataFrame with a column for every input and
+        output. Rows with missing outputs (failed solves) are dropped.
+        """
+        samples = samples.dropna(subset=self.input_names + self.output_names)
+        X = samples[self.input_names].to_numpy(dtype=float)
+        Y = samples[self.output_names].to_numpy(dtype=float)
+        self.lower = X.min(axis=0)
+        self.upper = X.max(axis=0)
+        # Guard against inputs that were not varied
+        self.upper = np.where(self.upper > self.lower, self.upper, self.lower + 1)
+
+        A = self._design_matrix(X)
+        if A.shape[0] < A.shape[1]:
+            raise ValueError(
+                f"At least {A.shape[1]} converged samples are needed to fit the "
+                f"surrogate, got {A.shape[0]}."
+            )
+        self.coefficients, *_ = np.linalg.lstsq(A, Y, rcond=None)
+        self.metadata["r2"] = self.score(samples)
+
+        return self
+
+    def predict(self, X):
+        """
+        Evaluate the surrogate for an array (or DataFrame) of inputs.
+        Returns a DataFrame with a column for every output.
+        """
+        if isinstance(X, pd.DataFrame):
+            X = X[self.input_names].to_numpy(dtype=float)
+        A = self._design_matrix(np.atleast_2d(X))
+        return pd.DataFrame(A @ self.coefficients, columns=self.output_names)
+
+    def score(self, samples):
+        """
+        Coefficient of determination of each output on samples.
+        """
+        Y = samples[self.output_names].to_numpy(dtype=float)
+        Y_pred = self.predict(samples).to_numpy()
+        ss_res = np.sum((Y - Y_pred) ** 2, axis=0)
+        ss_tot = np.sum((Y - Y.mean(axis=0)) ** 2, axis=0)
+        r2 = 1 - ss_res / np.maximum(ss_tot, 1e-30)
+        return dict(zip(self.output_names, r2.tolist()))
+
+    def expressions(self, inputs):
+        """
+        Pyomo expressions of each output given a dict of dimensionless input
+        expressions in the units of input_units.
+        """
+        z = [
+            (inputs[k] - self.lower[i]) / (self.upper[i] - self.lower[i])
+            for i, k in enumerate(self.input_names)
+        ]
+        features = _quadratic_features(z)
+        return {
+            k: sum(float(c) * f for c, f in zip(self.coefficients[:, j], features) if c)
+            for j, k in enumerate(self.output_names)
+        }
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(
+                {
+                    "input_names": self.input_names,
+                    "output_names": self.output_names,
+                    "lower": self.lower.tolist(),
+                    "upper": self.upper.tolist(),
+                    "coefficients": self.coefficients.tolist(),
+                    "metadata": self.metadata,
+                },
+                f,
+                indent=2,
+            )
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            data = json.load(f)
+        if data["input_names"] != list(input_units) or data["output_names"] != list(
+            output_units
+        ):
+            raise ValueError(f"Surrogate in {path} has different inputs or outputs.")
+        return cls(
+            lower=np.array(data["lower"]),
+            upper=np.array(data["upper"]),
+            coefficients=np.array(data["coefficients"]),
+            metadata=data["metadata"],
+        )
+
+
+def get_default_sample_bounds(stage_num=1, file="wrd_inputs_8_19_21.yaml"):
+    """
+    Sampling bounds around the operating point of a stage in the yaml file:
+    +/- 25% flow, +/- 50% concentration, 290-306 K and +/- 20% pump pressure.
+    """
+    config_data = load_config(get_config_file(file))
+    pump = f"pump_{stage_num}"
+    Q = value(
+        pyunits.convert(
+            get_config_value(config_data, "pump_flowrate", "pumps", pump),
+            to_units=input_units["Qin"],
+        )
+    )
+    C = value(
+        pyunits.convert(
+            get_config_value(config_data, "feed_conductivity", "pumps", pump)
+            * get_config_value(
+                config_data, "feed_conductivity_conversion", "feed_stream"
+            ),
+            to_units=input_units["Cin"],
+        )
+    )
+    P = value(
+        pyunits.convert(
+            get_config_value(config_data, "pump_outlet_pressure", "pumps", pump),
+            to_units=input_units["pump_pressure"],
+        )
+    )
+    return {
+        "Qin": (0.75 * Q, 1.25 * Q),
+        "Cin": (0.5 * C, 1.5 * C),
+        "Tin": (290, 306),
+        "pump_pressure": (0.8 * P, 1.2 * P),
+    }
+
+
+def _latin_hypercube(bounds, n_samples, rng):
+    samples = {}
+    for k, (lb, ub) in bounds.items():
+        strata = (rng.permutation(n_samples) + rng.random(n_samples)) / n_samples
+        samples[k] = lb + strata * (ub - lb)
+    return pd.DataFrame(samples)
+
+
+def sample_ro_stage(
+    n_samples=50,
+    bounds=None,
+    stage_num=1,
+    file="wrd_inputs_8_19_21.yaml",
+    seed=0,
+    results_file=None,
+):
+    """
+    Solve the full ro_stage model on a Latin hypercube of n_samples points
+    within bounds ({input: (lb, ub)}, see get_default_sample_bounds) and
+    return a DataFrame of inputs and outputs. One model is built and each
+    sample is solved from the previous solution, re-initializing on failure.
+    The feed pressure is the pump suction pressure of the stage in the yaml
+    file, so the pump power surrogate holds for that suction pressure.
+    """
+    if bounds is None:
+        bounds = get_default_sample_bounds(stage_num=stage_num, file=file)
+    rng = np.random.default_rng(seed)
+    samples = _latin_hypercube({k: bounds[k] for k in input_units}, n_samples, rng)
+
+    config_data = load_config(get_config_file(file))
+    Pin = get_config_value(
+        config_data, "pump_suction_pressure", "pumps", f"pump_{stage_num}"
+    )
+
+    m = build_system(stage_num=stage_num, file=file)
+    set_ro_stage_scaling(m.fs.ro_stage)
+    calculate_scaling_factors(m)
+    stage = m.fs.ro_stage
+    feed_state = m.fs.feed.properties[0]
+    pump_pressure = stage.pump.unit.control_volume.properties_out[0].pressure
+
+    initialized = False
+    rows = []
+    for _, x in samples.iterrows():
+        for v in feed_state.define_state_vars().values():
+            v.unfix()
+        set_inlet_conditions(m, Qin=x["Qin"], Cin=x["Cin"], Tin=x["Tin"], Pin=Pin)
+        if not initialized:
+            set_ro_stage_op_conditions(stage)
+        pump_pressure.fix(x["pump_pressure"] * input_units["pump_pressure"])
+
+        row = dict(x)
+        try:
+            if not initialized:
+                initialize_system(m)
+                initialized = True
+            results = solver.solve(m)
+            if not check_optimal_termination(results):
+                initialize_system(m)
+                results = solver.solve(m)
+            converged = check_optimal_termination(results)
+        except Exception:
+            converged = False
+
+        if converged:
+            row["recovery"] = value(stage.ro.unit.recovery_vol_phase[0, "Liq"])
+            row["permeate_conc"] = value(
+                pyunits.convert(
+                    stage.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"],
+                    to_units=output_units["permeate_conc"],
+                )
+            )
+            row["pump_power"] = value(
+                pyunits.convert(
+                    stage.pump.unit.work_mechanical[0],
+                    to_units=output_units["pump_power"],
+                )
+            )
+        else:
+            initialized = False
+            row.update({k: np.nan for k in output_units})
+        rows.append(row)
+
+    df = pd.DataFrame(rows, columns=list(input_units) + list(output_units))
+    if results_file is not None:
+        df.to_csv(results_file, index=False)
+
+    return df
+
+
+def build_ro_stage_surrogate(
+    blk,
+    surrogate,
+    stage_num=1,
+    file="wrd_inputs_8_19_21.yaml",
+    prop_package=None,
+):
+    """
+    Build a surrogate RO stage on blk with the same feed, product and
+    disposal ports as build_ro_stage.
+    """
+    if prop_package is None:
+        m = blk.model()
+        prop_package = m.fs.properties
+
+    blk.stage_num = stage_num
+    blk.config_data = load_config(get_config_file(file))
+    blk.surrogate = surrogate
+
+    blk.feed = StateJunction(property_package=prop_package)
+    touch_flow_and_conc(blk.feed)
+    blk.product = StateJunction(property_package=prop_package)
+    touch_flow_and_conc(blk.product)
+    blk.disposal = StateJunction(property_package=prop_package)
+    touch_flow_and_conc(blk.disposal)
+
+    blk.deltaP = Param(
+        initialize=value(
+            pyunits.convert(
+                get_config_value(
+                    blk.config_data,
+                    "pressure_drop",
+                    "reverse_osmosis_1d",
+                    f"stage_{stage_num}",
+                ),
+                to_units=pyunits.Pa,
+            )
+        ),
+        mutable=True,
+        units=pyunits.Pa,
+        doc="Feed side pressure drop",
+    )
+    blk.permeate_pressure = Param(
+        initialize=value(pyunits.convert(20 * pyunits.psi, to_units=pyunits.Pa)),
+        mutable=True,
+        units=pyunits.Pa,
+        doc="Permeate back pressure",
+    )
+    blk.pump_pressure = Var(
+        initialize=np.mean([surrogate.lower[-1], surrogate.upper[-1]]),
+        units=input_units["pump_pressure"],
+        doc="Pump outlet pressure",
+    )
+    blk.recovery = Var(
+        initialize=0.5,
+        bounds=(0, 1),
+        units=output_units["recovery"],
+        doc="Volumetric water recovery",
+    )
+    blk.permeate_conc = Var(
+        initialize=10,
+        bounds=(0, None),
+        units=output_units["permeate_conc"],
+        doc="Permeate NaCl concentration",
+    )
+    blk.pump_power = Var(
+        initialize=100,
+        bounds=(0, None),
+        units=output_units["pump_power"],
+        doc="Pump power",
+    )
+
+    feed = blk.feed.properties[0]
+    product = blk.product.properties[0]
+    disposal = blk.disposal.properties[0]
+
+    inputs = {
+        "Qin": pyunits.convert(feed.flow_vol_phase["Liq"], to_units=input_units["Qin"])
+        / input_units["Qin"],
+        "Cin": pyunits.convert(
+            feed.conc_mass_phase_comp["Liq", "NaCl"], to_units=input_units["Cin"]
+        )
+        / input_units["Cin"],
+        "Tin": feed.temperature / input_units["Tin"],
+        "pump_pressure": blk.pump_pressure / input_units["pump_pressure"],
+    }
+    outputs = surrogate.expressions(inputs)
+
+    blk.eq_recovery = Constraint(expr=blk.recovery == outputs["recovery"])
+    blk.eq_permeate_conc = Constraint(
+        expr=blk.permeate_conc
+        == outputs["permeate_conc"] * output_units["permeate_conc"]
+    )
+    blk.eq_pump_power = Constraint(
+        expr=blk.pump_power == outputs["pump_power"] * output_units["pump_power"]
+    )
+
+    blk.eq_product_flow = Constraint(
+        expr=product.flow_vol_phase["Liq"] == blk.recovery * feed.flow_vol_phase["Liq"]
+    )
+    blk.eq_product_conc = Constraint(
+        expr=product.conc_mass_phase_comp["Liq", "NaCl"]
+        == pyunits.convert(blk.permeate_conc, to_units=pyunits.kg / pyunits.m**3)
+    )
+
+    @blk.Constraint(prop_package.component_list)
+    def eq_mass_balance(b, j):
+        return (
+            feed.flow_mass_phase_comp["Liq", j]
+            == product.flow_mass_phase_comp["Liq", j]
+            + disposal.flow_mass_phase_comp["Liq", j]
+        )
+
+    blk.eq_product_temperature = Constraint(
+        expr=product.temperature == feed.temperature
+    )
+    blk.eq_disposal_temperature = Constraint(
+        expr=disposal.temperature == feed.temperature
+    )
+    blk.eq_product_pressure = Constraint(expr=product.pressure == blk.permeate_pressure)
+    blk.eq_disposal_pressure = Constraint(
+        expr=disposal.pressure
+        == pyunits.convert(blk.pump_pressure, to_units=pyunits.Pa) + blk.deltaP
+    )
+
+
+def set_ro_stage_surrogate_op_conditions(blk, pump_pressure=None):
+    """
+    Fix the pump outlet pressure (psi), by default from the yaml file.
+    """
+    if pump_pressure is None:
+        pump_pressure = get_config_value(
+            blk.config_data, "pump_outlet_pressure", "pumps", f"pump_{blk.stage_num}"
+        )
+    else:
+        pump_pressure = pump_pressure * pyunits.psi
+    blk.pump_pressure.fix(pump_pressure)
+
+
+def initialize_ro_stage_surrogate(blk):
+    """
+    Initialize from the surrogate prediction at the current feed state.
+    The feed state must already be propagated.
+    """
+    blk.feed.initialize()
+    feed = blk.feed.properties[0]
+
+    x = [
+        value(pyunits.convert(feed.flow_vol_phase["Liq"], to_units=input_units["Qin"])),
+        value(
+            pyunits.convert(
+                feed.conc_mass_phase_comp["Liq", "NaCl"], to_units=input_units["Cin"]
+            )
+        ),
+        value(feed.temperature),
+        value(blk.pump_pressure),
+    ]
+    y = blk.surrogate.predict([x]).iloc[0]
+    recovery = min(max(y["recovery"], 0.01), 0.99)
+    blk.recovery.set_value(recovery)
+    blk.permeate_conc.set_value(max(y["permeate_conc"], 0))
+    blk.pump_power.set_value(max(y["pump_power"], 0))
+
+    product = blk.product.properties[0]
+    disposal = blk.disposal.properties[0]
+    flow_water = value(feed.flow_mass_phase_comp["Liq", "H2O"])
+    flow_salt = value(feed.flow_mass_phase_comp["Liq", "NaCl"])
+    # Permeate salt from the predicted concentration at ~1000 kg/m3 water
+    product_salt = min(
+        value(pyunits.convert(blk.permeate_conc, to_units=pyunits.kg / pyunits.m**3))
+        * recovery
+        * flow_water
+        / 1000,
+        0.5 * flow_salt,
+    )
+    product.flow_mass_phase_comp["Liq", "H2O"].set_value(recovery * flow_water)
+    product.flow_mass_phase_comp["Liq", "NaCl"].set_value(product_salt)
+    disposal.flow_mass_phase_comp["Liq", "H2O"].set_value((1 - recovery) * flow_water)
+    disposal.flow_mass_phase_comp["Liq", "NaCl"].set_value(flow_salt - product_salt)
+    for state in [product, disposal]:
+        state.temperature.set_value(value(feed.temperature))
+    product.pressure.set_value(value(blk.permeate_pressure))
+    disposal.pressure.set_value(
+        value(pyunits.convert(blk.pump_pressure, to_units=pyunits.Pa) + blk.deltaP)
+    )
+
+    blk.product.initialize()
+    blk.disposal.initialize()
+
+
+def report_ro_stage_surrogate(blk, w=30):
+    title = f"RO Stage {blk.stage_num} Surrogate Report"
+    side = int(((3 * w) - len(title)) / 2) - 1
+    header = "=" * side + f" {title} " + "=" * side
+    print(f"\n{header}\n")
+    print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
+    print(f"{'-' * (3 * w)}")
+
+    print(
+        f'{f"Inlet Flow":<{w}s}{converted_value(blk.feed.properties[0].flow_vol_phase["Liq"], pyunits.gallon / pyunits.minute):<{w}.3f}{"gpm"}'
+    )
+    print(
+        f'{f"Inlet Conc.":<{w}s}{converted_value(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.liter):<{w}.3f}{"mg/L"}'
+    )
+    print(f'{f"Pump Pressure":<{w}s}{value(blk.pump_pressure):<{w}.3f}{"psi"}')
+    print(f'{f"Pump Power":<{w}s}{value(blk.pump_power):<{w}.3f}{"kW"}')
+    print(f'{f"Recovery":<{w}s}{value(blk.recovery)*100:<{w}.3f}{"%"}')
+    print(f'{f"Perm Conc":<{w}s}{value(blk.permeate_conc):<{w}.3f}{"mg/L"}')
+
+
+def add_ro_stage_surrogate_costing(blk, costing_package=None):
+
+    if costing_package is None:
+        m = blk.model()
+        costing_package = m.fs.costing
+
+    costing_package.cost_flow(blk.pump_power, "electricity")
@@ -30,11 +30,17 @@ from watertap.core.solvers import get_solver
 
 from wrd.components.ro_train import *
 from wrd.components.pump import report_pump
+from wrd.components.parallel_init import initialize_trains_parallel
+from wrd.utilities import add_train_replicas, initialize_train_replicas
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.results import collect_stream_results, get_result
+from srp.utils.units import converted_value
 
 solver = get_solver()
 
 
+@profiled
 def build_ro_system(
     m=None,
     num_trains=3,
@@ -42,7 +48,15 @@ def build_ro_system(
     split_fractions=None,
     prop_package=None,
     file="wrd_inputs_8_19_21.yaml",
+    symmetric_trains=False,
+    finite_elements=None,
 ):
+    """
+    Build the PRO system of num_trains identical RO trains fed by an even split.
+    With symmetric_trains=True only one representative train is modeled and its
+    product and brine are scaled by num_trains into the mixers.
+    finite_elements sets the RO discretization, see get_ro_finite_elements.
+    """
 
     if m is None:
         m = ConcreteModel()
@@ -64,10 +78,21 @@ def build_ro_system(
 
     m.num_trains = num_trains
     m.num_stages = num_stages
-    m.fs.trains = Set(initialize=range(1, m.num_trains + 1))
+    m.file = file
+    m.finite_elements = finite_elements
+    m.ro_symmetric = symmetric_trains and num_trains > 1
+    # Number of physical trains each modeled train represents
+    m.ro_train_multiplicity = num_trains if m.ro_symmetric else 1
+    m.fs.trains = Set(initialize=range(1, (1 if m.ro_symmetric else m.num_trains) + 1))
     m.fs.train = FlowsheetBlock(m.fs.trains, dynamic=False)
 
     outlet_list = [f"train{i}" for i in m.fs.trains]
+    perm_inlet_list = [f"perm_inlet{i}" for i in m.fs.trains]
+    brine_inlet_list = [f"brine_inlet{i}" for i in m.fs.trains]
+    if m.ro_symmetric:
+        outlet_list += ["replicas"]
+        perm_inlet_list += ["perm_replicas"]
+        brine_inlet_list += ["brine_replicas"]
 
     m.fs.ro_feed_separator = Separator(
         property_package=m.fs.properties,
@@ -76,12 +101,10 @@ def build_ro_system(
     )
 
     if split_fractions is None:
-        m.fs.ro_feed_separator.even_split = 1.0 / len(outlet_list)
+        m.fs.ro_feed_separator.even_split = 1.0 / m.num_trains
     else:
         raise NotImplementedError("Custom split fractions not yet implemented.")
 
-    perm_inlet_list = [f"perm_inlet{i}" for i in m.fs.trains]
-
     m.fs.ro_product_mixer = Mixer(
         property_package=m.fs.properties,
         momentum_mixing_type=MomentumMixingType.minimize,
@@ -89,8 +112,6 @@ def build_ro_system(
     )
     touch_flow_and_conc(m.fs.ro_product_mixer)
 
-    brine_inlet_list = [f"brine_inlet{i}" for i in m.fs.trains]
-
     m.fs.ro_brine_mixer = Mixer(
         property_package=m.fs.properties,
         momentum_mixing_type=MomentumMixingType.minimize,
@@ -104,14 +125,29 @@ def build_ro_system(
             prop_package=m.fs.properties,
             num_stages=num_stages,
             file=file,
+            finite_elements=finite_elements,
         )
 
     m.fs.total_ro_pump_power = Expression(
-        expr=sum(m.fs.train[i].total_pump_power for i in m.fs.trains)
+        expr=m.ro_train_multiplicity
+        * sum(m.fs.train[i].total_pump_power for i in m.fs.trains)
     )
 
-    for i, outlet in enumerate(outlet_list, start=1):
+    if m.ro_symmetric:
+        for name, mixer, train_port in [
+            ("perm_replicas", m.fs.ro_product_mixer, "product"),
+            ("brine_replicas", m.fs.ro_brine_mixer, "disposal"),
+        ]:
+            add_train_replicas(
+                m.fs,
+                f"ro_{name}",
+                mixer.find_component(f"{name}_state")[0],
+                m.fs.train[1].find_component(train_port).properties[0],
+                m.num_trains - 1,
+            )
 
+    for i in m.fs.trains:
+        outlet = f"train{i}"
         sep_out = m.fs.ro_feed_separator.find_component(f"{outlet}")
         perm_mix_in = m.fs.ro_product_mixer.find_component(f"perm_inlet{i}")
         brine_mix_in = m.fs.ro_brine_mixer.find_component(f"brine_inlet{i}")
@@ -152,7 +188,8 @@ def build_ro_system(
             destination=m.fs.disposal.inlet,
         )
 
-        TransformationFactory("network.expand_arcs").apply_to(m)
+        with profile_section("expand_arcs", m):
+            TransformationFactory("network.expand_arcs").apply_to(m)
 
         m.fs.properties.set_default_scaling(
             "flow_mass_phase_comp", 1e-1, index=("Liq", "H2O")
@@ -192,6 +229,12 @@ def set_ro_system_scaling(m):
 
 def set_ro_system_op_conditions(m):
 
+    if m.ro_symmetric:
+        for j in ["H2O", "NaCl"]:
+            m.fs.ro_feed_separator.split_fraction[0, "replicas", j].fix(
+                (m.num_trains - 1) * m.fs.ro_feed_separator.even_split
+            )
+
     for i in m.fs.trains:
         set_ro_train_op_conditions(m.fs.train[i])
         if i != m.fs.trains.first():
@@ -210,7 +253,8 @@ def set_ro_system_op_conditions(m):
             )
 
 
-def initialize_ro_system(m):
+@profiled
+def initialize_ro_system(m, parallel=False):
 
     if m.standalone:
         m.fs.feed.initialize()
@@ -218,10 +262,23 @@ def initialize_ro_system(m):
 
     m.fs.ro_feed_separator.initialize()
 
+    if parallel:
+        for i in m.fs.trains:
+            a = m.fs.find_component(f"sep_to_train{i}")
+            propagate_state(a)
+        initialize_trains_parallel(
+            [m.fs.train[i] for i in m.fs.trains],
+            "ro_train",
+            num_stages=m.num_stages,
+            file=m.file,
+            finite_elements=m.finite_elements,
+        )
+
     for i in m.fs.trains:
-        a = m.fs.find_component(f"sep_to_train{i}")
-        propagate_state(a)
-        initialize_ro_train(m.fs.train[i])
+        if not parallel:
+            a = m.fs.find_component(f"sep_to_train{i}")
+            propagate_state(a)
+            initialize_ro_train(m.fs.train[i])
 
         a = m.fs.find_component(f"train{i}_to_perm_mix")
         propagate_state(a)
@@ -229,6 +286,18 @@ def initialize_ro_system(m):
         propagate_state(a)
         print(f"Initialized RO Train {i}")
 
+    if m.ro_symmetric:
+        initialize_train_replicas(
+            m.fs.ro_product_mixer.perm_replicas_state[0],
+            m.fs.train[1].product.properties[0],
+            m.num_trains - 1,
+        )
+        initialize_train_replicas(
+            m.fs.ro_brine_mixer.brine_replicas_state[0],
+            m.fs.train[1].disposal.properties[0],
+            m.num_trains - 1,
+        )
+
     m.fs.ro_product_mixer.initialize()
     m.fs.ro_brine_mixer.initialize()
 
@@ -246,8 +315,19 @@ def add_ro_system_costing(m, costing_package=None, cost_RO=False):
         m.fs.costing = costing_package = WaterTAPCosting()
 
     for i in m.fs.trains:
+        # With symmetric trains, the RO capital of the replicas is costed on
+        # the representative train
         add_ro_train_costing(
-            m.fs.train[i], costing_package=costing_package, cost_RO=cost_RO
+            m.fs.train[i],
+            costing_package=costing_package,
+            cost_RO=cost_RO,
+            multiplicity=m.ro_train_multiplicity,
+        )
+
+    if m.ro_symmetric:
+        # Electricity for the trains that are not explicitly modeled
+        costing_package.cost_flow(
+            (m.num_trains - 1) * m.fs.train[1].total_pump_power, "electricity"
         )
 
 
@@ -268,34 +348,26 @@ def report_ro_system(m, w=30, add_costing=True):
     print(f"{'-' * (3 * w)}")
 
     if m.standalone:
-        print(
-            f'{f"Total Perm Flow":<{w}s}{value(pyunits.convert(m.fs.product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
-        )
-        print(
-            f'{f"Final Perm Conc":<{w}s}{value(pyunits.convert(m.fs.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
-        )
-        print(
-            f'{f"Total Brine Flow":<{w}s}{value(pyunits.convert(m.fs.disposal.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
-        )
-        print(
-            f'{f"Final Brine Conc":<{w}s}{value(pyunits.convert(m.fs.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
-        )
+        perm, brine = m.fs.product.properties[0], m.fs.disposal.properties[0]
     else:
-        print(
-            f'{f"Total Perm Flow":<{w}s}{value(pyunits.convert(m.fs.ro_product_mixer.mixed_state[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
-        )
-        print(
-            f'{f"Final Perm Conc":<{w}s}{value(pyunits.convert(m.fs.ro_product_mixer.mixed_state[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
-        )
-        print(
-            f'{f"Total Brine Flow":<{w}s}{value(pyunits.convert(m.fs.ro_brine_mixer.mixed_state[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
-        )
-        print(
-            f'{f"Final Brine Conc":<{w}s}{value(pyunits.convert(m.fs.ro_brine_mixer.mixed_state[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
-        )
+        perm = m.fs.ro_product_mixer.mixed_state[0]
+        brine = m.fs.ro_brine_mixer.mixed_state[0]
+    df = collect_stream_results([perm, brine], construct=True)
+    print(
+        f'{f"Total Perm Flow":<{w}s}{get_result(df, perm, "flow_vol_phase", "Liq"):<{w}.3f}{"gpm"}'
+    )
+    print(
+        f'{f"Final Perm Conc":<{w}s}{get_result(df, perm, "conc_mass_phase_comp", "Liq,NaCl"):<{w}.3f}{"mg/L"}'
+    )
+    print(
+        f'{f"Total Brine Flow":<{w}s}{get_result(df, brine, "flow_vol_phase", "Liq"):<{w}.3f}{"gpm"}'
+    )
+    print(
+        f'{f"Final Brine Conc":<{w}s}{get_result(df, brine, "conc_mass_phase_comp", "Liq,NaCl"):<{w}.3f}{"mg/L"}'
+    )
     print(f'{f"Overall Recovery":<{w}s}{value(m.fs.recovery_vol_ro)*100:<{w}.3f}{"%"}')
     print(
-        f'{f"Total RO Pump Power":<{w}s}{value(pyunits.convert(m.fs.total_ro_pump_power, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"Total RO Pump Power":<{w}s}{converted_value(m.fs.total_ro_pump_power, pyunits.kW):<{w}.3f}{"kW"}'
     )
 
 
@@ -32,6 +32,8 @@ from wrd.components.pump import *
 from wrd.components.ro import *
 from wrd.components.ro_stage import *
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 __all__ = [
     "build_ro_train",
@@ -103,8 +105,13 @@ def set_inlet_conditions(m, Qin=2637, Cin=0.5, Tin=302, Pin=101325):
     )
 
 
+@profiled
 def build_ro_train(
-    blk, num_stages=2, file="wrd_inputs_8_19_21.yaml", prop_package=None
+    blk,
+    num_stages=2,
+    file="wrd_inputs_8_19_21.yaml",
+    prop_package=None,
+    finite_elements=None,
 ):
 
     name = (
@@ -148,7 +155,13 @@ def build_ro_train(
     total_pump_power = 0
 
     for i in blk.stages:
-        build_ro_stage(blk.stage[i], stage_num=i, file=file, prop_package=prop_package)
+        build_ro_stage(
+            blk.stage[i],
+            stage_num=i,
+            file=file,
+            prop_package=prop_package,
+            finite_elements=finite_elements,
+        )
         total_pump_power += blk.stage[i].pump.unit.work_mechanical[0]
 
     for i in blk.stages:
@@ -189,7 +202,8 @@ def build_ro_train(
 
     blk.total_pump_power = Expression(expr=total_pump_power)
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_ro_train_scaling(blk):
@@ -206,6 +220,7 @@ def set_ro_train_op_conditions(blk):
     blk.mixer.outlet.pressure[0].fix(101325)
 
 
+@profiled
 def initialize_ro_train(blk):
 
     for i in blk.stages:
@@ -246,7 +261,7 @@ def initialize_system(m):
     m.fs.brine.initialize()
 
 
-def add_ro_train_costing(blk, costing_package=None, cost_RO=False):
+def add_ro_train_costing(blk, costing_package=None, cost_RO=False, multiplicity=1):
 
     if costing_package is None:
         m = blk.model()
@@ -254,7 +269,10 @@ def add_ro_train_costing(blk, costing_package=None, cost_RO=False):
 
     for i in blk.stages:
         add_ro_stage_costing(
-            blk.stage[i], costing_package=costing_package, cost_RO=cost_RO
+            blk.stage[i],
+            costing_package=costing_package,
+            cost_RO=cost_RO,
+            multiplicity=multiplicity,
         )
 
 
@@ -277,10 +295,10 @@ def report_ro_train(blk, train_num=None, w=30, add_costing=True):
         header = "_" * side + f" {title} " + "_" * side
         print(f"\n\n{header}\n")
         print(
-            f'{f"Stage {i} Feed Flow":<{w}s}{value(pyunits.convert(blk.stage[i].feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"Stage {i} Feed Flow":<{w}s}{converted_value(blk.stage[i].feed.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"Stage {i} Feed Conc.":<{w}s}{value(pyunits.convert(blk.stage[i].feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"Stage {i} Feed Conc.":<{w}s}{converted_value(blk.stage[i].feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
         report_ro_stage(blk.stage[i], w=w, add_costing=add_costing)
 
@@ -290,42 +308,42 @@ def report_ro_train(blk, train_num=None, w=30, add_costing=True):
     print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
     print(f"{'-' * (3 * w)}")
     print(
-        f'{f"Total Pump Power":<{w}s}{value(pyunits.convert(blk.total_pump_power, to_units=pyunits.kilowatt)):<{w}.3f}{"kW"}'
+        f'{f"Total Pump Power":<{w}s}{converted_value(blk.total_pump_power, pyunits.kilowatt):<{w}.3f}{"kW"}'
     )
 
     print(f'{f"Overall Recovery":<{w}s}{value(blk.recovery_vol)*100:<{w}.3f}{"%"}')
     print(
-        f'{f"Total Feed Flow":<{w}s}{value(pyunits.convert(blk.feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Feed Flow":<{w}s}{converted_value(blk.feed.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Inlet Feed Conc":<{w}s}{value(pyunits.convert(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Inlet Feed Conc":<{w}s}{converted_value(blk.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     print(
-        f'{f"Total Perm Flow":<{w}s}{value(pyunits.convert(blk.product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Perm Flow":<{w}s}{converted_value(blk.product.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Final Perm Conc":<{w}s}{value(pyunits.convert(blk.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Final Perm Conc":<{w}s}{converted_value(blk.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     print(
-        f'{f"Total Brine Flow":<{w}s}{value(pyunits.convert(blk.disposal.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Brine Flow":<{w}s}{converted_value(blk.disposal.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Final Brine Conc":<{w}s}{value(pyunits.convert(blk.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+        f'{f"Final Brine Conc":<{w}s}{converted_value(blk.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
     )
     print()
     for i, inlet in enumerate(blk.mixer.config.inlet_list, 1):
         sb = blk.mixer.find_component(f"{inlet}_state")
         print(
-            f'{f"  Stage {i} Feed Flow":<{w}s}{value(pyunits.convert(blk.stage[i].feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"  Stage {i} Feed Flow":<{w}s}{converted_value(blk.stage[i].feed.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"  Stage {i} Feed Conc":<{w}s}{value(pyunits.convert(blk.stage[i].feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"  Stage {i} Feed Conc":<{w}s}{converted_value(blk.stage[i].feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
         print(
-            f'{f"  Stage {i} Perm Flow":<{w}s}{value(pyunits.convert(sb[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"  Stage {i} Perm Flow":<{w}s}{converted_value(sb[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"  Stage {i} Perm Conc":<{w}s}{value(pyunits.convert(sb[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.L)):<{w}.3f}{"mg/L"}'
+            f'{f"  Stage {i} Perm Conc":<{w}s}{converted_value(sb[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L):<{w}.3f}{"mg/L"}'
         )
 
 
@@ -26,6 +26,8 @@ from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
 from watertap.costing import WaterTAPCosting
 
 from srp.utils import touch_flow_and_conc
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.units import converted_value
 
 
 def build_system(**kwargs):
@@ -59,6 +61,7 @@ def build_system(**kwargs):
     return m
 
 
+@profiled
 def build_uv_aop(blk, prop_package=None):
 
     if prop_package is None:
@@ -110,7 +113,8 @@ def build_uv_aop(blk, prop_package=None):
     blk.feed_to_unit = Arc(source=blk.feed.outlet, destination=blk.unit.inlet)
     blk.unit_to_product = Arc(source=blk.unit.outlet, destination=blk.product.inlet)
 
-    TransformationFactory("network.expand_arcs").apply_to(blk)
+    with profile_section("expand_arcs", blk):
+        TransformationFactory("network.expand_arcs").apply_to(blk)
 
 
 def set_uv_aop_op_conditions(blk):
@@ -147,6 +151,7 @@ def initialize_system(m):
     m.fs.product.initialize()
 
 
+@profiled
 def initialize_uv_aop(blk):
 
     blk.feed.initialize()
@@ -184,19 +189,19 @@ def report_uv(blk, w=30):
     total_flow = blk.feed.properties[0].flow_vol_phase["Liq"]
     power = blk.unit.power_consumption
     print(
-        f'{f"Total Flow Rate (MGD)":<{w}s}{value(pyunits.convert(total_flow, to_units=pyunits.Mgallons /pyunits.day)):<{w}.3f}{"MGD"}'
+        f'{f"Total Flow Rate (MGD)":<{w}s}{converted_value(total_flow, pyunits.Mgallons / pyunits.day):<{w}.3f}{"MGD"}'
     )
     print(f'{f"Total Flow Rate (m3/s)":<{w}s}{value(total_flow):<{w}.3e}{"m3/s"}')
     print(
-        f'{f"Total Flow Rate (gpm)":<{w}s}{value(pyunits.convert(total_flow, to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"Total Flow Rate (gpm)":<{w}s}{converted_value(total_flow, pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"Power Consumption (kW)":<{w}s}{value(pyunits.convert(power, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"Power Consumption (kW)":<{w}s}{converted_value(power, pyunits.kW):<{w}.3f}{"kW"}'
     )
     m = blk.model()
     SEC = m.fs.costing.SEC
     print(
-        f'{f"Specific Energy (SEC)":<{w}s}{value(pyunits.convert(SEC, to_units=pyunits.kWh / pyunits.m**3)):<{w}.3f}{"kWh/m3"}'
+        f'{f"Specific Energy (SEC)":<{w}s}{converted_value(SEC, pyunits.kWh / pyunits.m**3):<{w}.3f}{"kWh/m3"}'
     )
 
 
@@ -0,0 +1,323 @@
+"""
+Plant historian ingestion for the WRD flowsheet inputs.
+
+Historian CSV exports (one row per timestamp, one column per tag) are read in
+chunks and averaged over a fixed interval, e.g. one day, so months of
+minute-level data never have to be held in memory. Each interval becomes an
+input record: a copy of a base input file (meta_data/wrd_inputs_*.yaml) with
+the historian values of the mapped tags, validated and written back as an
+input file the flowsheet builders take directly:
+
+    records = iter_input_records("historian.csv", interval="1D")
+    files = write_input_records(records, "inputs")
+    m = build_wrd_system(num_pro_trains=4, file=files[0])
+"""
+
+import os
+import math
+import yaml
+import pandas as pd
+from collections.abc import Mapping
+
+from pyomo.environ import units as pyunits
+import idaes.logger as idaeslog
+
+from wrd.utilities import load_config, get_config_file, get_config_value
+from srp.utils.units import converted_value
+
+__all__ = [
+    "default_tags",
+    "aggregate_historian",
+    "add_tds",
+    "make_input_record",
+    "validate_input_record",
+    "iter_input_records",
+    "write_input_records",
+]
+
+_log = idaeslog.getLogger(__name__)
+
+# Historian column: (keys of the entry in the input file, units of the column)
+default_tags = {
+    "feed_flow": (("feed_stream", "feed_flow_water"), "gal/min"),
+    "feed_conductivity": (("feed_stream", "feed_conductivity"), "uS/cm"),
+    "feed_temperature": (("feed_stream", "feed_temperature"), "K"),
+    "feed_pressure": (("feed_stream", "feed_pressure"), "psi"),
+    **{
+        f"pump_{n}_{tag}": (("pumps", f"pump_{n}", key), units)
+        for n in [1, 2, 3]
+        for tag, key, units in [
+            ("flowrate", "pump_flowrate", "gal/min"),
+            ("conductivity", "feed_conductivity", "uS/cm"),
+            ("suction_pressure", "pump_suction_pressure", "psi"),
+            ("outlet_pressure", "pump_outlet_pressure", "psi"),
+        ]
+    },
+    # Pressure drops are negative, as in the input files
+    **{
+        f"stage_{n}_pressure_drop": (
+            ("reverse_osmosis_1d", f"stage_{n}", "pressure_drop"),
+            "psi",
+        )
+        for n in [1, 2, 3]
+    },
+    "tsro_header_loss": (("reverse_osmosis_1d", "stage_3", "header_loss"), "psi"),
+}
+
+# Offset temperature units, not supported by Pyomo units
+_temperature_offsets = {
+    "degC": lambda t: t + 273.15,
+    "degF": lambda t: (t - 32) * 5 / 9 + 273.15,
+}
+
+
+def aggregate_historian(
+    path,
+    tags=None,
+    time_column="timestamp",
+    interval="1D",
+    chunksize=100000,
+    **kwargs,
+):
+    """
+    Mean of every historian tag over each interval, reading the CSV file in
+    chunks. Only the time column and the tag columns found in the file are
+    read; values that are not numeric are ignored.
+
+    Args:
+        path: historian CSV file
+        tags: {column: (keys, units)}, default default_tags
+        time_column: column with the timestamps
+        interval: fixed pandas frequency of the intervals, e.g. "1D" or "1h"
+        chunksize: rows read at a time
+        kwargs: passed to pandas.read_csv
+
+    Returns:
+        DataFrame indexed by the start of every interval with data, with the
+        mean of every tag and the number of rows as "samples"
+    """
+    if tags is None:
+        tags = default_tags
+    header = pd.read_csv(path, nrows=0, **kwargs).columns
+    if time_column not in header:
+        raise KeyError(f"Time column {time_column} not found in {path}")
+    columns = [c for c in tags if c in header]
+    if not columns:
+        raise KeyError(f"None of the historian tags found in {path}")
+
+    # Sums and counts are carried over chunks, so intervals split between
+    # chunks are averaged correctly
+    sums = counts = samples = None
+    for chunk in pd.read_csv(
+        path, usecols=[time_column] + columns, chunksize=chunksize, **kwargs
+    ):
+        values = chunk[columns].apply(pd.to_numeric, errors="coerce")
+        grouped = values.groupby(
+            pd.to_datetime(chunk[time_column]).dt.floor(interval).values
+        )
+        if sums is None:
+            sums, counts, samples = grouped.sum(), grouped.count(), grouped.size()
+        else:
+            sums = sums.add(grouped.sum(), fill_value=0)
+            counts = counts.add(grouped.count(), fill_value=0)
+            samples = samples.add(grouped.size(), fill_value=0)
+
+    if sums is None:
+        return pd.DataFrame(columns=columns + ["samples"])
+    df = sums / counts.where(counts > 0)
+    df.index.name = time_column
+    df["samples"] = samples.astype(int)
+    return df
+
+
+def add_tds(df, tags=None, base_file="wrd_inputs_8_19_21.yaml"):
+    """
+    Add the TDS (mg/L) of every conductivity tag as "<tag>_tds", with the
+    feed_conductivity_conversion factor of the base input file.
+    """
+    if tags is None:
+        tags = default_tags
+    config = load_config(get_config_file(base_file))
+    conversion = converted_value(
+        get_config_value(config, "feed_conductivity_conversion", "feed_stream"),
+        pyunits.mg / pyunits.L / (pyunits.uS / pyunits.cm),
+    )
+    for col, (keys, units) in tags.items():
+        if col in df and keys[-1] == "feed_conductivity":
+            df[f"{col}_tds"] = (
+                df[col]
+                * converted_value(1 * getattr(pyunits, units), pyunits.uS / pyunits.cm)
+                * conversion
+            )
+    return df
+
+
+def _thaw(data):
+    # Editable copy of a loaded input file
+    if isinstance(data, Mapping):
+        return {k: _thaw(v) for k, v in data.items()}
+    if isinstance(data, tuple):
+        return [_thaw(v) for v in data]
+    return data
+
+
+def make_input_record(row, base_file="wrd_inputs_8_19_21.yaml", tags=None):
+    """
+    Input record for one interval: the base input file with the value and
+    units of every tag in row. Tags missing from row or without a value
+    keep the value of the base file.
+    """
+    if tags is None:
+        tags = default_tags
+    record = _thaw(load_config(get_config_file(base_file)))
+    for col, (keys, units) in tags.items():
+        if col not in row or pd.isna(row[col]):
+            continue
+        val = float(row[col])
+        if units in _temperature_offsets:
+            val, units = _temperature_offsets[units](val), "K"
+        entry = record
+        for key in keys[:-1]:
+            entry = entry.setdefault(key, {})
+        entry[keys[-1]] = {"value": val, "units": units}
+    return record
+
+
+def _quantity(record, keys, units):
+    # Value of an entry in units, None if the entry is not in the record
+    section, *subsection = keys[:-1]
+    try:
+        entry = get_config_value(record, keys[-1], section, *subsection)
+    except KeyError:
+        return None
+    return converted_value(entry, units)
+
+
+def validate_input_record(record):
+    """
+    Problems with the historian values of an input record that would give a
+    flowsheet that cannot be solved or that do not make physical sense.
+
+    Returns:
+        list of problems, empty if the record is valid
+    """
+    problems = []
+    gpm = pyunits.gal / pyunits.min
+
+    def check(keys, units, ok, msg):
+        val = _quantity(record, keys, units)
+        if val is None:
+            return
+        if not math.isfinite(val):
+            problems.append(f"{'.'.join(keys)} is not finite")
+        elif not ok(val):
+            problems.append(f"{'.'.join(keys)} {msg}: {val:.4g}")
+
+    check(("feed_stream", "feed_flow_water"), gpm, lambda v: v > 0, "not positive")
+    check(
+        ("feed_stream", "feed_conductivity"),
+        pyunits.uS / pyunits.cm,
+        lambda v: v > 0,
+        "not positive",
+    )
+    check(
+        ("feed_stream", "feed_temperature"),
+        pyunits.K,
+        lambda v: 273.15 < v < 323.15,
+        "outside 0-50 C",
+    )
+    for pump in record.get("pumps", {}):
+        keys = ("pumps", pump)
+        check(keys + ("pump_flowrate",), gpm, lambda v: v > 0, "not positive")
+        check(
+            keys + ("feed_conductivity",),
+            pyunits.uS / pyunits.cm,
+            lambda v: v > 0,
+            "not positive",
+        )
+        suction = _quantity(record, keys + ("pump_suction_pressure",), pyunits.psi)
+        check(
+            keys + ("pump_outlet_pressure",),
+            pyunits.psi,
+            lambda v: v > 0 and (suction is None or v > suction),
+            "not above the suction pressure",
+        )
+    for stage in record.get("reverse_osmosis_1d", {}):
+        if not stage.startswith("stage_"):
+            continue
+        for key in ["pressure_drop", "header_loss"]:
+            check(
+                ("reverse_osmosis_1d", stage, key),
+                pyunits.psi,
+                lambda v: v <= 0,
+                "positive",
+            )
+    return problems
+
+
+def iter_input_records(
+    path,
+    base_file="wrd_inputs_8_19_21.yaml",
+    tags=None,
+    interval="1D",
+    min_samples=1,
+    skip_invalid=True,
+    **kwargs,
+):
+    """
+    Validated input records for every interval of a historian CSV file.
+
+    Args:
+        path: historian CSV file
+        base_file: input file with the values not in the historian
+        tags: {column: (keys, units)}, default default_tags
+        interval: pandas frequency of the intervals
+        min_samples: minimum number of historian rows of an interval
+        skip_invalid: log and skip invalid intervals, otherwise raise a
+            ValueError
+        kwargs: passed to aggregate_historian
+
+    Yields:
+        (interval start, input record)
+    """
+    if tags is None:
+        tags = default_tags
+    df = aggregate_historian(path, tags=tags, interval=interval, **kwargs)
+    for start, row in df.iterrows():
+        record = make_input_record(row, base_file=base_file, tags=tags)
+        problems = validate_input_record(record)
+        if row["samples"] < min_samples:
+            problems.insert(0, f"only {row['samples']} samples")
+        if problems:
+            msg = f"Invalid historian interval {start}: " + "; ".join(problems)
+            if not skip_invalid:
+                raise ValueError(msg)
+            _log.warning(msg)
+            continue
+        record["historian"] = {
+            "file": os.path.basename(path),
+            "start": str(start),
+            "interval": interval,
+            "samples": int(row["samples"]),
+        }
+        yield start, record
+
+
+def write_input_records(records, directory, prefix="wrd_inputs_"):
+    """
+    Write input records as input files named after the interval start, e.g.
+    wrd_inputs_2021-08-19.yaml or wrd_inputs_2021-08-19T1300.yaml for
+    intervals shorter than a day, and return their paths. The flowsheet
+    builders take these paths as the file argument.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for start, record in records:
+        interval = pd.Timedelta(record.get("historian", {}).get("interval", "1D"))
+        daily = interval % pd.Timedelta("1D") == pd.Timedelta(0)
+        name = pd.Timestamp(start).strftime("%Y-%m-%d" if daily else "%Y-%m-%dT%H%M")
+        path = os.path.abspath(os.path.join(directory, f"{prefix}{name}.yaml"))
+        with open(path, "w") as f:
+            yaml.safe_dump(record, f, sort_keys=False)
+        paths.append(path)
+    return paths
@@ -25,93 +25,25 @@ from idaes.apps.grid_integration.multiperiod.multiperiod import MultiPeriodModel
 from idaes.core.solvers.get_solver import get_solver
 import idaes.logger as idaeslog
 
-# Based on rates in 2021 from GRIP Cost Tracker
-# Based on rates in 2021 from GRIP Cost Tracker
-elec_price_invoice_1 = [
-    0.15,
-    0.16,
-    0.17,
-    0.16,
-    0.16,
-    0.29,
-    0.2,
-    0.21,
-    0.21,
-    0.17,
-    0.16,
-    0.24,
-]
-
-elec_price_invoice_2 = [
-    0.14,
-    0.14,
-    0.14,
-    0.14,
-    0.14,
-    0.25,
-    0.18,
-    0.2,
-    0.21,
-    0.16,
-    0.15,
-    0.26,
-]
+from wrd.multiperiod.tariffs import get_invoice_prices, get_daily_prices
 
-elec_price = elec_price_invoice_1 + elec_price_invoice_2
+# Based on rates in 2021 from GRIP Cost Tracker
+invoices = get_invoice_prices("grip_2021")
+elec_price_invoice_1 = list(invoices["invoice_1"])
+elec_price_invoice_2 = list(invoices["invoice_2"])
 
 elec_price = elec_price_invoice_1 + elec_price_invoice_2
 
 
 def build_elec_price_summer():
-    # Delivery Pricing $/kWh
-    on_peak_del = 0.01971
-    mid_peak_del = 0.01971
-    off_peak_del = 0.01971
-    super_off_peak_del = 0
-
-    # Generation Pricing $/kWh
-    on_peak_gen = 0.09934
-    mid_peak_gen = 0.0891
-    off_peak_gen = 0.05782
-    super_off_peak_gen = 0
-
-    elec_price = np.ones(24)
-
-    # off peak 12 AM - 4 PM
-    elec_price[0:16] = off_peak_del + off_peak_gen
-    # on peak 4 PM - 9 PM
-    elec_price[16:21] = on_peak_del + mid_peak_gen
-    # off peak 9 PM - 12 AM
-    elec_price[21:24] = off_peak_del + off_peak_gen
-
-    return elec_price
+    # Off peak 12 AM - 4 PM and 9 PM - 12 AM, on peak 4 PM - 9 PM
+    return get_daily_prices("sce_tou_2021", "summer")
 
 
 def build_elec_price_winter():
-    # Delivery Pricing
-    on_peak_del = 0
-    mid_peak_del = 0.0239
-    off_peak_del = 0.0228
-    super_off_peak_del = 0.022137
-
-    # Generation Pricing $/kWh
-    on_peak_gen = 0
-    mid_peak_gen = 0.07663
-    off_peak_gen = 0.06397
-    super_off_peak_gen = 0.04026
-
-    elec_price = np.ones(24)
-
-    # Off peak 12 AM - 8 AM
-    elec_price[0:8] = off_peak_del + off_peak_gen
-    # Super off peak 8 AM - 4 PM
-    elec_price[8:16] = super_off_peak_del + super_off_peak_gen
-    # Mid peak 4 PM - 9 PM
-    elec_price[16:21] = mid_peak_del + mid_peak_gen
-    # Off peak peak 9 PM - 12 AM
-    elec_price[21:24] = off_peak_del + off_peak_gen
-
-    return elec_price
+    # Off peak 12 AM - 8 AM and 9 PM - 12 AM, super off peak 8 AM - 4 PM,
+    # mid peak 4 PM - 9 PM
+    return get_daily_prices("sce_tou_2021", "winter")
 
 
 def build_wrd_flowsheet(m=None, elec_price=0.1):
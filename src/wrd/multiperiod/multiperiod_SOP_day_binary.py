@@ -32,39 +32,12 @@ from idaes.apps.grid_integration.multiperiod.multiperiod import MultiPeriodModel
 from idaes.core.solvers.get_solver import get_solver
 import idaes.logger as idaeslog
 
-# Based on rates in 2021 from GRIP Cost Tracker
-# Based on rates in 2021 from GRIP Cost Tracker
-elec_price_invoice_1 = [
-    0.15,
-    0.16,
-    0.17,
-    0.16,
-    0.16,
-    0.29,
-    0.2,
-    0.21,
-    0.21,
-    0.17,
-    0.16,
-    0.24,
-]
-
-elec_price_invoice_2 = [
-    0.14,
-    0.14,
-    0.14,
-    0.14,
-    0.14,
-    0.25,
-    0.18,
-    0.2,
-    0.21,
-    0.16,
-    0.15,
-    0.26,
-]
+from wrd.multiperiod.tariffs import get_invoice_prices
 
-elec_price = elec_price_invoice_1 + elec_price_invoice_2
+# Based on rates in 2021 from GRIP Cost Tracker
+invoices = get_invoice_prices("grip_2021")
+elec_price_invoice_1 = list(invoices["invoice_1"])
+elec_price_invoice_2 = list(invoices["invoice_2"])
 
 elec_price = elec_price_invoice_1 + elec_price_invoice_2
 
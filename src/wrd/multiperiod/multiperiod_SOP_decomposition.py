@@ -0,0 +1,415 @@
+"""
+Lagrangian decomposition for train-level on/off scheduling.
+
+Generalizes multiperiod_SOP_day_binary.py to many trains and days: in every
+period each train runs in one of a few discrete modes (e.g. off, 50% and 100%
+flow), each with its production, power and cost per period, and starting a
+train costs startup_cost. The trains are only coupled by the daily production
+targets. Relaxing these targets with one multiplier per day splits the
+problem into one subproblem per train, a shortest path over periods and modes
+that is solved exactly by dynamic programming (vectorized over trains). The
+multipliers are updated with subgradient steps, and every iteration the
+relaxed schedule is repaired into a feasible one, so each iteration reports a
+lower bound, the best feasible cost and their gap.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from pyomo.environ import value, units as pyunits
+
+__all__ = [
+    "get_train_modes",
+    "evaluate_train_schedule",
+    "solve_train_schedule_lagrangian",
+    "report_train_schedule",
+]
+
+
+def get_train_modes(
+    flow_fracs=(0, 0.5, 1), file="wrd_inputs_8_19_21.yaml", period_length=1
+):
+    """
+    Production (MG/period), power (kW) and chemical cost (USD/period) of one
+    train at fractions of its nominal feed flow, from the reduced physical
+    model in multiperiod_wrd.py. A fraction of 0 is the off mode.
+    """
+    from wrd.multiperiod.multiperiod_wrd import (
+        create_wrd_physical_mp,
+        initialize_wrd_physical_mp,
+    )
+
+    m = create_wrd_physical_mp(
+        n_time_points=1,
+        num_trains=1,
+        file=file,
+        period_length=period_length,
+        min_flow_frac=0,
+        max_flow_frac=max(flow_fracs),
+    )
+    fs = m.fs.mp.blocks[0].process.fs
+    nominal_flow = value(m.fs.wrd_params.nominal_train_flow)
+
+    modes = {"production": [], "power": [], "cost": []}
+    for frac in flow_fracs:
+        if frac == 0:
+            for v in modes.values():
+                v.append(0.0)
+            continue
+        fs.train_feed_flow.set_value(frac * nominal_flow)
+        initialize_wrd_physical_mp(m)
+        modes["production"].append(value(fs.water_prod))
+        modes["power"].append(
+            value(pyunits.convert(fs.total_pump_power, to_units=pyunits.kW))
+        )
+        modes["cost"].append(value(fs.chem_cost))
+    return pd.DataFrame(modes, index=list(flow_fracs))
+
+
+def _mode_arrays(modes, num_trains):
+    # Per train production, power and cost with shape (trains, modes)
+    arrays = [
+        np.asarray(modes[k], dtype=float) for k in ["production", "power", "cost"]
+    ]
+    return [np.broadcast_to(x, (num_trains, x.shape[-1])) for x in arrays]
+
+
+def _transition_cost(production, startup_cost):
+    # Cost of going from mode i to mode j: starting up an idle train
+    producing = production > 0
+    startup = np.broadcast_to(np.asarray(startup_cost, dtype=float), (len(production),))
+    return startup[:, None, None] * (~producing[:, :, None] & producing[:, None, :])
+
+
+def _solve_subproblems(stage_cost, transition, initial_mode):
+    """
+    Minimum cost mode sequence of every train by dynamic programming.
+
+    Args:
+        stage_cost: cost of each mode in each period, shape (trains, periods, modes)
+        transition: cost of each mode change, shape (trains, modes, modes)
+        initial_mode: mode of each train before the first period
+
+    Returns:
+        schedule (trains, periods) of mode indices and the cost of each train
+    """
+    num_trains, num_periods, _ = stage_cost.shape
+    trains = np.arange(num_trains)
+    cost = stage_cost[:, 0, :] + transition[trains, initial_mode, :]
+    back = np.zeros(stage_cost.shape, dtype=int)
+    for t in range(1, num_periods):
+        total = cost[:, :, None] + transition
+        back[:, t, :] = total.argmin(axis=1)
+        cost = total.min(axis=1) + stage_cost[:, t, :]
+
+    schedule = np.zeros((num_trains, num_periods), dtype=int)
+    schedule[:, -1] = cost.argmin(axis=1)
+    for t in range(num_periods - 1, 0, -1):
+        schedule[:, t - 1] = back[trains, t, schedule[:, t]]
+    return schedule, cost.min(axis=1)
+
+
+def evaluate_train_schedule(
+    schedule,
+    elec_price,
+    modes,
+    startup_cost=0,
+    initial_mode=0,
+    period_length=1,
+):
+    """
+    Cost (USD) and daily production of a schedule of mode indices with shape
+    (trains, periods), with periods of period_length hours.
+    """
+    schedule = np.asarray(schedule)
+    num_trains = schedule.shape[0]
+    production, power, cost = _mode_arrays(modes, num_trains)
+    trains = np.arange(num_trains)[:, None]
+    elec_price = np.asarray(elec_price, dtype=float)
+
+    energy = power[trains, schedule] * period_length
+    total = np.sum(elec_price * energy + cost[trains, schedule])
+    transition = _transition_cost(production, startup_cost)
+    initial = np.broadcast_to(initial_mode, (num_trains,))[:, None]
+    previous = np.hstack([initial, schedule[:, :-1]])
+    total += transition[trains, previous, schedule].sum()
+    return total, production[trains, schedule].sum(axis=0)
+
+
+def _make_feasible(
+    schedule, stage_cost, production, transition, initial_mode, target, day
+):
+    """
+    Repair a relaxed schedule: on days short of their target, switch the
+    train-period with the lowest cost per additional MG to a higher mode until
+    the target is met. Then, while the targets still hold, switch down the
+    train-periods with the largest saving per MG.
+    """
+    schedule = schedule.copy()
+    num_trains, num_periods, num_modes = stage_cost.shape
+    trains = np.arange(num_trains)[:, None]
+    periods = np.arange(num_periods)
+    eps = 1e-9 * max(1, target.max())
+
+    def change():
+        # Cost and production change of switching each train-period to each
+        # mode, keeping all other periods, shape (trains, periods, modes)
+        previous = np.hstack([initial_mode[:, None], schedule[:, :-1]])
+        following = schedule[:, 1:]
+        current = (
+            stage_cost[trains, periods, schedule]
+            + transition[trains, previous, schedule]
+        )
+        current[:, :-1] += transition[trains, schedule[:, :-1], following]
+        new = stage_cost + transition[trains, previous, :]
+        new[:, :-1, :] += transition[
+            trains[:, :, None],
+            np.arange(num_modes)[None, None, :],
+            following[:, :, None],
+        ]
+        delta_prod = production[:, None, :] - production[trains, schedule][:, :, None]
+        return new - current[:, :, None], delta_prod
+
+    def daily_production():
+        return np.bincount(
+            day,
+            weights=production[trains, schedule].sum(axis=0),
+            minlength=len(target),
+        )
+
+    def apply_best(ratio, days):
+        # Apply the best change of each day (one per day keeps the cost
+        # changes computed above valid, except next to midnight)
+        for d in days:
+            r = ratio[:, day == d, :]
+            k, t, mode = np.unravel_index(np.argmin(r), r.shape)
+            schedule[k, periods[day == d][t]] = mode
+
+    while True:
+        short = np.where(daily_production() < target - eps)[0]
+        if len(short) == 0:
+            break
+        delta_cost, delta_prod = change()
+        ratio = np.where(
+            delta_prod > eps,
+            delta_cost / np.where(delta_prod > eps, delta_prod, 1),
+            np.inf,
+        )
+        apply_best(ratio, short)
+
+    while True:
+        surplus = daily_production() - target
+        delta_cost, delta_prod = change()
+        allowed = (
+            (delta_prod < -eps)
+            & (delta_cost < 0)
+            & (-delta_prod <= surplus[day][None, :, None] + eps)
+        )
+        days = np.unique(day[allowed.any(axis=(0, 2))])
+        if len(days) == 0:
+            break
+        ratio = np.where(
+            allowed, delta_cost / np.where(allowed, -delta_prod, 1), np.inf
+        )
+        apply_best(ratio, days)
+
+    return schedule
+
+
+def solve_train_schedule_lagrangian(
+    elec_price,
+    modes=None,
+    num_trains=4,
+    daily_target=None,
+    periods_per_day=24,
+    period_length=1,
+    startup_cost=0,
+    initial_mode=0,
+    max_iter=100,
+    tol=1e-3,
+    step_scale=2,
+    verbose=False,
+):
+    """
+    Schedule the train modes over the horizon with Lagrangian decomposition.
+
+    Args:
+        elec_price: electricity price per period (USD/kWh)
+        modes: DataFrame (or dict of lists) with the production
+            (MG/period), power (kW) and cost (USD/period) of each mode,
+            default get_train_modes(period_length=period_length)
+        num_trains: number of trains
+        daily_target: production target per day (MG), a scalar or one value
+            per day (default 90% of the full capacity)
+        periods_per_day: number of periods per day
+        period_length: length of each period (h), the mode power times
+            this is the energy billed at elec_price
+        startup_cost: cost of starting an idle train (USD), a scalar or one
+            value per train
+        initial_mode: mode of each train before the first period
+        max_iter: maximum number of multiplier updates
+        tol: relative optimality gap to stop at
+        step_scale: initial scale of the subgradient step, halved whenever
+            the lower bound stalls
+        verbose: print the history as it goes
+
+    Returns:
+        dict with the best schedule (trains, periods), its cost, daily
+        production, the lower bound, gap, multipliers and a history
+        DataFrame with the bounds, gap and wall time of every iteration
+    """
+    if modes is None:
+        modes = get_train_modes(period_length=period_length)
+    elec_price = np.asarray(elec_price, dtype=float)
+    num_periods = len(elec_price)
+    num_days = int(np.ceil(num_periods / periods_per_day))
+    day = np.arange(num_periods) // periods_per_day
+
+    production, power, cost = _mode_arrays(modes, num_trains)
+    transition = _transition_cost(production, startup_cost)
+    initial_mode = np.broadcast_to(np.asarray(initial_mode, dtype=int), (num_trains,))
+    energy = power * period_length
+    stage_cost = elec_price[None, :, None] * energy[:, None, :] + cost[:, None, :]
+
+    capacity = np.bincount(
+        day, weights=np.full(num_periods, production.max(axis=1).sum())
+    )
+    if daily_target is None:
+        daily_target = 0.9 * capacity
+    target = np.broadcast_to(np.asarray(daily_target, dtype=float), (num_days,))
+    if (target > capacity + 1e-9).any():
+        raise ValueError(
+            f"Daily production targets {target} exceed the plant capacity {capacity}"
+        )
+
+    # Multipliers start at the cheapest cost per MG of the most efficient mode
+    cost_per_MG = np.where(
+        production > 0,
+        (stage_cost.mean(axis=1)) / np.where(production > 0, production, 1),
+        np.inf,
+    )
+    multipliers = np.full(num_days, cost_per_MG.min())
+
+    best = {"cost": np.inf, "schedule": None, "lower_bound": -np.inf}
+    history = []
+    scale = step_scale
+    stall = 0
+    for it in range(max_iter):
+        tic = time.perf_counter()
+
+        # Lower bound from the relaxed problem
+        relaxed_cost = stage_cost - (
+            multipliers[day][None, :, None] * production[:, None, :]
+        )
+        schedule, train_cost = _solve_subproblems(
+            relaxed_cost, transition, initial_mode
+        )
+        lower_bound = train_cost.sum() + multipliers @ target
+        if lower_bound > best["lower_bound"] + 1e-9 * abs(lower_bound):
+            best["lower_bound"] = lower_bound
+            stall = 0
+        else:
+            stall += 1
+            if stall >= 3:
+                scale /= 2
+                stall = 0
+
+        # Upper bound from the repaired schedule
+        feasible = _make_feasible(
+            schedule,
+            stage_cost,
+            production,
+            transition,
+            initial_mode,
+            target,
+            day,
+        )
+        total, daily_prod = evaluate_train_schedule(
+            feasible,
+            elec_price,
+            modes,
+            startup_cost=startup_cost,
+            initial_mode=initial_mode,
+            period_length=period_length,
+        )
+        if total < best["cost"]:
+            best.update(cost=total, schedule=feasible)
+
+        gap = (best["cost"] - best["lower_bound"]) / abs(best["cost"])
+        history.append(
+            {
+                "iteration": it,
+                "lower_bound": lower_bound,
+                "best_lower_bound": best["lower_bound"],
+                "upper_bound": best["cost"],
+                "gap": gap,
+                "step_scale": scale,
+                "time": time.perf_counter() - tic,
+            }
+        )
+        if verbose:
+            h = history[-1]
+            print(
+                f"{it:<6d}{h['best_lower_bound']:<15.2f}{h['upper_bound']:<15.2f}"
+                f"{gap:<12.2e}{h['time']:.3f} s"
+            )
+        if gap <= tol:
+            break
+
+        # Subgradient step on the daily multipliers (Polyak step size)
+        subgradient = target - np.bincount(
+            day,
+            weights=production[np.arange(num_trains)[:, None], schedule].sum(axis=0),
+            minlength=num_days,
+        )
+        norm = subgradient @ subgradient
+        if norm == 0:
+            break
+        step = scale * (best["cost"] - lower_bound) / norm
+        multipliers = np.maximum(0, multipliers + step * subgradient)
+
+    _, daily_prod = evaluate_train_schedule(
+        best["schedule"],
+        elec_price,
+        modes,
+        startup_cost=startup_cost,
+        initial_mode=initial_mode,
+        period_length=period_length,
+    )
+    return {
+        "schedule": best["schedule"],
+        "cost": best["cost"],
+        "lower_bound": best["lower_bound"],
+        "gap": history[-1]["gap"],
+        "daily_production": np.bincount(day, weights=daily_prod),
+        "daily_target": target,
+        "multipliers": multipliers,
+        "history": pd.DataFrame(history).set_index("iteration"),
+    }
+
+
+def report_train_schedule(results, w=15):
+    history = results["history"]
+    print(f"Iterations: {len(history)}")
+    print(f"Total wall time (s): {history['time'].sum():.3f}")
+    print(f"Best cost ($): {results['cost']:.2f}")
+    print(f"Lower bound ($): {results['lower_bound']:.2f}")
+    print(f"Optimality gap: {results['gap']:.2e}")
+    print(f'{"Day":<{w}s}{"Target (MG)":<{w}s}{"Prod (MG)":<{w}s}')
+    for d, (target, prod) in enumerate(
+        zip(results["daily_target"], results["daily_production"])
+    ):
+        print(f"{d:<{w}d}{target:<{w}.3f}{prod:<{w}.3f}")
+
+
+if __name__ == "__main__":
+    from wrd.multiperiod.tariffs import expand_tariff
+
+    # One month of hourly prices for 4 trains
+    elec_price = expand_tariff("sce_tou_2021", "2021-07-01", "2021-08-01")
+    results = solve_train_schedule_lagrangian(
+        elec_price, num_trains=4, startup_cost=50, verbose=True
+    )
+    report_train_schedule(results)
@@ -0,0 +1,677 @@
+"""
+Multiperiod WRD model with a reduced physical flowsheet in every period.
+
+Each period block only holds the per-train feed flow (the decision), water
+production, energy, costs and the product storage level. Stage flows,
+recoveries, pump efficiencies from the pump curves, pump power and chemical
+dosing are Expressions on the shared parameter block m.fs.wrd_params, built
+once from the yaml file, so month-long horizons (24x30 periods) stay small.
+RO stages use the yaml recovery and the pump curves by default, or an
+ROStageSurrogate per stage_num when one is given.
+"""
+
+import logging
+import functools
+import numpy as np
+
+from pyomo.environ import (
+    ConcreteModel,
+    Block,
+    Var,
+    Param,
+    Set,
+    Constraint,
+    Expression,
+    Objective,
+    value,
+    units as pyunits,
+)
+from pyomo.util.calc_var_value import calculate_variable_from_constraint
+from pyomo.core.base.units_container import InconsistentUnitsError
+
+from idaes.core import FlowsheetBlock
+from idaes.core.base.costing_base import register_idaes_currency_units
+from idaes.apps.grid_integration.multiperiod.multiperiod import MultiPeriodModel
+
+from wrd.utilities import load_config, get_config_value, get_config_file
+from wrd.components.chemical_addition import get_chem_data
+from wrd.components.pump_curves import get_pump_name, get_pump_curve
+
+__all__ = [
+    "build_wrd_mp_params",
+    "build_wrd_period",
+    "initialize_wrd_period",
+    "initialize_wrd_physical_mp",
+    "create_wrd_physical_mp",
+    "report_wrd_physical_mp",
+]
+
+pre_treat_chem_list = [
+    "ammonium_sulfate",
+    "sodium_hypochlorite",
+    "sulfuric_acid",
+    "scale_inhibitor",
+]
+
+post_treat_chem_list = [
+    "calcium_hydroxide",
+    "sodium_hydroxide",
+    "sodium_bisulfite",
+]
+
+
+def build_wrd_mp_params(
+    blk,
+    file="wrd_inputs_8_19_21.yaml",
+    num_trains=4,
+    ro_stages=(1, 2, 3),
+    period_length=1,
+):
+    """
+    Build the parameters shared by every period on blk: number of trains,
+    period length (h), UF recovery, RO stage recoveries, pump pressures and
+    curves, motor and VFD efficiencies and chemical costs per volume treated.
+    """
+    config_data = load_config(get_config_file(file))
+
+    blk.period_length = Param(
+        initialize=period_length * 3600, units=pyunits.s, doc="Period length"
+    )
+    # Unit conversion factors, so periods do not call pyunits.convert
+    for name, from_units, to_units in [
+        ("MG_per_m3", pyunits.m**3, pyunits.megagallons),
+        ("MWh_per_kJ", pyunits.kW * pyunits.s, pyunits.MWh),
+        ("kWh_per_MWh", pyunits.MWh, pyunits.kWh),
+        ("kW_per_W", pyunits.W, pyunits.kW),
+        ("kWh_per_kJ", pyunits.kW * pyunits.s, pyunits.kWh),
+    ]:
+        blk.add_component(
+            name,
+            Param(
+                initialize=pyunits.convert_value(
+                    1, from_units=from_units, to_units=to_units
+                ),
+                units=to_units / from_units,
+            ),
+        )
+    blk.gpm_per_m3s = Param(
+        initialize=pyunits.convert_value(
+            1,
+            from_units=pyunits.m**3 / pyunits.s,
+            to_units=pyunits.gallons / pyunits.minute,
+        )
+    )
+    blk.psi_per_Pa = Param(
+        initialize=pyunits.convert_value(1, from_units=pyunits.Pa, to_units=pyunits.psi)
+    )
+
+    blk.num_trains = Param(
+        initialize=num_trains, mutable=True, doc="Number of PRO/TSRO trains"
+    )
+    blk.ro_stages = Set(initialize=ro_stages)
+    blk.pumps = Set(initialize=["uf"] + list(ro_stages))
+
+    nominal_flow = get_config_value(config_data, "feed_flow_water", "feed_stream")
+    blk.nominal_train_flow = Param(
+        initialize=value(
+            pyunits.convert(nominal_flow, to_units=pyunits.m**3 / pyunits.s)
+        ),
+        units=pyunits.m**3 / pyunits.s,
+        doc="Nominal feed flow per train",
+    )
+    blk.uf_recovery = Param(
+        initialize=0.99, mutable=True, doc="UF volumetric water recovery"
+    )
+    blk.stage_recovery = Param(
+        blk.ro_stages,
+        initialize={
+            s: get_config_value(
+                config_data,
+                "water_recovery_mass_phase",
+                "reverse_osmosis_1d",
+                f"stage_{s}",
+            )
+            for s in ro_stages
+        },
+        mutable=True,
+        doc="RO stage recovery when no surrogate is given",
+    )
+
+    feed_pressure = get_config_value(config_data, "feed_pressure", "feed_stream")
+    inlet_pressure = {
+        "uf": feed_pressure,
+        **{
+            s: get_config_value(
+                config_data, "pump_suction_pressure", "pumps", f"pump_{s}"
+            )
+            for s in ro_stages
+        },
+    }
+    outlet_pressure = {
+        "uf": get_config_value(
+            config_data, "pump_outlet_pressure", "uf_pumps", "pump_1"
+        ),
+        **{
+            s: get_config_value(
+                config_data, "pump_outlet_pressure", "pumps", f"pump_{s}"
+            )
+            for s in ro_stages
+        },
+    }
+    blk.pump_inlet_pressure = Param(
+        blk.pumps,
+        initialize={
+            k: value(pyunits.convert(p, to_units=pyunits.Pa))
+            for k, p in inlet_pressure.items()
+        },
+        mutable=True,
+        units=pyunits.Pa,
+        doc="Pump suction pressure",
+    )
+    blk.pump_outlet_pressure = Param(
+        blk.pumps,
+        initialize={
+            k: value(pyunits.convert(p, to_units=pyunits.Pa))
+            for k, p in outlet_pressure.items()
+        },
+        mutable=True,
+        units=pyunits.Pa,
+        doc="Pump outlet pressure",
+    )
+    pump_curves = load_config(get_config_file("pump_curves.yaml"))
+    blk.pump_curve = Param(
+        blk.pumps,
+        range(4),
+        initialize={
+            (k, i): get_pump_curve(get_pump_name(k, uf=k == "uf"))[i]
+            for k in blk.pumps
+            for i in range(4)
+        },
+        mutable=True,
+        doc="Pump curve coefficients, flow per pump in m3/s",
+    )
+    blk.efficiency_motor = Param(
+        initialize=pump_curves["efficiency_motor"], mutable=True
+    )
+    blk.efficiency_vfd = Param(initialize=pump_curves["efficiency_vfd"], mutable=True)
+
+    blk.pre_treat_chems = Set(initialize=pre_treat_chem_list)
+    blk.post_treat_chems = Set(initialize=post_treat_chem_list)
+    # Chemical unit costs are in currency units per gallon or ton of solution
+    register_idaes_currency_units()
+    chem_cost = {}
+    for chem_name in pre_treat_chem_list + post_treat_chem_list:
+        chem = get_chem_data(config_data, chem_name)
+        # (kg soln / m3 water) = (kg chem / m3 water) / (kg chem / kg soln)
+        soln_mass = chem["chemical_dosage"] / chem["ratio_in_solution"]
+        try:
+            cost = pyunits.convert(
+                soln_mass / chem["solution_density"] * chem["unit_cost"],
+                to_units=pyunits.USD_2021 / pyunits.m**3,
+            )
+        except InconsistentUnitsError:
+            cost = pyunits.convert(
+                soln_mass * chem["unit_cost"],
+                to_units=pyunits.USD_2021 / pyunits.m**3,
+            )
+        chem_cost[chem_name] = value(cost)
+    blk.chem_cost = Param(
+        blk.pre_treat_chems | blk.post_treat_chems,
+        initialize=chem_cost,
+        mutable=True,
+        units=pyunits.USD_2021 / pyunits.m**3,
+        doc="Chemical cost per volume of water dosed",
+    )
+
+
+def _pump_outlet_pressure(params, k, speed=1):
+    # Affinity law: the pressure increase scales with the speed squared
+    return params.pump_inlet_pressure[k] + speed**2 * (
+        params.pump_outlet_pressure[k] - params.pump_inlet_pressure[k]
+    )
+
+
+def _pump_power(params, k, flow, speed=1):
+    # Electrical power of one pump from the pump curve efficiency, evaluated
+    # at the equivalent full speed flow (affinity law)
+    flow_si = flow / speed / (pyunits.m**3 / pyunits.s)
+    efficiency = sum(params.pump_curve[k, i] * flow_si**i for i in range(4))
+    return (
+        params.kW_per_W
+        * flow
+        * (_pump_outlet_pressure(params, k, speed) - params.pump_inlet_pressure[k])
+        / (params.efficiency_motor * params.efficiency_vfd * efficiency)
+    )
+
+
+def _surrogate_inputs(params, k, flow, conc, temperature, speed=1):
+    # Dimensionless surrogate inputs in gpm, g/L, K and psi
+    return {
+        "Qin": params.gpm_per_m3s * flow / (pyunits.m**3 / pyunits.s),
+        "Cin": conc,
+        "Tin": temperature,
+        "pump_pressure": params.psi_per_Pa
+        * _pump_outlet_pressure(params, k, speed)
+        / pyunits.Pa,
+    }
+
+
+def _osmotic_pressure(conc, temperature):
+    # Van't Hoff osmotic pressure (Pa) of NaCl at conc (g/L) and temperature (K)
+    return 2 * conc / 58.44 * 1e3 * 8.314 * temperature
+
+
+def build_wrd_period(
+    m=None,
+    params=None,
+    surrogates=None,
+    elec_price=0.1,
+    demand=0,
+    feed_conc=0.54,
+    feed_temperature=302,
+    min_flow_frac=0.5,
+    max_flow_frac=1.1,
+    variable_speed=False,
+    min_speed=0.7,
+):
+    """
+    Build one period of the multiperiod WRD model on m.fs referencing the
+    shared params. elec_price is in $/kWh, demand in MG per period,
+    feed_conc in g/L and feed_temperature in K.
+
+    With variable_speed, the RO pump speeds (fraction of the rated speed,
+    at least min_speed) are decisions in every period. The pump pressure
+    increase scales with speed**2 and the pump curve is evaluated at
+    flow / speed (affinity laws). The stage recovery then follows the net
+    driving pressure (feed pressure minus the average osmotic pressure at
+    the nominal recoveries), or the surrogate when one is given.
+    """
+    if m is None:
+        m = ConcreteModel()
+    if params is None:
+        raise ValueError("Shared WRD multiperiod parameters must be provided.")
+    if surrogates is None:
+        surrogates = {}
+
+    m.fs = Block()
+    fs = m.fs
+    dt = params.period_length
+
+    fs.elec_price = Param(
+        initialize=elec_price,
+        mutable=True,
+        units=pyunits.USD_2021 / pyunits.kWh,
+        doc="Electricity price",
+    )
+    fs.demand = Param(
+        initialize=demand,
+        mutable=True,
+        units=pyunits.megagallons,
+        doc="Product water demand in the period",
+    )
+
+    fs.train_feed_flow = Var(
+        initialize=value(params.nominal_train_flow),
+        bounds=(
+            min_flow_frac * value(params.nominal_train_flow),
+            max_flow_frac * value(params.nominal_train_flow),
+        ),
+        units=pyunits.m**3 / pyunits.s,
+        doc="Feed flow per train",
+    )
+
+    speed = {s: 1 for s in params.ro_stages}
+    if variable_speed:
+        fs.pump_speed = Var(
+            params.ro_stages,
+            initialize=1,
+            bounds=(min_speed, 1),
+            units=pyunits.dimensionless,
+            doc="RO pump speed as a fraction of the rated speed",
+        )
+        speed = fs.pump_speed
+
+    # Flow, concentration and recovery of each RO stage per train (TSRO is
+    # fed by the stage 2 brine), assuming full salt rejection
+    stage_flow = {}
+    stage_conc = {}
+    stage_recovery = {}
+    flow = fs.train_feed_flow * params.uf_recovery
+    conc = feed_conc
+    nominal_conc = feed_conc
+    for s in params.ro_stages:
+        stage_flow[s] = flow
+        stage_conc[s] = conc
+        r0 = value(params.stage_recovery[s])
+        if s in surrogates:
+            inputs = _surrogate_inputs(
+                params, s, flow, conc, feed_temperature, speed[s]
+            )
+            stage_recovery[s] = surrogates[s].expressions(inputs)["recovery"]
+        elif variable_speed:
+            # Permeate flow proportional to the net driving pressure
+            osmotic = _osmotic_pressure(
+                nominal_conc * (1 + 1 / (1 - r0)) / 2, feed_temperature
+            )
+            p_rated = value(params.pump_outlet_pressure[s])
+            stage_recovery[s] = (
+                params.stage_recovery[s]
+                * (_pump_outlet_pressure(params, s, speed[s]) / pyunits.Pa - osmotic)
+                / (p_rated - osmotic)
+            )
+        else:
+            stage_recovery[s] = params.stage_recovery[s]
+        flow = flow * (1 - stage_recovery[s])
+        conc = conc / (1 - stage_recovery[s])
+        nominal_conc = nominal_conc / (1 - r0)
+
+    @fs.Expression(params.ro_stages, doc="RO stage feed flow per train")
+    def stage_feed_flow(b, s):
+        return stage_flow[s]
+
+    @fs.Expression(params.ro_stages, doc="RO stage recovery")
+    def recovery(b, s):
+        return stage_recovery[s]
+
+    @fs.Expression(params.pumps, doc="Pump power per train")
+    def pump_power(b, k):
+        if k == "uf":
+            return _pump_power(params, k, b.train_feed_flow)
+        if k in surrogates:
+            inputs = _surrogate_inputs(
+                params, k, stage_flow[k], stage_conc[k], feed_temperature, speed[k]
+            )
+            return surrogates[k].expressions(inputs)["pump_power"] * pyunits.kW
+        return _pump_power(params, k, stage_flow[k], speed[k])
+
+    fs.product_flow = Expression(
+        expr=params.num_trains
+        * sum(fs.stage_feed_flow[s] * fs.recovery[s] for s in params.ro_stages),
+        doc="Plant product flow",
+    )
+    fs.total_pump_power = Expression(
+        expr=params.num_trains * sum(fs.pump_power[k] for k in params.pumps),
+        doc="Plant pump power",
+    )
+
+    fs.water_prod = Var(
+        initialize=0.5,
+        bounds=(0, None),
+        units=pyunits.megagallons,
+        doc="Water produced in the period",
+    )
+    fs.energy = Var(
+        initialize=1,
+        bounds=(0, None),
+        units=pyunits.MWh,
+        doc="Energy used in the period",
+    )
+    fs.grid_cost = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.USD_2021,
+        doc="Electricity cost for the period",
+    )
+    fs.chem_cost = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.USD_2021,
+        doc="Chemical cost for the period",
+    )
+    fs.storage_level = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.megagallons,
+        doc="Product storage level at the end of the period",
+    )
+    fs.pre_storage_level = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.megagallons,
+        doc="Product storage level at the end of the previous period",
+    )
+    fs.acc_prod = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.megagallons,
+        doc="Accumulated water produced",
+    )
+    fs.pre_acc_prod = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.megagallons,
+        doc="Accumulated water produced up to the previous period",
+    )
+    fs.acc_energy = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.MWh,
+        doc="Accumulated energy used",
+    )
+    fs.pre_acc_energy = Var(
+        initialize=0,
+        bounds=(0, None),
+        units=pyunits.MWh,
+        doc="Accumulated energy used up to the previous period",
+    )
+
+    fs.eq_water_prod = Constraint(
+        expr=fs.water_prod == params.MG_per_m3 * fs.product_flow * dt
+    )
+    fs.eq_energy = Constraint(
+        expr=fs.energy == params.MWh_per_kJ * fs.total_pump_power * dt
+    )
+    fs.eq_grid_cost = Constraint(
+        expr=fs.grid_cost == fs.elec_price * params.kWh_per_MWh * fs.energy
+    )
+    fs.eq_chem_cost = Constraint(
+        expr=fs.chem_cost
+        == (
+            sum(params.chem_cost[c] for c in params.pre_treat_chems)
+            * params.num_trains
+            * fs.train_feed_flow
+            + sum(params.chem_cost[c] for c in params.post_treat_chems)
+            * fs.product_flow
+        )
+        * dt
+    )
+    fs.eq_storage_level = Constraint(
+        expr=fs.storage_level == fs.pre_storage_level + fs.water_prod - fs.demand
+    )
+    fs.eq_acc_prod = Constraint(expr=fs.acc_prod == fs.pre_acc_prod + fs.water_prod)
+    fs.eq_acc_energy = Constraint(expr=fs.acc_energy == fs.pre_acc_energy + fs.energy)
+
+    fs.energy_intensity = Expression(
+        expr=params.kWh_per_kJ * fs.total_pump_power / fs.product_flow,
+        doc="Energy intensity of the product water",
+    )
+
+    return m
+
+
+def initialize_wrd_period(m):
+    """
+    Calculate the period variables from the current feed flow and previous
+    storage, production and energy values.
+    """
+    fs = m.fs
+    for var, con in [
+        (fs.water_prod, fs.eq_water_prod),
+        (fs.energy, fs.eq_energy),
+        (fs.grid_cost, fs.eq_grid_cost),
+        (fs.chem_cost, fs.eq_chem_cost),
+        (fs.storage_level, fs.eq_storage_level),
+        (fs.acc_prod, fs.eq_acc_prod),
+        (fs.acc_energy, fs.eq_acc_energy),
+    ]:
+        if not var.fixed:
+            calculate_variable_from_constraint(var, con)
+
+
+def initialize_wrd_physical_mp(m):
+    """
+    Initialize every period in order from the current feed flows, passing
+    the linked storage, production and energy values forward.
+    """
+    blocks = [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+    for t, b in enumerate(blocks):
+        if t > 0:
+            for v1, v2 in get_wrd_period_variable_pairs(blocks[t - 1], b):
+                if not v2.fixed:
+                    v2.set_value(value(v1))
+        initialize_wrd_period(b)
+
+
+def get_wrd_period_variable_pairs(t1, t2):
+    # Connect storage and the accumulated water produced and energy used
+    return [
+        (t1.fs.storage_level, t2.fs.pre_storage_level),
+        (t1.fs.acc_prod, t2.fs.pre_acc_prod),
+        (t1.fs.acc_energy, t2.fs.pre_acc_energy),
+    ]
+
+
+def unfix_dof(m):
+    m.fs.train_feed_flow.unfix()
+
+
+def create_wrd_physical_mp(
+    n_time_points=24,
+    elec_price=None,
+    demand=None,
+    file="wrd_inputs_8_19_21.yaml",
+    num_trains=4,
+    surrogates=None,
+    feed_conc=0.54,
+    feed_temperature=302,
+    period_length=1,
+    storage_capacity=5,
+    initial_storage=2.5,
+    min_flow_frac=0.5,
+    max_flow_frac=1.1,
+    variable_speed=False,
+    min_speed=0.7,
+):
+    """
+    Create a multiperiod WRD model with one reduced physical flowsheet per
+    period, minimizing electricity and chemical cost while meeting demand
+    from product storage.
+
+    Args:
+        n_time_points: number of periods
+        elec_price: electricity price per period ($/kWh), default 0.1
+        demand: product demand per period (MG), default the nominal
+            production of the plant
+        surrogates: optional {stage_num: ROStageSurrogate} for the RO stages
+        feed_conc, feed_temperature: scalars or one value per period
+        storage_capacity, initial_storage: product storage in MG; the
+            storage must end at least as full as it started
+        variable_speed: optimize the RO pump speeds in every period (down to
+            min_speed), see build_wrd_period
+    """
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.wrd_params = Block()
+    build_wrd_mp_params(
+        m.fs.wrd_params,
+        file=file,
+        num_trains=num_trains,
+        period_length=period_length,
+    )
+    params = m.fs.wrd_params
+
+    def _per_period(x, default):
+        if x is None:
+            x = default
+        return list(np.broadcast_to(np.asarray(x, dtype=float), (n_time_points,)))
+
+    if demand is None:
+        # Nominal production with the yaml recoveries
+        flow = value(params.nominal_train_flow * params.uf_recovery)
+        nominal_prod = 0
+        for s in params.ro_stages:
+            nominal_prod += flow * value(params.stage_recovery[s])
+            flow *= 1 - value(params.stage_recovery[s])
+        demand = value(
+            pyunits.convert(
+                nominal_prod
+                * num_trains
+                * pyunits.m**3
+                / pyunits.s
+                * period_length
+                * pyunits.hr,
+                to_units=pyunits.megagallons,
+            )
+        )
+
+    period_data = zip(
+        _per_period(elec_price, 0.1),
+        _per_period(demand, 0),
+        _per_period(feed_conc, 0.54),
+        _per_period(feed_temperature, 302),
+    )
+    model_data_kwargs = {
+        t: {
+            "elec_price": p,
+            "demand": d,
+            "feed_conc": c,
+            "feed_temperature": T,
+        }
+        for t, (p, d, c, T) in enumerate(period_data)
+    }
+
+    m.fs.mp = MultiPeriodModel(
+        n_time_points=n_time_points,
+        process_model_func=functools.partial(
+            build_wrd_period,
+            params=params,
+            surrogates=surrogates,
+            min_flow_frac=min_flow_frac,
+            max_flow_frac=max_flow_frac,
+            variable_speed=variable_speed,
+            min_speed=min_speed,
+        ),
+        linking_variable_func=get_wrd_period_variable_pairs,
+        initialization_func=None,
+        unfix_dof_func=unfix_dof,
+        outlvl=logging.WARNING,
+    )
+    m.fs.mp.build_multi_period_model(model_data_kwargs=model_data_kwargs)
+    blocks = [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+
+    first = blocks[0].fs
+    first.pre_storage_level.fix(initial_storage)
+    first.pre_acc_prod.fix(0)
+    first.pre_acc_energy.fix(0)
+    for b in blocks:
+        b.fs.storage_level.setub(storage_capacity)
+    initialize_wrd_physical_mp(m)
+
+    @m.Constraint(doc="Storage must end at least as full as it started")
+    def eq_final_storage(b):
+        return blocks[-1].fs.storage_level >= first.pre_storage_level
+
+    @m.Expression(doc="Total cost")
+    def total_cost(b):
+        return sum(p.fs.grid_cost + p.fs.chem_cost for p in blocks)
+
+    m.fs.obj = Objective(expr=m.total_cost)
+
+    return m
+
+
+def report_wrd_physical_mp(m, w=15):
+    blocks = [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+    print(
+        f'{"Period":<{w}s}{"Price ($/kWh)":<{w}s}{"Prod (MG)":<{w}s}'
+        f'{"Energy (MWh)":<{w}s}{"kWh/m3":<{w}s}{"Storage (MG)":<{w}s}'
+    )
+    for t, b in enumerate(blocks):
+        print(
+            f"{t:<{w}d}{value(b.fs.elec_price):<{w}.4f}{value(b.fs.water_prod):<{w}.3f}"
+            f"{value(b.fs.energy):<{w}.3f}{value(b.fs.energy_intensity):<{w}.3f}"
+            f"{value(b.fs.storage_level):<{w}.3f}"
+        )
+    print(f"Total production (MG): {value(blocks[-1].fs.acc_prod):.3f}")
+    print(f"Total energy (MWh): {value(blocks[-1].fs.acc_energy):.3f}")
+    print(f"Total cost ($): {value(m.total_cost):.2f}")
@@ -0,0 +1,189 @@
+"""
+Receding-horizon operation of the reduced physical multiperiod WRD model.
+
+A single window model (e.g. 48 hourly periods) is built once with
+create_wrd_physical_mp. Every step updates the window's electricity prices and
+demand, fixes the starting storage to the end of the last committed hour,
+warm-starts from the previous solution shifted by the committed hours, solves
+and keeps the first `commit` hours. Memory stays at one window model no matter
+how long the price series is, so a full year of hourly tariffs (8760 periods)
+is processed as a sequence of small problems.
+"""
+
+import numpy as np
+import pandas as pd
+
+from pyomo.environ import Var, value, check_optimal_termination
+
+from watertap.core.solvers import get_solver
+
+from wrd.multiperiod.multiperiod_wrd import (
+    create_wrd_physical_mp,
+    initialize_wrd_physical_mp,
+)
+
+__all__ = [
+    "get_window_values",
+    "shift_window_solution",
+    "set_window_data",
+    "run_rolling_horizon",
+]
+
+solver = get_solver()
+
+result_columns = [
+    "elec_price",
+    "demand",
+    "train_feed_flow",
+    "water_prod",
+    "energy",
+    "energy_intensity",
+    "grid_cost",
+    "chem_cost",
+    "storage_level",
+]
+
+
+def get_window_values(x, start, window):
+    """
+    Values of the series x for the periods start to start + window. The last
+    window of a series runs past its end, so the series wraps around (hourly
+    tariffs repeat from the start of the year).
+    """
+    x = np.asarray(x, dtype=float)
+    return x[np.arange(start, start + window) % len(x)]
+
+
+def _get_blocks(m):
+    return [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+
+
+def shift_window_solution(m, shift):
+    """
+    Warm start for the next window: the feed flow (and pump speeds) of period
+    t are set to the previous solution of period t + shift, and the last
+    periods repeat the last solved value.
+    """
+    blocks = _get_blocks(m)
+    decisions = [
+        [v for v in b.fs.component_data_objects(Var) if not v.fixed] for b in blocks
+    ]
+    values = [[value(v) for v in d] for d in decisions]
+    for t, d in enumerate(decisions):
+        for v, x in zip(d, values[min(t + shift, len(blocks) - 1)]):
+            v.set_value(x)
+
+
+def set_window_data(m, elec_price, demand, initial_storage):
+    """
+    Update the window prices and demand (mutable Params) and the storage
+    level at the start of the window, then re-initialize the periods.
+    """
+    blocks = _get_blocks(m)
+    for b, p, d in zip(blocks, elec_price, demand):
+        b.fs.elec_price.set_value(p)
+        b.fs.demand.set_value(d)
+    first = blocks[0].fs
+    first.pre_storage_level.fix(initial_storage)
+    initialize_wrd_physical_mp(m)
+
+
+def run_rolling_horizon(
+    elec_price,
+    demand=None,
+    window=48,
+    commit=24,
+    n_periods=None,
+    initial_storage=2.5,
+    solver=None,
+    results_file=None,
+    **mp_kwargs,
+):
+    """
+    Solve the WRD schedule for a long price series with a receding horizon.
+
+    Args:
+        elec_price: electricity price per period ($/kWh)
+        demand: product demand per period (MG), a scalar or None for the
+            nominal production
+        window: number of periods optimized in each step
+        commit: number of periods kept from each step before shifting
+        n_periods: number of periods to schedule (default: len(elec_price))
+        initial_storage: product storage at the start of the first window (MG)
+        solver: solver used for every window (default: watertap get_solver)
+        results_file: optional csv file the committed periods are appended to
+            after every step
+        mp_kwargs: passed to create_wrd_physical_mp (num_trains, file,
+            storage_capacity, ...)
+
+    Returns:
+        DataFrame with one row per committed period and the termination
+        condition of the window it came from
+
+    Raises:
+        RuntimeError if a window is not solved to optimality, since its
+        storage level would be carried into every later window. The periods
+        committed before it are already in results_file.
+    """
+    if not 0 < commit <= window:
+        raise ValueError(
+            f"commit ({commit}) must be between 1 and the window length ({window})"
+        )
+    if solver is None:
+        solver = get_solver()
+    if n_periods is None:
+        n_periods = len(elec_price)
+
+    m = create_wrd_physical_mp(
+        n_time_points=window,
+        elec_price=get_window_values(elec_price, 0, window),
+        initial_storage=initial_storage,
+        **mp_kwargs,
+    )
+    blocks = _get_blocks(m)
+    if demand is None:
+        demand = value(blocks[0].fs.demand)
+    demand = np.broadcast_to(np.asarray(demand, dtype=float), (n_periods,))
+
+    storage = initial_storage
+    rows = []
+    for start in range(0, n_periods, commit):
+        if start > 0:
+            shift_window_solution(m, commit)
+        set_window_data(
+            m,
+            get_window_values(elec_price, start, window),
+            get_window_values(demand, start, window),
+            storage,
+        )
+        results = solver.solve(m)
+        status = str(results.solver.termination_condition)
+        if not check_optimal_termination(results):
+            raise RuntimeError(
+                f"Window starting at period {start} terminated with {status}"
+            )
+
+        step = []
+        for t, b in enumerate(blocks[: min(commit, n_periods - start)]):
+            row = {"period": start + t, "termination_condition": status}
+            for k in result_columns:
+                row[k] = value(getattr(b.fs, k))
+            step.append(row)
+        storage = step[-1]["storage_level"]
+        rows.extend(step)
+
+        if results_file is not None:
+            pd.DataFrame(step).set_index("period").to_csv(
+                results_file, mode="a" if start > 0 else "w", header=start == 0
+            )
+
+    return pd.DataFrame(rows).set_index("period")
+
+
+if __name__ == "__main__":
+    from wrd.multiperiod.tariffs import expand_tariff
+
+    # One year of hourly time-of-use prices
+    elec_price = expand_tariff("sce_tou_2021", "2021-01-01", "2022-01-01")
+    df = run_rolling_horizon(elec_price, window=48, commit=24)
+    print(df.describe())
@@ -0,0 +1,211 @@
+"""
+Electricity tariffs for the WRD multiperiod models.
+
+Time-of-use schedules, seasons and demand charges are read from a yaml file in
+wrd/meta_data (tariffs.yaml by default). Every tariff is turned once into a
+season lookup per month and a price table per season on a one minute grid, so
+expanding it over a date range is a single NumPy indexing operation. Expanded
+price vectors are cached and returned read-only.
+"""
+
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from wrd.utilities import load_config, get_config_file
+
+__all__ = [
+    "get_tariff",
+    "expand_tariff",
+    "get_tou_periods",
+    "get_daily_prices",
+    "get_demand_charges",
+    "get_invoice_prices",
+    "clear_tariff_cache",
+]
+
+minutes_per_day = 24 * 60
+
+
+def _get_tariff_file(file):
+    path = file if os.path.isfile(file) else get_config_file(file)
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return path, (stat.st_mtime_ns, stat.st_size)
+
+
+def get_tariff(name, file="tariffs.yaml"):
+    """
+    Get the configuration of a tariff from the tariff file.
+    """
+    path, _ = _get_tariff_file(file)
+    tariffs = load_config(path)["tariffs"]
+    if name not in tariffs:
+        raise KeyError(f"Tariff {name} not found in {path}: {list(tariffs)}")
+    return tariffs[name]
+
+
+@lru_cache(maxsize=None)
+def _build_tariff_tables(path, signature, name):
+    """
+    Season index per month (index 0 unused), and the price and period index
+    per season on a one minute grid over the day.
+    """
+    tariff = get_tariff(name, path)
+    seasons = list(tariff["seasons"])
+
+    season_of_month = np.full(13, -1)
+    for s, season in enumerate(seasons):
+        months = np.asarray(tariff["seasons"][season]["months"])
+        if (season_of_month[months] >= 0).any():
+            raise ValueError(f"Tariff {name}: season {season} overlaps another")
+        season_of_month[months] = s
+    if (season_of_month[1:] < 0).any():
+        missing = list(np.where(season_of_month[1:] < 0)[0] + 1)
+        raise ValueError(f"Tariff {name}: months {missing} have no season")
+
+    periods = []
+    price = np.full((len(seasons), minutes_per_day), np.nan)
+    period = np.full((len(seasons), minutes_per_day), -1)
+    for s, season in enumerate(seasons):
+        for name_p, cfg in tariff["seasons"][season]["periods"].items():
+            if name_p not in periods:
+                periods.append(name_p)
+            rate = cfg.get("delivery", 0) + cfg.get("generation", 0)
+            for start, end in cfg["hours"]:
+                i = slice(round(start * 60), round(end * 60))
+                if (period[s, i] >= 0).any():
+                    raise ValueError(
+                        f"Tariff {name}: period {name_p} overlaps another "
+                        f"period in {season}"
+                    )
+                price[s, i] = rate
+                period[s, i] = periods.index(name_p)
+        if (period[s] < 0).any():
+            raise ValueError(f"Tariff {name}: {season} hours are not all covered")
+
+    for table in (season_of_month, price, period):
+        table.flags.writeable = False
+    return seasons, periods, season_of_month, price, period
+
+
+def _get_times(start, end=None, periods=None, freq="h"):
+    if end is not None:
+        return pd.date_range(start, end, freq=freq, inclusive="left")
+    return pd.date_range(start, periods=periods, freq=freq)
+
+
+@lru_cache(maxsize=128)
+def _expand_tariff(path, signature, name, start, end, periods, freq):
+    _, _, season_of_month, price, period = _build_tariff_tables(path, signature, name)
+    times = _get_times(start, end=end, periods=periods, freq=freq)
+    season = season_of_month[times.month.values]
+    minute = times.hour.values * 60 + times.minute.values
+    prices = price[season, minute]
+    period_idx = period[season, minute]
+    for x in (prices, period_idx):
+        x.flags.writeable = False
+    return prices, period_idx
+
+
+def expand_tariff(name, start, end=None, periods=None, freq="h", file="tariffs.yaml"):
+    """
+    Electricity price (USD/kWh) at the start of every interval of a date range.
+
+    Args:
+        name: tariff name in the tariff file
+        start: first time step (anything pandas.Timestamp accepts)
+        end: end of the range (excluded), or use periods instead
+        periods: number of time steps
+        freq: pandas frequency of the time steps, e.g. "h" or "min"
+        file: tariff yaml file name in wrd/meta_data or a path
+
+    Returns:
+        read-only numpy array of prices
+    """
+    path, signature = _get_tariff_file(file)
+    return _expand_tariff(
+        path,
+        signature,
+        name,
+        pd.Timestamp(start),
+        None if end is None else pd.Timestamp(end),
+        periods,
+        freq,
+    )[0]
+
+
+def get_tou_periods(name, start, end=None, periods=None, freq="h", file="tariffs.yaml"):
+    """
+    Time-of-use period name for every interval of a date range.
+    """
+    path, signature = _get_tariff_file(file)
+    _, names, _, _, _ = _build_tariff_tables(path, signature, name)
+    _, period_idx = _expand_tariff(
+        path,
+        signature,
+        name,
+        pd.Timestamp(start),
+        None if end is None else pd.Timestamp(end),
+        periods,
+        freq,
+    )
+    return np.asarray(names)[period_idx]
+
+
+def get_daily_prices(name, season, freq="h", file="tariffs.yaml"):
+    """
+    Electricity price (USD/kWh) over one day of a season.
+    """
+    path, signature = _get_tariff_file(file)
+    seasons, _, _, price, _ = _build_tariff_tables(path, signature, name)
+    if season not in seasons:
+        raise KeyError(f"Season {season} not found in tariff {name}: {seasons}")
+    step = pd.Timedelta(pd.tseries.frequencies.to_offset(freq)).total_seconds()
+    minute = (np.arange(0, 24 * 3600, step) // 60).astype(int)
+    return price[seasons.index(season), minute].copy()
+
+
+def get_demand_charges(name, power, start, freq="h", file="tariffs.yaml"):
+    """
+    Monthly demand charges (USD) for a power profile.
+
+    Args:
+        name: tariff name in the tariff file
+        power: power (kW) for every time step starting at start
+        start: first time step
+        freq: pandas frequency of the time steps
+
+    Returns:
+        DataFrame with one row per month and one column per demand charge
+    """
+    power = np.asarray(power, dtype=float)
+    times = _get_times(start, periods=len(power), freq=freq)
+    months = times.to_period("M")
+    tou = get_tou_periods(name, start, periods=len(power), freq=freq, file=file)
+
+    charges = {}
+    for charge, cfg in get_tariff(name, file).get("demand_charges", {}).items():
+        if "periods" in cfg:
+            p = np.where(np.isin(tou, list(cfg["periods"])), power, 0)
+        else:
+            p = power
+        peak = pd.Series(p).groupby(months).max()
+        charges[charge] = cfg["rate"] * peak
+    return pd.DataFrame(charges, index=months.unique())
+
+
+def get_invoice_prices(name="grip_2021", file="tariffs.yaml"):
+    """
+    Monthly average electricity prices (USD/kWh) from utility invoices.
+    """
+    path, _ = _get_tariff_file(file)
+    invoices = load_config(path)["invoices"][name]
+    return {k: np.array(v) for k, v in invoices.items()}
+
+
+def clear_tariff_cache():
+    _build_tariff_tables.cache_clear()
+    _expand_tariff.cache_clear()
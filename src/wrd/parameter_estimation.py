@@ -0,0 +1,601 @@
+"""
+Multi-scenario estimation of the RO membrane parameters of the WRD stages.
+
+The water (A_comp) and salt (B_comp) permeability and the pressure drop of an
+RO stage are fitted to many operating days at once. Each day, i.e. each WRD
+input file (meta_data/wrd_inputs_*.yaml or the files written by
+wrd.historian), is one scenario: an RO block fed with the measured flow,
+conductivity, temperature and pump outlet pressure of the stage. Every
+scenario block is linked to one set of shared parameters and the weighted
+squared residuals of the measured recovery, brine concentration and brine
+pressure are minimized:
+
+    measurements = get_ro_measurements(files)
+    parameters, residuals = estimate_ro_parameters(measurements)
+    write_ro_parameters(parameters, files[-1], "wrd_inputs_recalibrated.yaml")
+
+Given the measured feed of each stage the stages are independent, so each
+stage is estimated separately (in parallel processes) and the scenario
+blocks of a stage can be initialized in parallel.
+"""
+
+import os
+import yaml
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+from pyomo.environ import (
+    ConcreteModel,
+    Set,
+    Var,
+    Param,
+    Expression,
+    Constraint,
+    Objective,
+    check_optimal_termination,
+    value,
+    units as pyunits,
+)
+from idaes.core import FlowsheetBlock
+from idaes.core.util.model_statistics import degrees_of_freedom
+from idaes.core.util.scaling import (
+    calculate_scaling_factors,
+    constraint_scaling_transform,
+    set_scaling_factor,
+)
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+
+from wrd.components.ro import (
+    build_ro,
+    get_ro_finite_elements,
+    set_ro_op_conditions,
+    set_ro_scaling,
+    initialize_ro,
+)
+from wrd.components.parallel_init import initialize_trains_parallel
+from wrd.utilities import load_config, get_config_file, get_config_value
+from wrd.utilities import get_wrd_solver
+from srp.utils.units import converted_value
+
+__all__ = [
+    "default_sigmas",
+    "get_ro_measurements",
+    "build_ro_estimation",
+    "set_ro_estimation_scaling",
+    "set_ro_estimation_op_conditions",
+    "set_ro_estimation_feeds",
+    "initialize_ro_estimation",
+    "solve_ro_estimation",
+    "get_ro_estimation_results",
+    "report_ro_estimation",
+    "estimate_ro_parameters",
+    "write_ro_parameters",
+]
+
+# Units of the measurement columns
+measurement_units = {
+    "feed_flow": pyunits.gallon / pyunits.minute,
+    "feed_conc": pyunits.g / pyunits.L,
+    "feed_temperature": pyunits.K,
+    "feed_pressure": pyunits.psi,
+    "recovery": pyunits.dimensionless,
+    "retentate_conc": pyunits.g / pyunits.L,
+    "retentate_pressure": pyunits.psi,
+}
+
+observations = ["recovery", "retentate_conc", "retentate_pressure"]
+
+# Standard deviation of each observation, in measurement_units
+default_sigmas = {
+    "recovery": 0.01,
+    "retentate_conc": 0.05,
+    "retentate_pressure": 1.0,
+}
+
+
+def _stage_value(config_data, key, stage_num, units=None):
+    # Value of a reverse_osmosis_1d stage entry, None if not in the file
+    try:
+        val = get_config_value(
+            config_data, key, "reverse_osmosis_1d", f"stage_{stage_num}"
+        )
+    except KeyError:
+        return None
+    return val if units is None else converted_value(val, units)
+
+
+def _pump_value(config_data, key, pump_num, units):
+    # Value of a pump entry, None if the pump or entry is not in the file
+    try:
+        val = get_config_value(config_data, key, "pumps", f"pump_{pump_num}")
+    except KeyError:
+        return None
+    return converted_value(val, units)
+
+
+def get_ro_measurements(files, stages=(1, 2, 3)):
+    """
+    Feed and observations of every RO stage in every input file, one row per
+    file and stage. The feed of stage N is the flow, conductivity and outlet
+    pressure of pump N; its brine is the feed of pump N + 1, upstream of the
+    TSRO header loss for stage 2. Observations not in a file are NaN.
+
+    Args:
+        files: WRD input files, one scenario (operating day) each
+        stages: RO stages
+
+    Returns:
+        DataFrame with the scenario name, file, stage and the
+        measurement_units columns
+    """
+    conductivity = pyunits.uS / pyunits.cm
+    rows = []
+    for file in files:
+        config_data = load_config(get_config_file(file))
+        conversion = converted_value(
+            get_config_value(
+                config_data, "feed_conductivity_conversion", "feed_stream"
+            ),
+            pyunits.g / pyunits.L / conductivity,
+        )
+        temperature = converted_value(
+            get_config_value(config_data, "feed_temperature", "feed_stream"),
+            pyunits.K,
+        )
+        for stage in stages:
+            feed_conductivity = _pump_value(
+                config_data, "feed_conductivity", stage, conductivity
+            )
+            brine_conductivity = _pump_value(
+                config_data, "feed_conductivity", stage + 1, conductivity
+            )
+            brine_pressure = _pump_value(
+                config_data, "pump_suction_pressure", stage + 1, pyunits.psi
+            )
+            header_loss = _stage_value(
+                config_data, "header_loss", stage + 1, pyunits.psi
+            )
+            if brine_pressure is not None and header_loss is not None:
+                brine_pressure -= header_loss
+            recovery = _stage_value(config_data, "water_recovery_mass_phase", stage)
+            rows.append(
+                {
+                    "scenario": os.path.splitext(os.path.basename(file))[0],
+                    "file": file,
+                    "stage": stage,
+                    "feed_flow": _pump_value(
+                        config_data,
+                        "pump_flowrate",
+                        stage,
+                        pyunits.gallon / pyunits.minute,
+                    ),
+                    "feed_conc": feed_conductivity * conversion,
+                    "feed_temperature": temperature,
+                    "feed_pressure": _pump_value(
+                        config_data, "pump_outlet_pressure", stage, pyunits.psi
+                    ),
+                    "recovery": recovery,
+                    "retentate_conc": (
+                        None
+                        if brine_conductivity is None
+                        else brine_conductivity * conversion
+                    ),
+                    "retentate_pressure": brine_pressure,
+                }
+            )
+    return pd.DataFrame(
+        rows, columns=["scenario", "file", "stage"] + list(measurement_units)
+    ).astype({k: float for k in measurement_units})
+
+
+def _predictions(blk):
+    # Model value of every observation of a scenario block, dimensionless in
+    # measurement_units
+    return {
+        "recovery": blk.unit.recovery_mass_phase_comp[0, "Liq", "H2O"],
+        "retentate_conc": pyunits.convert(
+            blk.disposal.properties[0].conc_mass_phase_comp["Liq", "NaCl"],
+            to_units=measurement_units["retentate_conc"],
+        )
+        / measurement_units["retentate_conc"],
+        "retentate_pressure": pyunits.convert(
+            blk.disposal.properties[0].pressure,
+            to_units=measurement_units["retentate_pressure"],
+        )
+        / measurement_units["retentate_pressure"],
+    }
+
+
+def build_ro_estimation(measurements, stage_num=1, finite_elements=None, sigmas=None):
+    """
+    Build the multi-scenario estimation model of one RO stage: one RO block
+    per scenario of measurements, built from the scenario's input file, the
+    shared A_comp, B_comp and deltaP linked to every block and the weighted
+    least squares objective over the observations that were measured.
+
+    Args:
+        measurements: DataFrame from get_ro_measurements
+        stage_num: RO stage to estimate
+        finite_elements: finite elements of the RO blocks, default from the
+            input file of the first scenario
+        sigmas: {observation: standard deviation}, default default_sigmas
+    """
+    if sigmas is None:
+        sigmas = default_sigmas
+    df = measurements[measurements["stage"] == stage_num].set_index("scenario")
+    if df.empty:
+        raise ValueError(f"No measurements for RO stage {stage_num}")
+    if not df.index.is_unique:
+        raise ValueError(f"Scenario names of RO stage {stage_num} must be unique")
+
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.stage_num = stage_num
+    m.fs.measurements = df
+
+    # All scenarios share the discretization of the first one
+    base_data = load_config(get_config_file(df["file"].iloc[0]))
+    m.fs.finite_elements = get_ro_finite_elements(base_data, stage_num, finite_elements)
+
+    m.fs.scenarios = Set(initialize=list(df.index), ordered=True)
+    m.fs.scenario = FlowsheetBlock(m.fs.scenarios, dynamic=False)
+    for s in m.fs.scenarios:
+        build_ro(
+            m.fs.scenario[s],
+            prop_package=m.fs.properties,
+            stage_num=stage_num,
+            file=df.loc[s, "file"],
+            finite_elements=m.fs.finite_elements,
+        )
+
+    m.fs.A_comp = Var(
+        initialize=_stage_value(base_data, "A_comp", stage_num),
+        bounds=(1e-13, 1e-9),
+        units=pyunits.m / pyunits.s / pyunits.Pa,
+        doc="Shared solvent permeability coefficient",
+    )
+    m.fs.B_comp = Var(
+        initialize=_stage_value(base_data, "B_comp", stage_num),
+        bounds=(1e-10, 1e-5),
+        units=pyunits.m / pyunits.s,
+        doc="Shared solute permeability coefficient",
+    )
+    m.fs.deltaP = Var(
+        initialize=_stage_value(base_data, "pressure_drop", stage_num, pyunits.Pa),
+        bounds=(None, 0),
+        units=pyunits.Pa,
+        doc="Shared pressure drop",
+    )
+
+    m.fs.eq_A_comp = Constraint(
+        m.fs.scenarios,
+        rule=lambda b, s: b.scenario[s].unit.A_comp[0, "H2O"] == b.A_comp,
+    )
+    m.fs.eq_B_comp = Constraint(
+        m.fs.scenarios,
+        rule=lambda b, s: b.scenario[s].unit.B_comp[0, "NaCl"] == b.B_comp,
+    )
+    m.fs.eq_deltaP = Constraint(
+        m.fs.scenarios,
+        rule=lambda b, s: b.scenario[s].unit.deltaP[0] == b.deltaP,
+    )
+
+    m.fs.observations = Set(
+        dimen=2,
+        initialize=[
+            (s, k)
+            for s in m.fs.scenarios
+            for k in observations
+            if pd.notna(df.loc[s, k])
+        ],
+        ordered=True,
+    )
+    m.fs.measured = Param(
+        m.fs.observations,
+        mutable=True,
+        initialize={(s, k): df.loc[s, k] for s, k in m.fs.observations},
+        doc="Measured value of each observation, in measurement_units",
+    )
+    m.fs.sigma = Param(
+        observations,
+        mutable=True,
+        initialize={k: sigmas[k] for k in observations},
+        doc="Standard deviation of each observation, in measurement_units",
+    )
+    m.fs.predicted = Expression(
+        m.fs.observations,
+        rule=lambda b, s, k: _predictions(b.scenario[s])[k],
+    )
+    m.fs.objective = Objective(
+        expr=sum(
+            ((m.fs.predicted[s, k] - m.fs.measured[s, k]) / m.fs.sigma[k]) ** 2
+            for s, k in m.fs.observations
+        )
+    )
+
+    m.fs.properties.set_default_scaling(
+        "flow_mass_phase_comp", 1e-1, index=("Liq", "H2O")
+    )
+    m.fs.properties.set_default_scaling(
+        "flow_mass_phase_comp", 1e2, index=("Liq", "NaCl")
+    )
+
+    return m
+
+
+def set_ro_estimation_scaling(m):
+    """
+    Scaling of the scenario blocks and of the shared parameters.
+    """
+    for s in m.fs.scenarios:
+        set_ro_scaling(m.fs.scenario[s])
+    set_scaling_factor(m.fs.A_comp, 1e12)
+    set_scaling_factor(m.fs.B_comp, 1e8)
+    set_scaling_factor(m.fs.deltaP, 1e-4)
+    for c in m.fs.eq_A_comp.values():
+        constraint_scaling_transform(c, 1e12)
+    for c in m.fs.eq_B_comp.values():
+        constraint_scaling_transform(c, 1e8)
+    for c in m.fs.eq_deltaP.values():
+        constraint_scaling_transform(c, 1e-4)
+
+
+def set_ro_estimation_op_conditions(m):
+    """
+    Operating conditions of every scenario block from its input file, with
+    the membrane parameters released to the shared ones. The pressure drop
+    is only fitted if a brine pressure was measured.
+    """
+    for s in m.fs.scenarios:
+        blk = m.fs.scenario[s]
+        set_ro_op_conditions(blk)
+        blk.unit.A_comp.unfix()
+        blk.unit.B_comp.unfix()
+        blk.unit.deltaP.unfix()
+
+    m.fs.A_comp.unfix()
+    m.fs.B_comp.unfix()
+    if any(k == "retentate_pressure" for _, k in m.fs.observations):
+        m.fs.deltaP.unfix()
+    else:
+        m.fs.deltaP.fix()
+
+
+def set_ro_estimation_feeds(m):
+    """
+    Fix the feed of every scenario block to its measured flow,
+    concentration, temperature and pressure.
+    """
+    units = measurement_units
+    for s in m.fs.scenarios:
+        row = m.fs.measurements.loc[s]
+        m.fs.scenario[s].feed.properties.calculate_state(
+            var_args={
+                ("flow_vol_phase", ("Liq")): row["feed_flow"] * units["feed_flow"],
+                ("conc_mass_phase_comp", ("Liq", "NaCl")): row["feed_conc"]
+                * units["feed_conc"],
+                ("pressure", None): row["feed_pressure"] * units["feed_pressure"],
+                ("temperature", None): row["feed_temperature"]
+                * units["feed_temperature"],
+            },
+            hold_state=True,
+        )
+
+
+def initialize_ro_estimation(m, parallel=False, max_workers=None):
+    """
+    Initialize every scenario block at the current shared parameters, in
+    separate worker processes if parallel. The scenario blocks are
+    independent while their parameters are fixed.
+    """
+    blks = [m.fs.scenario[s] for s in m.fs.scenarios]
+    for blk in blks:
+        blk.unit.A_comp[0, "H2O"].fix(value(m.fs.A_comp))
+        blk.unit.B_comp[0, "NaCl"].fix(value(m.fs.B_comp))
+        blk.unit.deltaP[0].fix(value(m.fs.deltaP))
+
+    if parallel and len(blks) > 1:
+        initialize_trains_parallel(
+            blks,
+            "ro",
+            max_workers=max_workers,
+            block_kwargs=[
+                {"file": m.fs.measurements.loc[s, "file"]} for s in m.fs.scenarios
+            ],
+            stage_num=m.fs.stage_num,
+            finite_elements=m.fs.finite_elements,
+        )
+    else:
+        for blk in blks:
+            initialize_ro(blk)
+
+    for blk in blks:
+        blk.unit.A_comp.unfix()
+        blk.unit.B_comp.unfix()
+        blk.unit.deltaP.unfix()
+
+
+def solve_ro_estimation(m, solver=None, tee=False):
+    """
+    Solve the estimation problem of all scenarios at once.
+    """
+    if solver is None:
+        solver = get_wrd_solver()
+    dof = degrees_of_freedom(m)
+    if dof <= 0:
+        raise ValueError(
+            f"RO stage {m.fs.stage_num} estimation has {dof} degrees of freedom, "
+            "the shared parameters must be unfixed"
+        )
+    return solver.solve(m, tee=tee)
+
+
+def get_ro_estimation_results(m, results=None):
+    """
+    Fitted parameters and residuals of a solved estimation model.
+
+    Returns:
+        (dict with the stage, fitted A_comp (m/s/Pa), B_comp (m/s),
+        pressure_drop (psi), objective, number of scenarios and observations
+        and termination condition, DataFrame with the measured and predicted
+        value and weighted residual of every observation)
+    """
+    parameters = {
+        "stage": m.fs.stage_num,
+        "A_comp": value(m.fs.A_comp),
+        "B_comp": value(m.fs.B_comp),
+        "pressure_drop": converted_value(m.fs.deltaP, pyunits.psi),
+        "pressure_drop_fitted": not m.fs.deltaP.fixed,
+        "objective": value(m.fs.objective),
+        "scenarios": len(m.fs.scenarios),
+        "observations": len(m.fs.observations),
+        "termination_condition": (
+            None if results is None else str(results.solver.termination_condition)
+        ),
+    }
+    residuals = pd.DataFrame(
+        [
+            {
+                "stage": m.fs.stage_num,
+                "scenario": s,
+                "observation": k,
+                "measured": value(m.fs.measured[s, k]),
+                "predicted": value(m.fs.predicted[s, k]),
+                "residual": value(
+                    (m.fs.predicted[s, k] - m.fs.measured[s, k]) / m.fs.sigma[k]
+                ),
+            }
+            for s, k in m.fs.observations
+        ],
+        columns=[
+            "stage",
+            "scenario",
+            "observation",
+            "measured",
+            "predicted",
+            "residual",
+        ],
+    )
+    return parameters, residuals
+
+
+def report_ro_estimation(m, w=25):
+    title = f"RO Stage {m.fs.stage_num} Estimation Report"
+    side = int(((3 * w) - len(title)) / 2) - 1
+    header = "=" * side + f" {title} " + "=" * side
+    print(f"\n{header}\n")
+    print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
+    print(f"{'-' * (3 * w)}")
+    print(f'{"Scenarios":<{w}s}{len(m.fs.scenarios):<{w}d}{"-"}')
+    print(f'{"A_comp":<{w}s}{value(m.fs.A_comp):<{w}.4e}{"m/s/Pa"}')
+    print(f'{"B_comp":<{w}s}{value(m.fs.B_comp):<{w}.4e}{"m/s"}')
+    print(f'{"∆P":<{w}s}{converted_value(m.fs.deltaP, pyunits.psi):<{w}.3f}{"psi"}')
+    print(f'{"Objective":<{w}s}{value(m.fs.objective):<{w}.4f}{"-"}')
+
+    print(f"\n{'Scenario':<{w}s}{'Observation':<{w}s}{'Measured/Predicted':<{w}s}")
+    print(f"{'-' * (3 * w)}")
+    for s, k in m.fs.observations:
+        print(
+            f"{s:<{w}s}{k:<{w}s}"
+            f"{value(m.fs.measured[s, k]):.4g} / {value(m.fs.predicted[s, k]):.4g}"
+        )
+
+
+def _estimate_stage(
+    measurements,
+    stage_num,
+    finite_elements=None,
+    sigmas=None,
+    parallel_init=False,
+    tee=False,
+):
+    m = build_ro_estimation(
+        measurements,
+        stage_num=stage_num,
+        finite_elements=finite_elements,
+        sigmas=sigmas,
+    )
+    set_ro_estimation_scaling(m)
+    calculate_scaling_factors(m)
+    set_ro_estimation_op_conditions(m)
+    set_ro_estimation_feeds(m)
+    initialize_ro_estimation(m, parallel=parallel_init)
+    results = solve_ro_estimation(m, tee=tee)
+    if not check_optimal_termination(results):
+        print(f"RO stage {stage_num} estimation did not converge")
+    return get_ro_estimation_results(m, results)
+
+
+def estimate_ro_parameters(
+    measurements,
+    stages=None,
+    finite_elements=None,
+    sigmas=None,
+    parallel=True,
+    max_workers=None,
+    tee=False,
+):
+    """
+    Fit A_comp, B_comp and the pressure drop of every RO stage to all
+    scenarios of measurements. If parallel, each stage is estimated in its
+    own worker process, or the scenario blocks are initialized in parallel
+    when there is only one stage.
+
+    Args:
+        measurements: DataFrame from get_ro_measurements
+        stages: RO stages to estimate, default all stages in measurements
+        finite_elements: finite elements of the RO blocks
+        sigmas: {observation: standard deviation}, default default_sigmas
+        parallel: estimate the stages in parallel
+        max_workers: maximum number of worker processes
+        tee: show the solver output
+
+    Returns:
+        (DataFrame with the fitted parameters of every stage, DataFrame with
+        the residuals of every observation)
+    """
+    if stages is None:
+        stages = sorted(measurements["stage"].unique())
+    kwargs = dict(finite_elements=finite_elements, sigmas=sigmas, tee=tee)
+
+    if parallel and len(stages) > 1:
+        if max_workers is None:
+            max_workers = min(len(stages), os.cpu_count())
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_estimate_stage, measurements, stage, **kwargs)
+                for stage in stages
+            ]
+            stage_results = [f.result() for f in futures]
+    else:
+        stage_results = [
+            _estimate_stage(measurements, stage, parallel_init=parallel, **kwargs)
+            for stage in stages
+        ]
+
+    parameters = pd.DataFrame([p for p, _ in stage_results])
+    residuals = pd.concat([r for _, r in stage_results], ignore_index=True)
+    return parameters, residuals
+
+
+def write_ro_parameters(parameters, base_file, path):
+    """
+    Write a copy of an input file with the fitted A_comp, B_comp and pressure
+    drop of every stage in parameters, and return its absolute path.
+    """
+    with open(get_config_file(base_file), "r") as f:
+        config_data = yaml.safe_load(f)
+    for _, row in parameters.iterrows():
+        stage = config_data["reverse_osmosis_1d"][f"stage_{int(row['stage'])}"]
+        stage["A_comp"] = float(row["A_comp"])
+        stage["B_comp"] = float(row["B_comp"])
+        if row.get("pressure_drop_fitted", True):
+            stage["pressure_drop"] = {
+                "value": float(row["pressure_drop"]),
+                "units": "psi",
+            }
+    path = os.path.abspath(path)
+    with open(path, "w") as f:
+        yaml.safe_dump(config_data, f, sort_keys=False)
+    return path
@@ -0,0 +1,150 @@
+import os
+import json
+import numpy as np
+
+from pyomo.environ import Var, value, units as pyunits
+
+from wrd.wrd_treatment_train import get_wrd_ro_blocks
+
+__all__ = [
+    "SolutionStore",
+    "get_wrd_structure",
+    "get_wrd_operating_point",
+]
+
+
+def get_wrd_structure(m):
+    """
+    Structural key of a WRD flowsheet. Stored solutions are only reused on
+    models with the same config file, number of trains/stages and RO mesh.
+    """
+    # str keys so the structure compares equal after a json round trip
+    finite_elements = {
+        str(stage_num): blk.finite_elements for stage_num, blk in get_wrd_ro_blocks(m)
+    }
+    return {
+        "file": os.path.basename(m.file),
+        "num_pro_trains": m.num_pro_trains,
+        "num_tsro_trains": m.num_tsro_trains,
+        "num_stages": m.num_stages,
+        "symmetric_trains": getattr(m, "symmetric_trains", False),
+        "finite_elements": finite_elements,
+    }
+
+
+def get_wrd_operating_point(m):
+    """
+    Operating point of a WRD flowsheet: feed flow, concentration and
+    temperature plus every fixed pump outlet pressure.
+    """
+    feed = m.fs.feed.properties[0]
+    point = {
+        "feed_flow": value(
+            pyunits.convert(
+                feed.flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute
+            )
+        ),
+        "feed_conc": value(
+            pyunits.convert(
+                feed.conc_mass_phase_comp["Liq", "NaCl"],
+                to_units=pyunits.g / pyunits.L,
+            )
+        ),
+        "feed_temperature": value(feed.temperature),
+    }
+    for v in m.fs.component_data_objects(Var):
+        if v.fixed and ".pump.unit." in v.name and v.local_name == "pressure":
+            point[v.name] = value(pyunits.convert(v, to_units=pyunits.psi))
+
+    return point
+
+
+class SolutionStore:
+    """
+    Store of converged WRD flowsheet solutions keyed by operating point.
+    A new model can be seeded from the nearest stored solution with the
+    same structure instead of running the sequential initialization.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = []
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, m):
+        """
+        Save the current variable values of m. Call after a converged solve.
+        """
+        entry = {
+            "structure": get_wrd_structure(m),
+            "point": get_wrd_operating_point(m),
+            "values": {
+                v.name: v.value
+                for v in m.component_data_objects(Var)
+                if v.value is not None
+            },
+        }
+        self.entries.append(entry)
+        return entry
+
+    def nearest(self, m, max_distance=None):
+        """
+        Return the stored entry closest to the operating point of m, or None
+        if there is no entry with the same structure (or none closer than
+        max_distance). Distance is the root-mean-square relative difference
+        over the operating point inputs.
+        """
+        structure = get_wrd_structure(m)
+        point = get_wrd_operating_point(m)
+        keys = sorted(point)
+        x = np.array([point[k] for k in keys])
+
+        candidates = [
+            e
+            for e in self.entries
+            if e["structure"] == structure and sorted(e["point"]) == keys
+        ]
+        if not candidates:
+            return None
+
+        X = np.array([[e["point"][k] for k in keys] for e in candidates])
+        scale = np.maximum(np.abs(x), 1e-8)
+        dist = np.sqrt(np.mean(((X - x) / scale) ** 2, axis=1))
+        i = int(np.argmin(dist))
+        if max_distance is not None and dist[i] > max_distance:
+            return None
+
+        return candidates[i]
+
+    def warm_start(self, m, max_distance=None):
+        """
+        Set the values of all unfixed variables on m from the nearest stored
+        solution. Returns True if a solution was found and applied.
+        """
+        entry = self.nearest(m, max_distance=max_distance)
+        if entry is None:
+            return False
+
+        for name, val in entry["values"].items():
+            v = m.find_component(name)
+            if v is None or v.fixed:
+                continue
+            v.set_value(val, skip_validation=True)
+
+        return True
+
+    def save(self, path=None):
+        if path is None:
+            path = self.path
+        if path is None:
+            raise ValueError("A path must be provided to save the solution store.")
+        with open(path, "w") as f:
+            json.dump({"entries": self.entries}, f)
+
+    def load(self, path):
+        with open(path, "r") as f:
+            self.entries.extend(json.load(f)["entries"])
@@ -0,0 +1,157 @@
+import pytest
+import numpy as np
+
+from pyomo.environ import ConcreteModel, value, units as pyunits
+
+from idaes.core import FlowsheetBlock, UnitModelCostingBlock
+from watertap.costing import WaterTAPCosting
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+
+from models import ChemicalAddition
+from srp.utils import compute_lazy_properties
+from wrd.components.chemical_dosing import (
+    wrd_chemicals,
+    get_chemical_dosing_data,
+    chemical_dose_flows,
+    evaluate_chemical_doses,
+    total_chemical_cost,
+)
+
+
+def build_chem_addition_model(chemical, flow, dose):
+    # Explicit chemical addition unit with the chemical catalog data
+    data = get_chemical_dosing_data(chemical, file=None)
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.costing = WaterTAPCosting()
+    m.fs.costing.base_currency = pyunits.USD_2021
+    m.fs.unit = ChemicalAddition(
+        property_package=m.fs.properties,
+        chemical=chemical,
+        chemical_data={
+            "solution_density": data["solution_density"],
+            "ratio_in_solution": data["ratio_in_solution"],
+        },
+        explicit=True,
+    )
+    m.fs.unit.dose.fix(dose)
+    sb = m.fs.unit.properties[0]
+    sb.flow_mass_phase_comp["Liq", "H2O"].fix(flow * 1000)
+    sb.flow_mass_phase_comp["Liq", "NaCl"].fix(flow * 0.5)
+    sb.temperature.fix(300)
+    sb.pressure.fix(101325)
+    compute_lazy_properties(sb)
+
+    m.fs.unit.costing = UnitModelCostingBlock(flowsheet_costing_block=m.fs.costing)
+    return m
+
+
+@pytest.mark.unit
+def test_get_chemical_dosing_data():
+    data = get_chemical_dosing_data("sulfuric_acid")
+    assert data["dose"] == pytest.approx(41.49e-3)
+    assert data["solution_density"] == pytest.approx(1840)
+    assert data["ratio_in_solution"] == pytest.approx(0.93)
+    assert data["purity"] == 1
+    assert not data["volumetric_cost"]
+    # 188.76 USD_2021/ton
+    assert data["unit_cost"] == pytest.approx(188.76 / 907.18474)
+
+    data = get_chemical_dosing_data("sodium_bisulfite", file=None)
+    assert data["dose"] is None
+    assert data["volumetric_cost"]
+    assert data["solution_density"] == 1480
+    # 1.405 USD_2021/gallon
+    assert data["unit_cost"] == pytest.approx(1.405 * 264.172052, rel=1e-6)
+
+    with pytest.raises(KeyError, match="No costing data for polymer"):
+        get_chemical_dosing_data("polymer")
+
+
+@pytest.mark.unit
+def test_chemical_dose_flows():
+    flow = np.array([0.1, 0.5, 1.0])
+    res = chemical_dose_flows(flow, 0.01, 1200, 0.4)
+    assert res["chemical_flow_mass"] == pytest.approx(flow * 0.01)
+    assert res["chemical_soln_flow_vol"] == pytest.approx(flow * 0.01 / 480)
+    assert res["chemical_soln_flow_mass"] == pytest.approx(flow * 0.01 / 0.4)
+    assert res["pumping_power"] == pytest.approx(
+        flow * 0.01 * 10 * 9.80665 / 0.75 / 1000
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chemical", ["sodium_bisulfite", "hydrochloric_acid"])
+def test_evaluate_chemical_doses_matches_model(chemical):
+    flow, dose = 0.5, 0.02
+    m = build_chem_addition_model(chemical, flow, dose)
+    flow_vol = value(m.fs.unit.properties[0].flow_vol_phase["Liq"])
+
+    results = evaluate_chemical_doses(
+        [flow_vol, 2 * flow_vol],
+        doses={chemical: dose * 1000},
+        chemicals=[chemical],
+        file=None,
+    )
+    res = results[chemical]
+    for v in [
+        "chemical_flow_mass",
+        "chemical_soln_flow_vol",
+        "chemical_soln_flow_mass",
+        "pumping_power",
+    ]:
+        assert res[v][0] == pytest.approx(value(getattr(m.fs.unit, v)), rel=1e-8)
+        assert res[v][1] == pytest.approx(2 * res[v][0], rel=1e-12)
+
+    # Cost rate of the flow registered with the costing package
+    cost_blk = m.fs.costing.component(chemical)
+    (costed_flow,) = m.fs.costing._registered_flows[chemical]
+    assert res["cost_rate"][0] == pytest.approx(
+        value(
+            pyunits.convert(
+                cost_blk.cost / cost_blk.purity * costed_flow,
+                to_units=pyunits.USD_2021 / pyunits.s,
+            )
+        ),
+        rel=1e-8,
+    )
+
+
+@pytest.mark.unit
+def test_total_chemical_cost():
+    # One day of minute data at 10800 gpm with the WRD input file doses
+    flow = np.full(24 * 60, 10800.0)
+    results = evaluate_chemical_doses(flow, flow_units=pyunits.gallon / pyunits.min)
+    assert list(results) == wrd_chemicals
+    # Daily solution flows close to the plant chemicals report for 8/19/21
+    gpd = {
+        c: res["chemical_soln_flow_vol"][0] * 86400 * 264.172052
+        for c, res in results.items()
+    }
+    assert gpd["sodium_hypochlorite"] == pytest.approx(871, rel=0.05)
+    assert gpd["calcium_hydroxide"] == pytest.approx(555, rel=0.15)
+
+    costs = total_chemical_cost(results, time_step=1)
+    assert costs["total"] == pytest.approx(
+        sum(costs[c] for c in wrd_chemicals), rel=1e-12
+    )
+    assert costs["sulfuric_acid"] == pytest.approx(
+        np.sum(results["sulfuric_acid"]["cost_rate"]) * 60, rel=1e-12
+    )
+    daily = total_chemical_cost(
+        results, time_step=1 / (24 * 60), time_units=pyunits.day
+    )
+    assert daily["total"] == pytest.approx(costs["total"], rel=1e-12)
+
+    # Dose arrays, e.g. a dose scenario per flow point
+    doses = {"sulfuric_acid": np.linspace(0, 50, flow.size)}
+    results = evaluate_chemical_doses(
+        flow,
+        doses=doses,
+        chemicals=["sulfuric_acid"],
+        flow_units=pyunits.gallon / pyunits.min,
+    )
+    assert results["sulfuric_acid"]["cost_rate"][0] == 0
+    with pytest.raises(ValueError, match="Dose must be provided for lime"):
+        evaluate_chemical_doses(flow, chemicals=["lime"])
@@ -0,0 +1,115 @@
+import logging
+import pytest
+import numpy as np
+import pandas as pd
+
+from wrd.historian import (
+    default_tags,
+    aggregate_historian,
+    add_tds,
+    make_input_record,
+    validate_input_record,
+    iter_input_records,
+    write_input_records,
+)
+from wrd.utilities import load_config, get_config_file, get_config_value
+from wrd.wrd_treatment_train import build_wrd_system
+
+
+def write_historian(path, days=3):
+    # Minute data with a day of negative pressure drop readings in between
+    n = days * 24 * 60
+    rng = np.random.default_rng(1)
+    df = pd.DataFrame(
+        {
+            "timestamp": pd.date_range("2021-08-18", periods=n, freq="min"),
+            "feed_flow": 2650 + rng.normal(0, 20, n),
+            "feed_conductivity": 1080 + rng.normal(0, 5, n),
+            "feed_temperature": 29 + rng.normal(0, 0.2, n),
+            "pump_1_suction_pressure": 35.4,
+            "pump_1_outlet_pressure": 142 + rng.normal(0, 1, n),
+            "stage_1_pressure_drop": -10.7,
+            "not_a_tag": 1.0,
+        }
+    )
+    df.loc[df.timestamp.dt.day == 19, "stage_1_pressure_drop"] = 10.7
+    # Bad reading, ignored in the mean
+    df["feed_flow"] = df["feed_flow"].astype(object)
+    df.loc[5, "feed_flow"] = "Bad"
+    df.to_csv(path, index=False)
+    return df
+
+
+@pytest.mark.unit
+def test_aggregate_historian(tmp_path):
+    path = tmp_path / "historian.csv"
+    df = write_historian(path)
+    # Chunks not aligned with the intervals
+    agg = aggregate_historian(path, chunksize=1000)
+    assert list(agg.index) == list(pd.date_range("2021-08-18", periods=3))
+    assert "not_a_tag" not in agg
+    assert (agg["samples"] == 1440).all()
+
+    df["feed_flow"] = pd.to_numeric(df["feed_flow"], errors="coerce")
+    expected = df.drop(columns="not_a_tag").set_index("timestamp").resample("1D")
+    expected = expected.mean()
+    for col in expected:
+        assert agg[col].values == pytest.approx(expected[col].values, rel=1e-12)
+
+    hourly = aggregate_historian(path, interval="1h", chunksize=7000)
+    assert len(hourly) == 72
+    assert (hourly["samples"] == 60).all()
+
+    agg = add_tds(agg)
+    assert agg["feed_conductivity_tds"].values == pytest.approx(
+        0.5 * agg["feed_conductivity"].values
+    )
+
+    with pytest.raises(KeyError, match="Time column time not found"):
+        aggregate_historian(path, time_column="time")
+
+
+@pytest.mark.unit
+def test_input_records(tmp_path, caplog):
+    path = tmp_path / "historian.csv"
+    write_historian(path)
+    tags = dict(default_tags)
+    tags["feed_temperature"] = (tags["feed_temperature"][0], "degC")
+
+    row = pd.Series({"feed_flow": 2000.0, "feed_temperature": 25.0})
+    record = make_input_record(row, tags=tags)
+    assert record["feed_stream"]["feed_flow_water"] == {
+        "value": 2000,
+        "units": "gal/min",
+    }
+    assert record["feed_stream"]["feed_temperature"]["value"] == pytest.approx(298.15)
+    # Values not in the historian come from the base file
+    assert record["pumps"]["pump_2"]["pump_outlet_pressure"]["value"] == 160.5
+    assert validate_input_record(record) == []
+
+    record["pumps"]["pump_1"]["pump_outlet_pressure"]["value"] = 30
+    record["feed_stream"]["feed_flow_water"]["value"] = float("nan")
+    problems = validate_input_record(record)
+    assert len(problems) == 2
+    assert "feed_stream.feed_flow_water is not finite" in problems
+    assert "pumps.pump_1.pump_outlet_pressure not above" in problems[1]
+
+    with caplog.at_level(logging.WARNING):
+        records = list(iter_input_records(path, tags=tags, chunksize=1000))
+    assert [str(start.date()) for start, _ in records] == ["2021-08-18", "2021-08-20"]
+    assert "reverse_osmosis_1d.stage_1.pressure_drop positive" in caplog.text
+    with pytest.raises(ValueError, match="Invalid historian interval 2021-08-19"):
+        list(iter_input_records(path, tags=tags, skip_invalid=False))
+    assert len(list(iter_input_records(path, tags=tags, min_samples=2000))) == 0
+
+    # Written records are input files the builders take directly
+    files = write_input_records(records, tmp_path / "inputs")
+    assert len(files) == 2
+    assert files[0].endswith("wrd_inputs_2021-08-18.yaml")
+    config = load_config(get_config_file(files[0]))
+    assert config["historian"]["samples"] == 1440
+    m = build_wrd_system(num_pro_trains=1, file=files[0])
+    flow = get_config_value(m.fs.config_data, "feed_flow_water", "feed_stream")
+    assert flow() == pytest.approx(
+        records[0][1]["feed_stream"]["feed_flow_water"]["value"]
+    )
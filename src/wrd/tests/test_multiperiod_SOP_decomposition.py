@@ -0,0 +1,156 @@
+import itertools
+
+import pytest
+import numpy as np
+
+from wrd.multiperiod.multiperiod_SOP_decomposition import (
+    _solve_subproblems,
+    _transition_cost,
+    get_train_modes,
+    evaluate_train_schedule,
+    solve_train_schedule_lagrangian,
+)
+
+modes = {
+    "production": [0, 0.3, 0.6],
+    "power": [0, 120, 200],
+    "cost": [0, 5, 10],
+}
+elec_price = np.array([0.08, 0.3, 0.05, 0.2])
+
+
+def brute_force(elec_price, num_trains, daily_target, periods_per_day, startup_cost):
+    num_periods = len(elec_price)
+    day = np.arange(num_periods) // periods_per_day
+    best = np.inf
+    for x in itertools.product(range(3), repeat=num_trains * num_periods):
+        schedule = np.reshape(x, (num_trains, num_periods))
+        cost, prod = evaluate_train_schedule(
+            schedule, elec_price, modes, startup_cost=startup_cost
+        )
+        if (np.bincount(day, weights=prod) >= np.array(daily_target) - 1e-9).all():
+            best = min(best, cost)
+    return best
+
+
+@pytest.mark.unit
+def test_subproblem_matches_brute_force():
+    rng = np.random.default_rng(0)
+    stage_cost = rng.uniform(-1, 1, (2, 5, 3))
+    production = np.array([[0, 1, 2], [0, 1, 2]])
+    transition = _transition_cost(production, [0.5, 2])
+    schedule, cost = _solve_subproblems(stage_cost, transition, np.zeros(2, int))
+
+    for k in range(2):
+        best = np.inf
+        for x in itertools.product(range(3), repeat=5):
+            previous = (0,) + x[:-1]
+            c = sum(stage_cost[k, t, x[t]] for t in range(5))
+            c += sum(transition[k, i, j] for i, j in zip(previous, x))
+            best = min(best, c)
+        assert cost[k] == pytest.approx(best)
+        previous = np.concatenate([[0], schedule[k, :-1]])
+        assert stage_cost[k, np.arange(5), schedule[k]].sum() + transition[
+            k, previous, schedule[k]
+        ].sum() == pytest.approx(best)
+
+
+@pytest.mark.unit
+def test_lagrangian_bounds_brute_force():
+    daily_target = [1.2, 1.5]
+    optimum = brute_force(
+        elec_price,
+        num_trains=2,
+        daily_target=daily_target,
+        periods_per_day=2,
+        startup_cost=8,
+    )
+    results = solve_train_schedule_lagrangian(
+        elec_price,
+        modes=modes,
+        num_trains=2,
+        daily_target=daily_target,
+        periods_per_day=2,
+        startup_cost=8,
+        max_iter=200,
+    )
+    assert results["lower_bound"] <= optimum + 1e-9
+    assert results["cost"] >= optimum - 1e-9
+    assert results["cost"] == pytest.approx(optimum, rel=0.05)
+    assert (results["daily_production"] >= np.array(daily_target) - 1e-9).all()
+
+    cost, _ = evaluate_train_schedule(
+        results["schedule"], elec_price, modes, startup_cost=8
+    )
+    assert cost == pytest.approx(results["cost"])
+
+    history = results["history"]
+    assert list(history.columns) == [
+        "lower_bound",
+        "best_lower_bound",
+        "upper_bound",
+        "gap",
+        "step_scale",
+        "time",
+    ]
+    assert (history["gap"] >= -1e-9).all()
+    assert history["gap"].iloc[-1] == pytest.approx(results["gap"])
+
+
+@pytest.mark.unit
+def test_lagrangian_month_horizon():
+    rng = np.random.default_rng(1)
+    price = np.tile(np.r_[np.full(16, 0.08), np.full(5, 0.2), np.full(3, 0.08)], 30)
+    price = price + rng.uniform(0, 0.01, len(price))
+    results = solve_train_schedule_lagrangian(
+        price, modes=modes, num_trains=8, startup_cost=20, max_iter=30, tol=0.01
+    )
+    assert results["schedule"].shape == (8, 720)
+    assert len(results["daily_production"]) == 30
+    assert (results["daily_production"] >= results["daily_target"] - 1e-9).all()
+    assert results["gap"] < 0.05
+
+
+@pytest.mark.unit
+def test_period_length():
+    # Power in kW is billed per kWh, so 2 h periods cost twice the electricity
+    schedule = np.array([[2, 2, 1, 0], [0, 1, 2, 2]])
+    cost, _ = evaluate_train_schedule(schedule, elec_price, modes)
+    cost_2h, _ = evaluate_train_schedule(schedule, elec_price, modes, period_length=2)
+    energy_cost = np.sum(elec_price * np.array(modes["power"])[schedule])
+    assert cost_2h - cost == pytest.approx(energy_cost)
+
+    results = solve_train_schedule_lagrangian(
+        elec_price,
+        modes=modes,
+        num_trains=2,
+        daily_target=[1.2, 1.5],
+        periods_per_day=2,
+        period_length=12,
+        max_iter=200,
+    )
+    cost, _ = evaluate_train_schedule(
+        results["schedule"], elec_price, modes, period_length=12
+    )
+    assert cost == pytest.approx(results["cost"])
+    assert results["lower_bound"] <= results["cost"] + 1e-9
+
+
+@pytest.mark.unit
+def test_infeasible_target():
+    with pytest.raises(ValueError, match="exceed the plant capacity"):
+        solve_train_schedule_lagrangian(
+            elec_price, modes=modes, num_trains=1, daily_target=10
+        )
+
+
+@pytest.mark.unit
+def test_get_train_modes():
+    df = get_train_modes(flow_fracs=(0, 0.5, 1))
+    assert list(df.index) == [0, 0.5, 1]
+    assert df.loc[0].tolist() == [0, 0, 0]
+    assert df.loc[1, "production"] == pytest.approx(2 * df.loc[0.5, "production"])
+    # Pumps are less efficient at part load
+    assert df.loc[0.5, "power"] / df.loc[0.5, "production"] > (
+        df.loc[1, "power"] / df.loc[1, "production"]
+    )
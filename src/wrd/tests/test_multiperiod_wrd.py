@@ -0,0 +1,108 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from pyomo.environ import Var, Param, value, assert_optimal_termination
+from pyomo.util.check_units import assert_units_consistent
+from idaes.core.util.model_statistics import degrees_of_freedom
+from watertap.core.solvers import get_solver
+
+from wrd.components.ro_stage_surrogate import ROStageSurrogate
+from wrd.multiperiod.multiperiod_wrd import (
+    create_wrd_physical_mp,
+    initialize_wrd_physical_mp,
+    report_wrd_physical_mp,
+)
+
+
+def get_blocks(m):
+    return [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+
+
+@pytest.fixture(scope="module")
+def mp():
+    elec_price = [0.08] * 16 + [0.2] * 5 + [0.08] * 3
+    return create_wrd_physical_mp(n_time_points=24, elec_price=elec_price)
+
+
+@pytest.mark.unit
+def test_build(mp):
+    blocks = get_blocks(mp)
+    assert len(blocks) == 24
+    # One feed flow decision per period
+    assert degrees_of_freedom(mp) == 24
+    assert_units_consistent(blocks[0])
+
+    # Periods only hold their own variables, parameters are shared
+    num_vars = sum(1 for _ in blocks[0].component_data_objects(Var))
+    assert num_vars <= 11
+    params = blocks[0].fs.component_objects(Param, descend_into=False)
+    assert {p.local_name for p in params} == {"elec_price", "demand"}
+    assert value(blocks[16].fs.elec_price) == pytest.approx(0.2)
+
+
+@pytest.mark.unit
+def test_initialization(mp):
+    blocks = get_blocks(mp)
+    fs = blocks[0].fs
+    assert value(fs.energy_intensity) == pytest.approx(0.44, rel=0.1)  # kWh/m3
+    assert value(fs.storage_level) == pytest.approx(
+        value(fs.pre_storage_level + fs.water_prod - fs.demand)
+    )
+    # Default demand is the nominal production
+    assert value(fs.water_prod) == pytest.approx(value(fs.demand))
+    assert value(blocks[-1].fs.acc_prod) == pytest.approx(24 * value(fs.water_prod))
+
+
+@pytest.mark.unit
+def test_build_with_surrogates():
+    rng = np.random.default_rng(0)
+    samples = pd.DataFrame(
+        {
+            "Qin": rng.uniform(1500, 3000, 30),
+            "Cin": rng.uniform(0.3, 3, 30),
+            "Tin": rng.uniform(290, 306, 30),
+            "pump_pressure": rng.uniform(100, 180, 30),
+        }
+    )
+    samples["recovery"] = 0.5 + 0.001 * (samples["pump_pressure"] - 140)
+    samples["permeate_conc"] = 10 * samples["Cin"]
+    samples["pump_power"] = 1e-3 * samples["Qin"] * samples["pump_pressure"] / 4
+    surrogate = ROStageSurrogate().fit(samples)
+
+    m = create_wrd_physical_mp(n_time_points=3, surrogates={1: surrogate, 2: surrogate})
+    fs = get_blocks(m)[0].fs
+    assert value(fs.recovery[1]) == pytest.approx(0.5 + 0.001 * (141.9 - 140))
+    assert value(fs.recovery[3]) == pytest.approx(0.516)
+    assert degrees_of_freedom(m) == 3
+
+
+@pytest.mark.unit
+def test_build_variable_speed():
+    m = create_wrd_physical_mp(n_time_points=3, variable_speed=True)
+    # Feed flow and three RO pump speeds per period
+    assert degrees_of_freedom(m) == 12
+    fs = get_blocks(m)[0].fs
+    assert value(fs.recovery[1]) == pytest.approx(0.61)
+    power = value(fs.total_pump_power)
+    prod = value(fs.water_prod)
+
+    for s in fs.pump_speed:
+        fs.pump_speed[s].set_value(0.85)
+    initialize_wrd_physical_mp(m)
+    # Slower pumps use less energy per volume but produce less water
+    assert value(fs.total_pump_power) < power
+    assert value(fs.water_prod) < prod
+    assert value(fs.energy_intensity) < 0.44
+
+
+@pytest.mark.component
+def test_solve(mp):
+    results = get_solver().solve(mp)
+    assert_optimal_termination(results)
+    report_wrd_physical_mp(mp)
+    blocks = get_blocks(mp)
+    # Production shifts away from the on-peak hours
+    on_peak = np.mean([value(b.fs.water_prod) for b in blocks[16:21]])
+    off_peak = np.mean([value(b.fs.water_prod) for b in blocks[:16]])
+    assert on_peak < off_peak
@@ -0,0 +1,90 @@
+import pytest
+from pyomo.environ import ConcreteModel, Var, value
+from idaes.core import FlowsheetBlock
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+
+from wrd.components.ro_system import build_ro_system, set_ro_system_op_conditions
+from wrd.components.ro_train import build_ro_train, set_ro_train_scaling
+from wrd.components.UF_train import build_uf_train, set_uf_train_scaling
+from wrd.components import parallel_init
+from wrd.components.parallel_init import initialize_trains_parallel
+
+
+def fake_initialize(blk):
+    # Stand-in for initialize_ro_train that tags the unfixed variables
+    for v in blk.component_data_objects(Var, descend_into=True):
+        if not v.fixed:
+            v.set_value(1.23)
+
+
+@pytest.mark.unit
+def test_initialize_trains_parallel(monkeypatch):
+    monkeypatch.setitem(
+        parallel_init.train_types,
+        "ro_train",
+        (build_ro_train, set_ro_train_scaling, fake_initialize),
+    )
+    m = build_ro_system(num_trains=2, num_stages=2)
+    set_ro_system_op_conditions(m)
+    blks = [m.fs.train[i] for i in m.fs.trains]
+    pressure = {
+        i: value(
+            m.fs.train[i].stage[1].pump.unit.control_volume.properties_out[0].pressure
+        )
+        for i in m.fs.trains
+    }
+
+    initialize_trains_parallel(
+        blks, "ro_train", max_workers=2, num_stages=m.num_stages, file=m.file
+    )
+
+    for i in m.fs.trains:
+        blk = m.fs.train[i]
+        p = blk.stage[1].pump.unit.control_volume.properties_out[0].pressure
+        assert p.fixed
+        assert value(p) == pytest.approx(pressure[i])
+        for v in blk.component_data_objects(Var, descend_into=True):
+            if not v.fixed:
+                assert value(v) == 1.23
+    # Variables outside the trains are untouched
+    assert value(m.fs.feed.properties[0].temperature) != 1.23
+
+
+@pytest.mark.unit
+def test_initialize_trains_parallel_unknown_type():
+    with pytest.raises(ValueError, match="Unknown train type"):
+        initialize_trains_parallel([], "not_a_train")
+
+
+def fake_lazy_initialize(blk):
+    # Workers must build the train with the parent's lazy_properties flag
+    assert blk.model().lazy_properties
+    fake_initialize(blk)
+
+
+@pytest.mark.unit
+def test_initialize_trains_parallel_lazy_properties(monkeypatch):
+    monkeypatch.setitem(
+        parallel_init.train_types,
+        "uf_train",
+        (build_uf_train, set_uf_train_scaling, fake_lazy_initialize),
+    )
+    m = ConcreteModel()
+    m.lazy_properties = True
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.uf_train = FlowsheetBlock([1, 2], dynamic=False)
+    for i in [1, 2]:
+        build_uf_train(m.fs.uf_train[i])
+    sb = m.fs.uf_train[1].UF.disposal.properties[0]
+    assert not sb.is_property_constructed("flow_vol_phase")
+
+    initialize_trains_parallel(
+        [m.fs.uf_train[i] for i in [1, 2]], "uf_train", max_workers=2
+    )
+
+    assert not sb.is_property_constructed("flow_vol_phase")
+    for i in [1, 2]:
+        for v in m.fs.uf_train[i].component_data_objects(Var, descend_into=True):
+            if not v.fixed:
+                assert value(v) == 1.23
@@ -0,0 +1,171 @@
+import pytest
+import pandas as pd
+
+from pyomo.environ import Var, value, units as pyunits
+from idaes.core.util.model_statistics import degrees_of_freedom
+
+from wrd.components import parallel_init
+from wrd.components.ro import build_ro, set_ro_scaling
+from wrd.parameter_estimation import (
+    get_ro_measurements,
+    build_ro_estimation,
+    set_ro_estimation_op_conditions,
+    initialize_ro_estimation,
+    estimate_ro_parameters,
+    write_ro_parameters,
+)
+from wrd.utilities import load_config, get_config_value
+from srp.utils.units import converted_value
+
+files = ["wrd_inputs_8_19_21.yaml", "wrd_inputs_3_13_21.yaml"]
+
+
+@pytest.mark.unit
+def test_get_ro_measurements():
+    df = get_ro_measurements(files)
+    assert len(df) == 6
+    assert list(df["scenario"].unique()) == [
+        "wrd_inputs_8_19_21",
+        "wrd_inputs_3_13_21",
+    ]
+
+    row = df[(df["scenario"] == "wrd_inputs_3_13_21") & (df["stage"] == 1)].iloc[0]
+    assert row["feed_flow"] == pytest.approx(2452.2)
+    assert row["feed_conc"] == pytest.approx(1007.0 * 0.5e-3)
+    assert row["feed_temperature"] == pytest.approx(295.52)
+    assert row["feed_pressure"] == pytest.approx(153.5)
+    assert row["recovery"] == pytest.approx(0.573)
+    assert row["retentate_conc"] == pytest.approx(2239.3 * 0.5e-3)
+    assert row["retentate_pressure"] == pytest.approx(143.5)
+
+    # Stage 2 brine is upstream of the TSRO header loss
+    row = df[(df["scenario"] == "wrd_inputs_3_13_21") & (df["stage"] == 2)].iloc[0]
+    assert row["retentate_pressure"] == pytest.approx(106.3 + 59.3)
+
+    # No brine measurements downstream of the last stage
+    stage_3 = df[df["stage"] == 3]
+    assert stage_3["retentate_conc"].isna().all()
+    assert stage_3["retentate_pressure"].isna().all()
+
+
+@pytest.mark.unit
+def test_build_ro_estimation():
+    df = get_ro_measurements(files, stages=[3])
+    m = build_ro_estimation(df, stage_num=3, finite_elements=3)
+
+    assert list(m.fs.scenarios) == ["wrd_inputs_8_19_21", "wrd_inputs_3_13_21"]
+    for s in m.fs.scenarios:
+        assert m.fs.scenario[s].finite_elements == 3
+        assert m.fs.eq_A_comp[s].active
+        assert m.fs.eq_deltaP[s].active
+    # Only the recovery is measured for the last stage
+    assert [k for _, k in m.fs.observations] == ["recovery", "recovery"]
+
+    config_data = m.fs.scenario["wrd_inputs_8_19_21"].config_data
+    assert value(m.fs.A_comp) == pytest.approx(
+        get_config_value(config_data, "A_comp", "reverse_osmosis_1d", "stage_3")
+    )
+
+    with pytest.raises(ValueError, match="No measurements"):
+        build_ro_estimation(df, stage_num=1)
+
+
+@pytest.mark.unit
+def test_set_ro_estimation_op_conditions():
+    df = get_ro_measurements(files, stages=[1, 3])
+    for stage, fitted in [(1, 3), (3, 2)]:
+        m = build_ro_estimation(df, stage_num=stage, finite_elements=3)
+        set_ro_estimation_op_conditions(m)
+        for s in m.fs.scenarios:
+            blk = m.fs.scenario[s]
+            assert not blk.unit.A_comp[0, "H2O"].fixed
+            blk.feed.properties[0].flow_mass_phase_comp.fix()
+            blk.feed.properties[0].pressure.fix()
+            blk.feed.properties[0].temperature.fix()
+        # Scenario blocks are square given the shared parameters; the
+        # pressure drop is only fitted with brine pressure measurements
+        assert degrees_of_freedom(m) == fitted
+        assert m.fs.deltaP.fixed == (fitted == 2)
+
+
+def fake_initialize_ro(blk):
+    # Stand-in for initialize_ro that tags the unfixed variables with the
+    # feed temperature of the input file the worker built the block from
+    temperature = converted_value(
+        get_config_value(blk.config_data, "feed_temperature", "feed_stream"),
+        pyunits.K,
+    )
+    for v in blk.component_data_objects(Var, descend_into=True):
+        if not v.fixed:
+            v.set_value(temperature)
+
+
+@pytest.mark.unit
+def test_initialize_ro_estimation_parallel(monkeypatch):
+    monkeypatch.setitem(
+        parallel_init.train_types,
+        "ro",
+        (build_ro, set_ro_scaling, fake_initialize_ro),
+    )
+    df = get_ro_measurements(files, stages=[1])
+    m = build_ro_estimation(df, stage_num=1, finite_elements=3)
+    set_ro_estimation_op_conditions(m)
+    initialize_ro_estimation(m, parallel=True, max_workers=2)
+
+    # Each worker builds its block from the input file of the scenario
+    for s in m.fs.scenarios:
+        blk = m.fs.scenario[s]
+        assert value(blk.unit.recovery_mass_phase_comp[0, "Liq", "H2O"]) == (
+            pytest.approx(df.set_index("scenario").loc[s, "feed_temperature"])
+        )
+        assert not blk.unit.A_comp[0, "H2O"].fixed
+
+
+@pytest.mark.unit
+def test_write_ro_parameters(tmp_path):
+    parameters = pd.DataFrame(
+        [
+            {
+                "stage": 1,
+                "A_comp": 5e-12,
+                "B_comp": 2e-8,
+                "pressure_drop": -9.5,
+                "pressure_drop_fitted": True,
+            },
+            {
+                "stage": 3,
+                "A_comp": 4e-12,
+                "B_comp": 3e-8,
+                "pressure_drop": -1.0,
+                "pressure_drop_fitted": False,
+            },
+        ]
+    )
+    path = write_ro_parameters(parameters, files[0], tmp_path / "fitted.yaml")
+    config_data = load_config(path)
+    assert get_config_value(
+        config_data, "A_comp", "reverse_osmosis_1d", "stage_1"
+    ) == pytest.approx(5e-12)
+    assert converted_value(
+        get_config_value(config_data, "pressure_drop", "reverse_osmosis_1d", "stage_1"),
+        pyunits.psi,
+    ) == pytest.approx(-9.5)
+    assert get_config_value(
+        config_data, "B_comp", "reverse_osmosis_1d", "stage_3"
+    ) == pytest.approx(3e-8)
+    # Pressure drop that was not fitted keeps the value of the base file
+    assert value(
+        get_config_value(config_data, "pressure_drop", "reverse_osmosis_1d", "stage_3")
+    ) == pytest.approx(-10.98)
+
+
+@pytest.mark.component
+def test_estimate_ro_parameters():
+    df = get_ro_measurements(files, stages=[1])
+    parameters, residuals = estimate_ro_parameters(df, finite_elements=5)
+    assert len(parameters) == 1
+    assert parameters["termination_condition"].iloc[0] == "optimal"
+    assert 1e-13 < parameters["A_comp"].iloc[0] < 1e-9
+    assert parameters["pressure_drop"].iloc[0] < 0
+    assert len(residuals) == 2 * 3
+    assert residuals["residual"].abs().max() < 10
@@ -0,0 +1,129 @@
+import pytest
+import numpy as np
+
+from pyomo.environ import value, units as pyunits
+
+from idaes.core import FlowsheetBlock
+
+from wrd.components.pump import build_system, build_pump, set_pump_op_conditions
+from wrd.components.pump_curves import (
+    get_pump_name,
+    get_pump_curve,
+    get_pump_speeds,
+    pump_efficiency,
+    pump_power,
+    variable_speed_pump_power,
+    preinitialize_pump,
+)
+
+
+@pytest.mark.unit
+def test_get_pump_curve():
+    assert get_pump_name(2) == "pump_2"
+    assert get_pump_name(1, uf=True) == "uf"
+    assert get_pump_curve("pump_1") == pytest.approx([0.389, -0.535, 41.373, -138.82])
+    assert get_pump_speeds("uf") == [0.75, 1.0]
+    assert get_pump_curve("uf", speed=0.75) == pytest.approx(
+        [0.0677, 7.142, -7.956, -46.408]
+    )
+    with pytest.raises(KeyError, match="No efficiency curve"):
+        get_pump_curve("pump_1", speed=0.75)
+    with pytest.raises(KeyError, match="not found"):
+        get_pump_curve("pump_4")
+
+
+@pytest.mark.unit
+def test_pump_efficiency_and_power():
+    flow = np.linspace(0.05, 0.2, 7)
+    a = get_pump_curve("pump_2")
+    eff = pump_efficiency(flow, "pump_2")
+    assert eff == pytest.approx(a[0] + a[1] * flow + a[2] * flow**2 + a[3] * flow**3)
+
+    deltaP = np.full(7, 8e5)
+    results = pump_power(flow, deltaP, "pump_2")
+    assert results["efficiency_pump"] == pytest.approx(0.938 * 0.95 * eff)
+    assert results["work_mechanical"] == pytest.approx(
+        flow * deltaP / (0.938 * 0.95 * eff)
+    )
+
+
+@pytest.mark.unit
+def test_build_pump_speed():
+    m = build_system(stage_num=1)
+    assert value(m.fs.pump.unit.efficiency_cubed_coeff) == pytest.approx(-138.82)
+
+    m.fs.uf_pump = FlowsheetBlock(dynamic=False)
+    build_pump(m.fs.uf_pump, prop_package=m.fs.properties, uf=True, speed=0.75)
+    assert value(m.fs.uf_pump.unit.efficiency_cubed_coeff) == pytest.approx(-46.408)
+
+
+@pytest.mark.unit
+def test_preinitialize_pump():
+    m = build_system(stage_num=1)
+    blk = m.fs.pump
+    flow = value(
+        pyunits.convert(
+            2637 * pyunits.gallons / pyunits.minute, to_units=pyunits.m**3 / pyunits.s
+        )
+    )
+    blk.feed.properties[0].flow_vol_phase["Liq"].set_value(flow)
+    blk.unit.control_volume.properties_in[0].pressure.set_value(101325)
+    blk.unit.control_volume.properties_out[0].pressure.fix(1e6)
+    preinitialize_pump(blk)
+
+    expected = pump_power(flow, 1e6 - 101325, "pump_1")
+    assert value(blk.unit.efficiency_fluid) == pytest.approx(
+        expected["efficiency_fluid"]
+    )
+    assert value(blk.unit.efficiency_pump[0]) == pytest.approx(
+        expected["efficiency_pump"]
+    )
+    assert value(blk.unit.work_mechanical[0]) == pytest.approx(
+        expected["work_mechanical"]
+    )
+    assert value(blk.unit.deltaP[0]) == pytest.approx(1e6 - 101325)
+
+
+@pytest.mark.unit
+def test_variable_speed_pump_power():
+    flow = np.linspace(0.1, 0.2, 5)
+    full = pump_power(flow, 7e5, "pump_1")
+    same = variable_speed_pump_power(flow, 1.0, 7e5, "pump_1")
+    assert same["work_mechanical"] == pytest.approx(full["work_mechanical"])
+
+    # Affinity laws: at homologous flows the power scales with speed**3
+    speed = 0.8
+    scaled = variable_speed_pump_power(speed * flow, speed, 7e5, "pump_1")
+    assert scaled["deltaP"] == pytest.approx(7e5 * speed**2)
+    assert scaled["efficiency_fluid"] == pytest.approx(full["efficiency_fluid"])
+    assert scaled["work_mechanical"] == pytest.approx(
+        speed**3 * full["work_mechanical"]
+    )
+
+
+@pytest.mark.unit
+def test_build_variable_speed_pump():
+    m = build_system(stage_num=1)
+    m.fs.vsd_pump = FlowsheetBlock(dynamic=False)
+    build_pump(m.fs.vsd_pump, prop_package=m.fs.properties, variable_speed=True)
+    blk = m.fs.vsd_pump
+    assert value(blk.unit.deltaP_rated) == pytest.approx(
+        value(pyunits.convert((141.9 - 35.4) * pyunits.psi, to_units=pyunits.Pa))
+    )
+    set_pump_op_conditions(blk)
+    assert blk.unit.speed.fixed
+    assert not blk.unit.control_volume.properties_out[0].pressure.fixed
+
+    flow = 0.15
+    blk.feed.properties[0].flow_vol_phase["Liq"].set_value(flow)
+    blk.unit.control_volume.properties_in[0].pressure.set_value(2e5)
+    blk.unit.speed.set_value(0.9)
+    preinitialize_pump(blk)
+    for con in [blk.unit.eq_affinity_head, blk.unit.eq_efficiency_surr]:
+        assert value(con.body) == pytest.approx(value(con.upper), abs=1e-8)
+    expected = variable_speed_pump_power(
+        flow, 0.9, value(blk.unit.deltaP_rated), "pump_1"
+    )
+    assert value(blk.unit.work_mechanical[0]) == pytest.approx(
+        expected["work_mechanical"]
+    )
@@ -1,4 +1,8 @@
 import pytest
+from pyomo.environ import ConcreteModel
+from idaes.core import FlowsheetBlock
+
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
 
 from watertap.unit_models.reverse_osmosis_1D import (
     ReverseOsmosis1D,
@@ -7,7 +11,15 @@ from watertap.unit_models.reverse_osmosis_1D import (
     ConcentrationPolarizationType,
 )
 
-from wrd.components.ro import main, default_ro_config
+from wrd.components.ro import (
+    main,
+    default_ro_config,
+    build_ro,
+    get_ro_finite_elements,
+    get_ro_discretization_outputs,
+    estimate_ro_discretization_error,
+)
+from wrd.utilities import load_config, get_config_file
 
 test_default_ro_config = dict(
     has_pressure_change=True,
@@ -31,3 +43,53 @@ def test_ro_main():
 @pytest.mark.component
 def test_ro_default_config():
     assert len(default_ro_config) == len(test_default_ro_config)
+
+
+def build_ro_block(finite_elements=None):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.ro = FlowsheetBlock(dynamic=False)
+    build_ro(m.fs.ro, prop_package=m.fs.properties, finite_elements=finite_elements)
+    return m
+
+
+@pytest.mark.unit
+def test_get_ro_finite_elements():
+    config_data = load_config(get_config_file("wrd_inputs_8_19_21.yaml"))
+    assert get_ro_finite_elements(config_data, 1) == 10
+    assert get_ro_finite_elements(config_data, 1, 4) == 4
+    assert get_ro_finite_elements(config_data, 1, {2: 4}) == 10
+    assert get_ro_finite_elements(config_data, 2, {2: 4}) == 4
+
+
+@pytest.mark.unit
+def test_ro_finite_elements():
+    m = build_ro_block(finite_elements=3)
+    assert m.fs.ro.finite_elements == 3
+    assert m.fs.ro.unit.config.finite_elements == 3
+    assert len(m.fs.ro.unit.feed_side.length_domain) == 4
+
+
+@pytest.mark.unit
+def test_get_ro_discretization_outputs():
+    m = build_ro_block(finite_elements=3)
+    m.fs.ro.unit.recovery_mass_phase_comp[0, "Liq", "H2O"].set_value(0.5)
+    outputs = get_ro_discretization_outputs(m.fs.ro)
+    assert set(outputs) == {"recovery", "permeate_conc"}
+    assert outputs["recovery"] == pytest.approx(0.5)
+
+
+@pytest.mark.unit
+def test_estimate_ro_discretization_error():
+    # First order convergence, q(N) = q + C / N: the estimate from N = 4 and
+    # N = 8 is the exact error of the fine mesh
+    def outputs(n):
+        return {"recovery": 0.5 + 0.08 / n, "permeate_conc": 0.01 - 0.004 / n}
+
+    err = estimate_ro_discretization_error(outputs(4), outputs(8))
+    assert err == pytest.approx(max(0.01 / outputs(8)["recovery"], 0.0005 / 0.0095))
+    err = estimate_ro_discretization_error(outputs(4), outputs(16), refine_factor=4)
+    assert err == pytest.approx(0.00025 / 0.00975)
+    # Converged outputs have no error
+    assert estimate_ro_discretization_error(outputs(8), outputs(8)) == 0
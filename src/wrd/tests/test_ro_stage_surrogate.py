@@ -0,0 +1,125 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from pyomo.environ import ConcreteModel, Var, value, units as pyunits
+from idaes.core import FlowsheetBlock
+from idaes.core.util.model_statistics import degrees_of_freedom
+from idaes.models.unit_models import Feed
+
+from watertap.property_models.NaCl_T_dep_prop_pack import NaClParameterBlock
+
+from wrd.components.ro_stage_surrogate import (
+    ROStageSurrogate,
+    get_default_sample_bounds,
+    sample_ro_stage,
+    build_ro_stage_surrogate,
+    set_ro_stage_surrogate_op_conditions,
+)
+
+
+def fake_samples(n=60, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "Qin": rng.uniform(2000, 3000, n),
+            "Cin": rng.uniform(0.3, 0.8, n),
+            "Tin": rng.uniform(290, 306, n),
+            "pump_pressure": rng.uniform(120, 160, n),
+        }
+    )
+    df["recovery"] = 0.2 + 0.003 * df["pump_pressure"] - 0.1 * df["Cin"] ** 2
+    df["permeate_conc"] = 5 + 10 * df["Cin"] + 0.1 * (df["Tin"] - 290)
+    df["pump_power"] = 1e-3 * df["Qin"] * df["pump_pressure"]
+    return df
+
+
+@pytest.fixture(scope="module")
+def surrogate():
+    return ROStageSurrogate().fit(fake_samples())
+
+
+@pytest.mark.unit
+def test_fit_and_predict(surrogate):
+    for r2 in surrogate.metadata["r2"].values():
+        assert r2 == pytest.approx(1, abs=1e-8)
+
+    test = fake_samples(n=5, seed=2)
+    pred = surrogate.predict(test)
+    for k in ["recovery", "permeate_conc", "pump_power"]:
+        assert np.allclose(pred[k], test[k], rtol=1e-6)
+
+
+@pytest.mark.unit
+def test_fit_drops_failed_samples():
+    samples = fake_samples(n=20)
+    samples.loc[:4, "recovery"] = np.nan
+    surrogate = ROStageSurrogate().fit(samples)
+    assert surrogate.predict(samples.iloc[5:]).notna().all().all()
+
+    with pytest.raises(ValueError, match="converged samples are needed"):
+        ROStageSurrogate().fit(samples.iloc[:10])
+
+
+@pytest.mark.unit
+def test_save_load(surrogate, tmp_path):
+    path = tmp_path / "surrogate.json"
+    surrogate.save(path)
+    loaded = ROStageSurrogate.load(path)
+    test = fake_samples(n=5, seed=3)
+    assert np.allclose(loaded.predict(test), surrogate.predict(test))
+    assert loaded.metadata["r2"] == surrogate.metadata["r2"]
+
+
+@pytest.mark.unit
+def test_expressions(surrogate):
+    m = ConcreteModel()
+    m.x = Var(surrogate.input_names)
+    x = [2500, 0.5, 300, 140]
+    for k, v in zip(surrogate.input_names, x):
+        m.x[k].set_value(v)
+    outputs = surrogate.expressions({k: m.x[k] for k in surrogate.input_names})
+    pred = surrogate.predict([x]).iloc[0]
+    for k, expr in outputs.items():
+        assert value(expr) == pytest.approx(pred[k])
+
+
+@pytest.mark.unit
+def test_default_sample_bounds():
+    bounds = get_default_sample_bounds(stage_num=1, file="wrd_inputs_8_19_21.yaml")
+    assert bounds["Qin"] == pytest.approx((0.75 * 2637.1, 1.25 * 2637.1))
+    assert bounds["pump_pressure"] == pytest.approx((0.8 * 141.9, 1.2 * 141.9))
+
+
+@pytest.mark.unit
+def test_build_ro_stage_surrogate(surrogate):
+    m = ConcreteModel()
+    m.fs = FlowsheetBlock(dynamic=False)
+    m.fs.properties = NaClParameterBlock()
+    m.fs.feed = Feed(property_package=m.fs.properties)
+    m.fs.ro_stage = FlowsheetBlock(dynamic=False)
+    build_ro_stage_surrogate(
+        m.fs.ro_stage, surrogate, stage_num=1, prop_package=m.fs.properties
+    )
+    blk = m.fs.ro_stage
+    feed = blk.feed.properties[0]
+    feed.flow_mass_phase_comp["Liq", "H2O"].fix(160)
+    feed.flow_mass_phase_comp["Liq", "NaCl"].fix(0.08)
+    feed.temperature.fix(300)
+    feed.pressure.fix(101325)
+    set_ro_stage_surrogate_op_conditions(blk)
+
+    assert value(blk.pump_pressure) == pytest.approx(141.9)
+    assert value(blk.deltaP) == pytest.approx(
+        value(pyunits.convert(-10.7 * pyunits.psi, to_units=pyunits.Pa))
+    )
+    assert degrees_of_freedom(blk) == 0
+
+
+@pytest.mark.component
+def test_sample_and_fit_ro_stage():
+    samples = sample_ro_stage(n_samples=20, stage_num=1, seed=0)
+    assert samples["recovery"].notna().sum() >= 15
+    surrogate = ROStageSurrogate(metadata={"stage_num": 1}).fit(samples)
+    assert surrogate.metadata["r2"]["recovery"] > 0.95
+    assert surrogate.metadata["r2"]["pump_power"] > 0.95
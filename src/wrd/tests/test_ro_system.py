@@ -1,5 +1,14 @@
 import pytest
-from wrd.components.ro_system import main
+from pyomo.environ import value
+from pyomo.util.calc_var_value import calculate_variable_from_constraint
+from idaes.core.util.model_statistics import degrees_of_freedom, number_variables
+from wrd.components import ro_stage
+from wrd.components.ro_system import (
+    main,
+    build_ro_system,
+    set_ro_system_op_conditions,
+    add_ro_system_costing,
+)
 
 
 @pytest.mark.component
@@ -10,3 +19,65 @@ def test_ro_system_with_costing():
 @pytest.mark.component
 def test_ro_system_without_costing():
     m = main(add_costing=False)
+
+
+@pytest.mark.unit
+def test_ro_system_symmetric_trains():
+    m_full = build_ro_system(num_trains=4, num_stages=2)
+    set_ro_system_op_conditions(m_full)
+
+    m = build_ro_system(num_trains=4, num_stages=2, symmetric_trains=True)
+    set_ro_system_op_conditions(m)
+
+    assert m.ro_symmetric
+    assert m.ro_train_multiplicity == 4
+    assert list(m.fs.trains) == [1]
+    assert degrees_of_freedom(m) == degrees_of_freedom(m_full)
+    assert number_variables(m) < number_variables(m_full)
+    split = m.fs.ro_feed_separator.split_fraction[0, "replicas", "H2O"]
+    assert split.fixed
+    assert value(split) == pytest.approx(0.75)
+
+
+@pytest.mark.unit
+def test_ro_system_symmetric_trains_costing(monkeypatch):
+    # RO capital and membrane replacement of the representative train cover
+    # all trains. Only the RO units are costed here.
+    monkeypatch.setattr(ro_stage, "add_pump_costing", lambda blk, **kwargs: None)
+    costs = {}
+    for symmetric in [False, True]:
+        m = build_ro_system(num_trains=4, num_stages=2, symmetric_trains=symmetric)
+        set_ro_system_op_conditions(m)
+        add_ro_system_costing(m, cost_RO=True)
+        for i in m.fs.trains:
+            for j in m.fs.train[i].stages:
+                costing = m.fs.train[i].stage[j].ro.unit.costing
+                calculate_variable_from_constraint(
+                    costing.capital_cost, costing.capital_cost_constraint
+                )
+                calculate_variable_from_constraint(
+                    costing.fixed_operating_cost,
+                    costing.fixed_operating_cost_constraint,
+                )
+                if symmetric:
+                    assert value(costing.membrane_area) == pytest.approx(
+                        4 * value(m.fs.train[i].stage[j].ro.unit.area)
+                    )
+        costs[symmetric] = [
+            sum(
+                value(getattr(m.fs.train[i].stage[j].ro.unit.costing, k))
+                for i in m.fs.trains
+                for j in m.fs.train[i].stages
+            )
+            for k in ["capital_cost", "fixed_operating_cost"]
+        ]
+        assert min(costs[symmetric]) > 0
+    assert costs[True] == pytest.approx(costs[False])
+
+
+@pytest.mark.unit
+def test_ro_system_symmetric_single_train():
+    m = build_ro_system(num_trains=1, num_stages=2, symmetric_trains=True)
+    assert not m.ro_symmetric
+    assert m.ro_train_multiplicity == 1
+    assert list(m.fs.trains) == [1]
@@ -0,0 +1,128 @@
+import pytest
+import numpy as np
+
+from pyomo.environ import value
+from pyomo.opt import SolverResults, SolverStatus, TerminationCondition
+
+from wrd.multiperiod.multiperiod_wrd import create_wrd_physical_mp
+from wrd.multiperiod.rolling_horizon import (
+    get_window_values,
+    shift_window_solution,
+    run_rolling_horizon,
+)
+
+
+class RecordingSolver:
+    """Returns an optimal status without changing the model and records the
+    window prices and starting storage it was called with"""
+
+    def __init__(self, fail_at=None):
+        self.calls = []
+        self.fail_at = fail_at
+
+    def solve(self, m):
+        blocks = [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+        self.calls.append(
+            {
+                "elec_price": [value(b.fs.elec_price) for b in blocks],
+                "initial_storage": value(blocks[0].fs.pre_storage_level),
+            }
+        )
+        results = SolverResults()
+        results.solver.status = SolverStatus.ok
+        results.solver.termination_condition = TerminationCondition.optimal
+        if len(self.calls) - 1 == self.fail_at:
+            results.solver.status = SolverStatus.warning
+            results.solver.termination_condition = TerminationCondition.infeasible
+        return results
+
+
+@pytest.mark.unit
+def test_get_window_values():
+    x = np.arange(10)
+    assert list(get_window_values(x, 2, 4)) == [2, 3, 4, 5]
+    # The last window wraps around to the start of the series
+    assert list(get_window_values(x, 8, 4)) == [8, 9, 0, 1]
+
+
+@pytest.mark.unit
+def test_shift_window_solution():
+    m = create_wrd_physical_mp(n_time_points=4)
+    blocks = [m.fs.mp.blocks[t].process for t in m.fs.mp.TIME]
+    for t, b in enumerate(blocks):
+        b.fs.train_feed_flow.set_value(0.1 + 0.01 * t)
+    shift_window_solution(m, 2)
+    flows = [value(b.fs.train_feed_flow) for b in blocks]
+    assert flows == pytest.approx([0.12, 0.13, 0.13, 0.13])
+
+
+@pytest.mark.unit
+def test_run_rolling_horizon(tmp_path):
+    elec_price = np.arange(10) / 100
+    solver = RecordingSolver()
+    results_file = tmp_path / "schedule.csv"
+    df = run_rolling_horizon(
+        elec_price,
+        demand=0.1,
+        window=6,
+        commit=4,
+        solver=solver,
+        results_file=results_file,
+    )
+
+    # One window model solved 3 times, the last one committing 2 periods
+    assert len(solver.calls) == 3
+    assert len(df) == 10
+    assert list(df.index) == list(range(10))
+    assert solver.calls[1]["elec_price"] == pytest.approx(elec_price[4:10])
+    assert solver.calls[2]["elec_price"] == pytest.approx(
+        get_window_values(elec_price, 8, 6)
+    )
+    assert df["elec_price"].values == pytest.approx(elec_price)
+    assert (df["termination_condition"] == "optimal").all()
+
+    # Storage carries over between committed hours
+    assert solver.calls[0]["initial_storage"] == pytest.approx(2.5)
+    assert solver.calls[1]["initial_storage"] == pytest.approx(
+        df.loc[3, "storage_level"]
+    )
+    storage = np.concatenate([[2.5], df["storage_level"].values])
+    assert np.diff(storage) == pytest.approx(df["water_prod"] - df["demand"])
+
+    saved = np.genfromtxt(results_file, delimiter=",", names=True)
+    assert len(saved) == 10
+
+    with pytest.raises(ValueError, match="commit"):
+        run_rolling_horizon(elec_price, window=4, commit=6, solver=solver)
+
+
+@pytest.mark.unit
+def test_rolling_horizon_failed_window(tmp_path):
+    # A window that is not optimal stops the run instead of carrying its
+    # storage level forward
+    solver = RecordingSolver(fail_at=1)
+    results_file = tmp_path / "schedule.csv"
+    with pytest.raises(RuntimeError, match="period 4 terminated with infeasible"):
+        run_rolling_horizon(
+            np.arange(10) / 100,
+            demand=0.1,
+            window=6,
+            commit=4,
+            solver=solver,
+            results_file=results_file,
+        )
+    assert len(solver.calls) == 2
+    saved = np.genfromtxt(results_file, delimiter=",", names=True)
+    assert list(saved["period"]) == [0, 1, 2, 3]
+
+
+@pytest.mark.component
+def test_rolling_horizon_solve():
+    from wrd.multiperiod.multiperiod_SOP_day import build_elec_price_summer
+
+    elec_price = np.tile(build_elec_price_summer(), 3)
+    df = run_rolling_horizon(elec_price, window=48, commit=24)
+    assert len(df) == 72
+    assert (df["termination_condition"] == "optimal").all()
+    on_peak = df[df["elec_price"] == df["elec_price"].max()]["water_prod"].mean()
+    assert on_peak < df["water_prod"].mean()
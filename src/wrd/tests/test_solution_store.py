@@ -0,0 +1,82 @@
+import pytest
+from pyomo.environ import value
+
+from wrd.wrd_treatment_train import (
+    build_wrd_system,
+    add_wrd_connections,
+    set_wrd_operating_conditions,
+)
+from wrd.solution_store import (
+    SolutionStore,
+    get_wrd_structure,
+    get_wrd_operating_point,
+)
+
+
+def build_model(num_pro_trains=1, Qin=2663):
+    m = build_wrd_system(num_pro_trains=num_pro_trains, file="wrd_inputs_8_19_21.yaml")
+    add_wrd_connections(m)
+    set_wrd_operating_conditions(m)
+    feed = m.fs.feed.properties[0]
+    feed.flow_vol_phase["Liq"].set_value(Qin * num_pro_trains * 6.309e-5)
+    feed.conc_mass_phase_comp["Liq", "NaCl"].set_value(1.2)
+    feed.temperature.set_value(300)
+    return m
+
+
+@pytest.fixture(scope="module")
+def models():
+    return build_model(Qin=2600), build_model(Qin=2800), build_model(num_pro_trains=2)
+
+
+@pytest.mark.unit
+def test_operating_point(models):
+    m = models[0]
+    assert get_wrd_structure(m) == {
+        "file": "wrd_inputs_8_19_21.yaml",
+        "num_pro_trains": 1,
+        "num_tsro_trains": 1,
+        "num_stages": 2,
+        "symmetric_trains": False,
+        "finite_elements": {"1": 10, "2": 10, "3": 10},
+    }
+    point = get_wrd_operating_point(m)
+    assert point["feed_flow"] == pytest.approx(2600, rel=1e-3)
+    assert point["feed_conc"] == pytest.approx(1.2)
+    assert point["feed_temperature"] == 300
+    pump_keys = [k for k in point if "pump" in k]
+    # UF pump, two PRO stage pumps and one TSRO pump
+    assert len(pump_keys) == 4
+
+
+@pytest.mark.unit
+def test_solution_store(models, tmp_path):
+    m1, m2, m3 = models
+    store = SolutionStore()
+    assert store.nearest(m1) is None
+    assert not store.warm_start(m1)
+
+    v1 = m1.fs.product.properties[0].flow_mass_phase_comp["Liq", "H2O"]
+    v2 = m2.fs.product.properties[0].flow_mass_phase_comp["Liq", "H2O"]
+    v1.set_value(123.4)
+    store.add(m1)
+    v1.set_value(234.5)
+    store.add(m1)
+    assert len(store) == 2
+
+    # Different structure is never matched
+    assert store.nearest(m3) is None
+    # Too far away
+    assert store.nearest(m2, max_distance=0.01) is None
+
+    assert store.warm_start(m2)
+    assert value(v2) == pytest.approx(123.4)
+    # Fixed variables keep their values
+    p = m2.fs.train[1].stage[1].pump.unit.control_volume.properties_out[0].pressure
+    assert p.fixed
+
+    path = tmp_path / "store.json"
+    store.save(str(path))
+    store2 = SolutionStore(str(path))
+    assert len(store2) == 2
+    assert store2.entries[0]["point"] == store.entries[0]["point"]
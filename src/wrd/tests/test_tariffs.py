@@ -0,0 +1,106 @@
+import pytest
+import numpy as np
+
+from wrd.multiperiod.tariffs import (
+    get_tariff,
+    expand_tariff,
+    get_tou_periods,
+    get_daily_prices,
+    get_demand_charges,
+    get_invoice_prices,
+)
+
+tariff_file = """
+tariffs:
+  test:
+    seasons:
+      summer:
+        months: [6, 7, 8, 9]
+        periods:
+          off_peak: {delivery: 0.02, generation: 0.06, hours: [[0, 16], [21, 24]]}
+          on_peak: {delivery: 0.02, generation: 0.18, hours: [[16, 21]]}
+      winter:
+        months: [1, 2, 3, 4, 5, 10, 11, 12]
+        periods:
+          off_peak: {generation: 0.08, hours: [[0, 8.5], [21, 24]]}
+          super_off_peak: {generation: 0.04, hours: [[8.5, 21]]}
+    demand_charges:
+      facility: {rate: 10}
+      on_peak: {rate: 20, periods: [on_peak]}
+  gap:
+    seasons:
+      all:
+        months: [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]
+        periods:
+          off_peak: {generation: 0.08, hours: [[0, 20]]}
+"""
+
+
+@pytest.fixture
+def file(tmp_path):
+    path = tmp_path / "tariffs.yaml"
+    path.write_text(tariff_file)
+    return str(path)
+
+
+@pytest.mark.unit
+def test_daily_prices_match_sop_day():
+    summer = get_daily_prices("sce_tou_2021", "summer")
+    assert summer.shape == (24,)
+    assert summer[:16] == pytest.approx(0.01971 + 0.05782)
+    assert summer[16:21] == pytest.approx(0.01971 + 0.0891)
+    assert summer[21:] == pytest.approx(0.01971 + 0.05782)
+
+    winter = get_daily_prices("sce_tou_2021", "winter")
+    assert winter[8:16] == pytest.approx(0.022137 + 0.04026)
+    assert winter[16:21] == pytest.approx(0.0239 + 0.07663)
+
+
+@pytest.mark.unit
+def test_expand_tariff(file):
+    prices = expand_tariff("test", "2021-01-01", "2022-01-01", file=file)
+    assert prices.shape == (8760,)
+    # June 1st starts on hour 151 * 24
+    june = 151 * 24
+    assert prices[june + 16] == pytest.approx(0.2)
+    assert prices[june - 24 + 16] == pytest.approx(0.04)
+    assert not prices.flags.writeable
+
+    # Cached
+    assert expand_tariff("test", "2021-01-01", "2022-01-01", file=file) is prices
+
+    # Minute resolution resolves the fractional period boundary
+    minutes = expand_tariff(
+        "test", "2021-01-01 08:00", periods=60, freq="min", file=file
+    )
+    assert minutes[:30] == pytest.approx(0.08)
+    assert minutes[30:] == pytest.approx(0.04)
+
+    periods = get_tou_periods("test", "2021-07-01", periods=24, file=file)
+    assert list(periods[15:22]) == ["off_peak"] + ["on_peak"] * 5 + ["off_peak"]
+
+
+@pytest.mark.unit
+def test_demand_charges(file):
+    power = np.full(24 * 61, 100.0)  # June and July
+    power[16] = 300  # June 1st on peak
+    power[24 * 30 + 2] = 500  # July 1st off peak
+    charges = get_demand_charges("test", power, "2021-06-01", file=file)
+    assert list(charges.index.astype(str)) == ["2021-06", "2021-07"]
+    assert list(charges["facility"]) == pytest.approx([3000, 5000])
+    assert list(charges["on_peak"]) == pytest.approx([6000, 2000])
+
+
+@pytest.mark.unit
+def test_invalid_tariff(file):
+    with pytest.raises(KeyError, match="not found"):
+        get_tariff("missing", file=file)
+    with pytest.raises(ValueError, match="not all covered"):
+        expand_tariff("gap", "2021-01-01", periods=24, file=file)
+
+
+@pytest.mark.unit
+def test_invoice_prices():
+    invoices = get_invoice_prices("grip_2021")
+    assert len(invoices["invoice_1"]) == 12
+    assert invoices["invoice_1"][5] == pytest.approx(0.29)
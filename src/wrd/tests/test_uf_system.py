@@ -1,6 +1,11 @@
 import pytest
 from pyomo.environ import value, units as pyunits
-from wrd.components.UF_system import main
+from idaes.core.util.model_statistics import degrees_of_freedom, number_variables
+from wrd.components.UF_system import (
+    main,
+    build_uf_system,
+    set_uf_system_op_conditions,
+)
 
 
 @pytest.mark.component
@@ -83,3 +88,30 @@ def test_uf_system_even_split():
     power = pyunits.convert(m.fs.total_uf_pump_power, to_units=pyunits.kW)
     expected_power = 94.7 * pyunits.kW  # Modeled Value
     assert pytest.approx(value(power), rel=0.15) == value(expected_power)  # kWh/m3
+
+
+@pytest.mark.unit
+def test_uf_system_symmetric_trains():
+    m_full = build_uf_system(num_trains=4)
+    set_uf_system_op_conditions(m_full)
+
+    m = build_uf_system(num_trains=4, symmetric_trains=True)
+    set_uf_system_op_conditions(m)
+
+    assert m.uf_symmetric
+    assert m.uf_train_multiplicity == 4
+    assert list(m.fs.uf_trains) == [1]
+    assert degrees_of_freedom(m) == degrees_of_freedom(m_full)
+    assert number_variables(m) < number_variables(m_full)
+    split = m.fs.uf_feed_separator.split_fraction[0, "replicas", "H2O"]
+    assert split.fixed
+    assert value(split) == pytest.approx(0.75)
+
+
+@pytest.mark.unit
+def test_uf_system_symmetric_trains_uneven_split():
+    m = build_uf_system(
+        num_trains=3, split_fraction=[0.385, 0.385, 0.23], symmetric_trains=True
+    )
+    assert not m.uf_symmetric
+    assert list(m.fs.uf_trains) == [1, 2, 3]
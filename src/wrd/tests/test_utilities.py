@@ -0,0 +1,92 @@
+import os
+import copy
+import pickle
+import pytest
+from pyomo.environ import ConcreteModel, Block, value, units as pyunits
+
+from wrd.utilities import (
+    load_config,
+    clear_config_cache,
+    get_config_value,
+    get_config_file,
+    get_wrd_solver,
+)
+
+
+@pytest.mark.unit
+def test_load_config_is_cached():
+    clear_config_cache()
+    file = get_config_file("wrd_inputs_8_19_21.yaml")
+    config1 = load_config(file)
+    config2 = load_config(file)
+    assert config1 is config2
+
+    Qin1 = get_config_value(config1, "feed_flow_water", "feed_stream")
+    Qin2 = get_config_value(config2, "feed_flow_water", "feed_stream")
+    assert Qin1 is Qin2
+    assert value(Qin1) == pytest.approx(2663)
+    assert str(pyunits.get_units(Qin1)) == str(pyunits.gal / pyunits.min)
+
+
+@pytest.mark.unit
+def test_load_config_read_only():
+    config = load_config(get_config_file("wrd_inputs_8_19_21.yaml"))
+    with pytest.raises(TypeError):
+        config["feed_stream"] = {}
+    with pytest.raises(TypeError):
+        config["reverse_osmosis_1d"]["stage_1"]["A_comp"] = 1
+
+
+@pytest.mark.unit
+def test_load_config_copy_and_pickle():
+    config = load_config(get_config_file("wrd_inputs_8_19_21.yaml"))
+    assert copy.deepcopy(config) is config
+    unpickled = pickle.loads(pickle.dumps(config))
+    assert unpickled == config
+    with pytest.raises(TypeError):
+        unpickled["feed_stream"] = {}
+
+    # Blocks holding the config can be cloned
+    m = ConcreteModel()
+    m.b = Block()
+    m.b.config_data = config
+    assert m.clone().b.config_data is config
+
+
+@pytest.mark.unit
+def test_load_config_invalidated_on_change(tmp_path):
+    file = tmp_path / "inputs.yaml"
+    file.write_text("feed_stream:\n  feed_temperature:\n    value: 300\n    units: K\n")
+    config1 = load_config(str(file))
+    assert value(get_config_value(config1, "feed_temperature", "feed_stream")) == 300
+
+    file.write_text(
+        "feed_stream:\n  feed_temperature:\n    value: 295.5\n    units: K\n"
+    )
+    stat = os.stat(file)
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    config2 = load_config(str(file))
+    assert config2 is not config1
+    assert value(get_config_value(config2, "feed_temperature", "feed_stream")) == 295.5
+
+
+@pytest.mark.unit
+def test_get_config_value_missing_key():
+    config = load_config(get_config_file("wrd_inputs_8_19_21.yaml"))
+    with pytest.raises(KeyError, match="Section 'not_a_section' not found"):
+        get_config_value(config, "A_comp", "not_a_section")
+    with pytest.raises(KeyError, match="Key 'not_a_key' not found in subsection"):
+        get_config_value(config, "not_a_key", "reverse_osmosis_1d", "stage_1")
+
+
+@pytest.mark.unit
+def test_get_wrd_solver():
+    solver = get_wrd_solver()
+    assert solver.name == "ipopt-watertap"
+    persistent = get_wrd_solver(persistent=True)
+    if isinstance(persistent, type(solver)):
+        # Falls back to get_solver() when the persistent interface is unavailable
+        assert persistent.name == "ipopt-watertap"
+    else:
+        assert persistent.options["tol"] == pytest.approx(1e-8)
+        assert persistent.options["bound_relax_factor"] == 0
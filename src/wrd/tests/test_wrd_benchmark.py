@@ -0,0 +1,120 @@
+import pytest
+import pandas as pd
+
+from pyomo.environ import ConcreteModel, Var, Constraint
+
+from wrd.wrd_benchmark import (
+    get_benchmark_cases,
+    count_nonzeros,
+    run_benchmark_case,
+    run_wrd_benchmark,
+    load_benchmark,
+    compare_benchmark,
+    check_benchmark,
+)
+
+
+@pytest.mark.unit
+def test_get_benchmark_cases():
+    cases = get_benchmark_cases()
+    assert len(cases) == 8 * 2 * 2
+    assert cases[0] == {
+        "file": "wrd_inputs_8_19_21.yaml",
+        "num_pro_trains": 1,
+        "num_stages": 2,
+    }
+    cases = get_benchmark_cases(num_pro_trains=[4], num_stages=[2])
+    assert [c["num_pro_trains"] for c in cases] == [4, 4]
+
+
+@pytest.mark.unit
+def test_count_nonzeros():
+    m = ConcreteModel()
+    m.x = Var([1, 2, 3], initialize=1)
+    m.c1 = Constraint(expr=m.x[1] + m.x[2] * m.x[3] == 1)
+    m.c2 = Constraint(expr=m.x[1] == m.x[2])
+    assert count_nonzeros(m) == 5
+    m.x[3].fix()
+    assert count_nonzeros(m) == 4
+    m.c2.deactivate()
+    assert count_nonzeros(m) == 2
+
+
+@pytest.mark.unit
+def test_benchmark_baseline(tmp_path):
+    # Model size of the smallest case must not grow over the stored baseline
+    history_file = tmp_path / "history.csv"
+    cases = [{"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": 1, "num_stages": 2}]
+    df = run_wrd_benchmark(cases, solve=False, history_file=str(history_file))
+    assert df["error"].isna().all()
+    assert (df[["variables", "constraints", "nonzeros"]] > 0).all(axis=None)
+    assert df["build_time"].iloc[0] > 0
+    assert df["solve_time"].isna().all()
+
+    # Every baseline case is required, so only check against this one
+    baseline = load_benchmark().merge(df[["file", "num_pro_trains", "num_stages"]])
+    comparison = check_benchmark(df, baseline)
+    assert set(comparison["metric"]) >= {"variables", "constraints", "nonzeros"}
+
+    run_wrd_benchmark(cases, solve=False, history_file=str(history_file))
+    history = pd.read_csv(history_file)
+    assert len(history) == 2
+
+
+@pytest.mark.unit
+def test_benchmark_case_error():
+    row = run_benchmark_case(
+        {"file": "not_a_file.yaml", "num_pro_trains": 1, "num_stages": 2}
+    )
+    assert row["termination_status"] == "error"
+    assert "not_a_file.yaml" in row["error"]
+
+
+@pytest.mark.unit
+def test_check_benchmark():
+    baseline = load_benchmark()
+    df = baseline.astype({"variables": float, "constraints": float})
+    df["termination_status"] = None
+    df["error"] = None
+    comparison = compare_benchmark(df, baseline)
+    assert not comparison["regression"].any()
+    assert (comparison["change"] == 0).all()
+
+    df.loc[0, "variables"] = df.loc[0, "variables"] * 1.1
+    df.loc[1, "constraints"] = df.loc[1, "constraints"] * 0.5
+    comparison = compare_benchmark(df, baseline)
+    regressions = comparison[comparison["regression"]]
+    assert len(regressions) == 1
+    assert regressions["metric"].iloc[0] == "variables"
+    assert regressions["change"].iloc[0] == pytest.approx(0.1, rel=1e-2)
+
+    with pytest.raises(RuntimeError, match="variables"):
+        check_benchmark(df, baseline)
+    check_benchmark(df, baseline, thresholds={"variables": 0.2})
+
+    # Timings only compared when both have them
+    df["solve_time"] = 10.0
+    comparison = compare_benchmark(df, baseline)
+    assert "solve_time" not in set(comparison["metric"])
+
+
+@pytest.mark.unit
+def test_check_benchmark_failed_cases():
+    baseline = load_benchmark()
+    df = baseline.copy()
+    df["termination_status"] = None
+    df["error"] = None
+    check_benchmark(df, baseline)
+
+    # Cases that failed to build have no model size to compare
+    failed = df.copy()
+    failed.loc[0, ["variables", "constraints", "nonzeros"]] = float("nan")
+    failed.loc[0, "termination_status"] = "error"
+    failed.loc[0, "error"] = "KeyError: 'chemical_addition'"
+    with pytest.raises(RuntimeError, match="chemical_addition"):
+        check_benchmark(failed, baseline)
+
+    with pytest.raises(RuntimeError, match="not in the results"):
+        check_benchmark(df.iloc[1:], baseline)
+    with pytest.raises(RuntimeError, match="not in the baseline"):
+        check_benchmark(df, baseline.iloc[1:])
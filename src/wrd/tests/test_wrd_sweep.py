@@ -0,0 +1,123 @@
+import pytest
+import pandas as pd
+
+from pyomo.environ import ConcreteModel
+
+from wrd import wrd_sweep
+from wrd.wrd_sweep import (
+    load_sweep_cases,
+    run_wrd_case,
+    run_wrd_sweep,
+    run_wrd_replay,
+)
+
+
+@pytest.mark.unit
+def test_load_sweep_cases_csv(tmp_path):
+    cases_file = tmp_path / "cases.csv"
+    cases_file.write_text(
+        "file,Qin,Cin,num_pro_trains\n"
+        "wrd_inputs_8_19_21.yaml,2663,1.2,4\n"
+        "wrd_inputs_3_13_21.yaml,,,2\n"
+    )
+    cases = load_sweep_cases(str(cases_file))
+    assert len(cases) == 2
+    assert cases[0]["Qin"] == 2663
+    assert cases[0]["Tin"] is None
+    assert cases[1]["Qin"] is None
+    assert cases[1]["num_pro_trains"] == 2
+
+
+@pytest.mark.unit
+def test_load_sweep_cases_yaml(tmp_path):
+    cases_file = tmp_path / "cases.yaml"
+    cases_file.write_text(
+        "cases:\n"
+        "  - file: wrd_inputs_8_19_21.yaml\n"
+        "    electricity_cost: 0.18\n"
+        "  - file: wrd_inputs_3_13_21.yaml\n"
+        "    num_pro_trains: 3\n"
+        "    finite_elements: 3\n"
+    )
+    cases = load_sweep_cases(str(cases_file))
+    assert cases[0]["electricity_cost"] == 0.18
+    assert cases[0]["num_pro_trains"] == 4
+    assert cases[0]["finite_elements"] is None
+    assert cases[1]["num_pro_trains"] == 3
+    assert cases[1]["finite_elements"] == 3
+
+
+@pytest.mark.unit
+def test_load_sweep_cases_errors(tmp_path):
+    cases_file = tmp_path / "cases.yaml"
+    cases_file.write_text("- Qin: 2663\n")
+    with pytest.raises(ValueError, match="Input file must be provided"):
+        load_sweep_cases(str(cases_file))
+
+    cases_file.write_text("- file: wrd_inputs_8_19_21.yaml\n  Qout: 2663\n")
+    with pytest.raises(KeyError, match="Unknown inputs"):
+        load_sweep_cases(str(cases_file))
+
+    with pytest.raises(ValueError, match="Unsupported sweep case file type"):
+        load_sweep_cases(str(tmp_path / "cases.txt"))
+
+
+@pytest.mark.unit
+def test_run_wrd_sweep_records_errors(tmp_path):
+    cases = [
+        {"file": "not_a_file.yaml", "num_pro_trains": 1},
+        {"file": "also_not_a_file.yaml", "num_pro_trains": 2},
+    ]
+    results_file = tmp_path / "results.csv"
+    df = run_wrd_sweep(cases, str(results_file), max_workers=2)
+    assert list(df["num_pro_trains"]) == [1, 2]
+    assert all(df["termination_status"] == "error")
+
+    streamed = pd.read_csv(results_file)
+    assert len(streamed) == 2
+    assert set(streamed["file"]) == {"not_a_file.yaml", "also_not_a_file.yaml"}
+
+
+@pytest.mark.unit
+def test_run_wrd_case_solver(monkeypatch):
+    # Sweep cases solve with the same WaterTAP solver as the WRD flowsheet
+    get_wrd_solver = wrd_sweep.get_wrd_solver
+    solvers = []
+
+    def get_solver(persistent=False):
+        solvers.append(get_wrd_solver(persistent=persistent))
+        return solvers[-1]
+
+    monkeypatch.setattr(wrd_sweep, "get_wrd_solver", get_solver)
+    monkeypatch.setattr(
+        wrd_sweep, "_build_wrd_case", lambda case, **kwargs: (ConcreteModel(), False)
+    )
+    run_wrd_case({"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": 1})
+    assert [s.name for s in solvers] == ["ipopt-watertap"]
+
+
+@pytest.mark.component
+def test_run_wrd_case():
+    row = run_wrd_case({"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": 4})
+    assert row["termination_status"] == "optimal"
+    assert row["LCOW"] > 0
+    assert 0 < row["system_recovery"] < 1
+
+
+@pytest.mark.unit
+def test_run_wrd_replay_records_errors(tmp_path):
+    cases = [{"file": "not_a_file.yaml", "num_pro_trains": 1}]
+    df = run_wrd_replay(cases, str(tmp_path / "results.csv"))
+    assert all(df["termination_status"] == "error")
+
+
+@pytest.mark.component
+def test_run_wrd_replay(tmp_path):
+    cases = [
+        {"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": 4},
+        {"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": 4, "Qin": 2500},
+        {"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": 4, "Tin": 300},
+    ]
+    df = run_wrd_replay(cases, str(tmp_path / "results.csv"))
+    assert all(df["termination_status"] == "optimal")
+    assert list(df["warm_start"]) == [False, True, True]
@@ -1,6 +1,24 @@
 import pytest
-from pyomo.environ import value, units as pyunits
-from wrd.wrd_treatment_train import main
+from pyomo.environ import (
+    ConcreteModel,
+    Block,
+    Var,
+    Constraint,
+    value,
+    assert_optimal_termination,
+    units as pyunits,
+)
+from idaes.core.util.model_statistics import degrees_of_freedom
+from wrd.wrd_treatment_train import (
+    main,
+    build_wrd_system,
+    add_wrd_connections,
+    set_wrd_operating_conditions,
+    update_wrd_inputs,
+    resolve_wrd_system,
+    get_wrd_finite_elements,
+    report_wrd_costing_flows,
+)
 
 
 @pytest.mark.unit
@@ -11,6 +29,80 @@ def test_no_wrd_file():
         _ = main(num_pro_trains=2, file=None)
 
 
+@pytest.mark.unit
+def test_wrd_finite_elements():
+    m = build_wrd_system(
+        num_pro_trains=1, file="wrd_inputs_8_19_21.yaml", finite_elements={1: 3, 3: 5}
+    )
+    assert get_wrd_finite_elements(m) == {1: 3, 2: 10, 3: 5}
+    assert len(m.fs.tsro_train[1].ro.unit.feed_side.length_domain) == 6
+
+
+@pytest.mark.unit
+def test_wrd_lazy_properties():
+    models = {}
+    for lazy in [False, True]:
+        m = build_wrd_system(
+            num_pro_trains=1, file="wrd_inputs_8_19_21.yaml", lazy_properties=lazy
+        )
+        add_wrd_connections(m)
+        models[lazy] = m
+    eager, lazy = models[False], models[True]
+    assert lazy.nvariables() < eager.nvariables()
+    assert eager.nvariables() - lazy.nvariables() == (
+        eager.nconstraints() - lazy.nconstraints()
+    )
+    assert degrees_of_freedom(lazy) == degrees_of_freedom(eager)
+
+    sb = lazy.fs.ro_brine_mixer.mixed_state[0]
+    assert eager.fs.ro_brine_mixer.mixed_state[0].is_property_constructed(
+        "flow_vol_phase"
+    )
+    assert not sb.is_property_constructed("flow_vol_phase")
+    # Referenced properties are still built
+    assert lazy.fs.product.properties[0].is_property_constructed("flow_vol_phase")
+
+
+@pytest.mark.unit
+def test_wrd_explicit_chemical_addition():
+    models = {}
+    for explicit in [False, True]:
+        m = build_wrd_system(
+            num_pro_trains=1,
+            file="wrd_inputs_8_19_21.yaml",
+            explicit_chemical_addition=explicit,
+        )
+        add_wrd_connections(m)
+        for chem_name in m.fs.chemical_list:
+            m.fs.find_component(chem_name + "_addition").unit.dose.fix()
+        models[explicit] = m
+    implicit, explicit = models[False], models[True]
+    # Three variables and constraints less per chemical addition unit
+    num_chems = len(explicit.fs.chemical_list)
+    assert implicit.nvariables() - explicit.nvariables() == 3 * num_chems
+    assert implicit.nconstraints() - explicit.nconstraints() == 3 * num_chems
+    assert degrees_of_freedom(explicit) == degrees_of_freedom(implicit)
+    for chem_name in explicit.fs.chemical_list:
+        unit = explicit.fs.find_component(chem_name + "_addition").unit
+        assert unit.config.explicit
+        assert not list(unit.component_objects(Constraint, descend_into=False))
+
+
+@pytest.mark.unit
+def test_report_wrd_costing_flows(capsys):
+    m = ConcreteModel()
+    m.fs = Block()
+    m.fs.costing = Block()
+    m.fs.costing.aggregate_flow_lime = Var(initialize=1, units=pyunits.kg / pyunits.s)
+    m.fs.costing.aggregate_flow_polymer = Var(
+        initialize=1, units=pyunits.m**3 / pyunits.s
+    )
+    report_wrd_costing_flows(m)
+    out = capsys.readouterr().out
+    assert "ton/month" in out
+    assert "gal/month" in out
+
+
 @pytest.mark.parametrize("num_pro_trains", [1, 2, 3, 4])
 @pytest.mark.component
 def test_wrd_treatment_train_8_19_21(num_pro_trains):
@@ -66,3 +158,41 @@ def test_wrd_treatment_train_3_13_21(num_pro_trains):
     file = "wrd_inputs_3_13_21.yaml"
     m = main(num_pro_trains=num_pro_trains, file=file)
     # TODO: Add tests against facility data
+
+
+@pytest.mark.unit
+def test_update_wrd_inputs():
+    m = build_wrd_system(num_pro_trains=2, file="wrd_inputs_8_19_21.yaml")
+    add_wrd_connections(m)
+    set_wrd_operating_conditions(m)
+    update_wrd_inputs(
+        m, pump_pressures={1: 150, 3: 170}, uf_pump_pressure=30, electricity_cost=0.12
+    )
+    for i in m.fs.trains:
+        p = m.fs.train[i].stage[1].pump.unit.control_volume.properties_out[0].pressure
+        assert p.fixed
+        assert value(pyunits.convert(p, to_units=pyunits.psi)) == pytest.approx(150)
+    for t in m.fs.tsro_trains:
+        p = m.fs.tsro_train[t].pump.unit.control_volume.properties_out[0].pressure
+        assert value(pyunits.convert(p, to_units=pyunits.psi)) == pytest.approx(170)
+    for i in m.fs.uf_trains:
+        p = m.fs.uf_train[i].pump.unit.control_volume.properties_out[0].pressure
+        assert value(pyunits.convert(p, to_units=pyunits.psi)) == pytest.approx(30)
+    elec_cost = pyunits.convert(
+        m.fs.costing.electricity_cost, to_units=pyunits.USD_2021 / pyunits.kWh
+    )
+    assert value(elec_cost) == pytest.approx(0.12)
+
+
+@pytest.mark.component
+def test_resolve_wrd_system():
+    m = main(num_pro_trains=4, file="wrd_inputs_8_19_21.yaml")
+    LCOW = value(m.fs.costing.LCOW)
+    results = resolve_wrd_system(m, Qin=2500, electricity_cost=0.15)
+    assert_optimal_termination(results)
+    Qin = pyunits.convert(
+        m.fs.feed.properties[0].flow_vol_phase["Liq"],
+        to_units=pyunits.gallons / pyunits.minute,
+    )
+    assert value(Qin) == pytest.approx(2500 * 4, rel=1e-4)
+    assert value(m.fs.costing.LCOW) < LCOW
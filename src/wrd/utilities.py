@@ -1,7 +1,12 @@
 import yaml
 import os
-from pyomo.environ import value, units as pyunits
-from idaes.models.unit_models import Mixer, Separator
+from collections.abc import Mapping
+from functools import lru_cache
+from pyomo.environ import value, Constraint, SolverFactory, units as pyunits
+import idaes.logger as idaeslog
+from watertap.core.solvers import get_solver
+from srp.utils.results import collect_stream_results, get_result
+from srp.utils.units import converted_value
 
 
 __all__ = [
@@ -11,9 +16,29 @@ __all__ = [
     "report_mixer",
     "get_config_value",
     "load_config",
+    "clear_config_cache",
     "get_config_file",
+    "get_wrd_solver",
+    "add_train_replicas",
+    "initialize_train_replicas",
 ]
 
+_log = idaeslog.getLogger(__name__)
+
+# WaterTAP's default IPOPT tolerances, applied by get_solver() at solve time
+_watertap_ipopt_options = {
+    "tol": 1e-08,
+    "constr_viol_tol": 1e-08,
+    "acceptable_constr_viol_tol": 1e-08,
+    "bound_relax_factor": 0.0,
+    "honor_original_bounds": "no",
+}
+
+# Parsed configuration files keyed by absolute path. Each entry holds the
+# (mtime, size) signature of the file when it was parsed so that edits to
+# the YAML on disk are picked up on the next load.
+_config_cache = {}
+
 
 def report_head_loss(hl, w=25):
 
@@ -23,118 +48,70 @@ def report_head_loss(hl, w=25):
     side = int(((3 * w) - len(title)) / 2) - 1
     header = "=" * side + f" {title} " + "=" * side
     print(f"\n{header}\n")
-    dp = value(
-        pyunits.convert(
-            cv.deltaP[0],
-            to_units=pyunits.psi,
-        )
-    )
+    dp = converted_value(cv.deltaP[0], pyunits.psi)
     print(f'{"Pressure Drop":<{w}s}{f"{dp:<{w}.1f}"}{"psi":<{w}s}')
-    flow_in = value(
-        pyunits.convert(
-            cv.properties_in[0].flow_vol_phase["Liq"],
-            to_units=pyunits.gallons / pyunits.minute,
-        )
-    )
-    conc_in = value(
-        pyunits.convert(
-            cv.properties_in[0].conc_mass_phase_comp["Liq", "NaCl"],
-            to_units=pyunits.mg / pyunits.L,
-        )
+    flow_in = converted_value(
+        cv.properties_in[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute
     )
-    p_in = value(
-        pyunits.convert(
-            cv.properties_in[0].pressure,
-            to_units=pyunits.psi,
-        )
+    conc_in = converted_value(
+        cv.properties_in[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L
     )
+    p_in = converted_value(cv.properties_in[0].pressure, pyunits.psi)
     print(f'{"INLET Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
     print(f'{"INLET NaCl":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
     print(f'{"INLET Pressure":<{w}s}{f"{p_in:<{w},.1f}"}{"psi":<{w}s}')
 
-    flow_out = value(
-        pyunits.convert(
-            cv.properties_out[0].flow_vol_phase["Liq"],
-            to_units=pyunits.gallons / pyunits.minute,
-        )
+    flow_out = converted_value(
+        cv.properties_out[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute
     )
-    conc_out = value(
-        pyunits.convert(
-            cv.properties_out[0].conc_mass_phase_comp["Liq", "NaCl"],
-            to_units=pyunits.mg / pyunits.L,
-        )
-    )
-    p_out = value(
-        pyunits.convert(
-            cv.properties_out[0].pressure,
-            to_units=pyunits.psi,
-        )
+    conc_out = converted_value(
+        cv.properties_out[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.L
     )
+    p_out = converted_value(cv.properties_out[0].pressure, pyunits.psi)
     print(f'{"OUTLET Flow":<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}')
     print(f'{"OUTLET NaCl":<{w}s}{f"{conc_out:<{w},.1f}"}{"mg/L":<{w}s}')
     print(f'{"OUTLET Pressure":<{w}s}{f"{p_out:<{w},.1f}"}{"psi":<{w}s}')
 
 
-def report_sj(sj, w=25):
-
-    title = sj.name.replace("fs.", "").replace("_", " ").upper()
-
+def _report_header(blk, w):
+    title = blk.name.replace("fs.", "").replace("_", " ").upper()
     side = int(((3 * w) - len(title)) / 2) - 1
     header = "=" * side + f" {title} " + "=" * side
     print(f"\n{header}\n")
-    flow_in = value(
-        pyunits.convert(
-            sj.properties[0].flow_vol_phase["Liq"],
-            to_units=pyunits.gallons / pyunits.minute,
-        )
-    )
-    conc_in = value(
-        pyunits.convert(
-            sj.properties[0].conc_mass_phase_comp["Liq", "NaCl"],
-            to_units=pyunits.mg / pyunits.L,
-        )
+
+
+def _stream_values(df, sb):
+    """
+    Flow (gpm), NaCl concentration (mg/L) and pressure (psi) of a state block
+    from a table of collect_stream_results.
+    """
+    return (
+        get_result(df, sb, "flow_vol_phase", "Liq"),
+        get_result(df, sb, "conc_mass_phase_comp", "Liq,NaCl"),
+        get_result(df, sb, "pressure"),
     )
+
+
+def report_sj(sj, w=25):
+
+    _report_header(sj, w)
+    df = collect_stream_results(sj, construct=True)
+    flow_in, conc_in, _ = _stream_values(df, sj.properties[0])
     print(f'{"INLET/OUTLET Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
     print(f'{"INLET/OUTLET NaCl":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
 
 
 def report_mixer(mixer, w=25):
 
-    ms = mixer.find_component("mixed_state")
-    title = mixer.name.replace("fs.", "").replace("_", " ").upper()
-    side = int(((3 * w) - len(title)) / 2) - 1
-    header = "=" * side + f" {title} " + "=" * side
-    print(f"\n{header}\n")
-    tot_flow_in = sum(
-        value(
-            pyunits.convert(
-                mixer.find_component(f"{x}_state")[0].flow_vol_phase["Liq"],
-                to_units=pyunits.gallons / pyunits.minute,
-            )
-        )
+    _report_header(mixer, w)
+    df = collect_stream_results(mixer, construct=True)
+    inlets = {
+        x: _stream_values(df, mixer.find_component(f"{x}_state")[0])
         for x in mixer.config.inlet_list
-    )
+    }
+    tot_flow_in = sum(flow_in for flow_in, _, _ in inlets.values())
     print(f'{"TOTAL INLET FLOW":<{w}s}{f"{tot_flow_in:<{w},.1f}"}{"gpm":<{w}s}')
-    for x in mixer.config.inlet_list:
-        sb = mixer.find_component(f"{x}_state")
-        flow_in = value(
-            pyunits.convert(
-                sb[0].flow_vol_phase["Liq"],
-                to_units=pyunits.gallons / pyunits.minute,
-            )
-        )
-        conc_in = value(
-            pyunits.convert(
-                sb[0].conc_mass_phase_comp["Liq", "NaCl"],
-                to_units=pyunits.mg / pyunits.L,
-            )
-        )
-        p_in = value(
-            pyunits.convert(
-                sb[0].pressure,
-                to_units=pyunits.psi,
-            )
-        )
+    for x, (flow_in, conc_in, p_in) in inlets.items():
         print(
             f'{"   Flow " + x.replace("_", " ").title():<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}'
         )
@@ -144,24 +121,7 @@ def report_mixer(mixer, w=25):
         print(
             f'{"   Pressure " + x.replace("_", " ").title():<{w}s}{f"{p_in:<{w},.1f}"}{"psi":<{w}s}'
         )
-    flow_out = value(
-        pyunits.convert(
-            ms[0].flow_vol_phase["Liq"],
-            to_units=pyunits.gallons / pyunits.minute,
-        )
-    )
-    conc_out = value(
-        pyunits.convert(
-            ms[0].conc_mass_phase_comp["Liq", "NaCl"],
-            to_units=pyunits.mg / pyunits.L,
-        )
-    )
-    p_out = value(
-        pyunits.convert(
-            ms[0].pressure,
-            to_units=pyunits.psi,
-        )
-    )
+    flow_out, conc_out, p_out = _stream_values(df, mixer.mixed_state[0])
     print(f'{"Outlet Flow":<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}')
     print(f'{"Outlet NaCl":<{w}s}{f"{conc_out:<{w},.1f}"}{"mg/L":<{w}s}')
     print(f'{"Outlet Pressure":<{w}s}{f"{p_out:<{w},.1f}"}{"psi":<{w}s}')
@@ -169,52 +129,18 @@ def report_mixer(mixer, w=25):
 
 def report_separator(sep, w=25):
 
-    title = sep.name.replace("fs.", "").replace("_", " ").upper()
-
-    side = int(((3 * w) - len(title)) / 2) - 1
-    header = "=" * side + f" {title} " + "=" * side
-    print(f"\n{header}\n")
-    ms = sep.find_component("mixed_state")
-    flow_in = value(
-        pyunits.convert(
-            ms[0].flow_vol_phase["Liq"],
-            to_units=pyunits.gallons / pyunits.minute,
-        )
-    )
-    conc_in = value(
-        pyunits.convert(
-            ms[0].conc_mass_phase_comp["Liq", "NaCl"],
-            to_units=pyunits.mg / pyunits.L,
-        )
-    )
+    _report_header(sep, w)
+    df = collect_stream_results(sep, construct=True)
+    flow_in, conc_in, _ = _stream_values(df, sep.mixed_state[0])
     print(f'{"INLET Flow":<{w}s}{f"{flow_in:<{w},.1f}"}{"gpm":<{w}s}')
     print(f'{"INLET NaCl":<{w}s}{f"{conc_in:<{w},.1f}"}{"mg/L":<{w}s}')
-    tot_flow_out = sum(
-        value(
-            value(
-                pyunits.convert(
-                    sep.find_component(f"{x}_state")[0].flow_vol_phase["Liq"],
-                    to_units=pyunits.gallons / pyunits.minute,
-                )
-            )
-        )
+    outlets = {
+        x: _stream_values(df, sep.find_component(f"{x}_state")[0])
         for x in sep.config.outlet_list
-    )
+    }
+    tot_flow_out = sum(flow_out for flow_out, _, _ in outlets.values())
     print(f'{"TOTAL OUTLET FLOW":<{w}s}{f"{tot_flow_out:<{w},.1f}"}{"gpm":<{w}s}')
-    for x in sep.config.outlet_list:
-        sb = sep.find_component(f"{x}_state")
-        flow_out = value(
-            pyunits.convert(
-                sb[0].flow_vol_phase["Liq"],
-                to_units=pyunits.gallons / pyunits.minute,
-            )
-        )
-        conc_out = value(
-            pyunits.convert(
-                sb[0].conc_mass_phase_comp["Liq", "NaCl"],
-                to_units=pyunits.mg / pyunits.L,
-            )
-        )
+    for x, (flow_out, conc_out, _) in outlets.items():
         print(
             f'{"   Flow " + x.replace("_", " ").title():<{w}s}{f"{flow_out:<{w},.1f}"}{"gpm":<{w}s}'
         )
@@ -223,9 +149,92 @@ def report_separator(sep, w=25):
         )
 
 
+class FrozenConfig(Mapping):
+    """
+    Read-only mapping of a parsed configuration file section.
+
+    Unlike types.MappingProxyType it can be deep-copied and pickled, so
+    blocks holding it as config_data can be cloned and sent to worker
+    processes. Being immutable, deep copies share the same instance.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data):
+        self._data = dict(data)
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._data!r})"
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return (type(self), (self._data,))
+
+
+def _freeze(data):
+    """
+    Recursively convert parsed YAML into read-only containers.
+    """
+    if isinstance(data, dict):
+        return FrozenConfig({k: _freeze(v) for k, v in data.items()})
+    if isinstance(data, list):
+        return tuple(_freeze(v) for v in data)
+    return data
+
+
 def load_config(config):
-    with open(config, "r") as file:
-        return yaml.safe_load(file)
+    """
+    Load a YAML configuration file.
+
+    Files are parsed once per process and the same read-only view is returned
+    on every subsequent call until the file is modified on disk.
+    """
+    path = os.path.abspath(config)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _config_cache.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached[1]
+
+    with open(path, "r") as file:
+        config_data = _freeze(yaml.safe_load(file))
+    _config_cache[path] = (signature, config_data)
+
+    return config_data
+
+
+def clear_config_cache():
+    """
+    Drop all cached configuration files and resolved quantities.
+    """
+    _config_cache.clear()
+    _resolve_quantity.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _resolve_quantity(val, units):
+    return val * getattr(pyunits, units)
+
+
+def _get_entry(entry):
+    if isinstance(entry, Mapping) and "value" in entry and "units" in entry:
+        return _resolve_quantity(entry["value"], entry["units"])
+    return entry
 
 
 def get_config_value(
@@ -242,15 +251,7 @@ def get_config_value(
         if subsection:
             if subsection in config[section]:
                 if key in config[section][subsection]:
-                    if (
-                        isinstance(config[section][subsection][key], dict)
-                        and "value" in config[section][subsection][key]
-                        and "units" in config[section][subsection][key]
-                    ):
-                        return config[section][subsection][key]["value"] * getattr(
-                            pyunits, config[section][subsection][key]["units"]
-                        )
-                    return config[section][subsection][key]
+                    return _get_entry(config[section][subsection][key])
                 else:
                     raise KeyError(
                         f"Key '{key}' not found in subsection '{subsection}' of section '{section}' of the configuration."
@@ -261,15 +262,7 @@ def get_config_value(
                 )
         else:
             if key in config[section]:
-                if (
-                    isinstance(config[section][key], dict)
-                    and "value" in config[section][key]
-                    and "units" in config[section][key]
-                ):
-                    return config[section][key]["value"] * getattr(
-                        pyunits, config[section][key]["units"]
-                    )
-                return config[section][key]
+                return _get_entry(config[section][key])
             else:
                 raise KeyError(
                     f"Key '{key}' not found in section '{section}' of the configuration."
@@ -290,6 +283,66 @@ def get_config_file(yaml_name):
     return config_file_name
 
 
+def get_wrd_solver(persistent=False):
+    """
+    Return the WaterTAP solver (get_solver()) for full flowsheet solves.
+    With persistent=True, the APPSI ipopt interface is returned (if available)
+    with WaterTAP's default tolerances. It keeps the model resident between
+    solves of the same model and only pushes changed bounds and fixed values
+    instead of rewriting the NL file, but does not use the user scaling of
+    get_solver(). Falls back to get_solver() otherwise.
+    """
+    solver = get_solver()
+    if not persistent:
+        return solver
+
+    opt = SolverFactory("appsi_ipopt")
+    if not opt.available(exception_flag=False):
+        _log.warning("Persistent solver not available, using get_solver() instead")
+        return solver
+    opt.options.update(_watertap_ipopt_options)
+    opt.options.update(solver.options)
+
+    return opt
+
+
+def add_train_replicas(blk, name, replica_state, train_state, num_replicas):
+    """
+    Add constraints on blk so that replica_state (e.g. a mixer inlet state)
+    represents num_replicas identical copies of train_state: component mass
+    flows are scaled by num_replicas and temperature and pressure are equal.
+    Used to model identical trains with a single representative train.
+    """
+    flow_index = train_state.flow_mass_phase_comp.index_set()
+
+    def _flow_rule(b, p, j):
+        return (
+            replica_state.flow_mass_phase_comp[p, j]
+            == num_replicas * train_state.flow_mass_phase_comp[p, j]
+        )
+
+    blk.add_component(f"eq_{name}_flow", Constraint(flow_index, rule=_flow_rule))
+    blk.add_component(
+        f"eq_{name}_temperature",
+        Constraint(expr=replica_state.temperature == train_state.temperature),
+    )
+    blk.add_component(
+        f"eq_{name}_pressure",
+        Constraint(expr=replica_state.pressure == train_state.pressure),
+    )
+
+
+def initialize_train_replicas(replica_state, train_state, num_replicas):
+    """
+    Set the replica_state values from train_state before initializing the
+    unit the replicas flow into.
+    """
+    for (p, j), v in train_state.flow_mass_phase_comp.items():
+        replica_state.flow_mass_phase_comp[p, j].set_value(num_replicas * value(v))
+    replica_state.temperature.set_value(value(train_state.temperature))
+    replica_state.pressure.set_value(value(train_state.pressure))
+
+
 def get_chem_list(yaml_name, section):
     # Section must be "pre_treatment" or "post_treatment"
     chem_list = []
@@ -300,36 +353,3 @@ def get_chem_list(yaml_name, section):
             chem_list.append(subsection)
         # chem_list.remove("default")
     return chem_list
-
-
-def touch_flow_and_conc(b):
-    """
-    Touch flow and conc variables for construction
-    """
-    props = b.find_component("properties")
-    if props is not None:
-        props[0].flow_vol_phase
-        props[0].conc_mass_phase_comp
-        return
-
-    cv = b.find_component("control_volume")
-    if cv is not None:
-        cv.properties_in[0].flow_vol_phase
-        cv.properties_in[0].conc_mass_phase_comp
-        cv.properties_out[0].flow_vol_phase
-        cv.properties_out[0].conc_mass_phase_comp
-        return
-
-    b.mixed_state[0].flow_vol_phase
-    b.mixed_state[0].conc_mass_phase_comp
-
-    if isinstance(b, Mixer):
-        for x in b.config.inlet_list:
-            sb = b.find_component(f"{x}_state")
-            sb[0].flow_vol_phase
-            sb[0].conc_mass_phase_comp
-    if isinstance(b, Separator):
-        for x in b.config.outlet_list:
-            sb = b.find_component(f"{x}_state")
-            sb[0].flow_vol_phase
-            sb[0].conc_mass_phase_comp
@@ -0,0 +1,327 @@
+"""
+Model size and timing benchmark for the WRD flowsheet.
+
+Builds the WRD system for a grid of PRO trains, PRO stages and input files and
+records the build time, model size (variables, constraints and Jacobian
+nonzeros of the active model), initialization and solve time and IPOPT
+iterations. Rows are tagged with the git commit so results can be appended
+to a history file and compared against a stored baseline, e.g.:
+
+    df = run_wrd_benchmark(history_file="wrd_benchmark_history.csv")
+    check_benchmark(df)  # raises if the model grew or slowed down
+
+With solve=False only the model is built, which is enough to catch model
+growth and does not need IPOPT.
+"""
+
+import os
+import time
+import subprocess
+import pandas as pd
+
+from pyomo.environ import Constraint, check_optimal_termination
+from pyomo.core.expr.visitor import identify_variables
+from idaes.core.util.model_statistics import (
+    number_activated_constraints,
+    number_variables_in_activated_constraints,
+)
+from idaes.core.util.scaling import calculate_scaling_factors
+
+from wrd.wrd_treatment_train import (
+    build_wrd_system,
+    add_wrd_connections,
+    set_wrd_inlet_conditions,
+    set_wrd_operating_conditions,
+    set_wrd_system_scaling,
+    initialize_wrd_system,
+    add_wrd_system_costing,
+)
+from wrd.utilities import get_wrd_solver, get_config_file
+from srp.utils.profiling import Profiler
+
+__all__ = [
+    "get_benchmark_cases",
+    "count_nonzeros",
+    "get_model_size",
+    "run_benchmark_case",
+    "run_wrd_benchmark",
+    "load_benchmark",
+    "compare_benchmark",
+    "check_benchmark",
+]
+
+# wrd_inputs_2_20_21.yaml has no chemical_addition or UF sections and cannot
+# build the full WRD flowsheet, so it is not benchmarked
+benchmark_files = [
+    "wrd_inputs_8_19_21.yaml",
+    "wrd_inputs_3_13_21.yaml",
+]
+
+case_columns = ["file", "num_pro_trains", "num_stages"]
+
+size_columns = ["variables", "constraints", "nonzeros"]
+
+time_columns = ["build_time", "init_time", "solve_time", "iterations"]
+
+result_columns = (
+    ["commit"]
+    + case_columns
+    + size_columns
+    + time_columns
+    + ["termination_status", "error"]
+)
+
+# Relative increase over the baseline counted as a regression. Model size is
+# deterministic, timings are noisy.
+default_thresholds = {
+    "variables": 0.01,
+    "constraints": 0.01,
+    "nonzeros": 0.01,
+    "iterations": 0.25,
+    "build_time": 0.5,
+    "init_time": 0.5,
+    "solve_time": 0.5,
+}
+
+default_baseline = "wrd_benchmark_baseline.csv"
+
+
+def get_benchmark_cases(
+    num_pro_trains=range(1, 9), num_stages=(2, 3), files=benchmark_files
+):
+    """
+    All combinations of PRO trains, PRO stages and input files.
+    """
+    return [
+        {"file": f, "num_pro_trains": n, "num_stages": s}
+        for f in files
+        for s in num_stages
+        for n in num_pro_trains
+    ]
+
+
+def count_nonzeros(blk):
+    """
+    Number of nonzeros in the Jacobian of the active constraints, i.e. the
+    number of unfixed variables appearing in each active constraint.
+    """
+    return sum(
+        sum(1 for _ in identify_variables(c.body, include_fixed=False))
+        for c in blk.component_data_objects(Constraint, active=True, descend_into=True)
+    )
+
+
+def get_model_size(m):
+    """
+    Variables, constraints and Jacobian nonzeros of the active model.
+    """
+    return {
+        "variables": number_variables_in_activated_constraints(m),
+        "constraints": number_activated_constraints(m),
+        "nonzeros": count_nonzeros(m),
+    }
+
+
+def _get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark_case(case, solve=True, commit=None):
+    """
+    Build (and if solve, initialize, cost and solve) the WRD flowsheet for one
+    benchmark case. The build time and model size cover building the
+    flowsheet, connections and scaling; the initialization time covers the
+    operating conditions, initialize_wrd_system and costing. Failures are
+    recorded in the returned row.
+    """
+    row = {k: case[k] for k in case_columns}
+    row["commit"] = commit
+    try:
+        with Profiler(count_components=False) as prof:
+            t0 = time.perf_counter()
+            m = build_wrd_system(
+                num_pro_trains=case["num_pro_trains"],
+                num_stages=case["num_stages"],
+                file=case["file"],
+            )
+            add_wrd_connections(m)
+            set_wrd_system_scaling(m)
+            calculate_scaling_factors(m)
+            row["build_time"] = time.perf_counter() - t0
+            row.update(get_model_size(m))
+
+            if solve:
+                t0 = time.perf_counter()
+                set_wrd_inlet_conditions(m)
+                set_wrd_operating_conditions(m)
+                initialize_wrd_system(m)
+                add_wrd_system_costing(m)
+                row["init_time"] = time.perf_counter() - t0
+
+                iterations = prof.root["iterations"]
+                t0 = time.perf_counter()
+                results = get_wrd_solver().solve(m)
+                row["solve_time"] = time.perf_counter() - t0
+                row["iterations"] = prof.root["iterations"] - iterations
+                row["termination_status"] = str(results.solver.termination_condition)
+                if not check_optimal_termination(results):
+                    row["error"] = "Solve did not converge"
+    except Exception as e:
+        row["termination_status"] = "error"
+        row["error"] = f"{type(e).__name__}: {e}"
+
+    return row
+
+
+def run_wrd_benchmark(cases=None, solve=True, results_file=None, history_file=None):
+    """
+    Run benchmark cases serially (so timings are not skewed by other cases)
+    and return the results as a DataFrame.
+
+    Args:
+        cases: list of case dicts, default get_benchmark_cases()
+        solve: also initialize and solve each case
+        results_file: CSV file to write the results to
+        history_file: CSV file the results are appended to, to track them
+            over commits
+    """
+    if cases is None:
+        cases = get_benchmark_cases()
+
+    commit = _get_commit()
+    rows = [run_benchmark_case(case, solve=solve, commit=commit) for case in cases]
+    df = pd.DataFrame(rows, columns=result_columns)
+
+    if results_file is not None:
+        df.to_csv(results_file, index=False)
+    if history_file is not None:
+        df.to_csv(
+            history_file,
+            mode="a",
+            header=not os.path.isfile(history_file),
+            index=False,
+        )
+    return df
+
+
+def load_benchmark(path=default_baseline):
+    """
+    Read benchmark results from a CSV file, a file name in wrd/meta_data or a
+    path.
+    """
+    if not os.path.isfile(path):
+        path = get_config_file(path)
+    return pd.read_csv(path)
+
+
+def compare_benchmark(df, baseline=default_baseline, thresholds=None):
+    """
+    Compare benchmark results with a baseline, case by case.
+
+    Args:
+        df: benchmark results
+        baseline: DataFrame or CSV file of baseline results
+        thresholds: {metric: relative increase counted as a regression},
+            default default_thresholds
+
+    Returns:
+        DataFrame with one row per case and metric found in both, with the
+        baseline and new value, the relative change and whether it is a
+        regression
+    """
+    if not isinstance(baseline, pd.DataFrame):
+        baseline = load_benchmark(baseline)
+    if thresholds is None:
+        thresholds = default_thresholds
+
+    merged = df.merge(baseline, on=case_columns, suffixes=("", "_baseline"))
+    rows = []
+    for metric, threshold in thresholds.items():
+        if metric not in df or f"{metric}_baseline" not in merged:
+            continue
+        for _, r in merged.iterrows():
+            new, base = r[metric], r[f"{metric}_baseline"]
+            if pd.isna(new) or pd.isna(base) or base <= 0:
+                continue
+            change = new / base - 1
+            rows.append(
+                {
+                    **{k: r[k] for k in case_columns},
+                    "metric": metric,
+                    "baseline": base,
+                    "value": new,
+                    "change": change,
+                    "threshold": threshold,
+                    "regression": change > threshold,
+                }
+            )
+    return pd.DataFrame(
+        rows,
+        columns=case_columns
+        + ["metric", "baseline", "value", "change", "threshold", "regression"],
+    )
+
+
+def _case_name(r):
+    return f"{r['file']} {r['num_pro_trains']} trains {r['num_stages']} stages"
+
+
+def check_benchmark(df, baseline=default_baseline, thresholds=None):
+    """
+    Raise a RuntimeError listing every case that failed or has no model
+    size, every case that is only in the results or only in the baseline,
+    and every metric that grew by more than its threshold over the baseline.
+    Returns the comparison otherwise.
+    """
+    if not isinstance(baseline, pd.DataFrame):
+        baseline = load_benchmark(baseline)
+
+    failed = df[
+        (df["termination_status"] == "error")
+        | df["error"].notna()
+        | df[size_columns].isna().any(axis=1)
+    ]
+    lines = [f"{_case_name(r)}: failed ({r['error']})" for _, r in failed.iterrows()]
+    cases = df[case_columns].merge(baseline[case_columns], how="outer", indicator=True)
+    lines += [
+        f"{_case_name(r)}: "
+        + (
+            "not in the results"
+            if r["_merge"] == "right_only"
+            else "not in the baseline"
+        )
+        for _, r in cases[cases["_merge"] != "both"].iterrows()
+    ]
+    if lines:
+        raise RuntimeError("WRD benchmark cases failed:\n" + "\n".join(lines))
+
+    comparison = compare_benchmark(df, baseline=baseline, thresholds=thresholds)
+    regressions = comparison[comparison["regression"]]
+    if not regressions.empty:
+        lines = [
+            f"{_case_name(r)}: {r['metric']} {r['baseline']:.4g} -> {r['value']:.4g} "
+            f"(+{r['change']:.1%}, threshold {r['threshold']:.0%})"
+            for _, r in regressions.iterrows()
+        ]
+        raise RuntimeError(
+            "WRD benchmark regressions over the baseline:\n" + "\n".join(lines)
+        )
+    return comparison
+
+
+if __name__ == "__main__":
+    df = run_wrd_benchmark(
+        results_file="wrd_benchmark_results.csv",
+        history_file="wrd_benchmark_history.csv",
+    )
+    print(df)
+    check_benchmark(df)
@@ -0,0 +1,314 @@
+import os
+import csv
+import time
+import yaml
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from pyomo.environ import (
+    value,
+    check_optimal_termination,
+    units as pyunits,
+)
+from idaes.core.util.scaling import calculate_scaling_factors
+
+from wrd.wrd_treatment_train import (
+    build_wrd_system,
+    add_wrd_connections,
+    set_wrd_inlet_conditions,
+    set_wrd_operating_conditions,
+    set_wrd_system_scaling,
+    initialize_wrd_system,
+    add_wrd_system_costing,
+    resolve_wrd_system,
+)
+from wrd.utilities import get_config_value, get_wrd_solver
+from wrd.solution_store import SolutionStore
+
+__all__ = [
+    "load_sweep_cases",
+    "run_wrd_case",
+    "run_wrd_sweep",
+    "run_wrd_replay",
+]
+
+# Inputs that define a sweep case; anything left as None falls back to the yaml file.
+# A low finite_elements (e.g. 2-3) gives a cheap RO screening model for sweeps.
+case_inputs = [
+    "file",
+    "Qin",
+    "Cin",
+    "Tin",
+    "electricity_cost",
+    "num_pro_trains",
+    "finite_elements",
+]
+
+result_columns = case_inputs + [
+    "termination_status",
+    "warm_start",
+    "LCOW",
+    "system_recovery",
+    "total_pump_power",
+    "SEC",
+    "wall_time",
+    "error",
+]
+
+
+def load_sweep_cases(cases_file):
+    """
+    Read sweep cases from a CSV or YAML file.
+    CSV files have one case per row with columns named after case_inputs.
+    YAML files are a list of cases (or a dict with a "cases" list).
+    """
+    ext = os.path.splitext(cases_file)[1].lower()
+    if ext == ".csv":
+        df = pd.read_csv(cases_file)
+        cases = df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    elif ext in [".yaml", ".yml"]:
+        with open(cases_file, "r") as f:
+            cases = yaml.safe_load(f)
+        if isinstance(cases, dict):
+            cases = cases["cases"]
+    else:
+        raise ValueError(f"Unsupported sweep case file type '{ext}'.")
+
+    clean_cases = []
+    for i, case in enumerate(cases):
+        unknown = set(case) - set(case_inputs)
+        if unknown:
+            raise KeyError(f"Unknown inputs {sorted(unknown)} in sweep case {i}.")
+        if case.get("file") is None:
+            raise ValueError(f"Input file must be provided for sweep case {i}.")
+        c = {k: case.get(k) for k in case_inputs}
+        if c["num_pro_trains"] is None:
+            c["num_pro_trains"] = 4
+        c["num_pro_trains"] = int(c["num_pro_trains"])
+        if c["finite_elements"] is not None:
+            c["finite_elements"] = int(c["finite_elements"])
+        clean_cases.append(c)
+
+    return clean_cases
+
+
+def _build_wrd_case(case, cost_RO=False, solution_store=None):
+    m = build_wrd_system(
+        num_pro_trains=case["num_pro_trains"],
+        file=case["file"],
+        finite_elements=case.get("finite_elements"),
+    )
+    add_wrd_connections(m)
+    set_wrd_system_scaling(m)
+    calculate_scaling_factors(m)
+    set_wrd_inlet_conditions(
+        m, Qin=case.get("Qin"), Cin=case.get("Cin"), Tin=case.get("Tin")
+    )
+    set_wrd_operating_conditions(m)
+    if case.get("electricity_cost") is not None:
+        m.fs.costing.electricity_cost.fix(
+            case["electricity_cost"] * pyunits.USD_2021 / pyunits.kWh
+        )
+
+    warm_started = solution_store is not None and solution_store.warm_start(m)
+    if not warm_started:
+        initialize_wrd_system(m)
+    add_wrd_system_costing(m, cost_RO=cost_RO)
+
+    return m, warm_started
+
+
+def _record_results(m, results, row):
+    row["termination_status"] = str(results.solver.termination_condition)
+    if check_optimal_termination(results):
+        row["LCOW"] = value(
+            pyunits.convert(m.fs.costing.LCOW, to_units=pyunits.USD_2021 / pyunits.m**3)
+        )
+        row["system_recovery"] = value(m.fs.system_recovery)
+        row["total_pump_power"] = value(
+            pyunits.convert(m.fs.total_system_pump_power, to_units=pyunits.kW)
+        )
+        row["SEC"] = value(
+            pyunits.convert(m.fs.costing.SEC, to_units=pyunits.kWh / pyunits.m**3)
+        )
+
+
+def _solve_wrd_case(case, cost_RO=False, solution_store=None):
+    row = {k: case.get(k) for k in case_inputs}
+    entry = None
+    t0 = time.perf_counter()
+    try:
+        m, warm_started = _build_wrd_case(
+            case, cost_RO=cost_RO, solution_store=solution_store
+        )
+        solver = get_wrd_solver()
+        results = solver.solve(m)
+        if warm_started and not check_optimal_termination(results):
+            # Fall back to the full sequential initialization
+            warm_started = False
+            initialize_wrd_system(m)
+            m.fs.costing.initialize()
+            results = solver.solve(m)
+
+        row["warm_start"] = warm_started
+        _record_results(m, results, row)
+        if solution_store is not None and check_optimal_termination(results):
+            entry = SolutionStore().add(m)
+    except Exception as e:
+        row["termination_status"] = "error"
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["wall_time"] = time.perf_counter() - t0
+
+    return row, entry
+
+
+def run_wrd_case(case, cost_RO=False, solution_store=None):
+    """
+    Build, initialize, cost and solve the WRD flowsheet for one sweep case.
+    Failures are recorded in the returned row instead of raised so one bad
+    operating day does not stop the sweep.
+    If a SolutionStore is passed, the model is seeded from the nearest stored
+    solution instead of running initialize_wrd_system, and the converged
+    solution is added to the store.
+    """
+    row, entry = _solve_wrd_case(case, cost_RO=cost_RO, solution_store=solution_store)
+    if entry is not None:
+        solution_store.entries.append(entry)
+
+    return row
+
+
+def run_wrd_sweep(
+    cases,
+    results_file,
+    max_workers=None,
+    cost_RO=False,
+    solution_store=None,
+):
+    """
+    Run sweep cases over a process pool, appending a row to results_file
+    (CSV) as each case finishes. cases can be a list of case dicts or a path
+    to a CSV/YAML case file. Returns the results as a DataFrame.
+    If a SolutionStore is passed, each case is warm-started from the solutions
+    available when it is submitted, converged solutions are added to the store
+    as cases finish, and the store is saved at the end if it has a path.
+    """
+    if isinstance(cases, (str, os.PathLike)):
+        cases = load_sweep_cases(cases)
+    if max_workers is None:
+        max_workers = os.cpu_count()
+
+    rows = []
+    pending = list(enumerate(cases))[::-1]
+    with open(results_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=result_columns)
+        writer.writeheader()
+        f.flush()
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            # Only keep max_workers cases in flight so later cases can be
+            # warm-started from solutions of cases that already finished
+            running = {}
+            while pending or running:
+                while pending and len(running) < max_workers:
+                    i, case = pending.pop()
+                    future = executor.submit(
+                        _solve_wrd_case,
+                        case,
+                        cost_RO,
+                        solution_store,
+                    )
+                    running[future] = i
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    i = running.pop(future)
+                    row, entry = future.result()
+                    if entry is not None:
+                        solution_store.entries.append(entry)
+                    writer.writerow(row)
+                    f.flush()
+                    rows.append((i, row))
+
+    if solution_store is not None and solution_store.path is not None:
+        solution_store.save()
+
+    rows.sort(key=lambda x: x[0])
+    return pd.DataFrame([r for _, r in rows], columns=result_columns)
+
+
+def _get_default_inputs(m):
+    # Case inputs from the yaml file, in the units used by update_wrd_inputs
+    config = m.fs.config_data
+    Qin = get_config_value(config, "feed_flow_water", "feed_stream")
+    Cin = get_config_value(
+        config, "feed_conductivity", "feed_stream"
+    ) * get_config_value(config, "feed_conductivity_conversion", "feed_stream")
+    Tin = get_config_value(config, "feed_temperature", "feed_stream")
+    elec = get_config_value(config, "electricity_cost", "electricity_cost")
+    return {
+        "Qin": value(pyunits.convert(Qin, to_units=pyunits.gallons / pyunits.minute)),
+        "Cin": value(pyunits.convert(Cin, to_units=pyunits.g / pyunits.L)),
+        "Tin": value(pyunits.convert(Tin, to_units=pyunits.K)),
+        "electricity_cost": value(
+            pyunits.convert(elec, to_units=pyunits.USD_2021 / pyunits.kWh)
+        ),
+    }
+
+
+def run_wrd_replay(cases, results_file, cost_RO=False, persistent_solver=False):
+    """
+    Run sweep cases serially, building one model per (file, num_pro_trains,
+    finite_elements)
+    and re-solving it with resolve_wrd_system for each following case
+    instead of rebuilding. With persistent_solver=True the solver keeps the
+    model resident so only the changed inputs are pushed between solves.
+    Rows are appended to results_file (CSV) as cases finish.
+    """
+    if isinstance(cases, (str, os.PathLike)):
+        cases = load_sweep_cases(cases)
+
+    models = {}
+    rows = []
+    with open(results_file, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=result_columns)
+        writer.writeheader()
+        f.flush()
+        for case in cases:
+            row = {k: case.get(k) for k in case_inputs}
+            key = (case["file"], case["num_pro_trains"], case.get("finite_elements"))
+            t0 = time.perf_counter()
+            try:
+                if key not in models:
+                    m, _ = _build_wrd_case(case, cost_RO=cost_RO)
+                    m.solver = get_wrd_solver(persistent=persistent_solver)
+                    results = m.solver.solve(m)
+                    row["warm_start"] = False
+                else:
+                    m = models.pop(key)
+                    inputs = _get_default_inputs(m)
+                    inputs.update(
+                        {k: case[k] for k in inputs if case.get(k) is not None}
+                    )
+                    results = resolve_wrd_system(m, **inputs)
+                    row["warm_start"] = True
+                _record_results(m, results, row)
+                # Only keep converged models to re-solve from
+                if check_optimal_termination(results):
+                    models[key] = m
+            except Exception as e:
+                row["termination_status"] = "error"
+                row["error"] = f"{type(e).__name__}: {e}"
+            row["wall_time"] = time.perf_counter() - t0
+            writer.writerow(row)
+            f.flush()
+            rows.append(row)
+
+    return pd.DataFrame(rows, columns=result_columns)
+
+
+if __name__ == "__main__":
+    cases = [
+        {"file": "wrd_inputs_8_19_21.yaml", "num_pro_trains": n} for n in [1, 2, 3, 4]
+    ]
+    store = SolutionStore("wrd_solution_store.json")
+    df = run_wrd_sweep(cases, "wrd_sweep_results.csv", solution_store=store)
+    print(df)
@@ -21,15 +21,39 @@ from wrd.components.pump import *
 from wrd.components.UF_system import *
 from wrd.components.ro_system import *
 from wrd.components.ro_stage import *
-from wrd.components.ro import report_ro
+from wrd.components.ro import (
+    report_ro,
+    get_ro_discretization_outputs,
+    estimate_ro_discretization_error,
+)
 from wrd.components.chemical_addition import *
 from wrd.components.brine_disposal import *
+from wrd.components.parallel_init import initialize_trains_parallel
 from wrd.utilities import *
 from srp.utils import touch_flow_and_conc
 from models import HeadLoss, Source
+from srp.utils.profiling import profiled, profile_section
+from srp.utils.results import (
+    collect_results,
+    collect_stream_results,
+    get_result,
+    write_results,
+)
+from srp.utils.units import converted_value
+from pyomo.core.base.units_container import UnitsError
 
 
-def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=None):
+@profiled
+def build_wrd_system(
+    num_pro_trains=4,
+    num_tsro_trains=None,
+    num_stages=2,
+    file=None,
+    symmetric_trains=False,
+    finite_elements=None,
+    lazy_properties=False,
+    explicit_chemical_addition=False,
+):
 
     if file is None:
         raise ValueError("Input file must be provided to build WRD system.")
@@ -38,9 +62,17 @@ def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=
         num_tsro_trains = num_pro_trains
 
     m = ConcreteModel()
+    m.file = file
     m.num_pro_trains = num_pro_trains
     m.num_tsro_trains = num_tsro_trains
     m.num_stages = num_stages
+    m.symmetric_trains = symmetric_trains
+    m.finite_elements = finite_elements
+    # Only build flow_vol_phase and conc_mass_phase_comp where referenced
+    m.lazy_properties = lazy_properties
+    # Chemical solution flows and pumping power as Expressions, evaluated after
+    # the solve instead of being solved for
+    m.explicit_chemical_addition = explicit_chemical_addition
     m.fs = FlowsheetBlock(dynamic=False)
 
     config = get_config_file(file)
@@ -74,12 +106,19 @@ def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=
     for chem_name in m.fs.pre_treat_chem_list:
         m.fs.add_component(chem_name + "_addition", FlowsheetBlock(dynamic=False))
         build_chem_addition(
-            m.fs.find_component(chem_name + "_addition"), chem_name, m.fs.properties
+            m.fs.find_component(chem_name + "_addition"),
+            chem_name,
+            m.fs.properties,
+            explicit=explicit_chemical_addition,
         )
 
     # UF
     build_uf_system(
-        m=m, num_trains=num_pro_trains, prop_package=m.fs.properties, file=file
+        m=m,
+        num_trains=num_pro_trains,
+        prop_package=m.fs.properties,
+        file=file,
+        symmetric_trains=symmetric_trains,
     )
 
     # PRO System
@@ -89,6 +128,8 @@ def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=
         num_stages=num_stages,
         prop_package=m.fs.properties,
         file=file,
+        symmetric_trains=symmetric_trains,
+        finite_elements=finite_elements,
     )
 
     # TSRO System
@@ -107,7 +148,11 @@ def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=
 
     for t in m.fs.tsro_trains:
         build_ro_stage(
-            m.fs.tsro_train[t], stage_num=3, prop_package=m.fs.properties, file=file
+            m.fs.tsro_train[t],
+            stage_num=3,
+            prop_package=m.fs.properties,
+            file=file,
+            finite_elements=finite_elements,
         )
 
     ro_system_prod_mixer_inlet_list = ["from_pro_product"] + [
@@ -152,7 +197,10 @@ def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=
     for chem_name in m.fs.post_treat_chem_list:
         m.fs.add_component(chem_name + "_addition", FlowsheetBlock(dynamic=False))
         build_chem_addition(
-            m.fs.find_component(chem_name + "_addition"), chem_name, m.fs.properties
+            m.fs.find_component(chem_name + "_addition"),
+            chem_name,
+            m.fs.properties,
+            explicit=explicit_chemical_addition,
         )
     # Combined chemical list for operating conditions, scaling, and costing(?)
     m.fs.chemical_list = m.fs.pre_treat_chem_list + m.fs.post_treat_chem_list
@@ -190,6 +238,7 @@ def build_wrd_system(num_pro_trains=4, num_tsro_trains=None, num_stages=2, file=
     return m
 
 
+@profiled
 def add_wrd_connections(m):
     # Connect pre-UF chemical chain: feed -> chem1 -> chem2 -> ... -> UF
     for i, chem_name in enumerate(m.fs.pre_treat_chem_list):
@@ -295,7 +344,8 @@ def add_wrd_connections(m):
         source=m.fs.disposal_mixer.outlet, destination=m.fs.disposal.feed.inlet
     )
 
-    TransformationFactory("network.expand_arcs").apply_to(m)
+    with profile_section("expand_arcs", m):
+        TransformationFactory("network.expand_arcs").apply_to(m)
 
 
 def set_wrd_inlet_conditions(m, Qin=None, Cin=None, Tin=None):
@@ -372,6 +422,174 @@ def set_wrd_operating_conditions(m):
     m.fs.disposal_mixer.outlet.pressure[0].fix(101325)
 
 
+def update_wrd_inputs(
+    m,
+    Qin=None,
+    Cin=None,
+    Tin=None,
+    pump_pressures=None,
+    uf_pump_pressure=None,
+    electricity_cost=None,
+):
+    """
+    Update the inputs of an already built and solved WRD flowsheet in place
+    so it can be re-solved without rebuilding the model.
+        Qin: feed flow per PRO train (gpm)
+        Cin: feed concentration (g/L)
+        Tin: feed temperature (K)
+        pump_pressures: dict of {stage_num: outlet pressure (psi)} for PRO/TSRO pumps
+        uf_pump_pressure: UF pump outlet pressure (psi)
+        electricity_cost: electricity cost (USD_2021/kWh)
+    Inputs left as None keep their current value.
+    """
+    if any(x is not None for x in [Qin, Cin, Tin]):
+        feed = m.fs.feed.properties[0]
+        if Qin is None:
+            Qin = value(
+                pyunits.convert(
+                    feed.flow_vol_phase["Liq"] / m.num_pro_trains,
+                    to_units=pyunits.gallons / pyunits.minute,
+                )
+            )
+        if Cin is None:
+            Cin = value(
+                pyunits.convert(
+                    feed.conc_mass_phase_comp["Liq", "NaCl"],
+                    to_units=pyunits.g / pyunits.L,
+                )
+            )
+        if Tin is None:
+            Tin = value(feed.temperature)
+        # calculate_state requires the state variables to be unfixed
+        feed.flow_mass_phase_comp.unfix()
+        feed.temperature.unfix()
+        feed.pressure.unfix()
+        set_wrd_inlet_conditions(m, Qin=Qin, Cin=Cin, Tin=Tin)
+
+    if pump_pressures is not None:
+        pumps = [
+            m.fs.train[i].stage[j].pump
+            for i in m.fs.trains
+            for j in m.fs.train[i].stages
+        ]
+        pumps += [m.fs.tsro_train[t].pump for t in m.fs.tsro_trains]
+        for pump in pumps:
+            if pump.stage_num in pump_pressures:
+                pump.unit.control_volume.properties_out[0].pressure.fix(
+                    pump_pressures[pump.stage_num] * pyunits.psi
+                )
+
+    if uf_pump_pressure is not None:
+        for i in m.fs.uf_trains:
+            m.fs.uf_train[i].pump.unit.control_volume.properties_out[0].pressure.fix(
+                uf_pump_pressure * pyunits.psi
+            )
+
+    if electricity_cost is not None:
+        m.fs.costing.electricity_cost.fix(
+            electricity_cost * pyunits.USD_2021 / pyunits.kWh
+        )
+
+
+def resolve_wrd_system(m, solver=None, **inputs):
+    """
+    Update inputs with update_wrd_inputs and re-solve the WRD flowsheet
+    starting from the current (last converged) solution. If no solver is
+    passed, the one stored on the model by main() is reused (so a persistent
+    solver only pushes the changed inputs), falling back to get_solver().
+    """
+    update_wrd_inputs(m, **inputs)
+    if solver is None:
+        solver = getattr(m, "solver", None)
+    if solver is None:
+        solver = get_solver()
+    results = solver.solve(m)
+    return results
+
+
+def get_wrd_ro_blocks(m):
+    """
+    (stage_num, blk) pairs for the RO block of every PRO stage and TSRO train.
+    """
+    ro_blks = [
+        (m.fs.train[i].stage[j].ro.stage_num, m.fs.train[i].stage[j].ro)
+        for i in m.fs.trains
+        for j in m.fs.train[i].stages
+    ]
+    ro_blks += [
+        (m.fs.tsro_train[t].ro.stage_num, m.fs.tsro_train[t].ro)
+        for t in m.fs.tsro_trains
+    ]
+    return ro_blks
+
+
+def get_wrd_finite_elements(m):
+    """
+    Number of RO finite elements for each stage_num in the WRD flowsheet.
+    """
+    return {stage_num: blk.finite_elements for stage_num, blk in get_wrd_ro_blocks(m)}
+
+
+def estimate_wrd_discretization_error(coarse, fine, order=1):
+    """
+    Richardson estimate of the RO discretization error of a solved WRD
+    flowsheet (fine) from the same flowsheet solved with fewer finite
+    elements (coarse). Returns the largest estimate over all trains for
+    each stage_num whose mesh differs between the two.
+    """
+    coarse_elements = get_wrd_finite_elements(coarse)
+    fine_elements = get_wrd_finite_elements(fine)
+    errors = {}
+    for (stage_num, coarse_blk), (_, fine_blk) in zip(
+        get_wrd_ro_blocks(coarse), get_wrd_ro_blocks(fine)
+    ):
+        refine_factor = fine_elements[stage_num] / coarse_elements[stage_num]
+        if refine_factor == 1:
+            continue
+        err = estimate_ro_discretization_error(
+            get_ro_discretization_outputs(coarse_blk),
+            get_ro_discretization_outputs(fine_blk),
+            refine_factor=refine_factor,
+            order=order,
+        )
+        errors[stage_num] = max(errors.get(stage_num, 0), err)
+    return errors
+
+
+def solve_wrd_adaptive(
+    finite_elements=3, tol=1e-3, max_elements=40, refine_factor=2, **kwargs
+):
+    """
+    Solve the WRD flowsheet on a coarse RO mesh, then rebuild and re-solve
+    with refine_factor times more finite elements for the RO stages whose
+    Richardson error estimate, from the last two solves, is above tol (every
+    stage after the first solve), until every stage is below tol or at
+    max_elements. kwargs are passed to main.
+    """
+    m = main(finite_elements=finite_elements, **kwargs)
+    elements = get_wrd_finite_elements(m)
+    errors = {}
+    refine_stages = set(elements)
+    while True:
+        refine = {
+            stage_num: min(elements[stage_num] * refine_factor, max_elements)
+            for stage_num in refine_stages
+            if elements[stage_num] < max_elements
+        }
+        if not refine:
+            break
+        print(f"Refining RO stages {refine}, estimated errors {errors}")
+        elements.update(refine)
+        fine = main(finite_elements=dict(elements), **kwargs)
+        errors.update(estimate_wrd_discretization_error(m, fine))
+        m = fine
+        refine_stages = {stage_num for stage_num in refine if errors[stage_num] > tol}
+
+    m.ro_discretization_error = errors
+    return m
+
+
+@profiled
 def set_wrd_system_scaling(m):
 
     m.fs.properties.set_default_scaling(
@@ -391,7 +609,13 @@ def set_wrd_system_scaling(m):
     add_decarbonator_scaling(m.fs.decarbonator)
 
 
-def initialize_wrd_system(m):
+@profiled
+def initialize_wrd_system(m, parallel=False):
+    """
+    Sequentially initialize the WRD flowsheet. With parallel=True the
+    independent UF, PRO and TSRO trains are each initialized in separate
+    worker processes.
+    """
 
     m.fs.feed.initialize()
 
@@ -409,13 +633,13 @@ def initialize_wrd_system(m):
         prev = chem_name
 
     propagate_state(m.fs.pre_chem_to_uf_system)
-    initialize_uf_system(m)
+    initialize_uf_system(m, parallel=parallel)
 
     m.fs.uf_disposal_mixer.initialize()
     propagate_state(m.fs.uf_disposal_to_disposal_mixer)
 
     propagate_state(m.fs.uf_system_to_pro)
-    initialize_ro_system(m)
+    initialize_ro_system(m, parallel=parallel)
 
     propagate_state(m.fs.pro_to_ro_system_product_mixer)
 
@@ -425,10 +649,23 @@ def initialize_wrd_system(m):
     propagate_state(m.fs.tsro_header_to_tsro_separator)
     m.fs.tsro_feed_separator.initialize()
 
+    if parallel:
+        for t in m.fs.tsro_trains:
+            a = m.fs.find_component(f"tsro_separator_to_tsro{t}")
+            propagate_state(a)
+        initialize_trains_parallel(
+            [m.fs.tsro_train[t] for t in m.fs.tsro_trains],
+            "ro_stage",
+            stage_num=3,
+            file=m.file,
+            finite_elements=m.finite_elements,
+        )
+
     for t in m.fs.tsro_trains:
-        a = m.fs.find_component(f"tsro_separator_to_tsro{t}")
-        propagate_state(a)
-        initialize_ro_stage(m.fs.tsro_train[t])
+        if not parallel:
+            a = m.fs.find_component(f"tsro_separator_to_tsro{t}")
+            propagate_state(a)
+            initialize_ro_stage(m.fs.tsro_train[t])
         a = m.fs.find_component(f"tsro{t}_to_ro_product")
         propagate_state(a)
         a = m.fs.find_component(f"tsro{t}_to_brine")
@@ -467,6 +704,7 @@ def initialize_wrd_system(m):
     initialize_brine_disposal(m.fs.disposal)
 
 
+@profiled
 def add_wrd_system_costing(m, source_cost=0.15, cost_RO=False):
 
     m.fs.feed.costing = UnitModelCostingBlock(flowsheet_costing_block=m.fs.costing)
@@ -517,10 +755,10 @@ def report_wrd_comparison_metrics(m, w=30):
     print(f"\n{header}\n")
     for i in m.fs.uf_trains:
         print(
-            f'{f"UF Train {i} Feed Flow":<{w}s}{value(pyunits.convert(m.fs.uf_train[i].feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"UF Train {i} Feed Flow":<{w}s}{converted_value(m.fs.uf_train[i].feed.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
-            f'{f"UF Train {i} Pump Power":<{w}s}{value(pyunits.convert(m.fs.uf_train[i].pump.unit.work_mechanical[0], to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+            f'{f"UF Train {i} Pump Power":<{w}s}{converted_value(m.fs.uf_train[i].pump.unit.work_mechanical[0], pyunits.kW):<{w}.3f}{"kW"}'
         )
 
     # Print PRO train metrics
@@ -533,13 +771,13 @@ def report_wrd_comparison_metrics(m, w=30):
         # Print stage-by-stage pump powers and permeate flows
         for j in m.fs.train[i].stages:
             print(
-                f'{f"  Stage {j} Pump Power":<{w}s}{value(pyunits.convert(m.fs.train[i].stage[j].pump.unit.work_mechanical[0], to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+                f'{f"  Stage {j} Pump Power":<{w}s}{converted_value(m.fs.train[i].stage[j].pump.unit.work_mechanical[0], pyunits.kW):<{w}.3f}{"kW"}'
             )
             print(
-                f'{f"  Stage {j} Perm Flow":<{w}s}{value(pyunits.convert(m.fs.train[i].stage[j].product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+                f'{f"  Stage {j} Perm Flow":<{w}s}{converted_value(m.fs.train[i].stage[j].product.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
             )
             print(
-                f'{f"Perm Conc":<{w}s}{value(pyunits.convert(m.fs.train[i].stage[j].ro.unit.mixed_permeate[0].conc_mass_phase_comp["Liq", "NaCl"], to_units=pyunits.mg / pyunits.liter)):<{w}.3f}{f"mg/L"}'
+                f'{f"Perm Conc":<{w}s}{converted_value(m.fs.train[i].stage[j].ro.unit.mixed_permeate[0].conc_mass_phase_comp["Liq", "NaCl"], pyunits.mg / pyunits.liter):<{w}.3f}{f"mg/L"}'
             )
             print(
                 f'{f"  Stage {j} Recovery":<{w}s}{value(m.fs.train[i].stage[j].ro.unit.recovery_vol_phase[0, "Liq"])*100:<{w}.3f}{"%"}'
@@ -547,10 +785,10 @@ def report_wrd_comparison_metrics(m, w=30):
 
         # Print train totals
         print(
-            f'{f"  Train {i} Total Pump Power":<{w}s}{value(pyunits.convert(m.fs.train[i].total_pump_power, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+            f'{f"  Train {i} Total Pump Power":<{w}s}{converted_value(m.fs.train[i].total_pump_power, pyunits.kW):<{w}.3f}{"kW"}'
         )
         print(
-            f'{f"  Train {i} Total Perm Flow":<{w}s}{value(pyunits.convert(m.fs.train[i].product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"  Train {i} Total Perm Flow":<{w}s}{converted_value(m.fs.train[i].product.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
 
     # Print TSRO train metrics
@@ -561,10 +799,10 @@ def report_wrd_comparison_metrics(m, w=30):
         print(f"\n{header}\n")
 
         print(
-            f'{f"  TSRO {t} Pump Power":<{w}s}{value(pyunits.convert(m.fs.tsro_train[t].pump.unit.work_mechanical[0], to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+            f'{f"  TSRO {t} Pump Power":<{w}s}{converted_value(m.fs.tsro_train[t].pump.unit.work_mechanical[0], pyunits.kW):<{w}.3f}{"kW"}'
         )
         print(
-            f'{f"  TSRO {t} Perm Flow":<{w}s}{value(pyunits.convert(m.fs.tsro_train[t].product.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+            f'{f"  TSRO {t} Perm Flow":<{w}s}{converted_value(m.fs.tsro_train[t].product.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
         )
         print(
             f'{f"  TSRO {t} Recovery":<{w}s}{value(m.fs.tsro_train[t].ro.unit.recovery_vol_phase[0, "Liq"])*100:<{w}.3f}{"%"}'
@@ -576,13 +814,13 @@ def report_wrd_comparison_metrics(m, w=30):
     print(f"\n{header}\n")
 
     print(
-        f'{f"UV AOP Feed Flow":<{w}s}{value(pyunits.convert(m.fs.UV_aop.feed.properties[0].flow_vol_phase["Liq"], to_units=pyunits.gallons / pyunits.minute)):<{w}.3f}{"gpm"}'
+        f'{f"UV AOP Feed Flow":<{w}s}{converted_value(m.fs.UV_aop.feed.properties[0].flow_vol_phase["Liq"], pyunits.gallons / pyunits.minute):<{w}.3f}{"gpm"}'
     )
     print(
-        f'{f"UV AOP Energy Use":<{w}s}{value(pyunits.convert(m.fs.UV_aop.unit.power_consumption, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"UV AOP Energy Use":<{w}s}{converted_value(m.fs.UV_aop.unit.power_consumption, pyunits.kW):<{w}.3f}{"kW"}'
     )
     print(
-        f'{f"Decarbonator Energy Use":<{w}s}{value(pyunits.convert(m.fs.decarbonator.unit.power_consumption, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
+        f'{f"Decarbonator Energy Use":<{w}s}{converted_value(m.fs.decarbonator.unit.power_consumption, pyunits.kW):<{w}.3f}{"kW"}'
     )
 
     # Costs
@@ -592,7 +830,7 @@ def report_wrd_comparison_metrics(m, w=30):
         header = "-" * side + f" {title} " + "-" * side
         print(f"\n{header}\n")
         print(
-            f'{f"Levelized Cost of Water":<{w}s}{value(pyunits.convert(m.fs.costing.LCOW, to_units=pyunits.USD_2021  / pyunits.m**3)):<{w}.3f}{"$/m3"}'
+            f'{f"Levelized Cost of Water":<{w}s}{converted_value(m.fs.costing.LCOW, pyunits.USD_2021  / pyunits.m**3):<{w}.3f}{"$/m3"}'
         )
         for key in m.fs.costing.aggregate_flow_costs:
             print(
@@ -606,39 +844,42 @@ def report_wrd_comparison_metrics(m, w=30):
         )
 
 
-def report_wrd(m, w=30, add_comp_metrics=False):
+def report_wrd_summary(m, w=30):
 
-    feed_flow = pyunits.convert(
-        m.fs.feed.properties[0].flow_vol_phase["Liq"],
-        to_units=pyunits.gallon / pyunits.minute,
-    )
-    feed_flow_mgd = pyunits.convert(feed_flow, to_units=pyunits.Mgallons / pyunits.day)
-    feed_conc = pyunits.convert(
-        m.fs.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"],
-        to_units=pyunits.mg / pyunits.L,
+    streams = {
+        "Feed": m.fs.feed.properties[0],
+        "Product": m.fs.product.properties[0],
+        "Brine": m.fs.disposal.feed.properties[0],
+    }
+    df = collect_stream_results(list(streams.values()), construct=True)
+    gpm_to_mgd = pyunits.convert_value(
+        1,
+        from_units=pyunits.gallon / pyunits.minute,
+        to_units=pyunits.Mgallons / pyunits.day,
     )
 
-    prod_flow = pyunits.convert(
-        m.fs.product.properties[0].flow_vol_phase["Liq"],
-        to_units=pyunits.gallon / pyunits.minute,
+    title = f"WRD System Summary"
+    side = int(((3 * w) - len(title)) / 2) - 1
+    header = "/" * side + f" {title} " + "\\" * side
+    print(f"\n\n{header}\n")
+    print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
+    print(f"{'-' * (3 * w)}")
+    print(
+        f'{"System Recovery":<{w}s}{value(m.fs.system_recovery)*100:<{w}.3f}{"%":<{w}s}'
     )
-    prod_flow_mgd = pyunits.convert(prod_flow, to_units=pyunits.Mgallons / pyunits.day)
-    prod_conc = pyunits.convert(
-        m.fs.product.properties[0].conc_mass_phase_comp["Liq", "NaCl"],
-        to_units=pyunits.mg / pyunits.L,
+    for name, sb in streams.items():
+        flow = get_result(df, sb, "flow_vol_phase", "Liq")
+        conc = get_result(df, sb, "conc_mass_phase_comp", "Liq,NaCl")
+        print(f'{f"{name} Flow (gpm)":<{w}s}{flow:<{w}.3f}{"gpm"}')
+        print(f'{f"{name} Flow (MGD)":<{w}s}{flow * gpm_to_mgd:<{w}.3f}{"MGD"}')
+        print(f'{f"{name} Conc":<{w}s}{conc:<{w}.3f}{"mg/L"}')
+    print()
+    print(
+        f'{f"Total Pumping Power":<{w}s}{converted_value(m.fs.total_system_pump_power, pyunits.kW):<{w}.3f}{"kW"}'
     )
 
-    brine_flow = pyunits.convert(
-        m.fs.disposal.feed.properties[0].flow_vol_phase["Liq"],
-        to_units=pyunits.gallon / pyunits.minute,
-    )
-    brine_flow_mgd = pyunits.convert(
-        brine_flow, to_units=pyunits.Mgallons / pyunits.day
-    )
-    brine_conc = pyunits.convert(
-        m.fs.disposal.feed.properties[0].conc_mass_phase_comp["Liq", "NaCl"],
-        to_units=pyunits.mg / pyunits.L,
-    )
+
+def report_wrd(m, w=30, add_comp_metrics=False, results_file=None):
 
     title = f"WRD System Report"
     side = int(((3 * w) - len(title)) / 2) - 1
@@ -688,31 +929,12 @@ def report_wrd(m, w=30, add_comp_metrics=False):
     report_brine_disposal(m.fs.disposal, w=w)
     print(sep)
 
-    title = f"WRD System Summary"
-    side = int(((3 * w) - len(title)) / 2) - 1
-    header = "/" * side + f" {title} " + "\\" * side
-    print(f"\n\n{header}\n")
-    print(f'{"Parameter":<{w}s}{"Value":<{w}s}{"Units":<{w}s}')
-    print(f"{'-' * (3 * w)}")
-    print(
-        f'{"System Recovery":<{w}s}{value(m.fs.system_recovery)*100:<{w}.3f}{"%":<{w}s}'
-    )
-    print(f'{f"Feed Flow (gpm)":<{w}s}{value(feed_flow):<{w}.3f}{"gpm"}')
-    print(f'{f"Feed Flow (MGD)":<{w}s}{value(feed_flow_mgd):<{w}.3f}{"MGD"}')
-    print(f'{f"Feed Conc":<{w}s}{value(feed_conc):<{w}.3f}{"mg/L"}')
-    print(f'{f"Product Flow (gpm)":<{w}s}{value(prod_flow):<{w}.3f}{"gpm"}')
-    print(f'{f"Product Flow (MGD)":<{w}s}{value(prod_flow_mgd):<{w}.3f}{"MGD"}')
-    print(f'{f"Product Conc":<{w}s}{value(prod_conc):<{w}.3f}{"mg/L"}')
-    print(f'{f"Brine Flow (gpm)":<{w}s}{value(brine_flow):<{w}.3f}{"gpm"}')
-    print(f'{f"Brine Flow (MGD)":<{w}s}{value(brine_flow_mgd):<{w}.3f}{"MGD"}')
-    print(f'{f"Brine Conc":<{w}s}{value(brine_conc):<{w}.3f}{"mg/L"}')
-    print()
-    print(
-        f'{f"Total Pumping Power":<{w}s}{value(pyunits.convert(m.fs.total_system_pump_power, to_units=pyunits.kW)):<{w}.3f}{"kW"}'
-    )
+    report_wrd_summary(m, w=w)
     print(sep)
     if add_comp_metrics:
         report_wrd_comparison_metrics(m, w=w)
+    if results_file is not None:
+        write_results(collect_results(m), results_file)
 
 
 def report_wrd_costing_flows(m, w=30):
@@ -728,16 +950,12 @@ def report_wrd_costing_flows(m, w=30):
                 continue
             try:
                 # Try converting to ton/month (for mass flows)
-                converted_value = value(
-                    pyunits.convert(x, to_units=pyunits.ton / pyunits.month)
-                )
-                print(f'{x.name:<{w}s}{converted_value:<{w}.3f}{"ton/month"}')
-            except:
+                flow = converted_value(x, pyunits.ton / pyunits.month)
+                print(f'{x.name:<{w}s}{flow:<{w}.3f}{"ton/month"}')
+            except UnitsError:
                 # Fall back to gallon/month (for volumetric flows)
-                converted_value = value(
-                    pyunits.convert(x, to_units=pyunits.gallon / pyunits.month)
-                )
-                print(f'{x.name:<{w}s}{converted_value:<{w}.3f}{"gal/month"}')
+                flow = converted_value(x, pyunits.gallon / pyunits.month)
+                print(f'{x.name:<{w}s}{flow:<{w}.3f}{"gal/month"}')
 
 
 def main(
@@ -745,6 +963,9 @@ def main(
     num_tsro_trains=None,
     num_pro_stages=2,
     file=None,
+    persistent_solver=False,
+    symmetric_trains=False,
+    finite_elements=None,
 ):
 
     m = build_wrd_system(
@@ -752,6 +973,8 @@ def main(
         num_tsro_trains=num_tsro_trains,
         num_stages=num_pro_stages,
         file=file,
+        symmetric_trains=symmetric_trains,
+        finite_elements=finite_elements,
     )
     add_wrd_connections(m)
     set_wrd_system_scaling(m)
@@ -765,8 +988,10 @@ def main(
 
     add_wrd_system_costing(m)
 
-    solver = get_solver()
-    results = solver.solve(m)
+    # Keep the solver on the model so resolve_wrd_system reuses it
+    m.solver = get_wrd_solver(persistent=persistent_solver)
+    with profile_section("solve", m):
+        results = m.solver.solve(m)
     assert_optimal_termination(results)
     report_wrd(m, add_comp_metrics=True)
 